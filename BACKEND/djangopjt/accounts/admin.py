@@ -1,6 +1,14 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Phone, Sarvis, UserDeviceConnection, BiometricLog, Session, CommandLog, Preset, EmailVerification, PasswordResetToken
+from .vector_codec import unpack_array
+from .models import User, Phone, Sarvis, UserDeviceConnection, BiometricLog, Session, CommandLog, CommandLogArchive, CommandLogDailyStat, Preset, EmailVerification, PasswordResetToken
+
+def vector_summary(data):
+    """패킹된 벡터의 형태와 크기 표시"""
+    if data is None:
+        return '-'
+    array = unpack_array(data)
+    return f"{' x '.join(str(n) for n in array.shape)} ({len(data)} bytes)"
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -9,11 +17,21 @@ class UserAdmin(BaseUserAdmin):
     list_display = ['user_id', 'login_id', 'email', 'nickname', 'is_active', 'is_staff', 'created_at']
     list_filter = ['is_active', 'is_staff', 'is_superuser', 'created_at']
     search_fields = ['login_id', 'email', 'nickname']
+    readonly_fields = ['face_vectors_summary', 'voice_vectors_summary']
+
+    # 생체 벡터는 바이너리로 저장되므로 형태만 표시
+    @admin.display(description='얼굴 벡터')
+    def face_vectors_summary(self, obj):
+        return vector_summary(obj.face_vectors_packed)
+
+    @admin.display(description='음성 벡터')
+    def voice_vectors_summary(self, obj):
+        return vector_summary(obj.voice_vectors_packed)
     
     # 필드셋 설정
     fieldsets = (
         (None, {'fields': ('login_id', 'email', 'nickname', 'password')}),
-        ('개인정보', {'fields': ('face_vectors', 'voice_vectors')}),
+        ('개인정보', {'fields': ('face_vectors_summary', 'voice_vectors_summary')}),
         ('권한', {'fields': ('is_active', 'is_staff', 'is_superuser')}),
         ('중요 날짜', {'fields': ('last_login_at', 'created_at', 'deleted_at')}),
         ('기타', {'fields': ('deletion_reason',)}),
@@ -43,6 +61,7 @@ class SarvisAdmin(admin.ModelAdmin):
 class UserDeviceConnectionAdmin(admin.ModelAdmin):
     list_display = ['connection_id', 'user_id', 'phone', 'sarvis', 'is_active', 'connected_at']
     list_filter = ['is_active']
+    list_select_related = ['phone', 'sarvis']
 
 @admin.register(BiometricLog)
 class BiometricLogAdmin(admin.ModelAdmin):
@@ -52,12 +71,28 @@ class BiometricLogAdmin(admin.ModelAdmin):
 class SessionAdmin(admin.ModelAdmin):
     list_display = ['session_id', 'connection', 'started_at', 'ended_at']
     list_filter = ['started_at', 'ended_at']
+    # connection 표시(UserDeviceConnection.__str__)가 user, phone을 읽음
+    list_select_related = ['connection__user', 'connection__phone']
 
 @admin.register(CommandLog)
 class CommandLogAdmin(admin.ModelAdmin):
     list_display = ['command_log_id', 'session', 'command_type', 'is_success', 'created_at']
     list_filter = ['command_type', 'is_success']
 
+@admin.register(CommandLogArchive)
+class CommandLogArchiveAdmin(admin.ModelAdmin):
+    list_display = ['archive_id', 'path', 'row_count', 'min_created_at', 'max_created_at', 'archived_at']
+    readonly_fields = ['path', 'first_log_id', 'last_log_id', 'min_created_at', 'max_created_at', 'row_count', 'size_bytes']
+
+@admin.register(CommandLogDailyStat)
+class CommandLogDailyStatAdmin(admin.ModelAdmin):
+    list_display = ['day', 'user', 'command_type', 'command_content', 'total_count', 'success_count', 'failure_count']
+    list_filter = ['command_type']
+    date_hierarchy = 'day'
+    search_fields = ['user__login_id']
+    list_select_related = ['user']
+    readonly_fields = ['user', 'day', 'command_type', 'command_content', 'total_count', 'success_count', 'failure_count']
+
 @admin.register(Preset)
 class PresetAdmin(admin.ModelAdmin):
     list_display = ['preset_id', 'user_id', 'preset_name', 'is_active', 'created_at']
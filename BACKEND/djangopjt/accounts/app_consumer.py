@@ -1,5 +1,7 @@
 # accounts/app_consumer.py
 import logging
+import time
+from collections import deque
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.db.models import Q
 from django.core.cache import cache
@@ -7,6 +9,10 @@ from django.utils import timezone
 from datetime import timedelta
 
 from .models import User, UserDeviceConnection, Session
+from .command_ack import resolve_ack
+from .button_stream import ButtonCommandStream
+from .cache_keys import FEEDBACK_NOTIFICATION
+from .presence import get_presence_config, presence
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +27,12 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
    
     async def connect(self):
         """WebSocket 연결"""
+        # 확인 대기 중인 요청: 그룹 메시지 타입 → deque[(request_id, reply_channel, 만료 시각)]
+        self.pending_acks = {
+            'voice_command': deque(),
+            'youtube_command': deque(),
+        }
+
         # URL에서 session_id 추출
         session_id = self.scope['url_route']['kwargs']['session_id']
         
@@ -47,6 +59,9 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
             self.connection = self.session.connection
             session_id = str(self.session.session_id)
             
+            # 버튼 명령 스트림 (입력 합치기 + 젯슨 전송 + 로그 일괄 저장)
+            self.button_stream = ButtonCommandStream(self.session, on_result=self._send_button_result)
+            
             # 세션 사용
             logger.info(f"앱 WebSocket - 세션 사용: {session_id}, 사용자: {self.connection.user.login_id}")
             
@@ -60,16 +75,8 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
             # 연결 수락
             await self.accept()
             
-            # 캐시에 WebSocket 연결 정보 저장
-            cache.set(
-                f'websocket:{session_id}',
-                {
-                    'connected': True,
-                    'connected_at': timezone.now().isoformat(),
-                    'session_id': session_id
-                },
-                timeout=300  # 5분
-            )
+            # 연결 레지스트리에 등록 (이후 앱 메시지마다 heartbeat로 만료 시각 갱신)
+            await self._register_presence()
             
             logger.info(f"앱 WebSocket 연결 성공: {session_id}, 사용자: {self.connection.user.login_id}")
             
@@ -101,21 +108,47 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
                     self.channel_name
                 )
             
-            # 캐시에서 WebSocket 연결 정보 삭제
-            cache.delete(f'websocket:{session_id}')
+            # 연결 레지스트리에서 삭제 (같은 세션으로 재연결한 새 연결은 유지)
+            await presence.adisconnect(session_id, self.channel_name)
+            
+            # 남은 버튼 입력 전송
+            if hasattr(self, 'button_stream'):
+                await self.button_stream.close()
             
             logger.info(f"앱 WebSocket 연결 종료: {session_id}, 코드: {close_code}")
     
+    async def _register_presence(self):
+        self._presence_refreshed = time.monotonic()
+        await presence.aconnect(
+            self.session.session_id,
+            user_id=self.connection.user.user_id,
+            user_login_id=self.connection.user.login_id,
+            channel_name=self.channel_name,
+        )
+
+    async def _refresh_presence(self):
+        """앱 메시지 수신 시 연결 만료 시각 갱신 (HEARTBEAT_INTERVAL마다 한 번)"""
+        if time.monotonic() - self._presence_refreshed < get_presence_config()['HEARTBEAT_INTERVAL']:
+            return
+        self._presence_refreshed = time.monotonic()
+        if not await presence.aheartbeat(self.session.session_id):
+            # 응답이 없던 사이 정리된 경우 다시 등록
+            await self._register_presence()
+
     async def receive_json(self, content):
         """JSON 메시지 수신"""
         try:
+            await self._refresh_presence()
             message_type = content.get('type')
             
             if message_type == 'ping':
                 await self.handle_ping(content)
+            elif message_type == 'button_command':
+                # 앱 → 서버: 로봇팔 수동 제어 버튼 (REST /api/control/button/의 스트림 버전)
+                await self.handle_button_command(content)
             elif message_type == 'voice_call_confirmation':
                 # 앱 → 서버: 음성 호출 신호 확인
-                await self.voice_call_confirmation({'type': 'voice_call_confirmation'})
+                await self.voice_call_confirmation(content)
             elif message_type == 'youtube_command_ack':
                 # 앱 → 서버: 유튜브 명령 실행 결과 확인
                 await self.youtube_command_confirmation(content)
@@ -142,6 +175,52 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
                 'message': 'Message processing error'
             })
     
+    def _remember_ack(self, event):
+        """그룹 메시지에 응답 채널이 있으면 앱 확인 대기 목록에 추가"""
+        reply_channel = event.get('reply_channel')
+        if reply_channel:
+            deadline = time.monotonic() + event.get('timeout', 30)
+            self.pending_acks[event['type']].append((event.get('request_id'), reply_channel, deadline))
+
+    async def _resolve_pending(self, event_type, request_id=None, **result):
+        """
+        대기 중인 요청에 앱 확인 결과 전달
+
+        앱이 돌려준 request_id와 같은 요청에만 전달합니다.
+        request_id가 없는 확인(request_id를 보내지 않는 이전 앱 버전)은 대기 요청이 하나뿐일 때만
+        그 요청에 전달하고, 여러 개이면 어느 명령의 결과인지 알 수 없으므로 기록만 하고 버립니다.
+
+        Returns:
+            bool: 전달한 대기 요청이 있었는지 여부
+        """
+        pending = self.pending_acks[event_type]
+
+        # 뷰에서 이미 타임아웃된 요청 정리
+        now = time.monotonic()
+        while pending and pending[0][2] < now:
+            pending.popleft()
+
+        target = None
+        if not request_id:
+            if len(pending) == 1:
+                target = pending.popleft()
+            elif pending:
+                logger.warning(
+                    f"request_id 없는 앱 확인 무시: session_id={self.session.session_id}, type={event_type}, 대기={len(pending)}"
+                )
+        else:
+            for item in pending:
+                if item[0] == request_id:
+                    target = item
+                    pending.remove(item)
+                    break
+
+        if target is None:
+            return False
+
+        await resolve_ack(target[1], target[0], **result)
+        return True
+
     async def handle_ping(self, content):
         """Ping 메시지 처리"""
         await self.send_json({
@@ -149,12 +228,31 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
             'timestamp': timezone.now().isoformat()
         })
     
+    async def handle_button_command(self, content):
+        """버튼 입력을 스트림에 추가 (결과는 button_command_result로 전달)"""
+        try:
+            self.button_stream.push(content.get('command'))
+        except ValueError as e:
+            await self.send_json({
+                'type': 'button_command_result',
+                'success': False,
+                'message': str(e)
+            })
+
+    async def _send_button_result(self, result):
+        """버튼 명령 스트림 전송 결과를 앱으로 전달"""
+        await self.send_json({
+            'type': 'button_command_result',
+            **result
+        })
+
     async def voice_command(self, event):
         """
         그룹에서 음성 명령 메시지 수신 (싸비스 호출어)
         젯슨 → Django HTTP → WebSocket 그룹 → 앱
         """
         message_data = event.get('data', {})
+        self._remember_ack(event)
         
         logger.info(f"앱으로 음성 호출 전송: session_id={self.session.session_id}, command={message_data.get('command')}")
         
@@ -162,6 +260,7 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
         await self.send_json({
             'type': 'voice_command',
             'command': message_data.get('command'),
+            'request_id': message_data.get('request_id'),
             'timestamp': message_data.get('timestamp')
         })
     
@@ -204,6 +303,7 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
         젯슨 → Django HTTP → WebSocket 그룹 → 앱
         """
         message_data = event.get('data', {})
+        self._remember_ack(event)
         
         logger.info(f"앱으로 유튜브 명령 전송: session_id={self.session.session_id}, command={message_data.get('command')}")
         
@@ -211,6 +311,7 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
         await self.send_json({
             'type': 'youtube_command',
             'command': message_data.get('command'),
+            'request_id': message_data.get('request_id'),
             'timestamp': message_data.get('timestamp')
         })
     
@@ -222,12 +323,8 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
         """
         session_id = str(self.session.session_id)
         
-        # 캐시에서 대기 중인 음성 호출 요청 확인
-        voice_call_key = f'voice_call_wait:{session_id}'
-        
-        if cache.get(voice_call_key):
-            # 대기 상태 확인 성공으로 변경
-            cache.set(voice_call_key, 'confirmed', timeout=30)
+        # 대기 중인 음성 호출 요청(trigger_voice_command)에 확인 전달
+        if await self._resolve_pending('voice_command', event.get('request_id'), success=True):
             logger.info(f"앱에서 음성 호출 신호 확인 완료: session_id={session_id}")
             
             # 앱으로 응답
@@ -258,14 +355,10 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
         data = event.get('data', {})
         status = data.get('status')
         success = (status == 'success')
+        request_id = data.get('request_id') or event.get('request_id')
         
-        # 캐시에서 대기 중인 요청 확인
-        youtube_command_key = f'youtube_command_wait:{session_id}'
-        
-        if cache.get(youtube_command_key):
-            # 실행 결과 상태로 변경
-            status = 'success' if success else 'failed'
-            cache.set(youtube_command_key, status, timeout=30)
+        # 대기 중인 유튜브 명령(voice_command_from_jetson)에 실행 결과 전달
+        if await self._resolve_pending('youtube_command', request_id, success=success):
             logger.info(f"앱에서 유튜브 명령 실행 완료: session_id={session_id}, 성공={success}")
             
             # 앱으로 응답
@@ -317,7 +410,7 @@ class AppConsumer(AsyncJsonWebsocketConsumer):
         
         @sync_to_async
         def confirm_notification():
-            notification_key = f'feedback_notification:{session_id}'
+            notification_key = FEEDBACK_NOTIFICATION.key(session_id)
             if cache.get(notification_key):
                 # 알림 확인 상태로 변경
                 cache.set(notification_key, 'confirmed', timeout=30)
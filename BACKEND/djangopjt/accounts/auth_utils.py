@@ -12,6 +12,9 @@ from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth import get_user_model
 import jwt
 
+from .principal_cache import SNAPSHOT_FIELDS, current_version, principal_cache
+from .session_registry import session_registry
+
 User = get_user_model()
 
 
@@ -70,6 +73,9 @@ class JWTAuthentication(BaseAuthentication):
     """
     커스텀 JWT 인증 클래스
     헤더에서 토큰을 추출하고 사용자를 인증합니다.
+
+    검증한 토큰의 사용자는 principal_cache에 스냅샷으로 보관하여
+    같은 토큰의 재요청은 토큰 디코딩/DB 조회 없이 인증합니다.
     """
     
     def authenticate(self, request):
@@ -94,40 +100,69 @@ class JWTAuthentication(BaseAuthentication):
             if prefix.lower() != 'bearer':
                 raise AuthenticationFailed('인증 헤더 형식이 올바르지 않습니다.')
             
+            if principal_cache.enabled:
+                snapshot = principal_cache.get(token)
+                if snapshot is not None:
+                    return (self._user_from_snapshot(snapshot), token)
+
             payload = decode_access_token(token)
+
+            # Refresh 토큰으로 API 호출 불가 (simplejwt 인증과 동일)
+            if payload.get('token_type', 'access') != 'access':
+                raise AuthenticationFailed('Access 토큰이 아닙니다.')
             
             # 페이로드에서 user_id 추출
             user_id = payload.get('user_id')
             if not user_id:
                 raise AuthenticationFailed('토큰에 사용자 정보가 없습니다.')
             
-            # 사용자 조회
-            try:
-                user = User.objects.get(user_id=user_id, is_active=True)
-            except User.DoesNotExist:
+            # 사용자 조회 (조회 전 버전을 읽어두어 조회 중 무효화되면 다음 요청에서 다시 조회)
+            version = current_version(user_id) if principal_cache.enabled else None
+            values = User.objects.filter(user_id=user_id, is_active=True).values_list(*SNAPSHOT_FIELDS).first()
+            if values is None:
                 raise AuthenticationFailed('사용자를 찾을 수 없습니다.')
+
+            if principal_cache.enabled:
+                principal_cache.set(token, values, version, token_exp=payload.get('exp'))
             
-            return (user, token)
+            return (self._user_from_snapshot(values), token)
             
         except ValueError:
             raise AuthenticationFailed('인증 헤더 형식이 올바르지 않습니다.')
         except Exception as e:
             raise AuthenticationFailed(f'인증 실패: {str(e)}')
 
+    def authenticate_header(self, request):
+        # DRF 기본 인증 클래스로 쓸 때 인증 실패를 403이 아닌 401로 응답
+        return 'Bearer realm="api"'
+
+    @staticmethod
+    def _user_from_snapshot(values):
+        """스냅샷 값으로 User 인스턴스 생성 (요청마다 새 인스턴스, 나머지 필드는 지연 로딩)"""
+        return User.from_db('default', SNAPSHOT_FIELDS, values)
+
+
+# 요청마다 인증 객체를 만들지 않도록 공용 인스턴스 사용 (상태 없음)
+_authenticator = JWTAuthentication()
+
 
 def get_user_from_token(request):
     """
     요청에서 토큰을 추출하여 사용자 객체 반환
     
+    DRF가 같은 인증 클래스로 이미 인증한 요청이면 그 결과를 그대로 사용합니다.
+
     Args:
         request: Django Request 객체
         
     Returns:
         User: 인증된 사용자 객체 또는 None
     """
-    auth = JWTAuthentication()
     try:
-        user_auth = auth.authenticate(request)
+        if isinstance(getattr(request, '_authenticator', None), JWTAuthentication):
+            return request.user
+
+        user_auth = _authenticator.authenticate(request)
         if user_auth is not None:
             return user_auth[0]
     except AuthenticationFailed:
@@ -181,6 +216,7 @@ def auto_login_for_user(user):
     try:
         if active_connection:
             session = Session.objects.create(connection=active_connection)
+            session_registry.register(session, user)
             logger.info(f"자동 로그인 - 세션 생성 (연결 있음): {session.session_id}, 사용자: {user.login_id}")
         else:
             # 연결이 없는 경우: 기본 연결 생성
@@ -205,6 +241,7 @@ def auto_login_for_user(user):
                 
                 # 세션 생성
                 session = Session.objects.create(connection=new_connection)
+                session_registry.register(session, user)
                 logger.info(f"자동 로그인 - 기본 연결 및 세션 생성 완료: {session.session_id}, 사용자: {user.login_id}")
                 
             except Exception as conn_error:
@@ -0,0 +1,391 @@
+"""
+생체 벡터 검색 엔진
+
+L2 정규화된 벡터(행)와 행별 label(user_id)을 받아 내적(=코사인 유사도) 기준
+상위 k개를 찾는 인덱스입니다. 백엔드는 같은 인터페이스를 따릅니다.
+
+- ExactIndex: 전체 행렬 스캔 (정답 기준, 소규모 갤러리)
+- IVFIndex: k-means 클러스터(역색인) 중 nprobe개만 스캔하는 근사 검색
+
+인덱스는 디렉터리(meta.json + .npy)로 저장하며, np.load(mmap_mode='r')로 열면
+같은 서버의 Django/Daphne 워커들이 OS 페이지 캐시를 공유해 벡터를 한 벌만 올립니다.
+
+사용 예:
+    index = build_index('ivf', vectors, labels, nlist=1024)
+    index.save('/var/lib/sarvis/face_index')
+    index = load_index('/var/lib/sarvis/face_index')  # mmap
+    labels, scores = index.search(query, k=5)
+"""
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+META_FILENAME = 'meta.json'
+
+# settings.BIOMETRIC_SEARCH 기본값
+DEFAULT_SEARCH_CONFIG = {
+    'BACKEND': 'exact',
+    'INDEX_PATH': None,
+    'NLIST': None,
+    'NPROBE': 8,
+    'MAX_DELTA': 5000,
+}
+
+
+def get_search_config():
+    """settings.BIOMETRIC_SEARCH를 기본값과 병합"""
+    config = dict(DEFAULT_SEARCH_CONFIG)
+    config.update(getattr(settings, 'BIOMETRIC_SEARCH', {}) or {})
+    return config
+
+
+def _top_k(scores, labels, k):
+    """1차원 점수 배열에서 상위 k개 (label, score) - 점수 내림차순"""
+    n = scores.shape[0]
+    if n == 0 or k <= 0:
+        return labels[:0], scores[:0]
+    k = min(k, n)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(n)
+    idx = idx[np.argsort(-scores[idx], kind='stable')]
+    return labels[idx], scores[idx]
+
+
+def _pad(found_labels, found_scores, k):
+    """결과가 k개 미만이면 label -1, 점수 -inf로 채움"""
+    labels = np.full(k, -1, dtype=np.int64)
+    scores = np.full(k, -np.inf, dtype=np.float32)
+    valid = np.isfinite(found_scores)
+    count = int(valid.sum())
+    labels[:count] = found_labels[valid]
+    scores[:count] = found_scores[valid]
+    return labels, scores
+
+
+def _as_queries(queries):
+    queries = np.asarray(queries, dtype=np.float32)
+    if queries.ndim == 1:
+        queries = queries.reshape(1, -1)
+    return queries
+
+
+class SearchIndex:
+    """
+    검색 인덱스 공통 인터페이스
+
+    vectors: (N, dim) float32, 행 단위 L2 정규화
+    labels: (N,) int64, 행별 소유자(user_id) - 한 사용자가 여러 행(포즈)을 가질 수 있음
+    """
+    backend = None
+
+    def __init__(self, vectors, labels, meta=None):
+        self.vectors = vectors
+        self.labels = labels
+        self.meta = meta or {}
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @classmethod
+    def build(cls, vectors, labels, **options):
+        raise NotImplementedError
+
+    def search(self, queries, k=1, exclude=None):
+        """
+        쿼리별 상위 k개 행 검색
+
+        Args:
+            queries: (dim,) 또는 (nq, dim) 정규화된 벡터
+            k: 쿼리당 결과 수
+            exclude: 결과에서 제외할 label 배열 (갱신/삭제된 사용자)
+
+        Returns:
+            tuple: (labels (nq, k) int64, scores (nq, k) float32) - 빈 자리는 -1 / -inf
+        """
+        queries = _as_queries(queries)
+        out_labels = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        out_scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+        if len(self) == 0 or queries.shape[1] != self.dim:
+            return out_labels, out_scores
+
+        exclude = None if exclude is None or len(exclude) == 0 else np.asarray(exclude, dtype=np.int64)
+        for i, query in enumerate(queries):
+            labels, scores = self._search_one(query, k, exclude)
+            out_labels[i], out_scores[i] = _pad(labels, scores, k)
+        return out_labels, out_scores
+
+    def _search_one(self, query, k, exclude):
+        raise NotImplementedError
+
+    # ===== 저장 / 로드 =====
+    def _arrays(self):
+        return {'vectors': self.vectors, 'labels': self.labels}
+
+    def save(self, path, **extra_meta):
+        """
+        인덱스를 디렉터리로 저장 (임시 디렉터리에 쓴 뒤 교체)
+
+        기존 인덱스를 mmap으로 열고 있는 워커는 교체 후에도 이전 파일을 계속 읽을 수 있습니다.
+        """
+        path = os.path.abspath(path)
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        arrays = self._arrays()
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f'{name}.npy'), np.ascontiguousarray(array))
+
+        meta = dict(self.meta)
+        meta.update(extra_meta)
+        meta.update({
+            'format_version': INDEX_FORMAT_VERSION,
+            'backend': self.backend,
+            'count': int(len(self)),
+            'dim': int(self.dim),
+            'arrays': sorted(arrays),
+        })
+        with open(os.path.join(tmp_path, META_FILENAME), 'w') as f:
+            json.dump(meta, f)
+
+        old_path = f'{path}.old-{os.getpid()}'
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+        self.meta = meta
+        logger.info(f"검색 인덱스 저장: backend={self.backend}, rows={len(self)}, path={path}")
+
+
+class ExactIndex(SearchIndex):
+    """전체 행렬 스캔 (brute-force)"""
+    backend = 'exact'
+
+    @classmethod
+    def build(cls, vectors, labels, **options):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        labels = np.ascontiguousarray(labels, dtype=np.int64)
+        return cls(vectors, labels)
+
+    def _search_one(self, query, k, exclude):
+        scores = self.vectors @ query
+        if exclude is not None:
+            scores[np.isin(self.labels, exclude)] = -np.inf
+        return _top_k(scores, self.labels, k)
+
+
+class IVFIndex(SearchIndex):
+    """
+    역색인(IVF) 근사 검색
+
+    구축 시 k-means(구면, 내적 기준)로 nlist개 중심점을 학습하고 행을 클러스터 순으로
+    재배열합니다. offsets[c]:offsets[c+1] 구간이 클러스터 c의 행입니다.
+    검색 시 쿼리와 가까운 nprobe개 클러스터만 스캔합니다.
+    """
+    backend = 'ivf'
+
+    def __init__(self, vectors, labels, centroids, offsets, nprobe=8, meta=None):
+        super().__init__(vectors, labels, meta)
+        self.centroids = centroids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self):
+        return self.centroids.shape[0]
+
+    @staticmethod
+    def _assign(vectors, centroids, chunk_size=65536):
+        """각 행을 가장 가까운(내적 최대) 중심점에 배정"""
+        assign = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], chunk_size):
+            block = np.asarray(vectors[start:start + chunk_size], dtype=np.float32)
+            assign[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+        return assign
+
+    @classmethod
+    def _train(cls, vectors, nlist, n_iter, sample_size, rng):
+        """샘플로 구면 k-means 학습"""
+        n = vectors.shape[0]
+        sample_idx = np.sort(rng.choice(n, min(n, sample_size), replace=False))
+        sample = np.asarray(vectors[sample_idx], dtype=np.float32)
+        centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assign = cls._assign(sample, centroids)
+            counts = np.bincount(assign, minlength=nlist)
+            order = np.argsort(assign, kind='stable')
+            nonempty = np.flatnonzero(counts)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[nonempty]
+            centroids[nonempty] = np.add.reduceat(sample[order], starts, axis=0)
+
+            # 빈 클러스터는 임의 샘플로 다시 시작
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(sample.shape[0], len(empty), replace=False)]
+
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.maximum(norms, 1e-12)
+
+        return centroids
+
+    @classmethod
+    def build(cls, vectors, labels, nlist=None, nprobe=8, n_iter=10, sample_size=None, seed=0, **options):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        labels = np.asarray(labels, dtype=np.int64)
+        n = vectors.shape[0]
+
+        if n == 0:
+            dim = vectors.shape[1] if vectors.ndim == 2 else 0
+            return cls(vectors.reshape(0, dim), labels, np.empty((0, dim), dtype=np.float32),
+                       np.zeros(1, dtype=np.int64), nprobe=nprobe)
+
+        if not nlist:
+            nlist = int(np.sqrt(n))
+        nlist = max(1, min(int(nlist), n))
+        if sample_size is None:
+            sample_size = max(nlist * 64, 10000)
+
+        rng = np.random.default_rng(seed)
+        centroids = cls._train(vectors, nlist, n_iter, sample_size, rng)
+
+        assign = cls._assign(vectors, centroids)
+        order = np.argsort(assign, kind='stable')
+        counts = np.bincount(assign, minlength=nlist)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        return cls(
+            np.ascontiguousarray(vectors[order]),
+            np.ascontiguousarray(labels[order]),
+            np.ascontiguousarray(centroids, dtype=np.float32),
+            offsets,
+            nprobe=nprobe,
+            meta={'nlist': nlist},
+        )
+
+    def _arrays(self):
+        arrays = super()._arrays()
+        arrays.update({'centroids': self.centroids, 'offsets': self.offsets})
+        return arrays
+
+    def _search_one(self, query, k, exclude, nprobe=None):
+        nprobe = max(1, min(nprobe or self.nprobe, self.nlist))
+        centroid_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(self.nlist)
+
+        score_blocks = []
+        label_blocks = []
+        for c in probe:
+            start, end = self.offsets[c], self.offsets[c + 1]
+            if start == end:
+                continue
+            score_blocks.append(self.vectors[start:end] @ query)
+            label_blocks.append(self.labels[start:end])
+
+        if not score_blocks:
+            return self.labels[:0], np.empty(0, dtype=np.float32)
+
+        scores = np.concatenate(score_blocks)
+        labels = np.concatenate(label_blocks)
+        if exclude is not None:
+            scores[np.isin(labels, exclude)] = -np.inf
+        return _top_k(scores, labels, k)
+
+
+BACKENDS = {
+    ExactIndex.backend: ExactIndex,
+    IVFIndex.backend: IVFIndex,
+}
+
+
+def get_backend_class(name):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f'지원하지 않는 검색 백엔드입니다: {name} (사용 가능: {", ".join(BACKENDS)})')
+
+
+def build_index(backend, vectors, labels, **options):
+    """백엔드 이름으로 인덱스 구축"""
+    return get_backend_class(backend).build(vectors, labels, **options)
+
+
+def index_exists(path):
+    return bool(path) and os.path.exists(os.path.join(path, META_FILENAME))
+
+
+def load_index(path, mmap=True, **options):
+    """
+    save()로 저장한 인덱스 로드
+
+    Args:
+        path: 인덱스 디렉터리
+        mmap: True면 벡터를 읽기 전용 메모리 맵으로 열기 (워커 간 공유)
+        options: 백엔드 옵션 (예: nprobe)
+    """
+    with open(os.path.join(path, META_FILENAME)) as f:
+        meta = json.load(f)
+
+    if meta.get('format_version') != INDEX_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 인덱스 형식입니다: {meta.get('format_version')}")
+
+    cls = get_backend_class(meta['backend'])
+    mmap_mode = 'r' if mmap else None
+    arrays = {
+        name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+        for name in meta['arrays']
+    }
+
+    if cls is IVFIndex:
+        # 중심점/오프셋은 작으므로 메모리로 복사
+        return cls(
+            arrays['vectors'], arrays['labels'],
+            np.array(arrays['centroids']), np.array(arrays['offsets']),
+            nprobe=options.get('nprobe', 8), meta=meta,
+        )
+    return cls(arrays['vectors'], arrays['labels'], meta=meta)
+
+
+def recall_at_k(candidate, reference, queries, k=1, exclude=None):
+    """
+    기준(보통 ExactIndex) 대비 후보 인덱스의 recall@k
+
+    쿼리별 기준 상위 k개 행의 label 중 후보 상위 k개에도 포함된 비율의 평균입니다.
+    """
+    queries = _as_queries(queries)
+    if queries.shape[0] == 0:
+        return 0.0
+
+    cand_labels, _ = candidate.search(queries, k=k, exclude=exclude)
+    ref_labels, _ = reference.search(queries, k=k, exclude=exclude)
+
+    hits = 0
+    total = 0
+    for cand, ref in zip(cand_labels, ref_labels):
+        ref_set = set(ref[ref >= 0].tolist())
+        if not ref_set:
+            continue
+        hits += len(ref_set & set(cand[cand >= 0].tolist()))
+        total += len(ref_set)
+
+    return hits / total if total else 0.0
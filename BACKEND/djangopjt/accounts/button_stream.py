@@ -0,0 +1,161 @@
+"""
+버튼 명령 스트림 (앱 WebSocket → 젯슨)
+
+앱에서 방향 버튼을 누르고 있으면 짧은 간격으로 같은 명령이 연속으로 들어옵니다.
+REST(robot_arm.button_command)로는 누를 때마다 JWT 검증, 세션 조회, 젯슨 왕복, 로그 INSERT가
+한 번씩 일어나 요청이 뒤로 밀립니다.
+
+AppConsumer가 세션당 ButtonCommandStream 하나를 가지고:
+- window(기본 50ms) 동안 들어온 버튼 입력을 축별 순이동량으로 합침 (RIGHT x3 + LEFT x1 → RIGHT x2)
+- 축당 한 번에 보내는 단계 수를 max_steps로 제한 (버튼을 계속 누르고 있어도 밀리지 않음)
+- 젯슨 전송은 프로세스 공용 커넥션 풀(jetson.apost)로 순서대로
+- 전송한 단계만큼의 CommandLog를 command_log_writer에 한 번에 기록 (DB에는 일괄 저장)
+
+젯슨 /button_command는 명령 하나씩만 받으므로 순이동량 n은 같은 명령 n회 전송입니다.
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+
+from .command_log_writer import command_log_writer
+from .jetson_client import jetson, JetsonUnavailable
+
+logger = logging.getLogger(__name__)
+
+BUTTON_COMMAND_ENDPOINT = '/button_command'
+
+# 버튼 명령 → (축, 방향)
+BUTTON_AXES = {
+    'RIGHT': ('x', 1),
+    'LEFT': ('x', -1),
+    'UP': ('y', 1),
+    'DOWN': ('y', -1),
+    'FAR': ('z', 1),
+    'NEAR': ('z', -1),
+    'YAW_RIGHT': ('yaw', 1),
+    'YAW_LEFT': ('yaw', -1),
+    'PITCH_UP': ('pitch', 1),
+    'PITCH_DOWN': ('pitch', -1),
+}
+BUTTON_COMMANDS = tuple(BUTTON_AXES)
+_AXIS_COMMANDS = {axis_sign: command for command, axis_sign in BUTTON_AXES.items()}
+
+# 입력을 모으는 시간 (초)
+COALESCE_WINDOW = 0.05
+# 한 번에 축당 보내는 최대 단계 수 (초과분은 버림)
+MAX_STEPS_PER_AXIS = 6
+
+
+def coalesce(commands, max_steps=None):
+    """
+    버튼 입력 목록을 축별 순이동량으로 합침
+
+    Args:
+        commands: 버튼 명령 목록 (입력 순서)
+        max_steps: 축당 최대 단계 수 (None이면 제한 없음)
+
+    Returns:
+        list[(command, steps)]: 축이 처음 입력된 순서, 순이동량 0인 축은 제외
+    """
+    net = {}
+    for command in commands:
+        axis, sign = BUTTON_AXES[command]
+        net[axis] = net.get(axis, 0) + sign
+
+    result = []
+    for axis, total in net.items():
+        if total == 0:
+            continue
+        steps = abs(total) if max_steps is None else min(abs(total), max_steps)
+        result.append((_AXIS_COMMANDS[(axis, 1 if total > 0 else -1)], steps))
+    return result
+
+
+class ButtonCommandStream:
+    """
+    세션별 버튼 명령 스트림
+
+    Args:
+        session: 활성 Session (CommandLog 저장용)
+        on_result: 전송 결과를 받을 코루틴 함수 (AppConsumer가 앱으로 전달)
+        window: 입력을 모으는 시간 (초)
+        max_steps: 축당 최대 단계 수
+    """
+
+    def __init__(self, session, on_result=None, window=COALESCE_WINDOW, max_steps=MAX_STEPS_PER_AXIS):
+        self.session = session
+        self.on_result = on_result
+        self.window = window
+        self.max_steps = max_steps
+        self._pending = []
+        self._task = None
+
+    def push(self, command):
+        """
+        버튼 입력 추가 (즉시 반환, 전송은 window 후 백그라운드에서)
+
+        Raises:
+            ValueError: 지원하지 않는 버튼 명령
+        """
+        if command not in BUTTON_AXES:
+            raise ValueError(f'유효하지 않은 명령입니다. 가능한 명령: {", ".join(BUTTON_COMMANDS)}')
+
+        self._pending.append(command)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        # 전송 중 들어온 입력은 다음 window로 모아서 순서대로 처리
+        while self._pending:
+            await asyncio.sleep(self.window)
+            presses, self._pending = self._pending, []
+            try:
+                await self._dispatch(presses)
+            except Exception as e:
+                logger.error(f"버튼 명령 스트림 처리 오류: session_id={self.session.session_id}, {e!r}")
+
+    async def _dispatch(self, presses):
+        """모은 입력을 합쳐 젯슨으로 전송하고 로그를 한 번에 기록"""
+        deltas = coalesce(presses, self.max_steps)
+        logs = []
+        results = []
+        error = None
+
+        for command, steps in deltas:
+            sent = 0
+            for _ in range(steps):
+                if error is None:
+                    try:
+                        response = await jetson.apost(BUTTON_COMMAND_ENDPOINT, {'command': command})
+                        if response.status_code != 200:
+                            error = f"젯슨 통신 실패 (HTTP {response.status_code})"
+                    except JetsonUnavailable as e:
+                        error = str(e)
+                success = error is None
+                sent += success
+                logs.append({
+                    'session_id': self.session.session_id,
+                    'command_type': 'BUTTON_COMMAND',
+                    'command_content': command,
+                    'is_success': success,
+                    'error_message': error,
+                })
+            results.append({'command': command, 'steps': steps, 'sent': sent})
+
+        if logs:
+            await sync_to_async(command_log_writer.record_many)(logs)
+        logger.info(f"버튼 명령 스트림 전송: session_id={self.session.session_id}, 입력 {len(presses)}건 → {results}")
+
+        if self.on_result is not None:
+            await self.on_result({
+                'success': error is None,
+                'pressed': len(presses),
+                'commands': results,
+                'error': error,
+            })
+
+    async def close(self):
+        """남은 입력을 모두 전송할 때까지 대기 (연결 종료 시)"""
+        if self._task is not None and not self._task.done():
+            await self._task
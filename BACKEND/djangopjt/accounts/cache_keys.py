@@ -0,0 +1,66 @@
+"""
+공유 캐시(Redis) 키 네임스페이스
+
+여러 워커가 같은 Redis를 공유하므로 기능별 키 형식을 한 곳에서 관리합니다.
+실제 Redis 키는 settings.CACHES의 KEY_PREFIX가 앞에 붙습니다 (예: sarvis:1:robot:angle).
+
+사용 예:
+    cache.set(FEEDBACK_NOTIFICATION.key(session_id), info, timeout=30)
+    version = cache.get(AUTH_PRINCIPAL.key(user_id, 'version'), 0)
+"""
+
+
+class CacheNamespace:
+    """기능별 캐시 키 생성기 - '{name}:{part1}:{part2}...' 형식"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def key(self, *parts):
+        return ':'.join([self.name, *(str(part) for part in parts)])
+
+    def keys(self, prefix, *fields):
+        """같은 prefix 아래 여러 필드 키 목록 (get_many/delete_many용)"""
+        return [self.key(prefix, field) for field in fields]
+
+    def pattern(self):
+        """이 네임스페이스 전체 키 패턴 (운영 도구용, 요청 경로에서는 사용 금지)"""
+        return f'{self.name}:*'
+
+    def __repr__(self):
+        return f'CacheNamespace({self.name!r})'
+
+
+# 회원가입 진행 상태 레코드 (registration:{login_id}, accounts/registration_state.py)
+REGISTRATION = CacheNamespace('registration')
+
+# 앱 WebSocket 연결 여부 (websocket:{session_id}) - 이전 형식, 연결 여부는 PRESENCE 사용
+WEBSOCKET = CacheNamespace('websocket')
+
+# 앱 WebSocket 연결 레지스트리 (presence:sessions ZSET, presence:info HASH)
+PRESENCE = CacheNamespace('presence')
+
+# 피드백 알림 확인 대기 (feedback_notification:{session_id})
+FEEDBACK_NOTIFICATION = CacheNamespace('feedback_notification')
+
+# 얼굴 갤러리 버전/변경 기록 (face_gallery:version, face_gallery:change:{version})
+FACE_GALLERY = CacheNamespace('face_gallery')
+
+# 로봇 상태 (robot:angle)
+ROBOT = CacheNamespace('robot')
+ROBOT_ANGLE_CACHE_KEY = ROBOT.key('angle')
+
+# CommandLog 지연 저장 큐 (command_log:queue, command_log:flush_lock, command_log:dead_letter)
+COMMAND_LOG = CacheNamespace('command_log')
+
+# JWT 인증 사용자 캐시 무효화 버전 (auth_principal:{user_id}:version)
+AUTH_PRINCIPAL = CacheNamespace('auth_principal')
+
+# uid → 활성 세션 레지스트리 (session_registry:{uid}, session_registry:{uid}:generation)
+SESSION_REGISTRY = CacheNamespace('session_registry')
+
+# 웹 대시보드 명령 로그 변경분 (dashboard:deltas, dashboard:tick_lock)
+DASHBOARD = CacheNamespace('dashboard')
+
+# 인증 메일 주소당 발송 횟수 (email:rate:{address})
+EMAIL = CacheNamespace('email')
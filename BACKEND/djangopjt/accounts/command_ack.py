@@ -0,0 +1,71 @@
+"""
+앱 명령 확인(ack) 대기 - 채널 레이어 기반 요청/응답
+
+HTTP 뷰가 앱 WebSocket 그룹으로 명령을 보내고, 앱의 실행 결과를 기다립니다.
+요청마다 채널 레이어에 전용 응답 채널을 만들어 메시지에 reply_channel로 싣고,
+AppConsumer가 앱의 확인 메시지를 받으면 그 채널로 결과를 바로 보냅니다.
+대기 중에는 이벤트 루프에 양보하므로 워커 스레드를 점유하지 않습니다.
+
+    (뷰) request_ack ── group_send(app_{session_id}, reply_channel) ──▶ AppConsumer ──▶ 앱
+    (뷰) ◀── channel_layer.receive(reply_channel) ── resolve_ack ◀── AppConsumer ◀── 앱 확인
+"""
+import asyncio
+import logging
+import uuid
+
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+# 응답 채널로 보내는 메시지 타입
+ACK_MESSAGE_TYPE = 'command.ack'
+
+
+class AckTimeout(Exception):
+    """앱 확인 대기 시간 초과"""
+
+
+async def request_ack(group_name, event_type, data, timeout):
+    """
+    앱 그룹에 명령을 보내고 확인 메시지를 기다림
+
+    Args:
+        group_name: 앱 WebSocket 그룹 (app_{session_id})
+        event_type: 그룹 메시지 타입 (AppConsumer 핸들러 이름, 예: 'youtube_command')
+        data: 앱으로 전달할 데이터 (request_id가 추가됨)
+        timeout: 최대 대기 시간 (초)
+
+    Returns:
+        dict: AppConsumer가 보낸 확인 메시지 ({'type': 'command.ack', 'request_id', 'success', ...})
+
+    Raises:
+        AckTimeout: timeout 내에 확인이 오지 않은 경우
+    """
+    channel_layer = get_channel_layer()
+    reply_channel = await channel_layer.new_channel('ack.')
+    request_id = uuid.uuid4().hex
+
+    await channel_layer.group_send(group_name, {
+        'type': event_type,
+        'data': {**data, 'request_id': request_id},
+        'reply_channel': reply_channel,
+        'request_id': request_id,
+        'timeout': timeout,
+    })
+
+    try:
+        message = await asyncio.wait_for(channel_layer.receive(reply_channel), timeout)
+    except asyncio.TimeoutError:
+        raise AckTimeout(f'{event_type} 확인 대기 시간 초과 ({timeout}s): group={group_name}')
+
+    return message
+
+
+async def resolve_ack(reply_channel, request_id, **result):
+    """대기 중인 request_ack에 확인 결과 전달 (AppConsumer에서 호출)"""
+    channel_layer = get_channel_layer()
+    await channel_layer.send(reply_channel, {
+        'type': ACK_MESSAGE_TYPE,
+        'request_id': request_id,
+        **result,
+    })
@@ -0,0 +1,322 @@
+"""
+CommandLog 보관 기간(retention) 관리
+
+버튼/음성 명령마다 쌓이는 CommandLog를 운영 테이블에 계속 두지 않고,
+보관 기간(RETENTION_DAYS)이 지난 행을 묶음 단위로 gzip JSONL 파일로 옮깁니다.
+
+    command_log (최근 N일) ──archive──▶ {DIR}/YYYY/MM/command_log_{첫 id}_{끝 id}.jsonl.gz
+                                          + command_log_archive (묶음 목록: 경로, id/시각 범위, 건수)
+
+- Celery Beat(archive_command_logs)가 주기적으로 실행, 한 번에 MAX_BATCHES x BATCH_SIZE 행까지만 처리
+- 파일을 먼저 완전히 쓰고(임시 파일 → 이름 변경) 같은 트랜잭션에서 목록 추가 + 원본 DELETE
+  (중간에 중단되면 다음 실행이 같은 id 범위를 같은 파일 이름으로 다시 씀)
+- 실행 락은 토큰으로 소유 확인 (redis_lock.RedisLock) - 묶음마다 만료를 늘리고, 락을 잃었으면 멈춤
+- history()는 운영 테이블과 보관 파일을 합쳐 같은 형식(dict)으로 반환 (이력 조회용)
+- history_page()는 같은 합집합을 (created_at, command_log_id) 커서로 최신순 페이지 단위로 반환
+- 설정은 settings.COMMAND_LOG_ARCHIVE
+
+MySQL 파티션 테이블은 외래 키(session_id)와 함께 쓸 수 없어 별도 보관 파일 방식을 사용합니다.
+"""
+import base64
+import gzip
+import json
+import logging
+import os
+import uuid
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache_keys import COMMAND_LOG
+from .models import CommandLog, CommandLogArchive, Session
+from .redis_lock import RedisLock
+
+logger = logging.getLogger(__name__)
+
+# settings.COMMAND_LOG_ARCHIVE 기본값
+DEFAULT_ARCHIVE_CONFIG = {
+    'DIR': None,  # None이면 BASE_DIR/archive/command_log
+    'RETENTION_DAYS': 90,
+    'BATCH_SIZE': 10000,  # 파일 하나에 담을 행 수
+    'MAX_BATCHES': 20,  # 한 번 실행에서 처리할 최대 묶음 수
+    'LOCK_TIMEOUT': 600,  # 초 - 실행 중 워커가 죽어도 이 시간 후 다음 실행이 이어서 처리
+}
+
+# 보관 파일 한 줄(JSON)에 담는 필드
+ARCHIVE_FIELDS = (
+    'command_log_id', 'session_id', 'command_type', 'command_content',
+    'is_success', 'error_message', 'created_at', 'event_id',
+)
+
+
+def get_archive_config():
+    """settings.COMMAND_LOG_ARCHIVE를 기본값과 병합"""
+    config = dict(DEFAULT_ARCHIVE_CONFIG)
+    config.update(getattr(settings, 'COMMAND_LOG_ARCHIVE', {}) or {})
+    if not config['DIR']:
+        config['DIR'] = Path(settings.BASE_DIR) / 'archive' / 'command_log'
+    config['DIR'] = Path(config['DIR'])
+    return config
+
+
+def _encode(row):
+    record = dict(row)
+    record['created_at'] = row['created_at'].isoformat()
+    record['event_id'] = str(row['event_id']) if row['event_id'] else None
+    return json.dumps(record, ensure_ascii=False)
+
+
+def _decode(line):
+    """보관 파일 한 줄 → ARCHIVE_FIELDS 순서의 tuple (dict보다 메모리를 적게 씀)"""
+    record = json.loads(line)
+    record['created_at'] = parse_datetime(record['created_at'])
+    record['event_id'] = uuid.UUID(record['event_id']) if record['event_id'] else None
+    return tuple(record[field] for field in ARCHIVE_FIELDS)
+
+
+@lru_cache(maxsize=8)
+def _read_archive(path):
+    """보관 파일 전체 (파일은 쓴 뒤 바뀌지 않으므로 최근 읽은 파일 몇 개를 메모리에 유지)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return tuple(_decode(line) for line in f if line.strip())
+
+
+def iter_archive_rows(path):
+    """보관 파일의 행을 dict로 하나씩 (캐시하지 않음 - 전체를 한 번 훑는 작업용)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield dict(zip(ARCHIVE_FIELDS, _decode(line)))
+
+
+class CommandLogArchiver:
+    """보관 기간이 지난 CommandLog를 압축 파일로 옮김"""
+
+    lock_key = COMMAND_LOG.key('archive_lock')
+
+    def archive(self, now=None):
+        """
+        보관 기간이 지난 행을 묶음 단위로 보관 (최대 MAX_BATCHES 묶음)
+
+        Returns:
+            int: 옮긴 행 수 (다른 워커가 실행 중이면 0)
+        """
+        config = get_archive_config()
+        lock = RedisLock(self.lock_key, config['LOCK_TIMEOUT'])
+        if not lock.acquire():
+            logger.info('CommandLog 보관: 다른 워커가 실행 중')
+            return 0
+
+        cutoff = (now or timezone.now()) - timedelta(days=config['RETENTION_DAYS'])
+        archived = 0
+        try:
+            for _ in range(config['MAX_BATCHES']):
+                # 락이 만료되어 다른 워커가 가져갔으면 같은 범위를 함께 옮기지 않도록 멈춤
+                if not lock.extend():
+                    logger.warning('CommandLog 보관: 실행 락 만료 - 다른 워커가 이어서 처리하므로 중단')
+                    break
+                count = self._archive_batch(cutoff, config)
+                archived += count
+                if count < config['BATCH_SIZE']:
+                    break
+        finally:
+            lock.release()
+
+        if archived:
+            logger.info(f'CommandLog 보관: {archived}건 (기준 {cutoff.isoformat()} 이전)')
+        return archived
+
+    def _archive_batch(self, cutoff, config):
+        # 오래된 행은 PK 앞쪽에 모여 있으므로 PK 순으로 읽음
+        rows = list(
+            CommandLog.objects.filter(created_at__lt=cutoff)
+            .order_by('command_log_id')
+            .values(*ARCHIVE_FIELDS)[:config['BATCH_SIZE']]
+        )
+        if not rows:
+            return 0
+
+        first_id, last_id = rows[0]['command_log_id'], rows[-1]['command_log_id']
+        min_created = min(row['created_at'] for row in rows)
+        max_created = max(row['created_at'] for row in rows)
+
+        relative = f'{min_created:%Y/%m}/command_log_{first_id}_{last_id}.jsonl.gz'
+        size = self._write(config['DIR'] / relative, rows)
+
+        with transaction.atomic():
+            CommandLogArchive.objects.update_or_create(path=relative, defaults={
+                'first_log_id': first_id,
+                'last_log_id': last_id,
+                'min_created_at': min_created,
+                'max_created_at': max_created,
+                'row_count': len(rows),
+                'size_bytes': size,
+            })
+            # 읽은 행과 같은 집합 (id 범위 + 같은 기준) - 큰 IN 목록 대신 범위 조건
+            CommandLog.objects.filter(
+                command_log_id__gte=first_id, command_log_id__lte=last_id, created_at__lt=cutoff
+            ).delete()
+        return len(rows)
+
+    def _write(self, path, rows):
+        """임시 파일에 쓰고 디스크에 반영한 뒤 이름 변경 (읽는 쪽은 완성된 파일만 봄)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0) as f:
+                for row in rows:
+                    f.write(_encode(row).encode('utf-8'))
+                    f.write(b'\n')
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+        return path.stat().st_size
+
+
+def history(session_ids, since=None, until=None):
+    """
+    세션들의 명령 로그 (운영 테이블 + 보관 파일)
+
+    Args:
+        session_ids: 세션 ID 목록
+        since, until: 명령 발생 일시 범위 (포함, None이면 제한 없음)
+
+    Returns:
+        list[dict]: ARCHIVE_FIELDS 키의 dict, (created_at, command_log_id) 오름차순
+    """
+    session_ids = set(session_ids)
+    if not session_ids:
+        return []
+
+    hot = CommandLog.objects.filter(session_id__in=session_ids)
+    if since is not None:
+        hot = hot.filter(created_at__gte=since)
+    if until is not None:
+        hot = hot.filter(created_at__lte=until)
+    records = {row['command_log_id']: row for row in hot.values(*ARCHIVE_FIELDS)}
+
+    # 보관 파일은 세션 기간과 겹치는 묶음만 읽음
+    window_since, window_until = since, until
+    if window_since is None or window_until is None:
+        sessions = list(Session.objects.filter(session_id__in=session_ids).values_list('started_at', 'ended_at'))
+        if not sessions:
+            return []
+        if window_since is None:
+            window_since = min(started for started, _ in sessions)
+        if window_until is None and all(ended is not None for _, ended in sessions):
+            window_until = max(ended for _, ended in sessions)
+
+    archives = CommandLogArchive.objects.filter(max_created_at__gte=window_since)
+    if window_until is not None:
+        archives = archives.filter(min_created_at__lte=window_until)
+
+    base = get_archive_config()['DIR']
+    for relative in archives.values_list('path', flat=True):
+        for values in _read_archive(str(base / relative)):
+            log_id, session_id, created_at = values[0], values[1], values[6]
+            if session_id not in session_ids:
+                continue
+            if since is not None and created_at < since:
+                continue
+            if until is not None and created_at > until:
+                continue
+            # 같은 id가 양쪽에 있으면 운영 테이블 우선
+            if log_id not in records:
+                records[log_id] = dict(zip(ARCHIVE_FIELDS, values))
+
+    return sorted(records.values(), key=lambda r: (r['created_at'], r['command_log_id']))
+
+
+def encode_cursor(row):
+    """이력 페이지 커서 (마지막 행의 created_at, command_log_id)"""
+    value = json.dumps([row['created_at'].isoformat(), row['command_log_id']])
+    return base64.urlsafe_b64encode(value.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    encode_cursor의 역변환
+
+    Raises:
+        ValueError: 잘못된 커서
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, log_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = parse_datetime(created_at)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f'잘못된 커서입니다: {cursor}') from e
+    if created_at is None or not isinstance(log_id, int):
+        raise ValueError(f'잘못된 커서입니다: {cursor}')
+    return created_at, log_id
+
+
+def history_page(user_id, before=None, limit=50, session_id=None):
+    """
+    사용자의 명령 로그 한 페이지 (최신순, 키셋 페이지네이션)
+
+    (created_at, command_log_id) < before 인 행을 최신순으로 limit건 읽습니다. OFFSET을 쓰지 않아
+    뒤쪽 페이지도 앞쪽과 같은 비용이고, 운영 테이블 행이 모자라면 보관 파일에서 이어서 채웁니다.
+
+    Args:
+        user_id: 사용자 ID
+        before: decode_cursor 결과 (None이면 첫 페이지)
+        limit: 페이지 크기
+        session_id: 지정하면 해당 세션의 로그만
+
+    Returns:
+        tuple: (ARCHIVE_FIELDS 키의 dict 목록, 다음 페이지 유무)
+    """
+    hot = CommandLog.objects.filter(session__connection__user_id=user_id)
+    if session_id is not None:
+        hot = hot.filter(session_id=session_id)
+    if before is not None:
+        created_at, log_id = before
+        hot = hot.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, command_log_id__lt=log_id))
+    rows = list(hot.order_by('-created_at', '-command_log_id').values(*ARCHIVE_FIELDS)[:limit + 1])
+    if len(rows) > limit:
+        return rows[:limit], True
+
+    # 운영 테이블이 이 페이지에서 끝남 - 나머지를 보관 파일에서
+    need = limit + 1 - len(rows)
+    sessions = Session.objects.filter(connection__user_id=user_id)
+    if session_id is not None:
+        sessions = sessions.filter(session_id=session_id)
+    sessions = dict(sessions.values_list('session_id', 'started_at'))
+    if not sessions:
+        return rows, False
+
+    archives = CommandLogArchive.objects.filter(max_created_at__gte=min(sessions.values()))
+    if before is not None:
+        archives = archives.filter(min_created_at__lte=before[0])
+    base = get_archive_config()['DIR']
+    seen = {row['command_log_id'] for row in rows}
+    candidates = []
+    for relative, max_created in archives.order_by('-max_created_at', '-last_log_id').values_list(
+        'path', 'max_created_at'
+    ):
+        # 남은 묶음은 모두 이미 모은 행보다 오래됨
+        if len(candidates) >= need and max_created < candidates[need - 1][6]:
+            break
+        for values in _read_archive(str(base / relative)):
+            if values[1] not in sessions or values[0] in seen:
+                continue
+            if before is not None and (values[6], values[0]) >= before:
+                continue
+            candidates.append(values)
+        candidates.sort(key=lambda v: (v[6], v[0]), reverse=True)
+        del candidates[need:]
+
+    rows += [dict(zip(ARCHIVE_FIELDS, values)) for values in candidates]
+    rows.sort(key=lambda r: (r['created_at'], r['command_log_id']), reverse=True)
+    return rows[:limit], len(rows) > limit
+
+
+# 프로세스 전역 인스턴스
+command_log_archiver = CommandLogArchiver()
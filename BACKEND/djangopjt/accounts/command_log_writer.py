@@ -0,0 +1,325 @@
+"""
+CommandLog 지연 저장 (write-behind)
+
+음성/버튼 명령마다 요청 안에서 CommandLog를 INSERT하고, 앱 확인 후 다시 UPDATE하던 것을
+Redis 리스트에 이벤트로 쌓아두고 Celery 태스크(flush_command_logs)가 모아서 저장합니다.
+
+    (요청) record / update ── RPUSH ──▶ command_log:queue ──▶ flush ── bulk_create / bulk_update ──▶ DB
+
+- 요청 경로에는 Redis RPUSH 한 번만 남음 (DB 왕복 없음)
+- 같은 배치 안의 생성 + 업데이트 이벤트는 INSERT 한 번으로 합침
+- 배치당 SELECT 1 + INSERT 1 + UPDATE 최대 1 (+ 집계 갱신: command_stats.rollup)
+- 최소 1회 전달(at-least-once): DB 커밋 후에만 큐에서 제거(LTRIM)하고,
+  커밋 후 제거 전에 중단되어 같은 이벤트가 다시 처리되어도 event_id(unique)로 중복 INSERT하지 않음
+- flush 락은 토큰으로 소유 확인 (redis_lock.RedisLock, 큐 제거도 Lua로 토큰 비교 후)
+  락이 만료되어 다른 워커가 이어받았으면 이전 워커는 큐를 제거하지 않고 멈춤 (같은 머리를 두 번 LTRIM하지 않음)
+- 저장할 수 없는 이벤트(잘못된 형식, DataError 등)는 command_log:dead_letter로 옮겨 큐가 막히지 않게 함
+  (DB 연결 오류는 옮기지 않고 그대로 전달 - 다음 flush에서 다시 처리)
+- settings.COMMAND_LOG_WRITER['ENABLED']가 False이면 바로 DB에 저장 (Celery 없는 개발 환경)
+- 기록/업데이트한 이벤트는 웹 대시보드 피드(dashboard_feed)에도 전달 (DB 저장을 기다리지 않음)
+
+record가 반환하는 event_id는 CommandLog.event_id로 저장되며 응답에서 command_event_id로 사용합니다.
+"""
+import json
+import logging
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, InterfaceError, OperationalError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+
+from . import command_stats
+from .cache_keys import COMMAND_LOG
+from .dashboard_feed import dashboard_feed
+from .models import CommandLog
+from .redis_lock import RedisLock
+
+logger = logging.getLogger(__name__)
+
+# settings.COMMAND_LOG_WRITER 기본값
+DEFAULT_WRITER_CONFIG = {
+    'ENABLED': True,
+    'BATCH_SIZE': 500,
+    'LOCK_TIMEOUT': 60,  # 초 - flush 중 워커가 죽어도 이 시간 후 다른 워커가 이어서 처리
+}
+
+# 업데이트 이벤트로 바꿀 수 있는 필드
+UPDATABLE_FIELDS = ('is_success', 'error_message')
+
+# KEYS[1]: 락, KEYS[2]: 큐, KEYS[3]: dead letter
+# ARGV[1]: 락 토큰, ARGV[2]: 제거할 이벤트 수, ARGV[3]: 락 TTL(ms), ARGV[4..]: dead letter로 옮길 이벤트
+# 락을 아직 갖고 있을 때만 배치를 제거하고 락 만료 시각을 늘림
+COMMIT_BATCH_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if #ARGV > 3 then
+    redis.call('RPUSH', KEYS[3], unpack(ARGV, 4))
+end
+redis.call('LTRIM', KEYS[2], ARGV[2], -1)
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# 일시적인 DB 오류 - 이벤트 문제가 아니므로 dead letter로 옮기지 않음
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+def get_writer_config():
+    """settings.COMMAND_LOG_WRITER를 기본값과 병합"""
+    config = dict(DEFAULT_WRITER_CONFIG)
+    config.update(getattr(settings, 'COMMAND_LOG_WRITER', {}) or {})
+    return config
+
+
+class CommandLogWriter:
+    """CommandLog 이벤트 큐 (프로세스 공용, 상태는 Redis에만 있음)"""
+
+    queue_key = COMMAND_LOG.key('queue')
+    lock_key = COMMAND_LOG.key('flush_lock')
+    dead_letter_key = COMMAND_LOG.key('dead_letter')
+
+    def __init__(self):
+        self._commit_script = None
+
+    @property
+    def enabled(self):
+        return get_writer_config()['ENABLED']
+
+    def _redis(self):
+        return get_redis_connection('default')
+
+    def _push(self, events):
+        self._redis().rpush(cache.make_key(self.queue_key), *(json.dumps(e) for e in events))
+
+    # ===== 요청 경로 =====
+    def record_many(self, rows):
+        """
+        명령 로그 여러 건 기록
+
+        Args:
+            rows: dict 목록 (session_id, command_type, command_content, is_success, error_message)
+
+        Returns:
+            list[str]: 각 로그의 event_id
+        """
+        now = timezone.now().isoformat()
+        events = []
+        for row in rows:
+            fields = {
+                'session_id': row['session_id'],
+                'command_type': row['command_type'],
+                'command_content': row.get('command_content'),
+                'is_success': row.get('is_success'),
+                'error_message': row.get('error_message'),
+                'created_at': now,
+            }
+            events.append({'op': 'create', 'event_id': uuid.uuid4().hex, 'fields': fields})
+
+        if not events:
+            return []
+        if self.enabled:
+            self._push(events)
+        else:
+            self._apply(events)
+        dashboard_feed.publish(events)
+        return [e['event_id'] for e in events]
+
+    def record(self, session_id, command_type, command_content=None, is_success=None, error_message=None):
+        """명령 로그 한 건 기록 - event_id 반환"""
+        return self.record_many([{
+            'session_id': session_id,
+            'command_type': command_type,
+            'command_content': command_content,
+            'is_success': is_success,
+            'error_message': error_message,
+        }])[0]
+
+    def update(self, event_id, **fields):
+        """기록한 로그의 결과 변경 (is_success, error_message)"""
+        unknown = set(fields) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f'변경할 수 없는 필드입니다: {", ".join(sorted(unknown))}')
+
+        event = {'op': 'update', 'event_id': event_id, 'fields': fields}
+        if self.enabled:
+            self._push([event])
+        else:
+            self._apply([event])
+        dashboard_feed.publish([event])
+
+    async def arecord(self, *args, **kwargs):
+        return await sync_to_async(self.record)(*args, **kwargs)
+
+    async def aupdate(self, event_id, **fields):
+        await sync_to_async(self.update)(event_id, **fields)
+
+    def pending(self):
+        """큐에 남은 이벤트 수"""
+        return self._redis().llen(cache.make_key(self.queue_key))
+
+    def dead_letters(self):
+        """저장하지 못하고 dead letter로 옮긴 이벤트 목록 (원본 JSON 문자열)"""
+        raw = self._redis().lrange(cache.make_key(self.dead_letter_key), 0, -1)
+        return [item.decode() for item in raw]
+
+    # ===== 저장 =====
+    def flush(self, max_batches=None):
+        """
+        큐의 이벤트를 DB에 저장 (Celery 태스크에서 주기적으로 호출)
+
+        동시에 한 워커만 실행합니다 (토큰 Redis 락). 배치를 DB에 커밋한 뒤, 락을 아직 갖고 있을 때만
+        큐에서 제거합니다. 락이 만료되어 다른 워커가 이어받았으면 제거하지 않고 멈춥니다.
+
+        Returns:
+            int: 처리한 이벤트 수 (다른 워커가 처리 중이면 0)
+        """
+        config = get_writer_config()
+        lock = RedisLock(self.lock_key, config['LOCK_TIMEOUT'])
+        if not lock.acquire():
+            return 0
+
+        redis = self._redis()
+
+        queue = cache.make_key(self.queue_key)
+        batch_size = config['BATCH_SIZE']
+        total = 0
+        batches = 0
+        dead = 0
+        try:
+            while max_batches is None or batches < max_batches:
+                raw = redis.lrange(queue, 0, batch_size - 1)
+                if not raw:
+                    break
+                failed = self._apply_batch(raw)
+                # 커밋 이후에만 제거 - 여기서 중단되면 다음 flush가 같은 배치를 다시 처리
+                if not self._commit_batch(redis, lock, queue, len(raw), failed):
+                    logger.warning(
+                        f"CommandLog flush 락 만료 - 다른 워커가 이어서 처리하므로 중단: 배치 {len(raw)}건"
+                    )
+                    break
+                total += len(raw)
+                dead += len(failed)
+                batches += 1
+                if len(raw) < batch_size:
+                    break
+        finally:
+            lock.release()
+
+        if total:
+            logger.info(f"CommandLog 지연 저장: 이벤트 {total}건, 배치 {batches}개")
+        if dead:
+            logger.error(f"CommandLog 저장 실패 이벤트 {dead}건을 dead letter로 옮김 ({self.dead_letter_key})")
+        return total
+
+    def _apply_batch(self, raw):
+        """
+        배치 저장 - 실패하면 한 건씩 다시 저장해 문제 이벤트만 골라냄
+
+        Returns:
+            list: 저장하지 못한 이벤트 (원본)
+        """
+        try:
+            self._apply([json.loads(item) for item in raw])
+            return []
+        except TRANSIENT_ERRORS:
+            raise
+        except Exception as e:
+            logger.warning(f"CommandLog 배치 저장 실패 - 한 건씩 다시 저장: {e!r}")
+
+        failed = []
+        for item in raw:
+            try:
+                self._apply([json.loads(item)])
+            except TRANSIENT_ERRORS:
+                raise
+            except Exception as e:
+                logger.error(f"CommandLog 이벤트 저장 실패 (dead letter): {item[:200]!r}, {e!r}")
+                failed.append(item)
+        return failed
+
+    def _commit_batch(self, redis, lock, queue, count, failed):
+        """락을 갖고 있으면 배치를 큐에서 제거 (실패 이벤트는 dead letter로) - 제거했으면 True"""
+        if self._commit_script is None:
+            self._commit_script = redis.register_script(COMMIT_BATCH_SCRIPT)
+        keys = [lock.key, queue, cache.make_key(self.dead_letter_key)]
+        args = [lock.token, count, lock.timeout_ms, *failed]
+        return bool(self._commit_script(keys=keys, args=args, client=redis))
+
+    def _apply(self, events):
+        """이벤트 배치를 DB에 반영 (생성 + 업데이트 병합, 재처리해도 같은 결과)"""
+        creates = {}
+        updates = {}
+        for event in events:
+            event_id = event['event_id']
+            if event['op'] == 'create':
+                creates[event_id] = dict(event['fields'])
+            elif event_id in creates:
+                creates[event_id].update(event['fields'])
+            else:
+                updates.setdefault(event_id, {}).update(event['fields'])
+
+        with transaction.atomic():
+            existing = CommandLog.objects.in_bulk(
+                [uuid.UUID(event_id) for event_id in [*creates, *updates]], field_name='event_id'
+            )
+            existing = {event_id.hex: log for event_id, log in existing.items()}
+
+            # 이미 저장된 생성 이벤트(재처리)는 업데이트로 처리
+            new_logs = []
+            for event_id, fields in creates.items():
+                if event_id in existing:
+                    updates.setdefault(event_id, {}).update(
+                        {name: fields[name] for name in UPDATABLE_FIELDS if name in fields}
+                    )
+                    continue
+                fields['created_at'] = parse_datetime(fields['created_at'])
+                new_logs.append(CommandLog(event_id=uuid.UUID(event_id), **fields))
+
+            saved = self._insert(new_logs) if new_logs else []
+
+            changed = []
+            changed_fields = set()
+            previous = []
+            for event_id, fields in updates.items():
+                log = existing.get(event_id)
+                if log is None:
+                    logger.warning(f"CommandLog 업데이트 대상 없음: event_id={event_id}")
+                    continue
+                previous.append((log, log.is_success))
+                for name, value in fields.items():
+                    setattr(log, name, value)
+                changed.append(log)
+                changed_fields.update(fields)
+
+            if changed:
+                CommandLog.objects.bulk_update(changed, sorted(changed_fields))
+
+            # 집계도 같은 트랜잭션에서 (재처리된 업데이트는 결과가 같아 집계가 변하지 않음)
+            command_stats.rollup(created=saved, changed=previous)
+
+    def _insert(self, logs):
+        """로그 저장 - 저장한 로그 목록 반환"""
+        try:
+            with transaction.atomic():
+                CommandLog.objects.bulk_create(logs)
+            return logs
+        except IntegrityError:
+            # 세션 삭제 등으로 저장할 수 없는 로그가 섞인 경우 - 한 건씩 저장하고 실패한 건은 버림
+            saved = []
+            for log in logs:
+                try:
+                    with transaction.atomic():
+                        log.save(force_insert=True)
+                    saved.append(log)
+                except IntegrityError as e:
+                    logger.error(f"CommandLog 저장 실패 (버림): event_id={log.event_id}, {e}")
+            return saved
+
+
+# 프로세스 전역 writer
+command_log_writer = CommandLogWriter()
@@ -0,0 +1,244 @@
+"""
+CommandLog 집계 (rollup)
+
+명령 통계(명령별 성공률, 일자별 건수)를 요청마다 command_log 전체에서 GROUP BY 하지 않고,
+로그를 저장할 때 command_log_daily_stat에 증분으로 더해 둡니다.
+
+    command_log_writer / create_command_log ──rollup()──▶ command_log_daily_stat
+                                                          (user, day, command_type, command_content)
+
+- 로그 저장과 같은 트랜잭션에서 갱신 (저장되지 않은 로그는 세지 않음)
+- 생성: total +1, 결과(is_success)가 정해져 있으면 success 또는 failure +1
+- 결과 변경: 이전 값과 새 값의 차이만 반영 (같은 이벤트를 다시 처리해도 집계가 변하지 않음)
+- 보관(command_log_archive)으로 옮긴 로그의 집계는 그대로 남음
+- rebuild()는 운영 테이블 + 보관 파일로 집계를 다시 만듦 (배포 직후 / 불일치 복구, rebuild_command_stats 명령)
+"""
+import logging
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .cache_keys import COMMAND_LOG
+from .command_log_archive import command_log_archiver, get_archive_config, iter_archive_rows
+from .models import CommandLog, CommandLogArchive, CommandLogDailyStat, Session
+from .redis_lock import RedisLock
+
+logger = logging.getLogger(__name__)
+
+CONTENT_LENGTH = CommandLogDailyStat._meta.get_field('command_content').max_length
+
+# rebuild 중 멈출 작업의 락 (command_log_writer.flush - 순환 import라 키를 직접 지정, command_log_archiver.archive)
+REBUILD_LOCK_KEYS = (COMMAND_LOG.key('flush_lock'), command_log_archiver.lock_key)
+REBUILD_LOCK_TIMEOUT = 60 * 60
+
+
+class RebuildLocked(Exception):
+    """로그 저장/보관 작업이 실행 중이라 집계를 다시 만들 수 없음"""
+
+
+def _day(value):
+    """명령 발생 일시 → 집계 일자 (TIME_ZONE 기준)"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def today():
+    """집계 기준 오늘 일자"""
+    return _day(timezone.now())
+
+
+def _key(user_id, created_at, command_type, command_content):
+    return user_id, _day(created_at), command_type, (command_content or '')[:CONTENT_LENGTH]
+
+
+def _outcome(is_success):
+    """is_success → (success, failure) 증분 (결과 미정 None은 어디에도 세지 않음)"""
+    return int(is_success is True), int(is_success is False)
+
+
+def _session_users(session_ids):
+    return dict(Session.objects.filter(session_id__in=session_ids).values_list('session_id', 'connection__user_id'))
+
+
+def rollup(created=(), changed=()):
+    """
+    저장한 로그를 집계에 반영 (로그 저장과 같은 트랜잭션 안에서 호출)
+
+    Args:
+        created: 새로 저장한 CommandLog 목록
+        changed: (CommandLog, 이전 is_success) 목록 - log에는 바뀐 값이 들어 있음
+    """
+    changed = [(log, previous) for log, previous in changed if log.is_success != previous]
+    if not created and not changed:
+        return
+
+    users = _session_users({log.session_id for log in created} | {log.session_id for log, _ in changed})
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for log in created:
+        if log.session_id not in users:
+            continue
+        success, failure = _outcome(log.is_success)
+        delta = deltas[_key(users[log.session_id], log.created_at, log.command_type, log.command_content)]
+        delta[0] += 1
+        delta[1] += success
+        delta[2] += failure
+    for log, previous in changed:
+        if log.session_id not in users:
+            continue
+        success, failure = _outcome(log.is_success)
+        old_success, old_failure = _outcome(previous)
+        delta = deltas[_key(users[log.session_id], log.created_at, log.command_type, log.command_content)]
+        delta[1] += success - old_success
+        delta[2] += failure - old_failure
+
+    _apply(deltas)
+
+
+def _apply(deltas):
+    # 항상 같은 순서로 갱신 (동시에 실행되는 트랜잭션끼리 행 잠금 순서가 엇갈리지 않도록)
+    for key in sorted(deltas):
+        total, success, failure = deltas[key]
+        if not (total or success or failure):
+            continue
+        user_id, day, command_type, command_content = key
+        stat = CommandLogDailyStat.objects.filter(
+            user_id=user_id, day=day, command_type=command_type, command_content=command_content
+        )
+        increments = {
+            'total_count': F('total_count') + total,
+            'success_count': F('success_count') + success,
+            'failure_count': F('failure_count') + failure,
+        }
+        if stat.update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                CommandLogDailyStat.objects.create(
+                    user_id=user_id, day=day, command_type=command_type, command_content=command_content,
+                    total_count=max(total, 0), success_count=max(success, 0), failure_count=max(failure, 0)
+                )
+        except IntegrityError:
+            # 다른 요청이 같은 행을 먼저 만든 경우
+            stat.update(**increments)
+
+
+def _summary(total, success, failure):
+    decided = success + failure
+    return {
+        'total': total,
+        'success': success,
+        'failure': failure,
+        'success_rate': round(success / decided, 4) if decided else None,
+    }
+
+
+def user_stats(user_id, since, until):
+    """
+    사용자의 기간별 명령 통계 (집계 테이블만 조회)
+
+    Args:
+        since, until: 일자 범위 (date, 포함)
+
+    Returns:
+        dict: by_command (명령별, 건수 많은 순), by_day (일자별, 오래된 순), total
+    """
+    stats = CommandLogDailyStat.objects.filter(user_id=user_id, day__gte=since, day__lte=until)
+    sums = {
+        'total': Sum('total_count'),
+        'success': Sum('success_count'),
+        'failure': Sum('failure_count'),
+    }
+
+    by_command = [
+        {'command_type': row['command_type'], 'command_content': row['command_content'],
+         **_summary(row['total'], row['success'], row['failure'])}
+        for row in stats.values('command_type', 'command_content').annotate(**sums)
+        .order_by('-total', 'command_type', 'command_content')
+    ]
+    by_day = [
+        {'date': row['day'].isoformat(), **_summary(row['total'], row['success'], row['failure'])}
+        for row in stats.values('day').annotate(**sums).order_by('day')
+    ]
+    return {
+        'by_command': by_command,
+        'by_day': by_day,
+        'total': _summary(*(sum(day[name] for day in by_day) for name in ('total', 'success', 'failure'))),
+    }
+
+
+def rebuild(user_ids=None):
+    """
+    운영 테이블 + 보관 파일의 로그로 집계를 다시 만듦
+
+    실행 중에는 로그 저장(flush)과 보관(archive)을 멈춥니다 (두 작업의 락을 잡음).
+    COMMAND_LOG_WRITER['ENABLED']가 False인 환경의 직접 저장은 막지 못하므로 사용량이 적을 때 실행합니다.
+
+    Args:
+        user_ids: 다시 만들 사용자 ID 목록 (None이면 전체)
+
+    Returns:
+        int: 만든 집계 행 수
+
+    Raises:
+        RebuildLocked: 로그 저장/보관 작업이 실행 중
+    """
+    acquired = []
+    try:
+        for lock_key in REBUILD_LOCK_KEYS:
+            lock = RedisLock(lock_key, REBUILD_LOCK_TIMEOUT)
+            if not lock.acquire():
+                raise RebuildLocked(lock_key)
+            acquired.append(lock)
+
+        sessions = Session.objects.all()
+        if user_ids is not None:
+            sessions = sessions.filter(connection__user_id__in=user_ids)
+        users = dict(sessions.values_list('session_id', 'connection__user_id'))
+
+        counts = defaultdict(lambda: [0, 0, 0])
+
+        def count(session_id, created_at, command_type, command_content, is_success):
+            user_id = users.get(session_id)
+            if user_id is None:
+                return
+            success, failure = _outcome(is_success)
+            delta = counts[_key(user_id, created_at, command_type, command_content)]
+            delta[0] += 1
+            delta[1] += success
+            delta[2] += failure
+
+        logs = CommandLog.objects.all()
+        if user_ids is not None:
+            logs = logs.filter(session__connection__user_id__in=user_ids)
+        for row in logs.values_list(
+            'session_id', 'created_at', 'command_type', 'command_content', 'is_success'
+        ).iterator(chunk_size=5000):
+            count(*row)
+
+        base = get_archive_config()['DIR']
+        for relative in CommandLogArchive.objects.values_list('path', flat=True):
+            for row in iter_archive_rows(str(base / relative)):
+                count(row['session_id'], row['created_at'], row['command_type'],
+                      row['command_content'], row['is_success'])
+
+        with transaction.atomic():
+            stale = CommandLogDailyStat.objects.all()
+            if user_ids is not None:
+                stale = stale.filter(user_id__in=user_ids)
+            stale.delete()
+            CommandLogDailyStat.objects.bulk_create((
+                CommandLogDailyStat(
+                    user_id=user_id, day=day, command_type=command_type, command_content=command_content,
+                    total_count=total, success_count=success, failure_count=failure
+                )
+                for (user_id, day, command_type, command_content), (total, success, failure) in counts.items()
+            ), batch_size=1000)
+    finally:
+        for lock in acquired:
+            lock.release()
+
+    logger.info(f'CommandLog 집계 재생성: {len(counts)}행')
+    return len(counts)
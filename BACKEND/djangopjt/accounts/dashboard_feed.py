@@ -0,0 +1,188 @@
+"""
+웹 대시보드 실시간 명령 로그 피드
+
+명령 로그가 기록될 때(command_log_writer.record/update, create_command_log) 변경분을
+Redis 리스트에 쌓고, 대시보드가 연결된 프로세스의 틱(기본 200ms)마다 모아서
+channel layer 그룹으로 한 번만 보냅니다.
+
+    record / update ── RPUSH ──▶ dashboard:deltas ──(틱마다 한 프로세스가 비움)──▶ group_send('dashboard')
+                                                                                    └▶ DashboardConsumer × N
+
+- 기록 경로에는 Redis RPUSH 한 번만 추가 (대시보드 클라이언트 수와 무관)
+- 틱마다 락(dashboard:tick_lock)을 잡은 한 프로세스만 비우고 전송 → 클러스터 전체에서 틱당 브로드캐스트 1회
+- 같은 틱 안의 생성 + 결과 업데이트는 한 항목으로 합침
+- 대시보드가 없으면 아무도 비우지 않으므로 최근 MAX_PENDING건만 유지
+- 연결 시에만 최근 로그 스냅샷을 DB에서 한 번 읽음 (이후는 변경분만)
+- 설정은 settings.DASHBOARD_FEED
+"""
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from .cache_keys import DASHBOARD
+from .models import CommandLog
+
+logger = logging.getLogger(__name__)
+
+# 대시보드 WebSocket 그룹
+DASHBOARD_GROUP = 'dashboard'
+
+# settings.DASHBOARD_FEED 기본값
+DEFAULT_DASHBOARD_CONFIG = {
+    'TICK': 0.2,  # 초 - 브로드캐스트 간격
+    'SNAPSHOT_SIZE': 20,  # 연결 시 보내는 최근 로그 수
+    'MAX_PENDING': 5000,  # 비우지 않은 변경분 최대 보관 수
+}
+
+# 대시보드로 보내는 로그 필드
+DELTA_FIELDS = ('session_id', 'command_type', 'command_content', 'is_success', 'error_message', 'created_at')
+
+
+def get_dashboard_config():
+    """settings.DASHBOARD_FEED를 기본값과 병합"""
+    config = dict(DEFAULT_DASHBOARD_CONFIG)
+    config.update(getattr(settings, 'DASHBOARD_FEED', {}) or {})
+    return config
+
+
+def merge(events):
+    """
+    변경분 이벤트 목록을 로그별 한 항목으로 합침 (처음 나온 순서 유지)
+
+    Args:
+        events: {'op': 'create'|'update', 'event_id', 'command_log_id'(선택), 'fields'} 목록
+
+    Returns:
+        list[dict]: {'event_id', 'command_log_id', 'op', **fields}
+    """
+    merged = {}
+    for event in events:
+        key = event.get('event_id') or f"log:{event.get('command_log_id')}"
+        item = merged.get(key)
+        if item is None:
+            merged[key] = {
+                'event_id': event.get('event_id'),
+                'command_log_id': event.get('command_log_id'),
+                'op': event['op'],
+                **event['fields'],
+            }
+        else:
+            # 생성 뒤 업데이트는 생성 항목에 반영 (op는 처음 것을 유지)
+            item.update(event['fields'])
+    return list(merged.values())
+
+
+class DashboardFeed:
+    """명령 로그 변경분 피드 (프로세스 공용, 대기 중 변경분은 Redis에 있음)"""
+
+    deltas_key = DASHBOARD.key('deltas')
+    tick_lock_key = DASHBOARD.key('tick_lock')
+
+    def __init__(self):
+        self._clients = 0
+        self._task = None
+
+    def _redis(self):
+        return get_redis_connection('default')
+
+    # ===== 기록 경로 =====
+    def publish(self, events):
+        """
+        명령 로그 변경분 추가 (대시보드 전송은 다음 틱에)
+
+        대시보드는 부가 기능이므로 Redis 오류는 기록만 하고 호출한 쪽으로 올리지 않습니다.
+        """
+        if not events:
+            return
+        key = cache.make_key(self.deltas_key)
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            pipe.rpush(key, *(json.dumps(event) for event in events))
+            pipe.ltrim(key, -get_dashboard_config()['MAX_PENDING'], -1)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"대시보드 변경분 기록 실패: {e!r}")
+
+    def publish_log(self, log):
+        """DB에 바로 저장한 CommandLog 한 건 (지연 저장을 거치지 않는 경로)"""
+        self.publish([{
+            'op': 'create',
+            'event_id': log.event_id.hex if log.event_id else None,
+            'command_log_id': log.command_log_id,
+            'fields': {
+                **{name: getattr(log, name) for name in DELTA_FIELDS},
+                'created_at': log.created_at.isoformat(),
+            },
+        }])
+
+    # ===== 틱 =====
+    def drain(self):
+        """
+        이번 틱의 변경분을 가져가고 비움 (틱당 한 프로세스만)
+
+        Returns:
+            list[dict]: merge 결과 (다른 프로세스가 이번 틱을 처리했으면 빈 목록)
+        """
+        if not cache.add(self.tick_lock_key, 1, timeout=get_dashboard_config()['TICK']):
+            return []
+        key = cache.make_key(self.deltas_key)
+        pipe = self._redis().pipeline(transaction=True)
+        pipe.lrange(key, 0, -1)
+        pipe.delete(key)
+        raw, _ = pipe.execute()
+        return merge([json.loads(item) for item in raw])
+
+    async def tick(self):
+        """변경분이 있으면 대시보드 그룹으로 한 번 전송 - 보낸 항목 수 반환"""
+        try:
+            logs = await sync_to_async(self.drain)()
+        except RedisError as e:
+            logger.warning(f"대시보드 변경분 읽기 실패: {e!r}")
+            return 0
+        if logs:
+            await get_channel_layer().group_send(DASHBOARD_GROUP, {'type': 'dashboard.delta', 'logs': logs})
+        return len(logs)
+
+    async def _run(self):
+        while self._clients > 0:
+            await asyncio.sleep(get_dashboard_config()['TICK'])
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"대시보드 브로드캐스트 오류: {e!r}")
+
+    def attach(self):
+        """대시보드 연결 - 이 프로세스의 틱 태스크가 없으면 시작 (실행 중인 이벤트 루프에서 호출)"""
+        self._clients += 1
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def detach(self):
+        """대시보드 연결 종료 - 마지막 연결이면 다음 틱에 태스크 종료"""
+        self._clients = max(self._clients - 1, 0)
+
+    # ===== 스냅샷 =====
+    def snapshot(self):
+        """최근 명령 로그 (연결 시 한 번, PK 역순 - created_at 정렬 인덱스 없이 읽음)"""
+        rows = CommandLog.objects.order_by('-command_log_id').values(
+            'command_log_id', 'event_id', *DELTA_FIELDS
+        )[:get_dashboard_config()['SNAPSHOT_SIZE']]
+        return [
+            {**row, 'event_id': row['event_id'].hex if row['event_id'] else None, 'created_at': row['created_at'].isoformat()}
+            for row in rows
+        ]
+
+    async def asnapshot(self):
+        return await sync_to_async(self.snapshot)()
+
+
+# 프로세스 전역 피드
+dashboard_feed = DashboardFeed()
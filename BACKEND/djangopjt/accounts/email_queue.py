@@ -0,0 +1,177 @@
+"""
+인증 메일 비동기 발송 (이메일 인증 코드 / 비밀번호 재설정 코드)
+
+요청 처리 중에 send_mail로 SMTP 서버와 직접 주고받던 것을 Celery 'email' 큐로 넘깁니다.
+
+    request_email_verification / request_password_reset
+        ├─ check_rate(email)            주소당 발송 횟수 제한 (초과 시 EmailRateLimited)
+        └─ queue_email(...) ── Celery 'email' 큐 ──▶ tasks.send_email ──▶ email_sender.send ──▶ SMTP
+
+- 요청 경로에는 브로커 전송 한 번만 남음 (SMTP 연결/TLS/인증 지연과 무관)
+- 워커는 프로세스당 SMTP 연결 하나를 메시지 사이에 재사용 (CONNECTION_IDLE 동안 유휴 시 닫음)
+- 일시 오류(연결 실패, 4xx 응답)는 지수 백오프로 재시도, 영구 오류(5xx)는 기록만 함
+- 브로커에 넣지 못하면 요청에서 바로 발송 (인증 코드는 이미 DB에 저장됨)
+- ENABLED=False면 항상 요청에서 바로 발송 (Celery 워커 없이 실행하는 개발 환경)
+- 테스트에서는 locmem 백엔드 + CELERY_TASK_ALWAYS_EAGER로 django.core.mail.outbox에 쌓임
+- 설정은 settings.EMAIL_QUEUE
+"""
+import logging
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from kombu.exceptions import OperationalError
+
+from .cache_keys import EMAIL
+
+logger = logging.getLogger(__name__)
+
+# settings.EMAIL_QUEUE 기본값
+DEFAULT_EMAIL_QUEUE_CONFIG = {
+    'ENABLED': True,
+    'MAX_RETRIES': 5,
+    'RETRY_BACKOFF': 10,  # 초 - 재시도 간격 기준 (10, 20, 40 ... 지터 포함)
+    'RETRY_BACKOFF_MAX': 600,
+    'RATE_LIMIT': 5,  # 주소당 RATE_WINDOW 안 최대 발송 수
+    'RATE_WINDOW': 600,  # 초
+    'CONNECTION_IDLE': 30,  # 초 - 워커가 SMTP 연결을 열어 두는 최대 유휴 시간
+}
+
+
+def get_email_queue_config():
+    """settings.EMAIL_QUEUE를 기본값과 병합"""
+    config = dict(DEFAULT_EMAIL_QUEUE_CONFIG)
+    config.update(getattr(settings, 'EMAIL_QUEUE', {}) or {})
+    return config
+
+
+class EmailRateLimited(Exception):
+    """주소당 발송 횟수 초과"""
+
+    def __init__(self, address, retry_after):
+        super().__init__(f'{address}: {retry_after}초 후 다시 시도')
+        self.address = address
+        self.retry_after = retry_after
+
+
+def check_rate(address):
+    """
+    주소당 발송 횟수 확인 후 1회 기록 (RATE_WINDOW 고정 구간, 워커 공용)
+
+    Raises:
+        EmailRateLimited: RATE_WINDOW 안에 RATE_LIMIT번을 이미 보낸 주소
+    """
+    config = get_email_queue_config()
+    if not config['RATE_LIMIT']:
+        return
+    key = EMAIL.key('rate', address.strip().lower())
+    cache.add(key, 0, timeout=config['RATE_WINDOW'])
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # 키가 그 사이 만료된 경우
+        cache.set(key, 1, timeout=config['RATE_WINDOW'])
+        count = 1
+    if count > config['RATE_LIMIT']:
+        retry_after = cache.ttl(key)
+        raise EmailRateLimited(address, retry_after if retry_after and retry_after > 0 else config['RATE_WINDOW'])
+
+
+def is_transient(exc):
+    """재시도할 발송 오류인지 (연결 문제 / 4xx 응답)"""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    # SMTPServerDisconnected, 소켓 오류, 타임아웃 (SMTPException은 OSError 하위 클래스)
+    return isinstance(exc, OSError)
+
+
+class EmailSender:
+    """프로세스 공용 SMTP 연결 - 메시지 사이에 재사용 (스레드 안전)"""
+
+    def __init__(self):
+        self._connection = None
+        self._backend = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _current_backend(self):
+        # 설정이 바뀌면 (테스트의 override_settings 등) 연결을 새로 엶
+        return settings.EMAIL_BACKEND, settings.EMAIL_HOST, settings.EMAIL_PORT, settings.EMAIL_HOST_USER
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def send(self, subject, message, recipient):
+        """
+        메일 한 통 발송 (열린 연결이 있으면 재사용)
+
+        서버가 유휴 연결을 먼저 끊었으면 새 연결로 한 번 더 보냅니다.
+        그 외 오류는 연결을 닫고 호출한 쪽(send_email 태스크)으로 올립니다.
+        """
+        email = EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [recipient])
+        with self._lock:
+            backend = self._current_backend()
+            idle = time.monotonic() - self._last_used > get_email_queue_config()['CONNECTION_IDLE']
+            if self._connection is not None and (idle or backend != self._backend):
+                self._close()
+
+            while True:
+                reused = self._connection is not None
+                if not reused:
+                    self._connection = get_connection(fail_silently=False)
+                    self._connection.open()
+                    self._backend = backend
+                    self.opened += 1
+                try:
+                    self._connection.send_messages([email])
+                except smtplib.SMTPServerDisconnected:
+                    self._close()
+                    if reused:
+                        continue
+                    raise
+                except Exception:
+                    self._close()
+                    raise
+                self._last_used = time.monotonic()
+                return
+
+
+# 프로세스 전역 SMTP 연결
+email_sender = EmailSender()
+
+
+def queue_email(subject, message, recipient):
+    """
+    메일 발송 요청 (Celery 'email' 큐, 비활성/브로커 오류 시 바로 발송)
+
+    바로 발송할 때의 오류는 기록만 합니다 (요청은 성공으로 응답 - 인증 코드는 DB에 있음).
+    """
+    from .tasks import send_email
+
+    if get_email_queue_config()['ENABLED']:
+        try:
+            send_email.delay(subject, message, recipient)
+            return
+        except OperationalError as e:
+            logger.warning(f"메일 큐 전송 실패, 바로 발송: {recipient} ({e!r})")
+
+    try:
+        email_sender.send(subject, message, recipient)
+        logger.info(f"메일 발송 성공: {recipient}")
+    except Exception as e:
+        logger.error(f"메일 발송 실패: {recipient} ({e!r})")
@@ -0,0 +1,305 @@
+"""
+얼굴 벡터 갤러리 (얼굴 로그인 가속)
+
+활성 사용자의 등록 얼굴 벡터(포즈 최대 5개)를 L2 정규화된 float32 행으로 모아
+검색 인덱스 하나로 유지합니다. 로그인 시 모든 포즈와의 코사인 유사도(근사 검색 시
+후보 클러스터만)를 계산하고, 행별 user_id로 사용자를 찾습니다.
+
+- 최초 검색 시 DB(또는 mmap 인덱스 파일)에서 한 번 적재 (지연 로딩)
+- 얼굴 벡터 저장/재등록/탈퇴 시 해당 사용자 행만 교체/삭제 (증분 갱신)
+- 다른 워커의 변경은 캐시의 버전 카운터로 감지하여 변경된 사용자만 다시 읽음
+- 검색 백엔드(exact/ivf)는 settings.BIOMETRIC_SEARCH로 선택 (biometric_search.py)
+"""
+import logging
+import threading
+import traceback
+
+import numpy as np
+from django.core.cache import cache
+
+from .biometric_search import build_index, get_search_config, index_exists, load_index
+from .vector_codec import unpack_array
+from .cache_keys import FACE_GALLERY
+
+logger = logging.getLogger(__name__)
+
+# 워커 간 갤러리 변경 감지용 버전 카운터
+FACE_GALLERY_VERSION_KEY = FACE_GALLERY.key('version')
+# 버전별 변경된 user_id 기록 (다른 워커가 변경분만 따라잡는 데 사용)
+FACE_GALLERY_CHANGE_KEY_PREFIX = FACE_GALLERY.key('change') + ':'
+FACE_GALLERY_CHANGE_TTL = 60 * 60 * 24
+
+
+def to_pose_matrix(face_vectors):
+    """
+    저장된 얼굴 벡터를 (포즈 수, 차원) float32 행렬로 변환 후 행 단위 L2 정규화
+
+    Args:
+        face_vectors: [[...512], ...] 형식의 포즈별 벡터 목록 (단일 벡터도 허용)
+
+    Returns:
+        np.ndarray 또는 None: 유효한 벡터가 없으면 None
+    """
+    if face_vectors is None:
+        return None
+
+    try:
+        matrix = np.asarray(face_vectors, dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2 or matrix.shape[0] == 0 or matrix.shape[1] == 0:
+        return None
+
+    norms = np.linalg.norm(matrix, axis=1)
+    valid = norms > 0
+    if not valid.any():
+        return None
+
+    return np.ascontiguousarray(matrix[valid] / norms[valid, None])
+
+
+def _decode_poses(user_id, packed):
+    """DB의 패킹된 얼굴 벡터를 정규화된 포즈 행렬로 변환 (손상된 데이터는 제외)"""
+    try:
+        return to_pose_matrix(unpack_array(packed))
+    except ValueError:
+        logger.warning(f"얼굴 갤러리 - 벡터 디코딩 실패로 제외: user_id={user_id}")
+        return None
+
+
+def load_gallery_arrays():
+    """
+    활성 사용자의 얼굴 벡터를 DB에서 읽어 (벡터 행렬, 행별 user_id) 반환
+
+    차원이 다른 사용자는 제외합니다.
+    """
+    from .models import User
+
+    blocks = []
+    owners = []
+    dim = None
+
+    rows = User.objects.filter(is_active=True).values_list('user_id', 'face_vectors_packed')
+    for user_id, packed in rows.iterator(chunk_size=2000):
+        poses = _decode_poses(user_id, packed)
+        if poses is None:
+            continue
+        if dim is None:
+            dim = poses.shape[1]
+        elif poses.shape[1] != dim:
+            logger.warning(f"얼굴 갤러리 - 벡터 차원 불일치로 제외: user_id={user_id}, dim={poses.shape[1]}")
+            continue
+        blocks.append(poses)
+        owners.append(np.full(poses.shape[0], user_id, dtype=np.int64))
+
+    if not blocks:
+        return np.empty((0, dim or 0), dtype=np.float32), np.empty(0, dtype=np.int64)
+    return np.ascontiguousarray(np.vstack(blocks)), np.concatenate(owners)
+
+
+class FaceGallery:
+    """
+    프로세스 전역 얼굴 벡터 갤러리
+
+    기본 인덱스(_index, biometric_search) + 이후 변경분(_delta)으로 구성됩니다.
+    _delta[user_id]는 갱신된 포즈 행렬(삭제 시 None)이며, 해당 사용자의 기본 인덱스
+    행은 검색에서 제외됩니다. INDEX_PATH가 설정되면 build_face_index로 만든 인덱스를
+    mmap으로 열어 워커 간에 공유합니다.
+    """
+
+    # 버전 차이가 이보다 크면 변경분을 따라잡지 않고 전체 재적재
+    MAX_CATCH_UP = 1000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._index = None
+        self._mmap = False
+        self._version = None
+        self._reset_delta()
+
+    def _reset_delta(self):
+        self._delta = {}
+        self._delta_matrix = None
+        self._delta_ids = np.empty(0, dtype=np.int64)
+        self._excluded = np.empty(0, dtype=np.int64)
+
+    def _rebuild_delta(self):
+        blocks = [poses for poses in self._delta.values() if poses is not None]
+        owners = [np.full(poses.shape[0], user_id, dtype=np.int64)
+                  for user_id, poses in self._delta.items() if poses is not None]
+        self._delta_matrix = np.ascontiguousarray(np.vstack(blocks)) if blocks else None
+        self._delta_ids = np.concatenate(owners) if owners else np.empty(0, dtype=np.int64)
+        self._excluded = np.fromiter(self._delta.keys(), dtype=np.int64, count=len(self._delta))
+
+    def _set_delta(self, user_id, poses):
+        if poses is not None and self._index.dim and poses.shape[1] != self._index.dim:
+            logger.warning(f"얼굴 갤러리 - 벡터 차원 불일치로 제외: user_id={user_id}, dim={poses.shape[1]}")
+            poses = None
+        self._delta[user_id] = poses
+
+    # ===== 버전 =====
+    def _current_version(self):
+        return cache.get(FACE_GALLERY_VERSION_KEY, 0)
+
+    def _bump_version(self, user_id):
+        """버전을 올리고 해당 버전에서 변경된 사용자를 기록"""
+        cache.add(FACE_GALLERY_VERSION_KEY, 0, timeout=None)
+        try:
+            version = cache.incr(FACE_GALLERY_VERSION_KEY)
+        except ValueError:
+            # 키가 그 사이 만료/삭제된 경우
+            cache.set(FACE_GALLERY_VERSION_KEY, 1, timeout=None)
+            version = 1
+        cache.set(f'{FACE_GALLERY_CHANGE_KEY_PREFIX}{version}', user_id, timeout=FACE_GALLERY_CHANGE_TTL)
+        return version
+
+    # ===== 적재 =====
+    def _load(self):
+        """기본 인덱스 적재 (인덱스 파일이 있으면 mmap, 없으면 DB에서 구축)"""
+        config = get_search_config()
+        path = config['INDEX_PATH']
+        version = self._current_version()
+
+        self._reset_delta()
+
+        if index_exists(path):
+            try:
+                self._index = load_index(path, mmap=True, nprobe=config['NPROBE'])
+                self._mmap = True
+                self._version = self._index.meta.get('gallery_version', 0)
+                logger.info(f"얼굴 갤러리 인덱스 로드(mmap): {path}, 벡터 {len(self._index)}개")
+                if self._catch_up(version):
+                    return
+                logger.warning("얼굴 갤러리 - 인덱스 이후 변경분을 따라잡지 못해 DB에서 재구축합니다.")
+            except (OSError, ValueError, KeyError):
+                logger.error(traceback.format_exc())
+            self._reset_delta()
+
+        matrix, user_ids = load_gallery_arrays()
+        self._index = build_index(
+            config['BACKEND'], matrix, user_ids,
+            nlist=config['NLIST'], nprobe=config['NPROBE'],
+        )
+        self._mmap = False
+        self._version = version
+        logger.info(f"얼굴 갤러리 적재 완료: backend={config['BACKEND']}, 벡터 {matrix.shape[0]}개")
+
+    def _catch_up(self, version):
+        """
+        현재 적재 버전 이후 변경된 사용자만 DB에서 다시 읽어 _delta에 반영
+
+        Returns:
+            bool: 따라잡기 성공 여부 (변경 기록이 만료되었으면 False)
+        """
+        from .models import User
+
+        if version == self._version:
+            return True
+        if version < self._version or version - self._version > self.MAX_CATCH_UP:
+            return False
+
+        keys = [f'{FACE_GALLERY_CHANGE_KEY_PREFIX}{v}' for v in range(self._version + 1, version + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return False
+
+        user_ids = set(changes.values())
+        rows = dict(
+            User.objects.filter(user_id__in=user_ids, is_active=True).values_list('user_id', 'face_vectors_packed')
+        )
+        for user_id in user_ids:
+            self._set_delta(user_id, _decode_poses(user_id, rows.get(user_id)))
+        self._rebuild_delta()
+        self._version = version
+
+        # 메모리 인덱스는 변경분이 쌓이면 재구축 (mmap 인덱스는 build_face_index로 재생성)
+        if not self._mmap and len(self._delta) > get_search_config()['MAX_DELTA']:
+            return False
+        return True
+
+    def ensure_loaded(self):
+        """미적재 상태면 적재, 다른 워커가 갤러리를 변경했다면 변경분 반영"""
+        version = self._current_version()
+        with self._lock:
+            if self._index is None or (self._version != version and not self._catch_up(version)):
+                self._load()
+
+    def invalidate(self):
+        """다음 검색 시 전체 재적재"""
+        with self._lock:
+            self._index = None
+            self._version = None
+            self._reset_delta()
+
+    # ===== 증분 갱신 =====
+    def upsert(self, user_id, face_vectors):
+        """사용자의 얼굴 벡터(전체 포즈)를 교체"""
+        poses = to_pose_matrix(face_vectors)
+        version = self._bump_version(user_id)
+
+        with self._lock:
+            # 아직 적재 전이거나 다른 워커의 변경이 사이에 있으면 다음 검색 때 DB에서 반영
+            if self._index is None or self._version != version - 1:
+                return
+            self._set_delta(user_id, poses)
+            self._rebuild_delta()
+            self._version = version
+
+    def remove(self, user_id):
+        """사용자를 갤러리에서 제거 (탈퇴 등)"""
+        self.upsert(user_id, None)
+
+    # ===== 검색 =====
+    def search(self, query):
+        """
+        입력 얼굴 벡터와 가장 유사한 사용자 검색
+
+        Args:
+            query: 512차원 벡터 (여러 장이면 (n, 512) - 가장 높은 점수 사용)
+
+        Returns:
+            tuple: (user_id 또는 None, 최고 코사인 유사도)
+
+        Raises:
+            ValueError: 숫자 벡터로 변환할 수 없는 입력
+        """
+        queries = to_pose_matrix(query)
+        if queries is None:
+            raise ValueError('유효한 얼굴 벡터가 아닙니다.')
+
+        self.ensure_loaded()
+
+        with self._lock:
+            index = self._index
+            delta_matrix = self._delta_matrix
+            delta_ids = self._delta_ids
+            excluded = self._excluded
+
+        best_user, best_score = None, 0.0
+
+        labels, scores = index.search(queries, k=1, exclude=excluded)
+        if scores.size and np.isfinite(scores).any():
+            best = int(np.argmax(scores[:, 0]))
+            best_user, best_score = int(labels[best, 0]), float(scores[best, 0])
+
+        if delta_matrix is not None and delta_matrix.shape[1] == queries.shape[1]:
+            delta_scores = (delta_matrix @ queries.T).max(axis=1)
+            best = int(np.argmax(delta_scores))
+            if best_user is None or delta_scores[best] > best_score:
+                best_user, best_score = int(delta_ids[best]), float(delta_scores[best])
+
+        return best_user, best_score
+
+    def __len__(self):
+        with self._lock:
+            if self._index is None:
+                return 0
+            base = np.unique(self._index.labels)
+            base = base[~np.isin(base, self._excluded)]
+            return len(base) + len(np.unique(self._delta_ids))
+
+
+face_gallery = FaceGallery()
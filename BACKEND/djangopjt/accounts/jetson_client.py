@@ -0,0 +1,277 @@
+"""
+젯슨 HTTP 클라이언트
+
+서버 → 젯슨(ngrok 터널) 호출을 한 곳에서 처리합니다.
+- 프로세스당 keep-alive 커넥션 풀 (요청마다 TLS 핸드셰이크를 다시 하지 않음)
+- 엔드포인트별 타임아웃 (버튼 명령은 짧게, 위치값 조회는 길게)
+- 회로 차단기: 젯슨이 연속으로 응답하지 않으면 일정 시간 동안 바로 실패 처리
+- 동기(jetson.post) / 비동기(await jetson.apost) 모두 지원
+
+사용 예:
+    try:
+        response = jetson.post('/button_command', {'command': 'UP'})
+    except JetsonUnavailable as e:
+        ...  # 연결 실패 / 타임아웃 / 회로 차단
+
+네트워크 대기는 DB 트랜잭션 밖에서 호출해야 합니다 (대기 중 락을 잡지 않도록).
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'ngrok-skip-browser-warning': '69420',
+    'Content-Type': 'application/json',
+}
+
+# 엔드포인트별 기본 타임아웃 (초)
+DEFAULT_TIMEOUTS = {
+    '/button_command': 3.0,
+    '/voice_command': 3.0,
+    '/update_user_offsets': 5.0,
+    '/logout': 5.0,
+    '/login_credentials': 10.0,
+    '/offsets_save': 10.0,
+}
+
+# settings.JETSON_CLIENT 기본값
+DEFAULT_CLIENT_CONFIG = {
+    'TIMEOUTS': {},
+    'DEFAULT_TIMEOUT': 10.0,
+    'CONNECT_TIMEOUT': 3.0,
+    'MAX_CONNECTIONS': 20,
+    'MAX_KEEPALIVE': 10,
+    'FAILURE_THRESHOLD': 5,
+    'RESET_TIMEOUT': 15.0,
+}
+
+# 회로 차단기가 실패로 세는 HTTP 상태 (터널/게이트웨이 장애)
+BREAKER_FAILURE_STATUSES = (502, 503, 504)
+
+
+def get_client_config():
+    """settings.JETSON_CLIENT를 기본값과 병합"""
+    config = dict(DEFAULT_CLIENT_CONFIG)
+    config.update(getattr(settings, 'JETSON_CLIENT', {}) or {})
+    return config
+
+
+class JetsonUnavailable(Exception):
+    """젯슨에 연결할 수 없음 (연결 실패, 타임아웃, 회로 차단)"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 회로 차단기
+
+    - closed: 정상 호출, 연속 실패가 failure_threshold에 도달하면 open
+    - open: reset_timeout 동안 호출하지 않고 바로 실패
+    - half_open: reset_timeout 경과 후 한 건만 시험 호출 (성공 → closed, 실패 → open)
+      시험 호출이 reset_timeout 넘게 결과를 남기지 않으면 실패로 보고 다음 시험 호출을 통과시킴
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=15.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def allow(self):
+        """이번 호출을 보내도 되는지 여부"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = self._clock()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            if self._state == self.HALF_OPEN:
+                logger.warning(f"젯슨 시험 호출 결과 없음: {self.reset_timeout}s 경과, 다시 시험 호출")
+            # 시험 호출 한 건만 통과 (half_open 동안 _opened_at은 시험 호출 시작 시각)
+            self._state = self.HALF_OPEN
+            self._opened_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"젯슨 회로 차단: 연속 실패 {self._failures}회, {self.reset_timeout}s 동안 호출 중단")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def reset(self):
+        self.record_success()
+
+
+class JetsonClient:
+    """
+    젯슨 HTTP 클라이언트 (프로세스당 하나, 스레드 간 공유)
+
+    Args:
+        base_url: 젯슨 주소 (None이면 settings.JETSON_BASE_URL을 호출 시점에 읽음)
+        config: JETSON_CLIENT 설정 덮어쓰기 (None이면 settings 사용)
+        transport / async_transport: httpx 전송 계층 (테스트용)
+    """
+
+    def __init__(self, base_url=None, config=None, transport=None, async_transport=None):
+        self._base_url = base_url
+        self._config = config
+        self._transport = transport
+        self._async_transport = async_transport
+        self._lock = threading.Lock()
+        self._client = None
+        self._client_key = None
+        # 이벤트 루프별 AsyncClient (커넥션은 생성한 루프에 묶임)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._breaker = None
+        self._breaker_key = None
+
+    @property
+    def config(self):
+        return self._config if self._config is not None else get_client_config()
+
+    @property
+    def base_url(self):
+        return (self._base_url or settings.JETSON_BASE_URL).rstrip('/')
+
+    @property
+    def breaker(self):
+        config = self.config
+        key = (self.base_url, config['FAILURE_THRESHOLD'], config['RESET_TIMEOUT'])
+        with self._lock:
+            if self._breaker is None or self._breaker_key != key:
+                self._breaker = CircuitBreaker(config['FAILURE_THRESHOLD'], config['RESET_TIMEOUT'])
+                self._breaker_key = key
+            return self._breaker
+
+    def timeout_for(self, endpoint):
+        """엔드포인트별 httpx.Timeout (연결 타임아웃은 공통)"""
+        config = self.config
+        seconds = config['TIMEOUTS'].get(endpoint, DEFAULT_TIMEOUTS.get(endpoint, config['DEFAULT_TIMEOUT']))
+        return httpx.Timeout(seconds, connect=min(seconds, config['CONNECT_TIMEOUT']))
+
+    def _client_options(self, config):
+        return {
+            'base_url': self.base_url,
+            'headers': DEFAULT_HEADERS,
+            'limits': httpx.Limits(
+                max_connections=config['MAX_CONNECTIONS'],
+                max_keepalive_connections=config['MAX_KEEPALIVE'],
+            ),
+            'timeout': config['DEFAULT_TIMEOUT'],
+        }
+
+    def _get_client(self):
+        config = self.config
+        key = (self.base_url, config['MAX_CONNECTIONS'], config['MAX_KEEPALIVE'])
+        with self._lock:
+            if self._client is None or self._client_key != key:
+                if self._client is not None:
+                    self._client.close()
+                self._client = httpx.Client(transport=self._transport, **self._client_options(config))
+                self._client_key = key
+            return self._client
+
+    def _get_async_client(self):
+        config = self.config
+        key = (self.base_url, config['MAX_CONNECTIONS'], config['MAX_KEEPALIVE'])
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None or entry[0] != key:
+            # 설정이 바뀐 이전 클라이언트는 루프가 끝나면 함께 정리됨
+            entry = (key, httpx.AsyncClient(transport=self._async_transport, **self._client_options(config)))
+            self._async_clients[loop] = entry
+        return entry[1]
+
+    def _before_request(self, endpoint):
+        if not self.breaker.allow():
+            raise JetsonUnavailable(f'젯슨 회로 차단 중: {endpoint}')
+
+    def _after_response(self, endpoint, response):
+        if response.status_code in BREAKER_FAILURE_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _on_error(self, endpoint, error):
+        self.breaker.record_failure()
+        logger.error(f"젯슨 통신 오류 ({endpoint}): {error!r}")
+        return JetsonUnavailable(f'젯슨 연결 실패 ({endpoint}): {error}')
+
+    def post(self, endpoint, json=None):
+        """
+        젯슨으로 POST (동기)
+
+        Returns:
+            httpx.Response: HTTP 오류 상태도 그대로 반환 (status_code로 판단)
+
+        Raises:
+            JetsonUnavailable: 연결 실패, 타임아웃, 회로 차단
+        """
+        self._before_request(endpoint)
+        try:
+            response = self._get_client().post(endpoint, json=json, timeout=self.timeout_for(endpoint))
+        except httpx.TransportError as e:
+            raise self._on_error(endpoint, e) from e
+        except BaseException:
+            # 취소, 그 외 httpx 오류, JSON 인코딩 오류 등 - 결과를 남겨야 half_open 시험 호출이 끝남
+            self.breaker.record_failure()
+            raise
+        return self._after_response(endpoint, response)
+
+    async def apost(self, endpoint, json=None):
+        """젯슨으로 POST (비동기, post와 동일한 반환/예외)"""
+        self._before_request(endpoint)
+        try:
+            response = await self._get_async_client().post(endpoint, json=json, timeout=self.timeout_for(endpoint))
+        except httpx.TransportError as e:
+            raise self._on_error(endpoint, e) from e
+        except BaseException:
+            # 취소, 그 외 httpx 오류, JSON 인코딩 오류 등 - 결과를 남겨야 half_open 시험 호출이 끝남
+            self.breaker.record_failure()
+            raise
+        return self._after_response(endpoint, response)
+
+    def close(self):
+        """동기 커넥션 풀 정리 (비동기 클라이언트는 aclose 사용)"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            self._client = None
+            self._client_key = None
+
+    async def aclose(self):
+        """현재 이벤트 루프의 비동기 커넥션 풀 정리"""
+        entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()
+
+
+# 프로세스 전역 클라이언트
+jetson = JetsonClient()
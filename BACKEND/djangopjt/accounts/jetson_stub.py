@@ -0,0 +1,127 @@
+"""
+로컬 젯슨 스텁 서버 (테스트 / 벤치마크용)
+
+실제 젯슨(ngrok 터널) 없이 jetson_client를 검증하기 위해
+같은 엔드포인트를 흉내 내는 HTTP/1.1 keep-alive 서버를 별도 스레드에서 띄웁니다.
+
+사용 예:
+    with JetsonStubServer(delay=0.05) as stub:
+        client = JetsonClient(base_url=stub.url)
+        client.post('/button_command', {'command': 'UP'})
+        stub.requests  # [('/button_command', {'command': 'UP'})]
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# /offsets_save 기본 응답 (robot_arm.DEFAULT_ROBOT_STATE와 동일)
+STUB_OFFSETS = {
+    'servo1': 90,
+    'servo2': 120,
+    'servo3': 0,
+    'servo4': 45,
+    'servo5': 90,
+    'servo6': 100,
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # keep-alive 연결에서 헤더/본문 분할 전송 시 Nagle + delayed ACK 지연(~40ms) 방지
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stub._record_connection()
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            payload = None
+
+        stub._record_request(self.path, payload)
+        if stub.delay:
+            time.sleep(stub.delay)
+
+        status, body = stub.response_for(self.path)
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트 타임아웃으로 먼저 끊긴 연결
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class JetsonStubServer:
+    """
+    젯슨 엔드포인트 스텁
+
+    Args:
+        delay: 응답 전 대기 시간 (초) - 터널 지연 흉내
+        status: 모든 응답의 HTTP 상태 (set_response로 엔드포인트별 덮어쓰기 가능)
+    """
+
+    def __init__(self, delay=0.0, status=200, host='127.0.0.1', port=0):
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self.connections = 0
+        self._responses = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def set_response(self, endpoint, status=200, body=None):
+        """엔드포인트 응답 지정"""
+        self._responses[endpoint] = (status, body if body is not None else {'success': status == 200})
+
+    def response_for(self, endpoint):
+        if endpoint in self._responses:
+            return self._responses[endpoint]
+        if endpoint == '/offsets_save':
+            return self.status, {'success': self.status == 200, 'offsets': dict(STUB_OFFSETS)}
+        return self.status, {'success': self.status == 200}
+
+    def _record_request(self, path, payload):
+        with self._lock:
+            self.requests.append((path, payload))
+
+    def _record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
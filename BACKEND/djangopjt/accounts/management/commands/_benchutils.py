@@ -0,0 +1,38 @@
+"""
+벤치마크 명령 공용 유틸리티
+"""
+import time
+
+import numpy as np
+
+
+def percentile(values, q):
+    """값 목록의 q 백분위수 (값이 없으면 0.0)"""
+    if not values:
+        return 0.0
+    return float(np.percentile(np.asarray(values, dtype=np.float64), q))
+
+
+def summarize_ms(samples):
+    """초 단위 측정값 목록을 ms 단위 통계 dict로 요약"""
+    ms = [s * 1000 for s in samples]
+    return {
+        'count': len(ms),
+        'mean_ms': round(float(np.mean(ms)), 3) if ms else 0.0,
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'p99_ms': round(percentile(ms, 99), 3),
+        'max_ms': round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def format_ms(stats):
+    return (f"p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms "
+            f"p99={stats['p99_ms']:.3f}ms mean={stats['mean_ms']:.3f}ms (n={stats['count']})")
+
+
+def timed(func, *args, **kwargs):
+    """(결과, 소요 초) 반환"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
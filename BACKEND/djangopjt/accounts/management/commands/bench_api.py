@@ -0,0 +1,327 @@
+"""
+API 부하 테스트 (엔드포인트별 지연 / 처리량 / 쿼리 수)
+
+합성 사용자 --users명(얼굴 5포즈 + 음성 벡터, 활성 연결/세션, 프리셋)을 만들고
+젯슨(로컬 스텁)과 앱(채널 레이어 가짜 소비자) 역할을 띄운 뒤,
+주요 엔드포인트를 --concurrency 동시 요청으로 --requests번씩 호출합니다.
+
+- 기본: 같은 프로세스의 ASGI 애플리케이션(server.asgi)을 httpx ASGITransport로 직접 호출
+  (daphne 배포와 같은 경로 - 동기 뷰는 sync_to_async 스레드, 비동기 뷰는 이벤트 루프)
+- --url: 실행 중인 서버를 HTTP로 호출 (같은 DB/Redis를 써야 하며, 서버의 JETSON_BASE_URL은 직접 지정)
+- 쿼리 수는 요청별로 집계 (query_budget.count_queries, 기본 모드에서만)
+- --output으로 결과 JSON을 파일에 저장해 릴리스 간 비교
+
+측정 대상: get_presets, button_command, voice_command(유튜브 비율 --youtube-ratio),
+face_login, password_login (로그인은 세션을 새로 만들므로 마지막에 실행)
+
+사용 예:
+    python manage.py bench_api --users 100 --requests 500 --concurrency 32
+    CACHE_FAKE_REDIS=True python manage.py bench_api --in-memory --endpoints get_presets,voice_command --json
+    python manage.py bench_api --output bench/api-$(git rev-parse --short HEAD).json
+"""
+import asyncio
+import contextlib
+import json
+import time
+import uuid
+from collections import Counter
+
+import httpx
+import numpy as np
+from channels.layers import get_channel_layer
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from accounts.auth_utils import generate_tokens_for_user
+from accounts.command_log_writer import command_log_writer
+from accounts.face_gallery import face_gallery
+from accounts.jetson_stub import JetsonStubServer
+from accounts.models import Phone, Preset, Sarvis, Session, User, UserDeviceConnection
+from accounts.presence import presence
+from accounts.query_budget import count_queries
+
+from ._benchutils import format_ms, summarize_ms
+from .bench_biometric_search import synthetic_gallery
+from .bench_command_ack import fake_app
+
+ENDPOINTS = ('get_presets', 'button_command', 'voice_command', 'face_login', 'password_login')
+
+BENCH_PASSWORD = 'Bench1234!'
+BUTTON_SEQUENCE = ('UP', 'RIGHT', 'DOWN', 'LEFT')
+VOICE_COMMANDS = ('TRACK_ON', 'TRACK_OFF', 'COME_HERE', 'HOME')
+YOUTUBE_COMMANDS = ('YOUTUBE_PLAY', 'YOUTUBE_PAUSE')
+
+class Command(BaseCommand):
+    help = '주요 API 엔드포인트를 동시 요청으로 호출해 지연(p50/p95/p99), 처리량, 쿼리 수를 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='합성 사용자 수')
+        parser.add_argument('--requests', type=int, default=300, help='엔드포인트별 요청 수')
+        parser.add_argument('--concurrency', type=int, default=16, help='동시 요청 수')
+        parser.add_argument('--warmup', type=int, default=5, help='엔드포인트별 측정 전 요청 수')
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='쉼표로 구분한 측정 대상')
+        parser.add_argument('--youtube-ratio', type=float, default=0.3, help='voice_command 중 유튜브(앱 확인 대기) 명령 비율')
+        parser.add_argument('--jetson-delay', type=float, default=0.005, help='스텁 젯슨 처리 시간 (초)')
+        parser.add_argument('--app-delay', type=float, default=0.05, help='가짜 앱이 확인을 보내기까지 걸리는 시간 (초)')
+        parser.add_argument('--url', help='측정할 서버 주소 (없으면 같은 프로세스의 ASGI 앱 호출)')
+        parser.add_argument('--in-memory', action='store_true', help='InMemoryChannelLayer 사용 (Redis 없이 실행, 기본 모드 전용)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='결과 JSON 저장 경로')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    # ===== 합성 데이터 =====
+    def _seed(self, options, rng):
+        """사용자/벡터/연결/세션/프리셋 생성 - 사용자별 요청에 필요한 값 목록 반환"""
+        count = options['users']
+        run = uuid.uuid4().hex[:6]
+        password_hash = make_password(BENCH_PASSWORD)  # 해시는 한 번만 계산 (느린 해셔)
+
+        poses, _ = synthetic_gallery(count, 5, 512, 0.6, rng)
+        # 사용자 i의 첫 포즈에 노이즈를 더한 로그인 쿼리 (같은 사람의 새 촬영)
+        queries = poses[::5] + 0.3 * rng.standard_normal((count, 512), dtype=np.float32) / np.sqrt(512)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        users = []
+        for i in range(count):
+            user = User(
+                login_id=f'load_{run}_{i}', email=f'load_{run}_{i}@example.com',
+                nickname='load', password=password_hash
+            )
+            user.face_vectors = poses[i * 5:(i + 1) * 5].tolist()
+            user.voice_vectors = rng.standard_normal((4, 256)).astype(np.float32).tolist()
+            users.append(user)
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            # bulk_create가 PK를 채우지 않는 DB(MySQL)도 있으므로 다시 조회
+            users = list(User.objects.filter(login_id__startswith=f'load_{run}_').order_by('user_id'))
+            by_login = {user.login_id: user for user in users}
+
+            seeded = []
+            phones, sarvises = [], []
+            for i in range(count):
+                user = by_login[f'load_{run}_{i}']
+                phone = Phone.objects.create(device_name=f'load-phone-{i}')
+                sarvis = Sarvis.objects.create()
+                phones.append(phone.pk)
+                sarvises.append(sarvis.pk)
+                device_connection = UserDeviceConnection.objects.create(
+                    user=user, phone=phone, sarvis=sarvis, is_active=True
+                )
+                session = Session.objects.create(connection=device_connection)
+                seeded.append({
+                    'user': user,
+                    'session_id': session.session_id,
+                    'access': generate_tokens_for_user(user)['access'],
+                    'face_query': queries[i].tolist(),
+                })
+
+            Preset.objects.bulk_create([
+                Preset(user=item['user'], preset_name=f'preset {n}', is_active=(n == 0),
+                       servo1=90, servo2=90, servo3=90, servo4=90, servo5=90, servo6=n * 10)
+                for item in seeded for n in range(3)
+            ])
+
+        for item in seeded:
+            face_gallery.upsert(item['user'].user_id, item['user'].face_vectors)
+            # 앱 WebSocket이 연결된 상태 (AppConsumer.connect와 같은 등록)
+            presence.connect(item['session_id'], user_id=item['user'].user_id, channel_name='bench')
+
+        return seeded, {'phones': phones, 'sarvises': sarvises}
+
+    def _cleanup(self, seeded, devices):
+        # 큐에 남은 CommandLog를 먼저 저장 (사용자 삭제 후에는 세션 FK로 저장 실패)
+        command_log_writer.flush()
+        for item in seeded:
+            presence.disconnect(item['session_id'])
+        for item in seeded:
+            face_gallery.remove(item['user'].user_id)
+        User.objects.filter(user_id__in=[item['user'].user_id for item in seeded]).delete()
+        Phone.objects.filter(pk__in=devices['phones']).delete()
+        Sarvis.objects.filter(pk__in=devices['sarvises']).delete()
+
+    # ===== 요청 =====
+    def _request_factories(self, seeded, options, rng):
+        """엔드포인트별 i번째 요청 (method, path, httpx 인자)"""
+        youtube = rng.random(options['requests'] + options['warmup']) < options['youtube_ratio']
+
+        def pick(i):
+            return seeded[i % len(seeded)]
+
+        def auth(item):
+            return {'Authorization': f"Bearer {item['access']}"}
+
+        def get_presets(i):
+            item = pick(i)
+            return 'GET', '/api/preset/list/', {'headers': auth(item)}
+
+        def button_command(i):
+            item = pick(i)
+            body = {'session_id': item['session_id'], 'command': BUTTON_SEQUENCE[i % len(BUTTON_SEQUENCE)]}
+            return 'POST', '/api/control/button/', {'headers': auth(item), 'json': body}
+
+        def voice_command(i):
+            item = pick(i)
+            commands = YOUTUBE_COMMANDS if youtube[i % len(youtube)] else VOICE_COMMANDS
+            body = {'uid': str(item['user'].uid), 'command': commands[i % len(commands)]}
+            return 'POST', '/api/control/voice/', {'json': body}
+
+        def face_login(i):
+            return 'POST', '/api/login/face/', {'json': {'face_vectors': pick(i)['face_query']}}
+
+        def password_login(i):
+            body = {'login_id': pick(i)['user'].login_id, 'password': BENCH_PASSWORD}
+            return 'POST', '/api/login/password/', {'json': body}
+
+        return {
+            'get_presets': get_presets,
+            'button_command': button_command,
+            'voice_command': voice_command,
+            'face_login': face_login,
+            'password_login': password_login,
+        }
+
+    async def _run_endpoint(self, client, name, make_request, options, count):
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        latencies = []
+        status_codes = Counter()
+        failures = 0
+        queries = 0
+
+        async def one(i, measure):
+            nonlocal failures, queries
+            method, path, kwargs = make_request(i)
+            async with semaphore:
+                started = time.perf_counter()
+                # 요청 처리 태스크/스레드는 이 컨텍스트를 이어받으므로 요청별로 집계됨
+                with count_queries() as counted:
+                    try:
+                        response = await client.request(method, path, **kwargs)
+                    except httpx.HTTPError:
+                        failures += 1
+                        return
+                elapsed = time.perf_counter() - started
+            if measure:
+                latencies.append(elapsed)
+                status_codes[response.status_code] += 1
+                queries += counted.count
+
+        # 워밍업 (갤러리 적재, 젯슨 연결 등) - 집계하지 않음
+        await asyncio.gather(*(one(i, False) for i in range(options['warmup'])))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(options['warmup'] + i, True) for i in range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        ok = sum(n for code, n in status_codes.items() if 200 <= code < 300)
+        result = {
+            'requests': options['requests'],
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            'errors': options['requests'] - ok,
+            'status_codes': {str(code): n for code, n in sorted(status_codes.items())},
+            'latency': summarize_ms(latencies),
+        }
+        if failures:
+            result['transport_errors'] = failures
+        if count:
+            result['queries'] = queries
+            result['queries_per_request'] = round(queries / options['requests'], 3)
+        return result
+
+    async def _run(self, seeded, endpoints, options, rng):
+        factories = self._request_factories(seeded, options, rng)
+
+        # 앱 역할: 세션별 그룹 메시지를 받아 app_delay 후 확인
+        channel_layer = get_channel_layer()
+        stop = asyncio.Event()
+        apps = [
+            asyncio.ensure_future(fake_app(channel_layer, f"app_{item['session_id']}", options['app_delay'], stop))
+            for item in seeded
+        ]
+        await asyncio.sleep(0.1)
+
+        if options['url']:
+            client = httpx.AsyncClient(base_url=options['url'].rstrip('/'), timeout=30)
+        else:
+            from server.asgi import application
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=application), base_url='http://localhost', timeout=30
+            )
+
+        results = {}
+        try:
+            for name in endpoints:
+                results[name] = await self._run_endpoint(
+                    client, name, factories[name], options, count=not options['url']
+                )
+                self._report(name, results[name])
+        finally:
+            await client.aclose()
+            stop.set()
+            for task in apps:
+                task.cancel()
+            await asyncio.gather(*apps, return_exceptions=True)
+        return results
+
+    def _report(self, name, result):
+        queries = f", 쿼리 {result['queries_per_request']}회/요청" if 'queries_per_request' in result else ''
+        self.stdout.write(
+            f"[{name}] {result['throughput_rps']} req/s, 오류 {result['errors']} {result['status_codes']}{queries}, "
+            f"{format_ms(result['latency'])}"
+        )
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"알 수 없는 엔드포인트: {', '.join(sorted(unknown))} (가능: {', '.join(ENDPOINTS)})")
+        if options['users'] < 1:
+            raise CommandError('--users는 1 이상이어야 합니다.')
+        # 로그인은 새 세션을 만들므로 다른 엔드포인트 뒤에 실행
+        endpoints.sort(key=ENDPOINTS.index)
+
+        rng = np.random.default_rng(options['seed'])
+        overrides = {}
+        if options['in_memory']:
+            overrides['CHANNEL_LAYERS'] = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+        results = {
+            'config': {
+                'users': options['users'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'youtube_ratio': options['youtube_ratio'],
+                'jetson_delay_s': options['jetson_delay'],
+                'app_delay_s': options['app_delay'],
+                'target': options['url'] or 'asgi (in-process)',
+                'db_vendor': connection.vendor,
+                'command_log_write_behind': command_log_writer.enabled,
+            },
+            'started_at': timezone.now().isoformat(),
+        }
+
+        seeded, devices = self._seed(options, rng)
+        try:
+            # --url이면 젯슨은 서버 설정을 따름
+            stub_context = contextlib.nullcontext() if options['url'] else JetsonStubServer(delay=options['jetson_delay'])
+            with stub_context as stub:
+                if stub is not None:
+                    overrides['JETSON_BASE_URL'] = stub.url
+                with override_settings(**overrides):
+                    results['endpoints'] = asyncio.run(self._run(seeded, endpoints, options, rng))
+                if stub is not None:
+                    results['jetson_stub_requests'] = len(stub.requests)
+        finally:
+            self._cleanup(seeded, devices)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"결과 저장: {options['output']}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,127 @@
+"""
+얼굴 벡터 검색 백엔드 벤치마크 (지연시간 / recall@k)
+
+exact 백엔드를 정답으로 두고 IVF 백엔드의 nprobe별 지연시간과 recall@k를 측정합니다.
+--users를 주면 합성 갤러리(사용자별 중심 벡터 + 포즈 노이즈), 생략하면 현재 DB 갤러리를 사용합니다.
+
+사용 예:
+    python manage.py bench_biometric_search --users 200000 --nprobe 1,4,8,16,32
+    python manage.py bench_biometric_search --nlist 512 --k 5 --json
+"""
+import json
+import tempfile
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from accounts.biometric_search import ExactIndex, IVFIndex, load_index, recall_at_k
+from accounts.face_gallery import load_gallery_arrays
+
+from ._benchutils import format_ms, summarize_ms, timed
+
+
+def synthetic_gallery(users, poses, dim, noise, rng):
+    """사용자별 중심 벡터 주변에 포즈 벡터를 생성 (행 단위 정규화)"""
+    centers = rng.standard_normal((users, dim), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = np.repeat(centers, poses, axis=0)
+    vectors += noise * rng.standard_normal(vectors.shape, dtype=np.float32) / np.sqrt(dim)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    labels = np.repeat(np.arange(1, users + 1, dtype=np.int64), poses)
+    return vectors, labels
+
+
+def make_queries(vectors, count, noise, rng):
+    """등록 벡터에 노이즈를 더한 쿼리 (같은 사용자의 새 촬영을 흉내)"""
+    picks = rng.choice(vectors.shape[0], min(count, vectors.shape[0]), replace=False)
+    queries = np.array(vectors[picks], dtype=np.float32)
+    queries += noise * rng.standard_normal(queries.shape, dtype=np.float32) / np.sqrt(queries.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries
+
+
+class Command(BaseCommand):
+    help = '얼굴 벡터 검색 백엔드(exact / ivf)의 지연시간과 recall@k를 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0, help='합성 사용자 수 (0이면 DB 갤러리 사용)')
+        parser.add_argument('--poses', type=int, default=5)
+        parser.add_argument('--dim', type=int, default=512)
+        parser.add_argument('--noise', type=float, default=0.6, help='포즈/쿼리 노이즈 크기')
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--k', type=int, default=5)
+        parser.add_argument('--nlist', type=int, default=None)
+        parser.add_argument('--nprobe', default='1,4,8,16,32', help='쉼표로 구분한 nprobe 목록')
+        parser.add_argument('--mmap', action='store_true', help='인덱스를 저장 후 mmap으로 열어 측정')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    def _measure(self, index, queries, k, **kwargs):
+        samples = []
+        for query in queries:
+            _, secs = timed(index.search, query, k=k, **kwargs)
+            samples.append(secs)
+        return summarize_ms(samples)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        k = options['k']
+
+        if options['users']:
+            vectors, labels = synthetic_gallery(
+                options['users'], options['poses'], options['dim'], options['noise'], rng
+            )
+            source = f"synthetic users={options['users']} poses={options['poses']} dim={options['dim']}"
+        else:
+            vectors, labels = load_gallery_arrays()
+            source = 'database'
+
+        if vectors.shape[0] == 0:
+            self.stdout.write(self.style.WARNING('갤러리가 비어 있습니다. --users로 합성 데이터를 사용하세요.'))
+            return
+
+        queries = make_queries(vectors, options['queries'], options['noise'], rng)
+        self.stdout.write(f'갤러리: {source}, 벡터 {vectors.shape[0]}개, 쿼리 {queries.shape[0]}개')
+
+        exact, exact_build = timed(ExactIndex.build, vectors, labels)
+        ivf, ivf_build = timed(IVFIndex.build, vectors, labels, nlist=options['nlist'], seed=options['seed'])
+
+        tmpdir = None
+        if options['mmap']:
+            tmpdir = tempfile.TemporaryDirectory()
+            exact.save(f'{tmpdir.name}/exact')
+            ivf.save(f'{tmpdir.name}/ivf')
+            exact = load_index(f'{tmpdir.name}/exact', mmap=True)
+            ivf = load_index(f'{tmpdir.name}/ivf', mmap=True)
+
+        results = {
+            'source': source,
+            'vectors': int(vectors.shape[0]),
+            'queries': int(queries.shape[0]),
+            'k': k,
+            'mmap': options['mmap'],
+            'exact': {'build_s': round(exact_build, 3), 'latency': self._measure(exact, queries, k)},
+            'ivf': {'build_s': round(ivf_build, 3), 'nlist': ivf.nlist, 'runs': []},
+        }
+        self.stdout.write(f"exact: build={exact_build:.2f}s {format_ms(results['exact']['latency'])}")
+        self.stdout.write(f'ivf: build={ivf_build:.2f}s nlist={ivf.nlist}')
+
+        for nprobe in [int(n) for n in options['nprobe'].split(',') if n.strip()]:
+            ivf.nprobe = nprobe
+            run = {
+                'nprobe': nprobe,
+                'recall@1': round(recall_at_k(ivf, exact, queries, k=1), 4),
+                f'recall@{k}': round(recall_at_k(ivf, exact, queries, k=k), 4),
+                'latency': self._measure(ivf, queries, k),
+            }
+            results['ivf']['runs'].append(run)
+            self.stdout.write(
+                f"  nprobe={nprobe:<4} recall@1={run['recall@1']:.4f} recall@{k}={run[f'recall@{k}']:.4f} "
+                f"{format_ms(run['latency'])}"
+            )
+
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,168 @@
+"""
+회원가입 단계별 캐시 왕복 횟수 / 지연시간 / 메모리 벤치마크
+
+회원가입 한 번(아이디 → 닉네임 → 이메일 → 비밀번호 → 얼굴 → 음성)의 캐시 사용을 비교합니다.
+- fields: 필드마다 키 하나 (registration:{login_id}:{field}) - 단계마다 이전 필드 MGET + 새 필드 SET,
+          얼굴 벡터는 pickle된 list, 완료 시 필드 키 모두 DEL (이전 방식)
+- record: 버전이 붙은 레코드 하나 (registration_state) - 단계마다 GET + 비교 후 저장 스크립트(EVALSHA),
+          얼굴 벡터는 float16 바이트, 완료 시 같은 스크립트로 삭제
+
+왕복 수는 Redis 연결의 요청 전송(send_packed_command) 횟수로 셉니다 (파이프라인은 1회).
+fakeredis(CACHE_FAKE_REDIS=True)처럼 네트워크가 없는 환경에서는 --rtt-ms로
+왕복 지연을 주입해 실제 배포 환경을 흉내낼 수 있습니다.
+메모리는 얼굴 단계까지 진행한 회원가입 하나가 차지하는 크기입니다
+(Redis MEMORY USAGE, 지원하지 않는 fakeredis에서는 키 + 값 바이트).
+
+사용 예:
+    python manage.py bench_cache_roundtrips --iterations 500
+    CACHE_FAKE_REDIS=True python manage.py bench_cache_roundtrips --rtt-ms 0.5 --json
+"""
+import json
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+from redis.connection import AbstractConnection
+from redis.exceptions import ResponseError
+
+from accounts.cache_keys import REGISTRATION
+from accounts.registration_state import REGISTRATION_TIMEOUT, registration_store
+
+from ._benchutils import format_ms, summarize_ms
+
+# 단계별로 확인하는 이전 단계 입력과 저장하는 필드
+STEPS = (
+    ('register_step_id', (), 'id'),
+    ('register_step_nickname', ('id',), 'nickname'),
+    ('register_step_email', ('nickname', 'id'), 'email'),
+    ('register_step_password', ('nickname', 'id', 'email'), 'password'),
+    ('save_face_vector_from_jetson', ('nickname', 'id', 'email', 'password'), 'face_vectors'),
+    ('save_voice_vector_from_jetson', ('nickname', 'id', 'email', 'password', 'face_vectors'), None),
+)
+LEGACY_FIELDS = ('nickname', 'id', 'email', 'password', 'face_vectors')
+
+
+@contextmanager
+def count_round_trips(rtt):
+    """Redis 왕복 수를 세고, rtt초의 지연을 왕복마다 주입"""
+    counter = {'round_trips': 0}
+    original = AbstractConnection.send_packed_command
+
+    def send_packed_command(connection, *args, **kwargs):
+        counter['round_trips'] += 1
+        if rtt:
+            time.sleep(rtt)
+        return original(connection, *args, **kwargs)
+
+    with patch.object(AbstractConnection, 'send_packed_command', send_packed_command):
+        yield counter
+
+
+def sample_values(login_id):
+    rng = np.random.default_rng(0)
+    return {
+        'id': login_id,
+        'nickname': '벤치마크',
+        'email': f'{login_id}@bench.local',
+        # make_password 결과와 같은 길이의 해시 문자열
+        'password': 'pbkdf2_sha256$1000000$' + 'x' * 22 + '$' + 'y' * 44,
+        # 젯슨이 보내는 JSON 그대로의 5x512 list
+        'face_vectors': rng.standard_normal((5, 512)).astype(np.float32).tolist(),
+    }
+
+
+def fields_step(login_id, reads, field, values):
+    """이전 방식: 필드마다 키 하나"""
+    if reads:
+        cache.get_many(REGISTRATION.keys(login_id, *reads))
+    if field == 'id':
+        cache.delete_many(REGISTRATION.keys(login_id, *LEGACY_FIELDS))
+    if field is None:
+        cache.delete_many(REGISTRATION.keys(login_id, *LEGACY_FIELDS))
+    else:
+        cache.set(REGISTRATION.key(login_id, field), values[field], timeout=REGISTRATION_TIMEOUT)
+
+
+def record_step(login_id, reads, field, values):
+    """registration_state: 레코드 하나"""
+    if field == 'id':
+        registration_store.start(login_id)
+        return
+    with registration_store.edit(login_id) as state:
+        if field is None:
+            state.delete()
+        elif field == 'face_vectors':
+            state.set_face_vectors(values[field])
+        else:
+            state.set(**{field: values[field]})
+
+
+def memory_usage(keys):
+    """키들의 Redis 메모리 (MEMORY USAGE가 없으면 키 + 값 바이트)"""
+    redis = get_redis_connection('default')
+    try:
+        return sum(redis.memory_usage(key) or 0 for key in keys)
+    except ResponseError:
+        return sum(len(key) + (redis.strlen(key) or 0) for key in keys)
+
+
+class Command(BaseCommand):
+    help = '회원가입 단계별 캐시 왕복 횟수, 지연시간, 진행 중 회원가입당 메모리를 필드별 키 / 레코드 하나로 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='방식별 회원가입 진행 횟수')
+        parser.add_argument('--rtt-ms', type=float, default=0.0, help='왕복마다 주입할 지연 (ms)')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    def handle(self, *args, **options):
+        login_id = 'benchcacheroundtrips'
+        values = sample_values(login_id)
+        rtt = options['rtt_ms'] / 1000
+        iterations = options['iterations']
+        results = {'iterations': iterations, 'rtt_ms': options['rtt_ms'], 'steps': {}, 'memory_bytes': {}}
+
+        try:
+            for mode, run_step in (('fields', fields_step), ('record', record_step)):
+                samples = {step: [] for step, _, _ in STEPS}
+                round_trips = dict.fromkeys(samples, 0)
+                for _ in range(iterations):
+                    for step, reads, field in STEPS:
+                        with count_round_trips(rtt) as counter:
+                            started = time.perf_counter()
+                            run_step(login_id, reads, field, values)
+                            samples[step].append(time.perf_counter() - started)
+                        round_trips[step] += counter['round_trips']
+
+                for step in samples:
+                    results['steps'].setdefault(step, {})[mode] = {
+                        'round_trips_per_request': round_trips[step] / iterations,
+                        'latency': summarize_ms(samples[step]),
+                    }
+
+                # 얼굴 단계까지 진행한 회원가입 하나의 메모리
+                for step, reads, field in STEPS[:-1]:
+                    run_step(login_id, reads, field, values)
+                keys = ([cache.make_key(REGISTRATION.key(login_id, field)) for field in LEGACY_FIELDS]
+                        if mode == 'fields' else [cache.make_key(REGISTRATION.key(login_id))])
+                results['memory_bytes'][mode] = memory_usage(keys)
+                run_step(login_id, *STEPS[-1][1:], values)
+        finally:
+            cache.delete_many(REGISTRATION.keys(login_id, *LEGACY_FIELDS))
+            registration_store.clear(login_id)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+
+        for step, modes in results['steps'].items():
+            self.stdout.write(step)
+            for mode in ('fields', 'record'):
+                self.stdout.write(
+                    f"  {mode:<6}: 왕복 {modes[mode]['round_trips_per_request']:.0f}회, {format_ms(modes[mode]['latency'])}"
+                )
+        memory = results['memory_bytes']
+        self.stdout.write(f"진행 중 회원가입당 메모리: fields {memory['fields']}B, record {memory['record']}B")
@@ -0,0 +1,177 @@
+"""
+앱 명령 확인(ack) 부하 테스트
+
+한 워커(이벤트 루프 하나)에서 동시에 대기할 수 있는 명령 수를 측정합니다.
+가짜 앱 소비자가 채널 레이어 그룹에서 명령을 받아 --app-delay 후 확인을 보내고,
+request_ack로 --concurrency개 요청을 동시에 대기시킵니다.
+
+비교용으로 기존 방식(캐시 100ms 폴링 + time.sleep)을 --threads개 스레드
+(동기 워커 스레드 수)로 같은 요청 수만큼 실행합니다.
+
+사용 예:
+    python manage.py bench_command_ack --requests 2000 --concurrency 500 --app-delay 0.2
+    python manage.py bench_command_ack --in-memory --json
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from accounts.command_ack import request_ack, resolve_ack
+
+from ._benchutils import format_ms, summarize_ms
+
+BENCH_GROUP_PREFIX = 'app_bench_'
+
+
+async def fake_app(channel_layer, group_name, app_delay, stop):
+    """앱 역할: 그룹 메시지를 받아 app_delay 후 성공 확인"""
+    channel = await channel_layer.new_channel()
+    await channel_layer.group_add(group_name, channel)
+
+    async def reply(message):
+        await asyncio.sleep(app_delay)
+        await resolve_ack(message['reply_channel'], message['request_id'], success=True)
+
+    replies = set()
+    try:
+        while not stop.is_set():
+            message = await channel_layer.receive(channel)
+            task = asyncio.ensure_future(reply(message))
+            replies.add(task)
+            task.add_done_callback(replies.discard)
+    finally:
+        await channel_layer.group_discard(group_name, channel)
+
+
+class Command(BaseCommand):
+    help = '채널 레이어 기반 명령 확인 대기의 워커당 동시 처리량을 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='총 요청 수')
+        parser.add_argument('--concurrency', type=int, default=200, help='동시에 대기하는 요청 수 (ack 방식)')
+        parser.add_argument('--sessions', type=int, default=50, help='가짜 앱 세션 수')
+        parser.add_argument('--app-delay', type=float, default=0.2, help='앱이 확인을 보내기까지 걸리는 시간 (초)')
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument('--threads', type=int, default=8, help='기존 폴링 방식의 워커 스레드 수')
+        parser.add_argument('--skip-polling', action='store_true', help='기존 폴링 방식 측정 생략')
+        parser.add_argument('--in-memory', action='store_true', help='InMemoryChannelLayer 사용 (Redis 없이 실행)')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    # ===== 채널 레이어 ack =====
+    async def _run_ack(self, options):
+        channel_layer = get_channel_layer()
+        stop = asyncio.Event()
+        groups = [f'{BENCH_GROUP_PREFIX}{i}' for i in range(options['sessions'])]
+        apps = [asyncio.ensure_future(fake_app(channel_layer, g, options['app_delay'], stop)) for g in groups]
+        await asyncio.sleep(0.1)
+
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        latencies = []
+        timeouts = 0
+        in_flight = 0
+        peak = 0
+
+        async def one(i):
+            nonlocal timeouts, in_flight, peak
+            async with semaphore:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                started = time.perf_counter()
+                try:
+                    await request_ack(groups[i % len(groups)], 'youtube_command',
+                                      {'command': 'YOUTUBE_PLAY'}, timeout=options['timeout'])
+                    latencies.append(time.perf_counter() - started)
+                except Exception:
+                    timeouts += 1
+                finally:
+                    in_flight -= 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        for task in apps:
+            task.cancel()
+        await asyncio.gather(*apps, return_exceptions=True)
+
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+            'peak_in_flight': peak,
+            'errors': timeouts,
+            'latency': summarize_ms(latencies),
+        }
+
+    # ===== 기존 캐시 폴링 =====
+    def _run_polling(self, options):
+        app_delay = options['app_delay']
+
+        def one(_):
+            key = f'bench_command_wait:{uuid.uuid4().hex}'
+            cache.set(key, 'waiting', timeout=options['timeout'])
+            # 앱 역할: app_delay 후 캐시 상태 변경 (AppConsumer의 기존 동작)
+            threading.Timer(app_delay, cache.set, args=(key, 'success'), kwargs={'timeout': 30}).start()
+
+            started = time.perf_counter()
+            elapsed = 0
+            while elapsed < options['timeout']:
+                if cache.get(key) == 'success':
+                    cache.delete(key)
+                    return time.perf_counter() - started
+                time.sleep(0.1)
+                elapsed += 0.1
+            return None
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            results = list(pool.map(one, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        latencies = [r for r in results if r is not None]
+
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+            'peak_in_flight': options['threads'],
+            'errors': len(results) - len(latencies),
+            'latency': summarize_ms(latencies),
+        }
+
+    def handle(self, *args, **options):
+        layers = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}} if options['in_memory'] else None
+
+        results = {
+            'requests': options['requests'],
+            'app_delay_s': options['app_delay'],
+        }
+
+        if layers:
+            with override_settings(CHANNEL_LAYERS=layers):
+                results['channel_ack'] = asyncio.run(self._run_ack(options))
+        else:
+            results['channel_ack'] = asyncio.run(self._run_ack(options))
+
+        ack = results['channel_ack']
+        self.stdout.write(
+            f"[channel ack] 워커 1개, 동시 대기 최대 {ack['peak_in_flight']}건: "
+            f"{ack['throughput_rps']} req/s, 오류 {ack['errors']}, {format_ms(ack['latency'])}"
+        )
+
+        if not options['skip_polling']:
+            results['cache_polling'] = self._run_polling(options)
+            poll = results['cache_polling']
+            self.stdout.write(
+                f"[cache polling] 스레드 {options['threads']}개: "
+                f"{poll['throughput_rps']} req/s, 오류 {poll['errors']}, {format_ms(poll['latency'])}"
+            )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,231 @@
+"""
+CommandLog 보관(archive) 전후 운영 테이블 INSERT 지연 벤치마크
+
+CommandLog를 --rows 건(기본 1000만) 채운 상태에서 INSERT 지연을 재고,
+보관 기간이 지난 행을 command_log_archiver로 압축 보관한 뒤 다시 잽니다.
+
+- insert: 요청 경로처럼 한 건씩 INSERT (command_log_writer 비활성 환경)
+- bulk_insert: command_log_writer flush처럼 --bulk-size 건씩 bulk_create
+- archive: 보관 처리량 (행/초), 압축 파일 크기
+- history: 보관된 세션 / 운영 테이블 세션의 이력 조회 지연 (command_log_archive.history)
+
+벤치마크 행은 2000~2001년 시각으로 채우고 보관 기준 시각을 그에 맞춰 지정하므로
+실제 데이터는 보관 대상이 되지 않습니다 (기준 이전 실제 행이 있으면 중단).
+보관 파일은 임시 디렉터리에 쓰고, 채운 데이터와 함께 끝나면 삭제합니다.
+
+사용 예:
+    python manage.py bench_command_log_archive --rows 10000000
+    python manage.py bench_command_log_archive --rows 1000000 --inserts 500 --json
+"""
+import json
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from accounts.command_log_archive import command_log_archiver, history
+from accounts.models import CommandLog, CommandLogArchive, Phone, Sarvis, Session, User, UserDeviceConnection
+
+from ._benchutils import format_ms, summarize_ms
+
+# 벤치마크 데이터 시각: 보관 대상(2000년) / 보관 기간 내(2001년 1분기)
+OLD_START = datetime(2000, 1, 1)
+RECENT_START = datetime(2001, 1, 1)
+RECENT_SPAN = timedelta(days=90)
+RETENTION_DAYS = 90
+
+
+def _aware(value):
+    """settings.USE_TZ에 맞춘 datetime"""
+    return timezone.make_aware(value) if settings.USE_TZ else value
+
+
+class Command(BaseCommand):
+    help = 'CommandLog 1000만 건 상태와 보관(archive) 이후의 INSERT 지연을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000, help='채울 CommandLog 행 수')
+        parser.add_argument('--recent-ratio', type=float, default=0.1, help='보관 기간 안에 남는 행 비율')
+        parser.add_argument('--sessions', type=int, default=2000, help='세션 수')
+        parser.add_argument('--inserts', type=int, default=2000, help='단계별 한 건 INSERT 횟수')
+        parser.add_argument('--bulk-size', type=int, default=500, help='bulk_insert 한 번의 행 수')
+        parser.add_argument('--bulk-inserts', type=int, default=50, help='단계별 bulk_insert 횟수')
+        parser.add_argument('--seed-batch', type=int, default=20000, help='채우기 executemany 배치 크기')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    # ===== 데이터 채우기 =====
+    def _create_sessions(self, count):
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            login_id=f'bench_{suffix}', email=f'bench_{suffix}@example.com', nickname='bench', password=None
+        )
+        connection_ = UserDeviceConnection.objects.create(
+            user=user,
+            phone=Phone.objects.create(device_name='bench-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        Session.objects.bulk_create(Session(connection=connection_) for _ in range(count))
+        session_ids = list(Session.objects.filter(connection=connection_).values_list('session_id', flat=True))
+        # 오래된 세션 / 최근 세션: 각 기간을 세션 수로 나눠 시작/종료 시각 지정
+        half = len(session_ids) // 2
+        periods = ((session_ids[:half], self.old_start, self.recent_start - self.old_start),
+                   (session_ids[half:], self.recent_start, RECENT_SPAN))
+        sessions = []
+        for ids, start, span in periods:
+            step = span / len(ids)
+            sessions += [
+                Session(session_id=session_id, started_at=start + step * i, ended_at=start + step * (i + 1))
+                for i, session_id in enumerate(ids)
+            ]
+        Session.objects.bulk_update(sessions, ['started_at', 'ended_at'], batch_size=500)
+        return user, session_ids[:half], session_ids[half:]
+
+    def _seed(self, old_sessions, recent_sessions, options):
+        """executemany로 빠르게 채움 (ORM 인스턴스 생성 비용 제외)"""
+        table = connection.ops.quote_name(CommandLog._meta.db_table)
+        sql = (
+            f'INSERT INTO {table} (session_id, command_type, command_content, is_success, error_message, created_at) '
+            f'VALUES (%s, %s, %s, %s, %s, %s)'
+        )
+        recent_rows = int(options['rows'] * options['recent_ratio'])
+        old_span = int((self.recent_start - self.old_start).total_seconds())
+        recent_span = int(RECENT_SPAN.total_seconds())
+        adapt = connection.ops.adapt_datetimefield_value
+
+        old_rows = options['rows'] - recent_rows
+
+        def row(i):
+            # 실제처럼 발생 시각 순으로 쌓임 (PK 순 = 시각 순), 시각은 해당 세션 기간 안
+            if i < old_rows:
+                offset = i * old_span // old_rows
+                session_id = old_sessions[offset * len(old_sessions) // old_span]
+                created = self.old_start + timedelta(seconds=offset)
+            else:
+                offset = (i - old_rows) * recent_span // recent_rows
+                session_id = recent_sessions[offset * len(recent_sessions) // recent_span]
+                created = self.recent_start + timedelta(seconds=offset)
+            return (session_id, 'BUTTON_COMMAND', 'UP', True, None, adapt(created))
+
+        batch = options['seed_batch']
+        for start in range(0, options['rows'], batch):
+            # 배치마다 커밋 (autocommit이면 행마다 커밋됨)
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, [row(i) for i in range(start, min(start + batch, options['rows']))])
+
+    # ===== 측정 =====
+    def _measure_inserts(self, session_ids, options, rng):
+        latencies = []
+        for _ in range(options['inserts']):
+            session_id = session_ids[rng.randrange(len(session_ids))]
+            started = time.perf_counter()
+            CommandLog.objects.create(
+                session_id=session_id, command_type='BUTTON_COMMAND', command_content='UP', is_success=True
+            )
+            latencies.append(time.perf_counter() - started)
+
+        bulk_latencies = []
+        for _ in range(options['bulk_inserts']):
+            logs = [
+                CommandLog(
+                    session_id=session_ids[rng.randrange(len(session_ids))], command_type='VOICE_COMMAND',
+                    command_content='YOUTUBE_PLAY', is_success=True, event_id=uuid.uuid4()
+                )
+                for _ in range(options['bulk_size'])
+            ]
+            started = time.perf_counter()
+            CommandLog.objects.bulk_create(logs)
+            bulk_latencies.append(time.perf_counter() - started)
+
+        return {
+            'table_rows': CommandLog.objects.count(),
+            'insert': summarize_ms(latencies),
+            'bulk_insert': summarize_ms(bulk_latencies),
+        }
+
+    def _measure_history(self, session_ids, rng, repeat=20):
+        latencies = []
+        rows = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows += len(history([session_ids[rng.randrange(len(session_ids))]]))
+            latencies.append(time.perf_counter() - started)
+        return {'latency': summarize_ms(latencies), 'rows_per_session': round(rows / repeat, 1)}
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.old_start, self.recent_start = _aware(OLD_START), _aware(RECENT_START)
+        archive_dir = tempfile.mkdtemp(prefix='command_log_archive_')
+        archive_config = {
+            'DIR': archive_dir,
+            'RETENTION_DAYS': RETENTION_DAYS,
+            'BATCH_SIZE': 10000,
+            'MAX_BATCHES': options['rows'] // 10000 + 1,
+        }
+        # 2001년 1월 1일이 보관 기준이 되는 시각
+        simulated_now = self.recent_start + timedelta(days=RETENTION_DAYS)
+        results = {'config': {key: options[key] for key in ('rows', 'recent_ratio', 'sessions', 'inserts', 'bulk_size')}}
+
+        if CommandLog.objects.filter(created_at__lt=self.recent_start).exists():
+            raise CommandError('2001년 이전 CommandLog가 이미 있어 실행하지 않습니다 (실제 데이터 보관 방지).')
+
+        user, old_sessions, recent_sessions = self._create_sessions(options['sessions'])
+        archive_ids_before = set(CommandLogArchive.objects.values_list('archive_id', flat=True))
+        try:
+            started = time.perf_counter()
+            self._seed(old_sessions, recent_sessions, options)
+            results['seed_s'] = round(time.perf_counter() - started, 3)
+            self.stdout.write(f"데이터 준비 {results['seed_s']}s ({options['rows']}건)")
+
+            results['before'] = self._measure_inserts(recent_sessions, options, rng)
+
+            with override_settings(COMMAND_LOG_ARCHIVE=archive_config):
+                started = time.perf_counter()
+                archived = command_log_archiver.archive(now=simulated_now)
+                elapsed = time.perf_counter() - started
+                archives = CommandLogArchive.objects.exclude(archive_id__in=archive_ids_before)
+                size = sum(archives.values_list('size_bytes', flat=True))
+                results['archive'] = {
+                    'rows': archived,
+                    'files': archives.count(),
+                    'elapsed_s': round(elapsed, 3),
+                    'rows_per_s': round(archived / elapsed, 1) if elapsed else 0.0,
+                    'bytes_per_row': round(size / archived, 2) if archived else 0.0,
+                }
+
+                results['after'] = self._measure_inserts(recent_sessions, options, rng)
+                results['history_archived'] = self._measure_history(old_sessions, rng)
+                results['history_hot'] = self._measure_history(recent_sessions, rng)
+        finally:
+            # 로그를 먼저 지워 사용자 삭제 시 연쇄 삭제 대상을 메모리에 모으지 않음
+            CommandLog.objects.filter(session__connection__user=user).delete()
+            CommandLogArchive.objects.exclude(archive_id__in=archive_ids_before).delete()
+            user.delete()
+            shutil.rmtree(archive_dir, ignore_errors=True)
+
+        for name in ('before', 'after'):
+            result = results[name]
+            self.stdout.write(
+                f"[{name}] 테이블 {result['table_rows']}건 - INSERT {format_ms(result['insert'])}, "
+                f"bulk_create({options['bulk_size']}) {format_ms(result['bulk_insert'])}"
+            )
+        archive = results['archive']
+        self.stdout.write(
+            f"[archive] {archive['rows']}건 → 파일 {archive['files']}개, {archive['elapsed_s']}s "
+            f"({archive['rows_per_s']}행/s), 행당 {archive['bytes_per_row']}바이트"
+        )
+        for name in ('history_archived', 'history_hot'):
+            result = results[name]
+            self.stdout.write(f"[{name}] 세션당 {result['rows_per_session']}건 {format_ms(result['latency'])}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,136 @@
+"""
+CommandLog 저장 방식 벤치마크
+
+명령 하나당 기존 음성 명령 경로처럼 로그 생성 + 결과 업데이트를 수행하며,
+요청 경로 지연과 명령당 DB 쓰기 횟수를 비교합니다.
+
+- direct: 요청 안에서 CommandLog INSERT + UPDATE (기존 방식)
+- write_behind: command_log_writer로 Redis 큐에 기록, --flush-every 명령마다 flush
+  (Celery Beat 주기 동안 쌓이는 명령 수를 흉내, flush 시간은 요청 지연에 포함하지 않음)
+
+테이블이 있는 DB가 필요합니다 (migrate 이후). 벤치마크용 사용자/세션을 만들고 끝나면 삭제합니다.
+
+사용 예:
+    python manage.py bench_command_log_writer --commands 5000 --flush-every 200
+    CACHE_FAKE_REDIS=True python manage.py bench_command_log_writer --json
+"""
+import json
+import time
+import uuid
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.command_log_writer import command_log_writer
+from accounts.models import CommandLog, Phone, Sarvis, Session, User, UserDeviceConnection
+
+from ._benchutils import format_ms, summarize_ms
+
+
+def _statement_counts(queries):
+    """캡처한 쿼리의 SQL 종류별 횟수 (SAVEPOINT 제외)"""
+    return Counter(
+        q['sql'].split()[0].upper() for q in queries.captured_queries if 'SAVEPOINT' not in q['sql'].upper()
+    )
+
+
+class Command(BaseCommand):
+    help = 'CommandLog 직접 저장과 지연 저장(write-behind)의 요청 지연 및 DB 쓰기 횟수를 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--commands', type=int, default=2000, help='방식별 명령 수')
+        parser.add_argument('--flush-every', type=int, default=100, help='write_behind: flush 간격 (명령 수)')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    def _create_session(self):
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            login_id=f'bench_{suffix}', email=f'bench_{suffix}@example.com', nickname='bench', password=None
+        )
+        connection_ = UserDeviceConnection.objects.create(
+            user=user,
+            phone=Phone.objects.create(device_name='bench-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        return user, Session.objects.create(connection=connection_)
+
+    def _summary(self, latencies, counts, commands, flush_seconds=0.0):
+        writes = counts.get('INSERT', 0) + counts.get('UPDATE', 0)
+        return {
+            'latency': summarize_ms(latencies),
+            'statements': dict(counts),
+            'db_writes_per_command': round(writes / commands, 4),
+            'db_statements_per_command': round(sum(counts.values()) / commands, 4),
+            'flush_s': round(flush_seconds, 3),
+        }
+
+    # ===== 기존 방식 =====
+    def _run_direct(self, session, options):
+        latencies = []
+        with CaptureQueriesContext(connection) as queries:
+            for i in range(options['commands']):
+                started = time.perf_counter()
+                log = CommandLog.objects.create(
+                    session=session, command_type='VOICE_COMMAND', command_content='YOUTUBE_PLAY', is_success=False
+                )
+                log.is_success = True
+                log.save(update_fields=['is_success'])
+                latencies.append(time.perf_counter() - started)
+        return self._summary(latencies, _statement_counts(queries), options['commands'])
+
+    # ===== 지연 저장 =====
+    def _run_write_behind(self, session, options):
+        latencies = []
+        flush_seconds = 0.0
+        counts = Counter()
+
+        for i in range(options['commands']):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                event_id = command_log_writer.record(
+                    session.session_id, 'VOICE_COMMAND', 'YOUTUBE_PLAY', is_success=False
+                )
+                command_log_writer.update(event_id, is_success=True)
+                latencies.append(time.perf_counter() - started)
+            counts.update(_statement_counts(queries))
+
+            if (i + 1) % options['flush_every'] == 0:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    command_log_writer.flush()
+                    flush_seconds += time.perf_counter() - started
+                counts.update(_statement_counts(queries))
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            command_log_writer.flush()
+            flush_seconds += time.perf_counter() - started
+        counts.update(_statement_counts(queries))
+
+        return self._summary(latencies, counts, options['commands'], flush_seconds)
+
+    def handle(self, *args, **options):
+        results = {'commands': options['commands'], 'flush_every': options['flush_every']}
+        user, session = self._create_session()
+        try:
+            results['direct'] = self._run_direct(session, options)
+            results['write_behind'] = self._run_write_behind(session, options)
+            results['write_behind']['stored'] = CommandLog.objects.filter(
+                session=session, event_id__isnull=False
+            ).count()
+        finally:
+            user.delete()
+
+        for name in ('direct', 'write_behind'):
+            result = results[name]
+            self.stdout.write(
+                f"[{name}] 요청 지연 {format_ms(result['latency'])}, "
+                f"명령당 DB 쓰기 {result['db_writes_per_command']}회 (전체 쿼리 {result['db_statements_per_command']}회), "
+                f"flush {result['flush_s']}s"
+            )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,118 @@
+"""
+인증 메일 발송 지연 벤치마크
+
+1) 요청 지연: /api/register/email-request/ 를
+   - inline: 요청에서 바로 SMTP 발송 (EMAIL_QUEUE['ENABLED']=False, 요청마다 새 연결 - 기존 방식과 같은 조건)
+   - queue: Celery 'email' 큐에 넣고 바로 응답
+   두 방식으로 --requests번씩 호출해 비교합니다.
+2) 워커 발송: 같은 메일 --messages통을
+   - send_mail: 메일마다 새 SMTP 연결 (기존 방식)
+   - email_sender: 연결 재사용
+   두 방식으로 보내 메일당 시간과 연결 수를 비교합니다.
+
+SMTP 서버는 로컬 스텁(--delay로 명령당 메일 서버 왕복 지연 흉내)을 사용하며,
+브로커는 기본적으로 프로세스 내 memory:// (--broker를 주면 settings.CELERY_BROKER_URL)입니다.
+DB(EmailVerification)를 쓰므로 migrate된 DB가 필요합니다.
+
+사용 예:
+    python manage.py bench_email --requests 200 --delay 0.02
+    CACHE_FAKE_REDIS=True python manage.py bench_email --messages 100 --json
+"""
+import json
+import time
+import uuid
+
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from accounts.email_queue import email_sender
+from accounts.models import EmailVerification
+from accounts.smtp_stub import SmtpStubServer
+from server.celery import app as celery_app
+
+from ._benchutils import format_ms, summarize_ms, timed
+
+
+class Command(BaseCommand):
+    help = '인증 메일 요청 지연(바로 발송 / 메일 큐)과 워커 발송 시간(연결 재사용 여부)을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='방식별 인증 코드 요청 수')
+        parser.add_argument('--messages', type=int, default=100, help='방식별 워커 발송 메일 수')
+        parser.add_argument('--delay', type=float, default=0.01, help='스텁 SMTP 명령당 응답 지연 (초)')
+        parser.add_argument('--broker', action='store_true', help='memory:// 대신 settings의 브로커 사용')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    def _request_latencies(self, prefix, count):
+        client = Client()
+        latencies = []
+        for index in range(count):
+            started = time.perf_counter()
+            response = client.post(
+                '/api/register/email-request/',
+                data=json.dumps({'email': f'{prefix}-{index}@bench.local'}),
+                content_type='application/json'
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f'요청 실패: HTTP {response.status_code} {response.content[:200]!r}')
+        return latencies
+
+    def _worker(self, stub, send, count):
+        connections = stub.connections
+        _, elapsed = timed(lambda: [send(f'worker-{index}@bench.local') for index in range(count)])
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'per_message_ms': round(elapsed / count * 1000, 3) if count else 0.0,
+            'connections': stub.connections - connections,
+        }
+
+    def handle(self, *args, **options):
+        # config_from_object(namespace='CELERY')라 설정 키에 CELERY_ 접두사가 붙음
+        if not options['broker']:
+            celery_app.conf.CELERY_BROKER_URL = 'memory://'
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = False
+        prefix = f'bench-{uuid.uuid4().hex[:8]}'
+        results = {}
+
+        with SmtpStubServer(delay=options['delay']) as stub, override_settings(
+            DEBUG=False,
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST=stub.host, EMAIL_PORT=stub.port, EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER=None, EMAIL_HOST_PASSWORD=None,
+            QUERY_BUDGET={'ENFORCE': False, 'HEADER': False},
+        ):
+            try:
+                # inline은 요청마다 새 연결 (CONNECTION_IDLE=0, 기존 send_mail과 같은 조건)
+                for mode, enabled in (('inline', False), ('queue', True)):
+                    with override_settings(EMAIL_QUEUE={'ENABLED': enabled, 'RATE_LIMIT': 0, 'CONNECTION_IDLE': 0}):
+                        results[f'request_{mode}'] = summarize_ms(
+                            self._request_latencies(f'{prefix}-{mode}', options['requests'])
+                        )
+
+                def per_message(address):
+                    send_mail('[bench] 인증 코드', '인증 코드: 000000', None, [address], fail_silently=False)
+
+                def reused(address):
+                    email_sender.send('[bench] 인증 코드', '인증 코드: 000000', address)
+
+                email_sender.close()
+                results['worker_send_mail'] = self._worker(stub, per_message, options['messages'])
+                results['worker_email_sender'] = self._worker(stub, reused, options['messages'])
+                email_sender.close()
+            finally:
+                EmailVerification.objects.filter(email__startswith=prefix).delete()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"SMTP 스텁 명령당 지연 {options['delay'] * 1000:.0f}ms")
+        self.stdout.write(f"요청 (바로 발송)  {format_ms(results['request_inline'])}")
+        self.stdout.write(f"요청 (메일 큐)    {format_ms(results['request_queue'])}")
+        for label, key in (('send_mail (메일마다 연결)', 'worker_send_mail'), ('email_sender (연결 재사용)', 'worker_email_sender')):
+            worker = results[key]
+            self.stdout.write(
+                f"워커 {label}: 메일당 {worker['per_message_ms']:.3f}ms, 연결 {worker['connections']}회"
+            )
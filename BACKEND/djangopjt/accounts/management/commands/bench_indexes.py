@@ -0,0 +1,259 @@
+"""
+핫 쿼리 인덱스 벤치마크 (0004_hot_query_indexes)
+
+실제에 가까운 분량(기본 CommandLog 200만 건)을 채운 뒤,
+자주 실행되는 조회의 EXPLAIN 계획과 지연을 인덱스 없음/있음으로 비교합니다.
+
+- active_session: 사용자의 활성 세션 (연결 JOIN, ended_at IS NULL, -started_at)
+- active_session_by_uid: uid 기준 활성 세션 (session_registry.active_sessions_for_uid)
+- active_connection: 사용자의 활성 연결 (-connected_at)
+- active_preset: 사용자의 활성 프리셋
+- command_history: 세션별 최근 명령 50건 (-created_at)
+
+"인덱스 없음"은 마이그레이션으로 만든 인덱스를 잠시 삭제해서 측정하고, 끝나면 다시 만듭니다.
+테이블이 있는 DB가 필요합니다 (migrate 이후). 채운 데이터는 끝나면 삭제합니다.
+
+사용 예:
+    python manage.py bench_indexes --users 2000 --command-logs 2000000
+    python manage.py bench_indexes --command-logs 200000 --repeat 100 --json
+"""
+import json
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from accounts.models import CommandLog, Phone, Preset, Sarvis, Session, User, UserDeviceConnection
+from accounts.session_registry import active_sessions_for_uid
+
+from ._benchutils import format_ms, summarize_ms
+
+# 0004_hot_query_indexes에서 추가한 인덱스 (모델, 인덱스 이름)
+HOT_QUERY_INDEXES = (
+    (UserDeviceConnection, 'udc_user_active_idx'),
+    (Session, 'session_conn_active_idx'),
+    (Preset, 'preset_user_active_idx'),
+    (CommandLog, 'cmdlog_session_created_idx'),
+)
+
+COMMAND_TYPES = ('BUTTON_COMMAND', 'VOICE_COMMAND', 'YOUTUBE_PLAY', 'YOUTUBE_PAUSE')
+
+
+def _queries():
+    """측정할 조회: 이름 → (대상 종류, 대상으로 QuerySet을 만드는 함수)"""
+    return {
+        'active_session': ('user', lambda user: Session.objects.filter(
+            connection__user_id=user['user_id'],
+            connection__is_active=True,
+            connection__deleted_at__isnull=True,
+            ended_at__isnull=True
+        ).order_by('-started_at')[:1]),
+        'active_session_by_uid': ('user', lambda user: active_sessions_for_uid(user['uid'])[:1]),
+        'active_connection': ('user', lambda user: UserDeviceConnection.objects.filter(
+            user_id=user['user_id'], is_active=True, deleted_at__isnull=True
+        ).order_by('-connected_at')[:1]),
+        'active_preset': ('user', lambda user: Preset.objects.filter(user_id=user['user_id'], is_active=True)[:1]),
+        'command_history': ('session', lambda session_id: CommandLog.objects.filter(
+            session_id=session_id
+        ).order_by('-created_at')[:50]),
+    }
+
+
+class Command(BaseCommand):
+    help = '세션/명령 핫 쿼리의 EXPLAIN 계획과 지연을 복합 인덱스 없음/있음으로 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000, help='사용자 수')
+        parser.add_argument('--connections-per-user', type=int, default=3, help='사용자당 연결 수 (마지막 하나만 활성)')
+        parser.add_argument('--sessions-per-connection', type=int, default=10, help='연결당 세션 수')
+        parser.add_argument('--presets-per-user', type=int, default=5, help='사용자당 프리셋 수 (하나만 활성)')
+        parser.add_argument('--command-logs', type=int, default=2_000_000, help='CommandLog 행 수')
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk_create 배치 크기')
+        parser.add_argument('--repeat', type=int, default=200, help='조회별 측정 횟수')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    # ===== 데이터 채우기 =====
+    def _bulk_create(self, model, rows, batch_size):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+
+    def _seed(self, prefix, phone, sarvis, options, rng):
+        batch_size = options['batch_size']
+        now = timezone.now()
+
+        self._bulk_create(User, (
+            User(login_id=f'{prefix}{i}', email=f'{prefix}{i}@example.com', nickname='bench', password='!')
+            for i in range(options['users'])
+        ), batch_size)
+        users = list(User.objects.filter(login_id__startswith=prefix).values('user_id', 'uid'))
+
+        per_user = options['connections_per_user']
+
+        def connections():
+            for user in users:
+                for i in range(per_user):
+                    active = i == per_user - 1
+                    yield UserDeviceConnection(
+                        user_id=user['user_id'], phone=phone, sarvis=sarvis, is_active=active,
+                        deleted_at=None if active or i % 2 else now - timedelta(days=per_user - i)
+                    )
+
+        self._bulk_create(UserDeviceConnection, connections(), batch_size)
+        connection_rows = list(
+            UserDeviceConnection.objects.filter(user__login_id__startswith=prefix).values_list('connection_id', 'is_active')
+        )
+
+        per_connection = options['sessions_per_connection']
+
+        def sessions():
+            for connection_id, is_active in connection_rows:
+                for i in range(per_connection):
+                    # 활성 연결의 마지막 세션만 사용 중
+                    ended = None if is_active and i == per_connection - 1 else now - timedelta(hours=per_connection - i)
+                    yield Session(connection_id=connection_id, ended_at=ended)
+
+        self._bulk_create(Session, sessions(), batch_size)
+        session_ids = list(
+            Session.objects.filter(connection__user__login_id__startswith=prefix).values_list('session_id', flat=True)
+        )
+
+        per_preset = options['presets_per_user']
+        self._bulk_create(Preset, (
+            Preset(
+                user_id=user['user_id'], preset_name=f'preset{i}', is_active=i == 0,
+                servo1=0, servo2=0, servo3=0, servo4=0, servo5=0, servo6=0
+            )
+            for user in users for i in range(per_preset)
+        ), batch_size)
+
+        # 명령 로그: 세션마다 고르게, 최근 90일에 흩어진 발생 시각
+        span = int(timedelta(days=90).total_seconds())
+        self._bulk_create(CommandLog, (
+            CommandLog(
+                session_id=session_ids[rng.randrange(len(session_ids))],
+                command_type=COMMAND_TYPES[i % len(COMMAND_TYPES)],
+                command_content='UP',
+                is_success=True,
+                created_at=now - timedelta(seconds=rng.randrange(span))
+            )
+            for i in range(options['command_logs'])
+        ), batch_size)
+
+        return users, session_ids
+
+    def _cleanup(self, prefix, phone, sarvis):
+        # 로그/세션을 먼저 지워 사용자 삭제 시 연쇄 삭제 대상을 메모리에 모으지 않음
+        CommandLog.objects.filter(session__connection__user__login_id__startswith=prefix).delete()
+        Session.objects.filter(connection__user__login_id__startswith=prefix).delete()
+        User.objects.filter(login_id__startswith=prefix).delete()
+        phone.delete()
+        sarvis.delete()
+
+    def _analyze(self):
+        """채운 뒤 플래너 통계 갱신 (인덱스 선택이 실제 분포를 반영하도록)"""
+        tables = [model._meta.db_table for model in (User, UserDeviceConnection, Session, Preset, CommandLog)]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute('ANALYZE TABLE ' + ', '.join(connection.ops.quote_name(t) for t in tables))
+            elif connection.vendor in ('sqlite', 'postgresql'):
+                for table in tables:
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+
+    # ===== 인덱스 =====
+    def _existing_index_names(self, model):
+        with connection.cursor() as cursor:
+            return set(connection.introspection.get_constraints(cursor, model._meta.db_table))
+
+    def _drop_indexes(self):
+        """존재하는 핫 쿼리 인덱스를 삭제하고 삭제한 (모델, 인덱스) 목록 반환"""
+        dropped = []
+        with connection.schema_editor() as editor:
+            for model, name in HOT_QUERY_INDEXES:
+                if name not in self._existing_index_names(model):
+                    self.stderr.write(f'인덱스 없음 (migrate 필요?): {name}')
+                    continue
+                index = next(index for index in model._meta.indexes if index.name == name)
+                editor.remove_index(model, index)
+                dropped.append((model, index))
+        return dropped
+
+    def _restore_indexes(self, dropped):
+        with connection.schema_editor() as editor:
+            for model, index in dropped:
+                editor.add_index(model, index)
+
+    # ===== 측정 =====
+    def _measure(self, targets, options, rng):
+        results = {}
+        for name, (kind, make_queryset) in _queries().items():
+            pool = targets[kind]
+            plan = make_queryset(pool[0]).explain()
+            latencies = []
+            for _ in range(options['repeat']):
+                queryset = make_queryset(pool[rng.randrange(len(pool))])
+                started = time.perf_counter()
+                list(queryset)
+                latencies.append(time.perf_counter() - started)
+            results[name] = {'latency': summarize_ms(latencies), 'plan': plan}
+        return results
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = f'idxbench_{uuid.uuid4().hex[:6]}_'
+        results = {
+            'config': {key: options[key] for key in (
+                'users', 'connections_per_user', 'sessions_per_connection',
+                'presets_per_user', 'command_logs', 'repeat'
+            )},
+            'db_vendor': connection.vendor,
+        }
+
+        phone = Phone.objects.create(device_name=prefix)
+        sarvis = Sarvis.objects.create()
+        try:
+            started = time.perf_counter()
+            users, session_ids = self._seed(prefix, phone, sarvis, options, rng)
+            self._analyze()
+            results['seed_s'] = round(time.perf_counter() - started, 3)
+            self.stdout.write(f"데이터 준비 {results['seed_s']}s (CommandLog {options['command_logs']}건)")
+
+            # 두 단계가 같은 대상을 조회하도록 표본 고정
+            targets = {
+                'user': rng.sample(users, min(len(users), 500)),
+                'session': rng.sample(session_ids, min(len(session_ids), 500)),
+            }
+
+            dropped = self._drop_indexes()
+            try:
+                self._analyze()
+                results['without_indexes'] = self._measure(targets, options, random.Random(options['seed']))
+            finally:
+                self._restore_indexes(dropped)
+            self._analyze()
+            results['with_indexes'] = self._measure(targets, options, random.Random(options['seed']))
+        finally:
+            self._cleanup(prefix, phone, sarvis)
+
+        for name in _queries():
+            before = results['without_indexes'][name]
+            after = results['with_indexes'][name]
+            speedup = before['latency']['p50_ms'] / max(after['latency']['p50_ms'], 1e-6)
+            self.stdout.write(f'\n[{name}] p50 {speedup:.1f}배')
+            self.stdout.write(f"  인덱스 없음: {format_ms(before['latency'])}")
+            self.stdout.write(f"    {before['plan'].replace(chr(10), chr(10) + '    ')}")
+            self.stdout.write(f"  인덱스 있음: {format_ms(after['latency'])}")
+            self.stdout.write(f"    {after['plan'].replace(chr(10), chr(10) + '    ')}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,162 @@
+"""
+젯슨 HTTP 호출 지연 벤치마크
+
+기존 방식(requests.post로 요청마다 새 연결)과 jetson_client의 keep-alive 커넥션 풀
+(동기 스레드 / 비동기 동시 요청)을 같은 요청 수로 비교합니다.
+기본은 로컬 젯슨 스텁(--delay로 젯슨 처리 시간 흉내)을 대상으로 하고,
+--url을 주면 실제 젯슨(ngrok 터널)을 측정합니다. TLS 터널에서는 연결 재사용 효과가 더 큽니다.
+
+사용 예:
+    python manage.py bench_jetson_client --requests 500 --threads 8 --delay 0.01
+    python manage.py bench_jetson_client --url https://xxxx.ngrok-free.dev --endpoint /logout --requests 50 --json
+"""
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from accounts.jetson_client import DEFAULT_HEADERS, JetsonClient, get_client_config
+from accounts.jetson_stub import JetsonStubServer
+
+from ._benchutils import format_ms, summarize_ms
+
+
+class Command(BaseCommand):
+    help = '젯슨 HTTP 호출의 요청당 연결 방식과 커넥션 풀 방식 지연을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='방식별 총 요청 수')
+        parser.add_argument('--threads', type=int, default=8, help='동기 방식의 워커 스레드 수')
+        parser.add_argument('--concurrency', type=int, default=8, help='비동기 방식의 동시 요청 수')
+        parser.add_argument('--delay', type=float, default=0.005, help='스텁 젯슨 처리 시간 (초)')
+        parser.add_argument('--url', help='측정할 젯슨 주소 (없으면 로컬 스텁 실행)')
+        parser.add_argument('--endpoint', default='/button_command')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    def _payload(self, options):
+        return {'command': 'UP'} if options['endpoint'] == '/button_command' else {}
+
+    def _summary(self, latencies, errors, elapsed):
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            'errors': errors,
+            'latency': summarize_ms(latencies),
+        }
+
+    def _run_threads(self, call, options):
+        def one(_):
+            started = time.perf_counter()
+            try:
+                ok = call()
+            except Exception:
+                ok = False
+            return time.perf_counter() - started if ok else None
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            results = list(pool.map(one, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        latencies = [r for r in results if r is not None]
+        return self._summary(latencies, len(results) - len(latencies), elapsed)
+
+    # ===== 기존 방식: 요청마다 새 연결 =====
+    def _run_requests(self, base_url, options):
+        url = f"{base_url}{options['endpoint']}"
+        payload = self._payload(options)
+
+        def call():
+            return requests.post(url, json=payload, headers=DEFAULT_HEADERS, timeout=10).status_code == 200
+
+        return self._run_threads(call, options)
+
+    # ===== jetson_client: 동기 커넥션 풀 =====
+    def _run_pooled(self, client, options):
+        payload = self._payload(options)
+
+        def call():
+            return client.post(options['endpoint'], payload).status_code == 200
+
+        return self._run_threads(call, options)
+
+    # ===== jetson_client: 비동기 =====
+    async def _run_async(self, client, options):
+        payload = self._payload(options)
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        latencies = []
+        errors = 0
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.apost(options['endpoint'], payload)
+                    if response.status_code != 200:
+                        raise ValueError(response.status_code)
+                    latencies.append(time.perf_counter() - started)
+                except Exception:
+                    errors += 1
+
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(one() for _ in range(options['requests'])))
+        finally:
+            await client.aclose()
+        return self._summary(latencies, errors, time.perf_counter() - started)
+
+    def _run_all(self, base_url, options, stub=None):
+        # 벤치마크 중 회로 차단으로 요청이 누락되지 않도록 임계값을 크게
+        config = {**get_client_config(), 'FAILURE_THRESHOLD': options['requests'] + 1}
+        results = {}
+
+        results['requests_per_call'] = self._run_requests(base_url, options)
+        if stub is not None:
+            results['requests_per_call']['connections'] = stub.connections
+            stub.connections = 0
+
+        client = JetsonClient(base_url=base_url, config=config)
+        try:
+            results['pooled_sync'] = self._run_pooled(client, options)
+        finally:
+            client.close()
+        if stub is not None:
+            results['pooled_sync']['connections'] = stub.connections
+            stub.connections = 0
+
+        results['pooled_async'] = asyncio.run(self._run_async(JetsonClient(base_url=base_url, config=config), options))
+        if stub is not None:
+            results['pooled_async']['connections'] = stub.connections
+        return results
+
+    def handle(self, *args, **options):
+        results = {
+            'requests': options['requests'],
+            'endpoint': options['endpoint'],
+            'target': options['url'] or f"stub (delay={options['delay']}s)",
+        }
+
+        if options['url']:
+            results.update(self._run_all(options['url'].rstrip('/'), options))
+        else:
+            with JetsonStubServer(delay=options['delay']) as stub:
+                results.update(self._run_all(stub.url, options, stub=stub))
+
+        labels = {
+            'requests_per_call': f"requests (요청마다 연결, 스레드 {options['threads']}개)",
+            'pooled_sync': f"jetson.post (커넥션 풀, 스레드 {options['threads']}개)",
+            'pooled_async': f"jetson.apost (커넥션 풀, 동시 {options['concurrency']}건)",
+        }
+        for name, label in labels.items():
+            result = results[name]
+            connections = f", 연결 {result['connections']}개" if 'connections' in result else ''
+            self.stdout.write(
+                f"[{label}] {result['throughput_rps']} req/s, 오류 {result['errors']}{connections}, "
+                f"{format_ms(result['latency'])}"
+            )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
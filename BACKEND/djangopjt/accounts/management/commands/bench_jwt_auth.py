@@ -0,0 +1,136 @@
+"""
+JWT 인증 오버헤드 벤치마크
+
+@api_view + @jwt_required 요청 하나가 인증에 쓰는 시간과 쿼리 수를 비교합니다.
+
+- legacy: 기존 경로 - DRF 기본 인증(simplejwt, 사용자 SELECT) + jwt_required
+  (요청마다 인증 객체 생성, 토큰 디코딩, 사용자 SELECT)
+- uncached: accounts JWTAuthentication을 캐시 없이 (AUTH_PRINCIPAL_CACHE TTL 0)
+- cached: 인증 사용자 캐시 적중 (Redis 버전 확인 1회, DB 조회 없음)
+
+테이블이 있는 DB가 필요합니다 (migrate 이후). 벤치마크용 사용자를 만들고 끝나면 삭제합니다.
+
+사용 예:
+    python manage.py bench_jwt_auth --requests 5000 --users 50
+    CACHE_FAKE_REDIS=True python manage.py bench_jwt_auth --json
+"""
+import json
+import time
+import uuid
+
+import jwt
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication as SimpleJWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.auth_utils import JWTAuthentication, get_user_from_token
+from accounts.models import User
+from accounts.principal_cache import principal_cache
+
+from ._benchutils import format_ms, summarize_ms
+
+
+def _legacy_get_user_from_token(request):
+    """변경 전 get_user_from_token (요청마다 인증 객체 생성 + 디코딩 + SELECT)"""
+    class LegacyAuthentication:
+        def authenticate(self, request):
+            _, token = request.headers['Authorization'].split(' ')
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+            return User.objects.get(user_id=payload['user_id'], is_active=True), token
+
+    return LegacyAuthentication().authenticate(request)[0]
+
+
+class Command(BaseCommand):
+    help = 'JWT 인증의 요청당 지연과 쿼리 수를 기존 방식과 인증 사용자 캐시 방식으로 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=3000, help='방식별 요청 수')
+        parser.add_argument('--users', type=int, default=20, help='토큰(사용자) 수')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    def _create_users(self, count):
+        suffix = uuid.uuid4().hex[:8]
+        users = [
+            User.objects.create_user(
+                login_id=f'bench_{suffix}_{i}', email=f'bench_{suffix}_{i}@example.com', nickname='bench', password=None
+            )
+            for i in range(count)
+        ]
+        tokens = [str(RefreshToken.for_user(user).access_token) for user in users]
+        return users, tokens
+
+    def _run(self, authenticate, make_request, tokens, options):
+        # DRF Request는 인증 결과를 저장하므로 요청마다 새로 만듦 (측정 시간에서는 제외)
+        requests_ = [make_request(tokens[i % len(tokens)]) for i in range(options['requests'])]
+        latencies = []
+        query_count = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            for request in requests_:
+                started = time.perf_counter()
+                user = authenticate(request)
+                latencies.append(time.perf_counter() - started)
+                if user is None:
+                    raise RuntimeError('인증 실패')
+        return {
+            'latency': summarize_ms(latencies),
+            'queries_per_request': round(query_count / options['requests'], 4),
+        }
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        simplejwt = SimpleJWTAuthentication()
+        accounts_auth = JWTAuthentication()
+        users, tokens = self._create_users(options['users'])
+        results = {'requests': options['requests'], 'users': options['users']}
+
+        def legacy_request(token):
+            return Request(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'), authenticators=[simplejwt])
+
+        def current_request(token):
+            return Request(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'), authenticators=[accounts_auth])
+
+        def legacy(request):
+            # DRF APIView.initial의 인증 + jwt_required
+            request.user
+            return _legacy_get_user_from_token(request)
+
+        def current(request):
+            request.user
+            return get_user_from_token(request)
+
+        try:
+            results['legacy'] = self._run(legacy, legacy_request, tokens, options)
+
+            with override_settings(AUTH_PRINCIPAL_CACHE={**getattr(settings, 'AUTH_PRINCIPAL_CACHE', {}), 'TTL': 0}):
+                results['uncached'] = self._run(current, current_request, tokens, options)
+
+            # 토큰마다 한 번씩 인증해 캐시를 채운 뒤 적중 경로만 측정
+            principal_cache.clear()
+            for token in tokens:
+                current(current_request(token))
+            results['cached'] = self._run(current, current_request, tokens, options)
+        finally:
+            principal_cache.clear()
+            User.objects.filter(user_id__in=[user.user_id for user in users]).delete()
+
+        for name in ('legacy', 'uncached', 'cached'):
+            result = results[name]
+            self.stdout.write(
+                f"[{name}] 요청당 인증 {format_ms(result['latency'])}, 쿼리 {result['queries_per_request']}회"
+            )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+
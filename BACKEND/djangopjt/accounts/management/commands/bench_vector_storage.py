@@ -0,0 +1,93 @@
+"""
+생체 벡터 저장 형식 벤치마크 (JSON 목록 vs 패킹 바이트)
+
+사용자 한 명 분량(얼굴 5x512 + 음성 4x256)을 기준으로 행 크기와
+인코딩/디코딩 시간을 비교합니다. DB에 사용자가 있으면 실제 컬럼 크기도 함께 출력합니다.
+
+사용 예:
+    python manage.py bench_vector_storage --rows 2000
+"""
+import json
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db.models import Avg
+from django.db.models.functions import Length
+
+from accounts.models import User
+from accounts.vector_codec import pack_vectors, unpack_array
+
+from ._benchutils import format_ms, summarize_ms, timed
+
+
+class Command(BaseCommand):
+    help = '생체 벡터 저장 형식(JSON / float16 / float32)의 크기와 (역)직렬화 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='측정할 사용자 행 수')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    def _measure(self, rows, encode, decode):
+        encoded = []
+        encode_samples = []
+        for face, voice in rows:
+            (face_data, voice_data), secs = timed(lambda: (encode(face), encode(voice)))
+            encoded.append((face_data, voice_data))
+            encode_samples.append(secs)
+
+        decode_samples = []
+        for face_data, voice_data in encoded:
+            _, secs = timed(lambda: (decode(face_data), decode(voice_data)))
+            decode_samples.append(secs)
+
+        return {
+            'row_bytes': float(np.mean([len(f) + len(v) for f, v in encoded])),
+            'encode': summarize_ms(encode_samples),
+            'decode': summarize_ms(decode_samples),
+        }
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        rows = [
+            (rng.standard_normal((5, 512)).tolist(), rng.standard_normal((4, 256)).tolist())
+            for _ in range(options['rows'])
+        ]
+
+        # 로그인 스캔에서 필요한 것은 float32 행렬이므로 디코딩은 배열 변환까지 포함
+        formats = {
+            'json': (
+                lambda v: json.dumps(v).encode(),
+                lambda data: np.asarray(json.loads(data), dtype=np.float32),
+            ),
+            'float16': (lambda v: pack_vectors(v, dtype='float16'), unpack_array),
+            'float32': (lambda v: pack_vectors(v, dtype='float32'), unpack_array),
+        }
+
+        results = {'rows': options['rows'], 'formats': {}}
+        self.stdout.write(f"사용자 {options['rows']}명 (얼굴 5x512 + 음성 4x256)")
+        for name, (encode, decode) in formats.items():
+            result = self._measure(rows, encode, decode)
+            results['formats'][name] = result
+            self.stdout.write(f"[{name}] 행 크기 {result['row_bytes'] / 1024:.1f}KB")
+            self.stdout.write(f"  encode {format_ms(result['encode'])}")
+            self.stdout.write(f"  decode {format_ms(result['decode'])}")
+
+        # float16 저장 시 코사인 유사도 오차
+        face = np.asarray(rows[0][0], dtype=np.float64)
+        restored = unpack_array(pack_vectors(face)).astype(np.float64)
+        cos = np.sum(face * restored, axis=1) / (
+            np.linalg.norm(face, axis=1) * np.linalg.norm(restored, axis=1)
+        )
+        results['float16_max_cosine_error'] = float(1 - cos.min())
+        self.stdout.write(f"float16 코사인 유사도 최대 오차: {results['float16_max_cosine_error']:.2e}")
+
+        stored = User.objects.aggregate(
+            face=Avg(Length('face_vectors_packed')), voice=Avg(Length('voice_vectors_packed'))
+        )
+        if stored['face'] is not None:
+            results['database_avg_bytes'] = stored
+            self.stdout.write(f"DB 평균 컬럼 크기: 얼굴 {stored['face']:.0f}B, 음성 {stored['voice'] or 0:.0f}B")
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
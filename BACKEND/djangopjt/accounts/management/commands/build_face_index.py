@@ -0,0 +1,51 @@
+"""
+얼굴 벡터 검색 인덱스 생성
+
+활성 사용자의 얼굴 벡터로 인덱스를 구축해 BIOMETRIC_SEARCH['INDEX_PATH']에 저장합니다.
+워커들은 이 파일을 mmap으로 열어 공유하고, 이후 변경분만 메모리에 반영합니다.
+변경분이 쌓이면 주기적으로(예: 야간 cron) 다시 실행하세요.
+
+사용 예:
+    python manage.py build_face_index --backend ivf --nlist 1024
+"""
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.biometric_search import build_index, get_search_config
+from accounts.face_gallery import FACE_GALLERY_VERSION_KEY, load_gallery_arrays
+
+from ._benchutils import timed
+
+
+class Command(BaseCommand):
+    help = '얼굴 벡터 검색 인덱스를 생성합니다 (mmap 공유용).'
+
+    def add_arguments(self, parser):
+        config = get_search_config()
+        parser.add_argument('--backend', default=config['BACKEND'], help='exact | ivf')
+        parser.add_argument('--path', default=config['INDEX_PATH'], help='인덱스 디렉터리')
+        parser.add_argument('--nlist', type=int, default=config['NLIST'], help='IVF 클러스터 수')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path:
+            raise CommandError("--path 또는 settings.BIOMETRIC_SEARCH['INDEX_PATH']가 필요합니다.")
+
+        # DB를 읽기 전 버전을 기록 - 읽는 동안의 변경은 워커가 변경분으로 다시 반영
+        version = cache.get(FACE_GALLERY_VERSION_KEY, 0)
+
+        (vectors, labels), load_secs = timed(load_gallery_arrays)
+        self.stdout.write(f'DB 적재: 벡터 {vectors.shape[0]}개, {load_secs:.2f}s')
+
+        try:
+            index, build_secs = timed(
+                build_index, options['backend'], vectors, labels,
+                nlist=options['nlist'], seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f'인덱스 구축({options["backend"]}): {build_secs:.2f}s')
+
+        index.save(path, gallery_version=version)
+        self.stdout.write(self.style.SUCCESS(f'저장 완료: {path} (gallery_version={version})'))
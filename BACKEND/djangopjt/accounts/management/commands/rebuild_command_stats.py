@@ -0,0 +1,30 @@
+"""
+CommandLog 일자별 집계 재생성
+
+운영 테이블 + 보관 파일의 로그로 command_log_daily_stat을 다시 만듭니다.
+집계는 로그 저장 시 증분으로 갱신되므로, 배포 직후(기존 로그 반영)나 불일치가 의심될 때만 실행합니다.
+실행 중에는 CommandLog 지연 저장(flush)과 보관(archive)이 멈춥니다.
+
+사용 예:
+    python manage.py rebuild_command_stats
+    python manage.py rebuild_command_stats --user 12 --user 34
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.command_stats import RebuildLocked, rebuild
+
+from ._benchutils import timed
+
+
+class Command(BaseCommand):
+    help = 'CommandLog 일자별 집계(command_log_daily_stat)를 로그로부터 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='사용자 ID (여러 번 지정 가능, 생략 시 전체)')
+
+    def handle(self, *args, **options):
+        try:
+            rows, secs = timed(rebuild, options['user_ids'])
+        except RebuildLocked:
+            raise CommandError('CommandLog 저장/보관 작업이 실행 중입니다. 잠시 후 다시 실행하세요.')
+        self.stdout.write(self.style.SUCCESS(f'집계 재생성 완료: {rows}행, {secs:.2f}s'))
@@ -0,0 +1,146 @@
+# 생체 벡터 JSON 목록 → 패킹된 float16 바이트 (accounts/vector_codec.py)
+
+import json
+import logging
+import struct
+
+import numpy as np
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+# 이 마이그레이션 시점의 형식 (vector_codec.py 형식 버전 1)을 그대로 복사
+# - 앱 코드가 바뀌거나 삭제되어도 마이그레이션 결과가 달라지지 않도록
+_HEADER = struct.Struct('<4sBBBx')
+_MAGIC = b'SVEC'
+_VERSION = 1
+_FLOAT16 = 1
+_DTYPES = {1: np.dtype('<f2'), 2: np.dtype('<f4')}
+
+
+def pack_vectors(vectors):
+    """벡터(1차원) / 벡터 목록(2차원) → float16 패킹 바이트"""
+    try:
+        array = np.asarray(vectors, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError('벡터는 숫자 목록이어야 합니다.')
+    if array.ndim not in (1, 2):
+        raise ValueError(f'1차원 또는 2차원 벡터만 저장할 수 있습니다: ndim={array.ndim}')
+
+    header = _HEADER.pack(_MAGIC, _VERSION, _FLOAT16, array.ndim)
+    shape = struct.pack(f'<{array.ndim}I', *array.shape)
+    return header + shape + array.astype(_DTYPES[_FLOAT16]).tobytes()
+
+
+def unpack_vectors(data):
+    """패킹 바이트 → 중첩 list (None은 None)"""
+    if data is None:
+        return None
+    data = bytes(data)
+    magic, version, code, ndim = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION or code not in _DTYPES:
+        raise ValueError('벡터 데이터 형식이 아닙니다.')
+    shape = struct.unpack_from(f'<{ndim}I', data, _HEADER.size)
+    array = np.frombuffer(data, dtype=_DTYPES[code], offset=_HEADER.size + 4 * ndim)
+    return array.reshape(shape).astype(np.float32).tolist()
+
+# (모델, [(JSON 필드, 바이너리 필드), ...])
+VECTOR_FIELDS = [
+    ('User', [('face_vectors', 'face_vectors_packed'), ('voice_vectors', 'voice_vectors_packed')]),
+    ('BiometricLog', [('previous_vector', 'previous_vector_packed'), ('new_vector', 'new_vector_packed')]),
+]
+
+
+def _convert(apps, convert_value, reverse=False):
+    for model_name, pairs in VECTOR_FIELDS:
+        model = apps.get_model('accounts', model_name)
+        sources = [dst if reverse else src for src, dst in pairs]
+        targets = [src if reverse else dst for src, dst in pairs]
+
+        batch = []
+        for obj in model.objects.only(model._meta.pk.name, *sources).iterator(chunk_size=BATCH_SIZE):
+            for source, target in zip(sources, targets):
+                setattr(obj, target, convert_value(model, target, obj.pk, getattr(obj, source)))
+            batch.append(obj)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, targets)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, targets)
+
+
+def _pack(model, field, pk, value):
+    if isinstance(value, str):
+        value = json.loads(value)
+    if value is None:
+        return None
+    try:
+        return pack_vectors(value)
+    except ValueError:
+        logger.warning(f"벡터 변환 실패로 비움: {model.__name__} pk={pk}")
+        return None
+
+
+def _unpack(model, field, pk, value):
+    vectors = unpack_vectors(value)
+    # 0001의 user.face_vectors는 NOT NULL (default=list)
+    if vectors is None and not model._meta.get_field(field).null:
+        return []
+    return vectors
+
+
+def pack_json_vectors(apps, schema_editor):
+    _convert(apps, _pack)
+
+
+def unpack_binary_vectors(apps, schema_editor):
+    _convert(apps, _unpack, reverse=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='face_vectors_packed',
+            field=models.BinaryField(blank=True, db_comment='face_vectors VECTOR(512) x 5', null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='voice_vectors_packed',
+            field=models.BinaryField(blank=True, db_comment='voice_vectors VECTOR(256) x 4', null=True),
+        ),
+        migrations.AddField(
+            model_name='biometriclog',
+            name='previous_vector_packed',
+            field=models.BinaryField(blank=True, db_comment='변경 전 벡터', null=True),
+        ),
+        migrations.AddField(
+            model_name='biometriclog',
+            name='new_vector_packed',
+            field=models.BinaryField(blank=True, db_comment='변경 후 벡터', null=True),
+        ),
+        migrations.RunPython(pack_json_vectors, unpack_binary_vectors),
+        migrations.RemoveField(
+            model_name='user',
+            name='face_vectors',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='voice_vectors',
+        ),
+        migrations.RemoveField(
+            model_name='biometriclog',
+            name='previous_vector',
+        ),
+        migrations.RemoveField(
+            model_name='biometriclog',
+            name='new_vector',
+        ),
+    ]
@@ -0,0 +1,24 @@
+# CommandLog 지연 저장(accounts/command_log_writer.py): 이벤트 ID + 발생 시각 직접 지정
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_packed_biometric_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commandlog',
+            name='event_id',
+            field=models.UUIDField(blank=True, db_comment='명령 이벤트 고유 식별자', editable=False, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='commandlog',
+            name='created_at',
+            field=models.DateTimeField(db_comment='명령 발생 일시', default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# 핫 쿼리 복합 인덱스: 활성 연결/활성 세션/활성 프리셋 조회, 세션별 명령 이력 (bench_indexes로 측정)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_command_log_event_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commandlog',
+            index=models.Index(fields=['session', 'created_at'], name='cmdlog_session_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='preset',
+            index=models.Index(fields=['user', 'is_active'], name='preset_user_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['connection', 'ended_at', 'started_at'], name='session_conn_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userdeviceconnection',
+            index=models.Index(fields=['user', 'is_active', 'deleted_at', 'connected_at'], name='udc_user_active_idx'),
+        ),
+    ]
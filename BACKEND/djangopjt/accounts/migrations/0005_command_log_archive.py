@@ -0,0 +1,32 @@
+# CommandLog 보관 기간 경과분 압축 보관 목록 (accounts/command_log_archive.py)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandLogArchive',
+            fields=[
+                ('archive_id', models.AutoField(primary_key=True, serialize=False)),
+                ('path', models.CharField(db_comment='COMMAND_LOG_ARCHIVE DIR 기준 상대 경로 (gzip JSONL)', max_length=255, unique=True)),
+                ('first_log_id', models.IntegerField(db_comment='묶음의 최소 command_log_id')),
+                ('last_log_id', models.IntegerField(db_comment='묶음의 최대 command_log_id')),
+                ('min_created_at', models.DateTimeField(db_comment='묶음의 가장 이른 명령 발생 일시')),
+                ('max_created_at', models.DateTimeField(db_comment='묶음의 가장 늦은 명령 발생 일시')),
+                ('row_count', models.IntegerField()),
+                ('size_bytes', models.BigIntegerField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'command_log_archive',
+                'managed': True,
+                'indexes': [models.Index(fields=['min_created_at', 'max_created_at'], name='cmdlog_archive_range_idx')],
+            },
+        ),
+    ]
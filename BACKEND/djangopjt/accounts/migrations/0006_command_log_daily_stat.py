@@ -0,0 +1,33 @@
+# CommandLog 일자별 집계 (accounts/command_stats.py)
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_command_log_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandLogDailyStat',
+            fields=[
+                ('stat_id', models.AutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField(db_comment='명령 발생 일자 (TIME_ZONE 기준)')),
+                ('command_type', models.CharField(max_length=50)),
+                ('command_content', models.CharField(blank=True, db_comment='명령 상세 내용 (앞 100자)', default='', max_length=100)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('failure_count', models.PositiveIntegerField(db_comment='결과 미정(NULL)은 성공/실패 어디에도 세지 않음', default=0)),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'command_log_daily_stat',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('user', 'day', 'command_type', 'command_content'), name='cmdlog_stat_unique')],
+            },
+        ),
+    ]
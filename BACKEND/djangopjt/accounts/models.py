@@ -4,6 +4,8 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, Permis
 import uuid
 from django.utils import timezone
 
+from .vector_codec import packed_vector_property
+
 class UserManager(BaseUserManager):
     def create_user(self, login_id, email, nickname, password=None):
         if not login_id:
@@ -28,9 +30,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(max_length=100, unique=True)
     nickname = models.CharField(max_length=20)
     
-    # Vector fields -> JSONField in Django
-    face_vectors = models.JSONField(null=False, blank=False, default=list, db_comment='face_vectors VECTOR(512) x 5')
-    voice_vectors = models.JSONField(null=True, blank=True, db_comment='voice_vectors VECTOR(256) x 4')
+    # Vector fields -> 패킹된 float16 바이트 (accounts/vector_codec.py)
+    face_vectors_packed = models.BinaryField(null=True, blank=True, db_comment='face_vectors VECTOR(512) x 5')
+    voice_vectors_packed = models.BinaryField(null=True, blank=True, db_comment='voice_vectors VECTOR(256) x 4')
+
+    # 기존 JSON 필드와 같은 list 형식으로 읽고 쓰는 속성
+    face_vectors = packed_vector_property('face_vectors_packed', empty=list)
+    voice_vectors = packed_vector_property('voice_vectors_packed')
 
     created_at = models.DateTimeField(auto_now_add=True, db_comment='회원가입 일시')
     last_login_at = models.DateTimeField(null=True, blank=True)
@@ -59,6 +65,16 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'login_id'
     REQUIRED_FIELDS = ['email', 'nickname']
 
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # 지연 로딩 필드 하나에 접근하면 나머지 지연 필드도 한 번에 읽음
+        # (JWT 인증 캐시 스냅샷으로 만든 request.user에서 필드마다 쿼리가 나가지 않도록)
+        if fields is not None:
+            fields = set(fields)
+            deferred_fields = self.get_deferred_fields()
+            if fields & deferred_fields:
+                fields |= deferred_fields
+        super().refresh_from_db(using, fields, **kwargs)
+
     class Meta:
         db_table = 'user'
         managed = True
@@ -110,6 +126,10 @@ class UserDeviceConnection(models.Model):
     class Meta:
         db_table = 'user_device_connection'
         managed = True
+        indexes = [
+            # 사용자의 활성 연결 (user, is_active=True, deleted_at IS NULL, -connected_at)
+            models.Index(fields=['user', 'is_active', 'deleted_at', 'connected_at'], name='udc_user_active_idx'),
+        ]
 
 class Session(models.Model):
     session_id = models.AutoField(primary_key=True, db_comment='세션 고유 식별자')
@@ -129,6 +149,10 @@ class Session(models.Model):
     class Meta:
         db_table = 'session'
         managed = True
+        indexes = [
+            # 연결의 활성 세션 (connection, ended_at IS NULL, -started_at)
+            models.Index(fields=['connection', 'ended_at', 'started_at'], name='session_conn_active_idx'),
+        ]
 
 class Preset(models.Model):
     preset_id = models.AutoField(primary_key=True)
@@ -151,6 +175,10 @@ class Preset(models.Model):
     class Meta:
         db_table = 'preset'
         managed = True
+        indexes = [
+            # 사용자의 활성 프리셋 (user, is_active=True)
+            models.Index(fields=['user', 'is_active'], name='preset_user_active_idx'),
+        ]
 
 class CommandLog(models.Model):
     command_log_id = models.AutoField(primary_key=True, db_comment='사용자 명령 로그 고유 식별자')
@@ -160,7 +188,10 @@ class CommandLog(models.Model):
     command_content = models.TextField(null=True, blank=True, db_comment='명령 상세 내용')
     is_success = models.BooleanField(null=True, db_comment='명령 실행 성공 여부')
     error_message = models.TextField(null=True, blank=True, db_comment='실패 시 오류 메시지')
-    created_at = models.DateTimeField(auto_now_add=True, db_comment='명령 발생 일시')
+    # 지연 저장(command_log_writer) 시 이벤트 발생 시각을 그대로 기록하므로 auto_now_add 대신 default 사용
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_comment='명령 발생 일시')
+    # 지연 저장 이벤트 ID - 재전송 시 중복 INSERT 방지 (직접 생성한 로그는 NULL)
+    event_id = models.UUIDField(null=True, blank=True, unique=True, editable=False, db_comment='명령 이벤트 고유 식별자')
 
     def __str__(self):  
         result = "✅" if self.is_success else "❌"
@@ -169,14 +200,68 @@ class CommandLog(models.Model):
     class Meta:
         db_table = 'command_log'
         managed = True
+        indexes = [
+            # 세션별 명령 이력 (session, created_at 순)
+            models.Index(fields=['session', 'created_at'], name='cmdlog_session_created_idx'),
+        ]
+
+class CommandLogArchive(models.Model):
+    """보관 기간이 지나 압축 파일로 옮긴 CommandLog 묶음 (accounts/command_log_archive.py)"""
+    archive_id = models.AutoField(primary_key=True)
+    path = models.CharField(max_length=255, unique=True, db_comment='COMMAND_LOG_ARCHIVE DIR 기준 상대 경로 (gzip JSONL)')
+    first_log_id = models.IntegerField(db_comment='묶음의 최소 command_log_id')
+    last_log_id = models.IntegerField(db_comment='묶음의 최대 command_log_id')
+    min_created_at = models.DateTimeField(db_comment='묶음의 가장 이른 명령 발생 일시')
+    max_created_at = models.DateTimeField(db_comment='묶음의 가장 늦은 명령 발생 일시')
+    row_count = models.IntegerField()
+    size_bytes = models.BigIntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.path} ({self.row_count}건)"
+
+    class Meta:
+        db_table = 'command_log_archive'
+        managed = True
+        indexes = [
+            # 기간이 겹치는 묶음 찾기 (min_created_at <= until AND max_created_at >= since)
+            models.Index(fields=['min_created_at', 'max_created_at'], name='cmdlog_archive_range_idx'),
+        ]
+
+class CommandLogDailyStat(models.Model):
+    """사용자 x 일자 x 명령별 CommandLog 집계 (accounts/command_stats.py가 로그 저장 시 갱신)"""
+    stat_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_id')
+    day = models.DateField(db_comment='명령 발생 일자 (TIME_ZONE 기준)')
+    command_type = models.CharField(max_length=50)
+    command_content = models.CharField(max_length=100, default='', blank=True, db_comment='명령 상세 내용 (앞 100자)')
+    total_count = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0, db_comment='결과 미정(NULL)은 성공/실패 어디에도 세지 않음')
+
+    def __str__(self):
+        return f"{self.day} {self.command_type}:{self.command_content} ({self.success_count}/{self.total_count})"
+
+    class Meta:
+        db_table = 'command_log_daily_stat'
+        managed = True
+        constraints = [
+            # 사용자의 기간별 집계 조회 (user, day 범위)에도 사용
+            models.UniqueConstraint(
+                fields=['user', 'day', 'command_type', 'command_content'], name='cmdlog_stat_unique'
+            ),
+        ]
 
 class BiometricLog(models.Model):
     biometric_history_id = models.AutoField(primary_key=True, db_comment='이력 고유 식별자')
     user = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_id')
     
     change_type = models.CharField(max_length=50, db_comment='face_update / voice_update') # ENUM
-    previous_vector = models.JSONField(null=True, blank=True, db_comment='변경 전 벡터')
-    new_vector = models.JSONField(null=True, blank=True, db_comment='변경 후 벡터')
+    previous_vector_packed = models.BinaryField(null=True, blank=True, db_comment='변경 전 벡터')
+    new_vector_packed = models.BinaryField(null=True, blank=True, db_comment='변경 후 벡터')
+
+    previous_vector = packed_vector_property('previous_vector_packed')
+    new_vector = packed_vector_property('new_vector_packed')
     
     changed_at = models.DateTimeField(auto_now_add=True)
     change_reason = models.CharField(max_length=50, null=True, blank=True) # ENUM
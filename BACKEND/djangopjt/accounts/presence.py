@@ -0,0 +1,214 @@
+"""
+앱 WebSocket 연결 레지스트리 (presence)
+
+세션별 앱 연결 여부를 키마다 따로 두고 cache.keys('ws_status:*')로 훑던 것을
+Redis 정렬 집합 + 해시 두 개로 관리합니다.
+
+    presence:sessions  (ZSET)  session_id → 만료 시각 (마지막 heartbeat + TTL, epoch 초)
+    presence:info      (HASH)  session_id → 연결 정보 JSON (user_id, user_login_id, channel_name, connected_at ...)
+
+- 연결/종료: ZADD + HSET / ZREM + HDEL (종료는 같은 채널일 때만 - 재연결한 새 연결을 지우지 않도록)
+- heartbeat: 앱 메시지(ping 등)마다 ZADD XX로 만료 시각 갱신 (HEARTBEAT_INTERVAL 안에서는 한 번만)
+- 조회: 만료 시각이 지나지 않은 항목만 연결된 것으로 봄 (ZSCORE / ZRANGEBYSCORE, 키 스캔 없음)
+- 정리: Celery Beat(sweep_presence)가 만료된 항목을 ZRANGEBYSCORE 범위로 삭제
+  (정리 전에도 조회에는 나오지 않음, 워커가 죽어 disconnect가 없던 연결도 TTL 후 사라짐)
+- 설정은 settings.PRESENCE
+"""
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from .cache_keys import PRESENCE
+
+logger = logging.getLogger(__name__)
+
+# settings.PRESENCE 기본값
+DEFAULT_PRESENCE_CONFIG = {
+    'TTL': 120,  # 초 - 마지막 heartbeat 후 이 시간이 지나면 연결 끊김으로 봄
+    'HEARTBEAT_INTERVAL': 30,  # 초 - 연결당 만료 시각 갱신 최소 간격
+}
+
+
+def get_presence_config():
+    """settings.PRESENCE를 기본값과 병합"""
+    config = dict(DEFAULT_PRESENCE_CONFIG)
+    config.update(getattr(settings, 'PRESENCE', {}) or {})
+    return config
+
+
+class PresenceRegistry:
+    """세션별 앱 WebSocket 연결 레지스트리 (상태는 Redis에만 있음)"""
+
+    sessions_key = PRESENCE.key('sessions')
+    info_key = PRESENCE.key('info')
+
+    def _redis(self):
+        return get_redis_connection('default')
+
+    def _keys(self):
+        return cache.make_key(self.sessions_key), cache.make_key(self.info_key)
+
+    def _ttl(self):
+        return get_presence_config()['TTL']
+
+    # ===== 연결 =====
+    def connect(self, session_id, **info):
+        """
+        연결 등록 (같은 세션의 이전 연결 정보는 덮어씀)
+
+        Args:
+            session_id: 세션 ID
+            info: 함께 저장할 연결 정보 (user_id, user_login_id, channel_name 등)
+        """
+        session_id = str(session_id)
+        sessions, infos = self._keys()
+        record = {**info, 'status': 'connected', 'session_id': session_id, 'connected_at': timezone.now().isoformat()}
+        pipe = self._redis().pipeline(transaction=True)
+        pipe.zadd(sessions, {session_id: time.time() + self._ttl()})
+        pipe.hset(infos, session_id, json.dumps(record))
+        pipe.execute()
+
+    def heartbeat(self, session_id):
+        """
+        만료 시각 갱신
+
+        Returns:
+            bool: 등록된 연결이었는지 (False면 정리되었으므로 connect로 다시 등록)
+        """
+        sessions, _ = self._keys()
+        return bool(self._redis().zadd(sessions, {str(session_id): time.time() + self._ttl()}, xx=True, ch=True))
+
+    def disconnect(self, session_id, channel_name=None):
+        """
+        연결 해제 (channel_name을 주면 그 채널이 등록된 연결일 때만)
+
+        Returns:
+            bool: 삭제했는지 여부
+        """
+        session_id = str(session_id)
+        sessions, infos = self._keys()
+        removed = False
+
+        def remove(pipe):
+            nonlocal removed
+            raw = pipe.hget(infos, session_id)
+            if channel_name is not None and raw is not None and json.loads(raw).get('channel_name') != channel_name:
+                # 같은 세션으로 재연결한 새 연결 - 지우지 않음
+                removed = False
+                return
+            pipe.multi()
+            pipe.zrem(sessions, session_id)
+            pipe.hdel(infos, session_id)
+            removed = raw is not None
+
+        self._redis().transaction(remove, infos)
+        return removed
+
+    # ===== 조회 =====
+    def is_online(self, session_id):
+        """연결 여부 (ZSCORE 한 번)"""
+        sessions, _ = self._keys()
+        expires_at = self._redis().zscore(sessions, str(session_id))
+        return expires_at is not None and expires_at > time.time()
+
+    def statuses(self, session_ids):
+        """
+        여러 세션의 연결 정보 (왕복 한 번)
+
+        Returns:
+            dict: session_id(str) → 연결 정보 dict (last_seen 포함) 또는 None
+        """
+        session_ids = [str(session_id) for session_id in session_ids]
+        if not session_ids:
+            return {}
+        sessions, infos = self._keys()
+        pipe = self._redis().pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.zscore(sessions, session_id)
+        pipe.hmget(infos, session_ids)
+        *scores, raws = pipe.execute()
+        return {
+            session_id: self._status(score, raw)
+            for session_id, score, raw in zip(session_ids, scores, raws)
+        }
+
+    def status(self, session_id):
+        return self.statuses([session_id])[str(session_id)]
+
+    def active(self):
+        """
+        모든 활성 연결 (만료 시각이 지나지 않은 항목만, 왕복 두 번)
+
+        Returns:
+            list[dict]: 연결 정보 (만료가 늦은 순 = 최근 heartbeat 순)
+        """
+        sessions, infos = self._keys()
+        redis = self._redis()
+        members = redis.zrevrangebyscore(sessions, '+inf', f'({time.time()}', withscores=True)
+        if not members:
+            return []
+        raws = redis.hmget(infos, [member for member, _ in members])
+        return [status for status in (self._status(score, raw) for (_, score), raw in zip(members, raws)) if status]
+
+    def count(self):
+        """활성 연결 수 (ZCOUNT)"""
+        sessions, _ = self._keys()
+        return self._redis().zcount(sessions, f'({time.time()}', '+inf')
+
+    def _status(self, expires_at, raw):
+        if expires_at is None or raw is None or expires_at <= time.time():
+            return None
+        status = json.loads(raw)
+        status['last_seen'] = expires_at - self._ttl()
+        return status
+
+    # ===== 정리 =====
+    def sweep(self):
+        """
+        만료된 항목 삭제
+
+        읽고 지우는 사이에 heartbeat가 들어오면(WATCH 충돌) 다시 읽어서 처리합니다.
+
+        Returns:
+            int: 삭제한 연결 수
+        """
+        sessions, infos = self._keys()
+        expired = []
+
+        def remove(pipe):
+            nonlocal expired
+            now = time.time()
+            expired = pipe.zrangebyscore(sessions, '-inf', now)
+            if not expired:
+                return
+            pipe.multi()
+            pipe.zremrangebyscore(sessions, '-inf', now)
+            pipe.hdel(infos, *expired)
+
+        self._redis().transaction(remove, sessions)
+        if expired:
+            logger.info(f"WebSocket 연결 레지스트리 정리: 만료 {len(expired)}건")
+        return len(expired)
+
+    # ===== 비동기 =====
+    async def aconnect(self, session_id, **info):
+        await sync_to_async(self.connect)(session_id, **info)
+
+    async def aheartbeat(self, session_id):
+        return await sync_to_async(self.heartbeat)(session_id)
+
+    async def adisconnect(self, session_id, channel_name=None):
+        return await sync_to_async(self.disconnect)(session_id, channel_name)
+
+    async def ais_online(self, session_id):
+        return await sync_to_async(self.is_online)(session_id)
+
+
+# 프로세스 전역 레지스트리
+presence = PresenceRegistry()
@@ -0,0 +1,148 @@
+"""
+JWT 인증 사용자 캐시 (principal cache)
+
+@jwt_required 요청마다 토큰 디코딩 + User 조회(SELECT)를 하던 것을
+워커(프로세스) 메모리의 짧은 TTL LRU로 줄입니다.
+
+    토큰 ──▶ (user_id, login_id, uid, nickname, is_active) 스냅샷 + 캐시 시점 버전 + 만료 시각
+
+- 같은 토큰의 재요청은 서명 검증/DB 조회 없이 스냅샷으로 User 인스턴스를 만듦
+  (나머지 필드는 지연 로딩 - 처음 접근할 때 한 번의 쿼리로 모두 읽음, User.refresh_from_db)
+- 항목 수명은 TTL과 토큰 exp 중 빠른 쪽
+- 로그아웃/탈퇴/프로필 수정 시 invalidate_principal로 사용자별 버전을 올리면
+  모든 워커가 다음 요청에서 버전 불일치를 보고 DB에서 다시 읽음 (요청당 Redis GET 1회)
+- 설정은 settings.AUTH_PRINCIPAL_CACHE (TTL 0이면 캐시 사용 안 함)
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .cache_keys import AUTH_PRINCIPAL
+
+# settings.AUTH_PRINCIPAL_CACHE 기본값
+DEFAULT_PRINCIPAL_CACHE_CONFIG = {
+    'TTL': 60,  # 초
+    'MAX_ENTRIES': 10000,  # 워커당 토큰 수
+}
+
+# 스냅샷으로 채우는 User 필드 (이 외의 필드는 지연 로딩)
+# Model.from_db에 그대로 넘기므로 User 모델의 필드 정의 순서를 따름
+SNAPSHOT_FIELDS = ('user_id', 'login_id', 'uid', 'nickname', 'is_active')
+
+
+def get_principal_cache_config():
+    """settings.AUTH_PRINCIPAL_CACHE를 기본값과 병합"""
+    config = dict(DEFAULT_PRINCIPAL_CACHE_CONFIG)
+    config.update(getattr(settings, 'AUTH_PRINCIPAL_CACHE', {}) or {})
+    return config
+
+
+def _version_key(user_id):
+    return AUTH_PRINCIPAL.key(user_id, 'version')
+
+
+def current_version(user_id):
+    """사용자의 인증 캐시 버전 (워커 공용)"""
+    return cache.get(_version_key(user_id), 0)
+
+
+def invalidate_principal(user_id):
+    """
+    사용자의 캐시된 인증 정보 무효화 (모든 워커)
+
+    트랜잭션 안에서 호출하면 커밋 이후에 버전을 올립니다.
+    (커밋 전에 올리면 다른 요청이 변경 전 값을 다시 캐시할 수 있음)
+    """
+    def bump():
+        key = _version_key(user_id)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # 키가 그 사이 삭제된 경우
+            cache.set(key, 1, timeout=None)
+        principal_cache.discard_user(user_id)
+
+    transaction.on_commit(bump)
+
+
+class PrincipalCache:
+    """토큰 → 사용자 스냅샷 LRU (스레드 안전)"""
+
+    def __init__(self, config=None):
+        self._config = config
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        return self._config or get_principal_cache_config()
+
+    @property
+    def enabled(self):
+        return self.config['TTL'] > 0
+
+    def get(self, token):
+        """
+        캐시된 스냅샷 조회
+
+        Returns:
+            tuple | None: SNAPSHOT_FIELDS 순서의 값 (없거나 만료/무효화되었으면 None)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            snapshot, version, expires_at = entry
+            if expires_at <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+
+        if current_version(snapshot[0]) != version:
+            with self._lock:
+                self._entries.pop(token, None)
+            return None
+        return snapshot
+
+    def set(self, token, snapshot, version, token_exp=None):
+        """
+        스냅샷 저장
+
+        Args:
+            snapshot: SNAPSHOT_FIELDS 순서의 값
+            version: DB 조회 전에 읽은 current_version (조회 중 무효화되면 다음 요청에서 다시 읽음)
+            token_exp: 토큰 만료 시각 (epoch 초)
+        """
+        config = self.config
+        expires_at = time.time() + config['TTL']
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+
+        with self._lock:
+            self._entries[token] = (snapshot, version, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > config['MAX_ENTRIES']:
+                self._entries.popitem(last=False)
+
+    def discard_user(self, user_id):
+        """이 워커에 캐시된 사용자의 모든 토큰 제거"""
+        with self._lock:
+            for token in [t for t, entry in self._entries.items() if entry[0][0] == user_id]:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# 프로세스 전역 캐시
+principal_cache = PrincipalCache()
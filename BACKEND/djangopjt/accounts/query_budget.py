@@ -0,0 +1,169 @@
+"""
+요청당 DB 쿼리 수 예산 (query budget)
+
+뷰마다 허용하는 쿼리 수를 @query_budget(n)으로 선언하고,
+QueryBudgetMiddleware가 요청마다 실행된 쿼리 수를 세어 예산과 비교합니다.
+
+- 응답 헤더 X-Query-Count / X-Query-Budget (settings.QUERY_BUDGET['HEADER'])
+- 예산 초과 시 경고 로그, ENFORCE(테스트 기본값)이면 QueryBudgetExceeded 발생 → 해당 테스트 실패
+- 동기/비동기 뷰 모두 집계 (contextvar가 sync_to_async 스레드까지 전달됨)
+- 트랜잭션 제어문(SAVEPOINT 등)은 세지 않음 (테스트 트랜잭션과 운영의 수를 같게)
+- 미들웨어는 ENABLED(DEBUG / 테스트 기본값)일 때만 사용 - 운영에서는 쿼리마다 감싸지 않음 (MiddlewareNotUsed)
+
+사용 예:
+    @query_budget(2)
+    @api_view(['GET'])
+    @jwt_required
+    def get_presets(request):
+        ...
+
+    with count_queries() as counted:
+        ...
+    counted.count
+"""
+import contextvars
+import logging
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# settings.QUERY_BUDGET 기본값
+DEFAULT_QUERY_BUDGET_CONFIG = {
+    'ENABLED': False,  # False면 QueryBudgetMiddleware를 쓰지 않음 (쿼리 카운터도 설치하지 않음)
+    'ENFORCE': False,  # True면 예산 초과 시 예외 (테스트)
+    'HEADER': False,  # True면 응답에 X-Query-Count / X-Query-Budget 헤더 추가
+}
+
+# 세지 않는 트랜잭션 제어문
+_TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+_current_counter = contextvars.ContextVar('query_budget_counter', default=None)
+
+
+def get_query_budget_config():
+    """settings.QUERY_BUDGET을 기본값과 병합"""
+    config = dict(DEFAULT_QUERY_BUDGET_CONFIG)
+    config.update(getattr(settings, 'QUERY_BUDGET', {}) or {})
+    return config
+
+
+class QueryBudgetExceeded(AssertionError):
+    """뷰가 선언한 쿼리 예산 초과 (ENFORCE 모드)"""
+
+
+class QueryCount:
+    """count_queries 블록 안에서 실행된 쿼리 수 (중첩 시 바깥 블록에도 합산)"""
+
+    def __init__(self, parent=None, record=False):
+        self.parent = parent
+        self.count = 0
+        self.queries = [] if record else None
+
+    def add(self, sql):
+        counter = self
+        while counter is not None:
+            counter.count += 1
+            if counter.queries is not None:
+                counter.queries.append(sql)
+            counter = counter.parent
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    counter = _current_counter.get()
+    if counter is not None and not sql.lstrip().upper().startswith(_TRANSACTION_STATEMENTS):
+        counter.add(sql)
+    return execute(sql, params, many, context)
+
+
+def _install(connection, **kwargs):
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def install_query_counter():
+    """현재 스레드의 연결과 이후 새로 여는 모든 연결에 카운터 설치 (중복 설치 안전)"""
+    connection_created.connect(_install, dispatch_uid='accounts.query_budget')
+    for connection in connections.all():
+        _install(connection)
+
+
+@contextmanager
+def count_queries(record=False):
+    """
+    블록 안에서 실행된 쿼리 수 집계
+
+    Args:
+        record: True면 SQL 목록도 보관 (QueryCount.queries)
+    """
+    install_query_counter()
+    counter = QueryCount(parent=_current_counter.get(), record=record)
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def query_budget(limit):
+    """뷰의 요청당 최대 쿼리 수 선언 (@api_view 등 다른 데코레이터보다 바깥에)"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """요청당 쿼리 수를 세고 뷰의 @query_budget과 비교"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_query_budget_config()['ENABLED']:
+            raise MiddlewareNotUsed('QUERY_BUDGET ENABLED=False')
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        install_query_counter()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with count_queries() as counted:
+            response = self.get_response(request)
+        return self._check(request, response, counted)
+
+    async def __acall__(self, request):
+        with count_queries() as counted:
+            response = await self.get_response(request)
+        return self._check(request, response, counted)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+
+    def _check(self, request, response, counted):
+        config = get_query_budget_config()
+        budget = getattr(request, 'query_budget', None)
+
+        if config['HEADER']:
+            response['X-Query-Count'] = str(counted.count)
+            if budget is not None:
+                response['X-Query-Budget'] = str(budget)
+
+        if budget is not None and counted.count > budget:
+            message = f"쿼리 예산 초과: {request.method} {request.path} - {counted.count}회 (예산 {budget}회)"
+            if config['ENFORCE']:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+def response_query_count(response):
+    """테스트용: 응답의 X-Query-Count 헤더 값 (HEADER 설정 필요)"""
+    return int(response['X-Query-Count'])
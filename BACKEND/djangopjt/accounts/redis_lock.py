@@ -0,0 +1,84 @@
+"""
+토큰으로 소유를 확인하는 Redis 락
+
+주기 작업(CommandLog flush / 보관 / 집계 재생성)이 동시에 한 워커만 실행되도록 잡는 락입니다.
+
+    SET {key} {token} NX PX {timeout}      획득 (토큰은 획득할 때마다 새로 만듦)
+    Lua: GET == token 이면 PEXPIRE / DEL   연장 / 해제
+
+- 작업이 timeout보다 오래 걸려 락이 만료되고 다른 워커가 가져가도, 이전 워커가 그 락을 지우지 않음
+- 긴 작업은 단계마다 extend()로 만료를 늘리고, False(락을 잃음)면 멈춤
+- 키는 cache.make_key를 거친 값 (django-redis 캐시와 같은 접두사)
+
+사용 예:
+    lock = RedisLock(COMMAND_LOG.key('archive_lock'), timeout=600)
+    if not lock.acquire():
+        return 0
+    try:
+        for batch in batches:
+            if not lock.extend():
+                break
+            ...
+    finally:
+        lock.release()
+"""
+import os
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+# KEYS[1]: 락, ARGV[1]: 토큰, ARGV[2]: 락 TTL(ms) - 자기 락일 때만 만료 연장
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1]: 락, ARGV[1]: 토큰 - 자기 락일 때만 삭제
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 프로세스당 한 번만 등록 (EVALSHA, 서버에 스크립트가 없으면 EVAL로 한 번 더)
+_scripts = {}
+
+
+def _script(redis, source):
+    script = _scripts.get(source)
+    if script is None:
+        script = _scripts[source] = redis.register_script(source)
+    return script
+
+
+class RedisLock:
+    """
+    소유 토큰이 있는 Redis 락 (한 번 획득 / 해제에 인스턴스 하나)
+
+    Args:
+        key: 락 캐시 키 (make_key 전, 예: COMMAND_LOG.key('flush_lock'))
+        timeout: 만료 시간 (초) - 워커가 죽어도 이 시간 후 다른 워커가 가져감
+    """
+
+    def __init__(self, key, timeout):
+        self.key = cache.make_key(key)
+        self.timeout_ms = int(timeout * 1000)
+        self.token = os.urandom(16).hex()
+        self.redis = get_redis_connection('default')
+
+    def acquire(self):
+        """락 획득 (다른 워커가 잡고 있으면 False)"""
+        return bool(self.redis.set(self.key, self.token, nx=True, px=self.timeout_ms))
+
+    def extend(self):
+        """만료 시간을 처음부터 다시 늘림 (락을 잃었으면 False)"""
+        return bool(_script(self.redis, EXTEND_LOCK_SCRIPT)(
+            keys=[self.key], args=[self.token, self.timeout_ms], client=self.redis
+        ))
+
+    def release(self):
+        """락 해제 (만료 후 다른 워커가 잡은 락은 지우지 않음)"""
+        _script(self.redis, RELEASE_LOCK_SCRIPT)(keys=[self.key], args=[self.token], client=self.redis)
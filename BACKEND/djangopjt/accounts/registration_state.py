@@ -0,0 +1,218 @@
+"""
+회원가입 진행 상태 (login_id당 레코드 하나)
+
+회원가입 단계(아이디 → 닉네임 → 이메일 → 비밀번호 → 얼굴 → 음성)의 입력을
+필드마다 따로 두던 캐시 키(registration:{login_id}:{field}) 대신 버전이 붙은 레코드 하나로 관리합니다.
+
+    registration:{login_id}  (Redis 문자열, TTL = REGISTRATION_TIMEOUT)
+
+형식 (little-endian):
+    magic(4s) = b'SREG', format(B), token(8s), version(I), fields 길이(I), fields JSON, 얼굴 벡터(vector_codec, 없으면 생략)
+
+- 단계마다 왕복 두 번: edit()이 GET으로 읽고, 바꿨으면 Lua 스크립트 한 번으로 비교 후 저장(compare-and-set)
+- 저장할 때마다 version +1, token은 회원가입을 시작할 때마다 새로 만듦
+  (헤더 magic~version이 읽을 때와 같을 때만 저장 - 다시 시작한 회원가입의 같은 version과 구분)
+- 읽은 뒤 다른 요청이 상태를 바꿨으면(처음부터 다시 시작 등) 쓰지 않고 RegistrationConflict
+- 5x512 얼굴 벡터는 float16 바이트로 저장 (User.face_vectors와 같은 정밀도, pickle된 list 대비 약 1/4)
+"""
+import json
+import logging
+import os
+import struct
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from .cache_keys import REGISTRATION
+from .vector_codec import pack_vectors, unpack_array, unpack_vectors
+
+logger = logging.getLogger(__name__)
+
+# 회원가입 진행 상태 만료 시간: 10분 (마지막 단계 저장 기준)
+REGISTRATION_TIMEOUT = 600
+
+REGISTRATION_MAGIC = b'SREG'
+REGISTRATION_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sB8sII')
+# compare-and-set 비교 대상 (magic, format, token, version)
+_PREFIX_SIZE = _HEADER.size - 4
+
+# KEYS[1]: 레코드 키, ARGV[1]: 읽을 때의 헤더, ARGV[2]: 새 레코드 (빈 값이면 삭제), ARGV[3]: TTL(초)
+COMPARE_AND_SET_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current or string.sub(current, 1, string.len(ARGV[1])) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == '' then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return 1
+"""
+
+
+class RegistrationConflict(Exception):
+    """읽은 뒤 다른 요청이 같은 회원가입 상태를 바꿈"""
+
+
+class RegistrationState:
+    """
+    회원가입 진행 상태
+
+    fields: 단계별 입력 (id, nickname, email, password - password는 해시)
+    face_packed: 얼굴 벡터 (vector_codec 바이트)
+    """
+
+    __slots__ = ('login_id', 'token', 'version', 'fields', 'face_packed', 'changed', 'deleted')
+
+    def __init__(self, login_id, token, version=1, fields=None, face_packed=None):
+        self.login_id = login_id
+        self.token = token
+        self.version = version
+        self.fields = dict(fields or {})
+        self.face_packed = face_packed
+        self.changed = False
+        self.deleted = False
+
+    def get(self, field):
+        return self.fields.get(field)
+
+    def has(self, *fields):
+        """이전 단계 입력이 모두 있는지"""
+        return all(self.fields.get(field) for field in fields)
+
+    def set(self, **fields):
+        self.fields.update(fields)
+        self.changed = True
+
+    def set_face_vectors(self, face_vectors):
+        """
+        얼굴 벡터 저장 (float16 바이트로 변환)
+
+        Raises:
+            ValueError: 숫자 벡터 목록이 아닌 입력
+        """
+        self.face_packed = pack_vectors(face_vectors)
+        self.changed = True
+
+    @property
+    def face_vectors(self):
+        """얼굴 벡터 (중첩 list, 없으면 None)"""
+        return unpack_vectors(self.face_packed)
+
+    @property
+    def face_array(self):
+        """얼굴 벡터 (float32 np.ndarray, 없으면 None)"""
+        return unpack_array(self.face_packed)
+
+    def delete(self):
+        """회원가입 완료 - edit()을 벗어날 때 레코드 삭제"""
+        self.deleted = True
+
+
+def encode(state):
+    fields = json.dumps(state.fields, ensure_ascii=False, separators=(',', ':')).encode()
+    header = _HEADER.pack(REGISTRATION_MAGIC, REGISTRATION_FORMAT_VERSION, state.token, state.version, len(fields))
+    return header + fields + (state.face_packed or b'')
+
+
+def decode(login_id, data):
+    """
+    Raises:
+        ValueError: 형식이 올바르지 않은 데이터
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError('회원가입 상태 데이터가 너무 짧습니다.')
+    magic, format_version, token, version, length = _HEADER.unpack_from(data)
+    if magic != REGISTRATION_MAGIC or format_version != REGISTRATION_FORMAT_VERSION:
+        raise ValueError('회원가입 상태 데이터 형식이 아닙니다.')
+    end = _HEADER.size + length
+    fields = json.loads(data[_HEADER.size:end])
+    return RegistrationState(login_id, token, version, fields, data[end:] or None)
+
+
+class RegistrationStore:
+    """login_id별 회원가입 진행 상태 (상태는 Redis에만 있음)"""
+
+    def __init__(self):
+        self._script = None
+
+    def _redis(self):
+        return get_redis_connection('default')
+
+    def _key(self, login_id):
+        return cache.make_key(REGISTRATION.key(login_id))
+
+    def _decode(self, login_id, raw):
+        if raw is None:
+            return None
+        try:
+            return decode(login_id, raw)
+        except ValueError as e:
+            # 손상된 레코드는 없는 것으로 봄 (처음부터 다시 진행)
+            logger.warning(f"회원가입 상태 읽기 실패: login_id={login_id} ({e})")
+            return None
+
+    def _compare_and_set(self, redis, key, expected, data):
+        # EVALSHA (서버에 스크립트가 없으면 EVAL로 한 번 더)
+        if self._script is None:
+            self._script = redis.register_script(COMPARE_AND_SET_SCRIPT)
+        return bool(self._script(keys=[key], args=[expected, data, REGISTRATION_TIMEOUT], client=redis))
+
+    def start(self, login_id):
+        """회원가입 시작 - 이전 진행 상태를 버리고 새 레코드 저장 (SET 한 번)"""
+        state = RegistrationState(login_id, os.urandom(8), fields={'id': login_id})
+        self._redis().set(self._key(login_id), encode(state), ex=REGISTRATION_TIMEOUT)
+        return state
+
+    def load(self, login_id):
+        """진행 상태 조회 (GET 한 번, 없으면 None)"""
+        return self._decode(login_id, self._redis().get(self._key(login_id)))
+
+    @contextmanager
+    def edit(self, login_id):
+        """
+        진행 상태를 읽고 바꾼 뒤 저장 (읽은 뒤 다른 요청이 바꿨으면 저장하지 않음)
+
+        with 블록에서 state.set(...) / state.set_face_vectors(...)로 바꾸면 벗어날 때 version +1로 저장,
+        state.delete()를 호출하면 삭제합니다. 바꾸지 않았으면 쓰지 않습니다 (GET 한 번).
+
+        사용 예:
+            with registration_store.edit(login_id) as state:
+                if state is None or not state.has('id'):
+                    return expired_response
+                state.set(nickname=nickname)
+
+        Yields:
+            RegistrationState 또는 None (없거나 만료됨)
+
+        Raises:
+            RegistrationConflict: 읽은 뒤 다른 요청이 상태를 바꿈
+        """
+        redis = self._redis()
+        key = self._key(login_id)
+        raw = redis.get(key)
+        state = self._decode(login_id, raw)
+        yield state
+        if state is None or not (state.changed or state.deleted):
+            return
+
+        if state.deleted:
+            data = b''
+        else:
+            state.version += 1
+            data = encode(state)
+        if not self._compare_and_set(redis, key, raw[:_PREFIX_SIZE], data):
+            raise RegistrationConflict(login_id)
+        state.changed = False
+
+    def clear(self, login_id):
+        """진행 상태 삭제 (회원가입 중단)"""
+        self._redis().delete(self._key(login_id))
+
+
+# 프로세스 전역 저장소
+registration_store = RegistrationStore()
@@ -7,19 +7,19 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
-import requests
 import logging
 import traceback
 from django.utils import timezone
 
-from .models import UserDeviceConnection, Session, CommandLog, Preset
+from .models import UserDeviceConnection, Session, Preset
 from .decorators import jwt_required
+from .jetson_client import jetson, JetsonUnavailable
+from .button_stream import BUTTON_COMMAND_ENDPOINT, BUTTON_COMMANDS
+from .command_log_writer import command_log_writer
+from .query_budget import query_budget
 
 logger = logging.getLogger(__name__)
 
-JETSON_BASE_URL = "https://unforetold-jannet-hydropically.ngrok-free.dev"
-BUTTON_COMMAND_ENDPOINT = "/button_command"
-
 # 기본 초기 상태
 DEFAULT_ROBOT_STATE = {
     "servo1": 90,
@@ -66,19 +66,12 @@ def send_button_command_to_jetson(command):
         tuple: (성공 여부, 상태코드, 에러 메시지)
     """
     try:
-        jetson_url = f"{JETSON_BASE_URL}/button_command"
-        
         # 젯슨으로 보낼 JSON 형식: {command}
         jetson_data = {
             'command': command
         }
         
-        headers = {
-            "ngrok-skip-browser-warning": "69420",
-            "Content-Type": "application/json"  
-        }
-                
-        jetson_response = requests.post(jetson_url, json=jetson_data, headers=headers, timeout=10)
+        jetson_response = jetson.post(BUTTON_COMMAND_ENDPOINT, jetson_data)
         
         if jetson_response.status_code == 200:
             logger.info(f"버튼 커맨드 전송 성공: {command}")
@@ -87,10 +80,8 @@ def send_button_command_to_jetson(command):
             logger.warning(f"버튼 커맨드 전송 실패 (HTTP {jetson_response.status_code}): {command}")
             return False, jetson_response.status_code, f"젯슨 통신 실패 (HTTP {jetson_response.status_code})"
             
-    except requests.exceptions.RequestException as e:
-        logger.error(f"젯슨 통신 오류: {str(e)}")
-        logger.error(traceback.format_exc())
-        return False, 503, f"젯슨 연결 실패: {str(e)}"
+    except JetsonUnavailable as e:
+        return False, 503, str(e)
     except Exception as e:
         logger.error(f"버튼 커맨드 전송 중 알 수 없는 오류: {str(e)}")
         logger.error(traceback.format_exc())
@@ -98,16 +89,18 @@ def send_button_command_to_jetson(command):
 
 
 # ===== Views =====
+@query_budget(2)
 @api_view(['POST'])
 @jwt_required
-@transaction.atomic
 def button_command(request):
     """
     버튼 커맨드 전송 (로봇팔 수동 제어)
+    연속 입력은 앱 WebSocket의 button_command 스트림 사용 (button_stream.py)
     
     앱 → 서버: 버튼 명령 (UP, DOWN, LEFT, RIGHT, FAR, NEAR, YAW_RIGHT, YAW_LEFT, PITCH_UP, PITCH_DOWN)
     서버: 오프셋값 로그 저장 + 젯슨으로 전송
     젯슨: 버튼 커맨드 처리
+    (젯슨 응답을 받은 뒤 로그를 저장 - 대기 중 트랜잭션을 열어두지 않음)
     
     요청 예시:
     {
@@ -120,7 +113,7 @@ def button_command(request):
         "success": true,
         "message": "오른쪽 버튼 명령이 전송되었습니다.",
         "command": "RIGHT",
-        "command_log_id": 125
+        "command_event_id": "0b6f6f0c9d7e4b0a8f3f1c2d3e4f5a6b"
     }
     """
     serializer = ButtonCommandSerializer(data=request.data)
@@ -134,11 +127,13 @@ def button_command(request):
     command = serializer.validated_data['command']
 
     try:
-        # 세션 정보 조회
-        session = Session.objects.get(session_id=session_id)
+        # 세션 정보 조회 (연결의 user_id까지 쿼리 한 번)
+        session = Session.objects.select_related('connection').only(
+            'session_id', 'ended_at', 'connection__user_id'
+        ).get(session_id=session_id)
         
-        # 사용자 확인 (session.connection.user)
-        if session.connection.user != request.user:
+        # 사용자 확인 (사용자 객체를 읽지 않고 user_id로 비교)
+        if session.connection.user_id != request.user.user_id:
             return Response({
                 'success': False,
                 'message': '권한이 없는 세션입니다.'
@@ -158,21 +153,20 @@ def button_command(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     # 유효한 명령인지 확인
-    valid_commands = ['UP', 'DOWN', 'LEFT', 'RIGHT', 'FAR', 'NEAR', 'YAW_RIGHT', 'YAW_LEFT', 'PITCH_UP', 'PITCH_DOWN']
-    if command not in valid_commands:
+    if command not in BUTTON_COMMANDS:
         return Response({
             'success': False,
-            'message': f'유효하지 않은 명령입니다. 가능한 명령: {", ".join(valid_commands)}'
+            'message': f'유효하지 않은 명령입니다. 가능한 명령: {", ".join(BUTTON_COMMANDS)}'
         }, status=status.HTTP_400_BAD_REQUEST)
 
     # 젯슨으로 버튼 커맨드 전송
     jetson_success, jetson_status_code, jetson_error = send_button_command_to_jetson(command)
 
-    # 오프셋값 로그 생성 (명령 로그 저장)
-    log = CommandLog.objects.create(
-        session=session,
-        command_type='BUTTON_COMMAND',
-        command_content=command,
+    # 오프셋값 로그 생성 (명령 로그 기록 - command_log_writer가 DB에 일괄 저장)
+    event_id = command_log_writer.record(
+        session.session_id,
+        'BUTTON_COMMAND',
+        command,
         is_success=jetson_success,
         error_message=jetson_error if not jetson_success else None
     )
@@ -183,22 +177,21 @@ def button_command(request):
             'message': '버튼 커맨드 전송 실패',
             'jetson_error': jetson_error,
             'command': command,
-            'command_log_id': log.command_log_id
+            'command_event_id': event_id
         }, status=jetson_status_code)
 
-    logger.info(f"버튼 커맨드 전송 성공: {command}, 로그 ID: {log.command_log_id}")
+    logger.info(f"버튼 커맨드 전송 성공: {command}, 로그 이벤트: {event_id}")
 
     return Response({
         'success': True,
         'message': f'{command} 버튼 명령이 전송되었습니다.',
         'command': command,
-        'command_log_id': log.command_log_id
+        'command_event_id': event_id
     }, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @jwt_required
-@transaction.atomic
 def save_preset(request):
     """
     앱에서 로봇팔 위치를 프리셋으로 저장
@@ -206,7 +199,7 @@ def save_preset(request):
     앱 → 서버: 프리셋 저장 요청
     서버 → 젯슨: 현재 로봇팔 위치 요청
     젯슨 → 서버: 현재 servo 값들 반환
-    서버: 프리셋 DB 저장
+    서버: 프리셋 DB 저장 (젯슨 응답 이후 짧은 트랜잭션으로)
     
     요청 예시:
     {
@@ -225,14 +218,8 @@ def save_preset(request):
     user = request.user
 
     try:
-        # 젯슨으로 현재 로봇팔 위치 요청
-        jetson_url = f"{JETSON_BASE_URL}/offsets_save"
-        headers = {
-            "ngrok-skip-browser-warning": "69420",
-            "Content-Type": "application/json"
-        }
-
-        jetson_response = requests.post(jetson_url, headers=headers, timeout=10)
+        # 젯슨으로 현재 로봇팔 위치 요청 (트랜잭션 밖에서 대기)
+        jetson_response = jetson.post('/offsets_save')
 
         if jetson_response.status_code != 200:
             logger.warning(f"젯슨에서 위치값 가져오기 실패 (HTTP {jetson_response.status_code})")
@@ -283,22 +270,23 @@ def save_preset(request):
                 'message': '로봇팔 위치값이 불완전합니다.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # 기존 활성 프리셋 비활성화
-        Preset.objects.filter(user=user, is_active=True).update(is_active=False)
-
-        # 프리셋 저장 (활성 상태로)
         preset_name_final = preset_name if preset_name else f"프리셋 {timezone.now().strftime('%H:%M')}"
-        preset = Preset.objects.create(
-            user=user,
-            preset_name=preset_name_final,
-            servo1=servo1,
-            servo2=servo2,
-            servo3=servo3,
-            servo4=servo4,
-            servo5=servo5,
-            servo6=servo6,
-            is_active=True
-        )
+        with transaction.atomic():
+            # 기존 활성 프리셋 비활성화
+            Preset.objects.filter(user=user, is_active=True).update(is_active=False)
+
+            # 프리셋 저장 (활성 상태로)
+            preset = Preset.objects.create(
+                user=user,
+                preset_name=preset_name_final,
+                servo1=servo1,
+                servo2=servo2,
+                servo3=servo3,
+                servo4=servo4,
+                servo5=servo5,
+                servo6=servo6,
+                is_active=True
+            )
         logger.info(f"앱 프리셋 저장 성공: {preset.preset_id}, 사용자: {user.login_id}, 활성화됨")
 
         return Response({
@@ -309,7 +297,7 @@ def save_preset(request):
             'created_at': preset.created_at
         }, status=status.HTTP_200_OK)
 
-    except requests.exceptions.RequestException as e:
+    except JetsonUnavailable as e:
         logger.error(f"젯슨 통신 오류: {str(e)}")
         return Response({
             'success': False,
@@ -44,6 +44,18 @@ class SessionEndSerializer(serializers.Serializer):
     session_uuid = serializers.UUIDField(required=False)
 
 
+class CommandHistoryQuerySerializer(serializers.Serializer):
+    """명령 이력 조회 (쿼리 파라미터)"""
+    cursor = serializers.CharField(required=False, allow_blank=True, help_text="이전 응답의 next_cursor (첫 페이지는 생략)")
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100, help_text="페이지 크기")
+    session_id = serializers.IntegerField(required=False, help_text="특정 세션의 로그만 (선택사항)")
+
+
+class CommandStatsQuerySerializer(serializers.Serializer):
+    """명령 통계 조회 (쿼리 파라미터)"""
+    days = serializers.IntegerField(required=False, default=30, min_value=1, max_value=365, help_text="오늘 포함 최근 일수")
+
+
 # ===== 로그인 =====
 class FaceLoginSerializer(serializers.Serializer):
     face_vector = serializers.ListField(
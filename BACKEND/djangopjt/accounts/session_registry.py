@@ -0,0 +1,199 @@
+"""
+uid → 활성 세션 레지스트리 (session registry)
+
+젯슨 → 서버 요청(음성 명령, 음성 호출, 버튼 명령)은 uid만 보내므로
+매번 사용자 + 연결 + 세션 JOIN으로 활성 세션을 찾던 것을 공유 캐시(Redis)로 옮깁니다.
+
+    session_registry:{uid}             → {'session': ActiveSession, 'generation': n}
+    session_registry:{uid}:generation  → n (세션 시작/종료 때마다 증가)
+
+- 세션 시작 시 register: 커밋 후 세대를 올리고 새 세션을 기록 (다음 젯슨 요청은 DB 조회 없음)
+- 세션 종료/연결 해제/로그아웃/탈퇴 시 invalidate: 커밋 후 세대를 올리고 항목 삭제
+- resolve: 항목의 세대가 현재 세대와 같을 때만 사용, 아니면 DB에서 찾아 채움
+  (DB 조회 전에 읽은 세대로 저장하므로 조회 중 종료된 세션이 캐시에 남지 않음)
+- 설정은 settings.SESSION_REGISTRY (TTL 0이면 항상 DB 조회)
+"""
+import logging
+import uuid
+from typing import NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .cache_keys import SESSION_REGISTRY
+from .models import Session
+
+logger = logging.getLogger(__name__)
+
+# settings.SESSION_REGISTRY 기본값
+DEFAULT_SESSION_REGISTRY_CONFIG = {
+    'TTL': 6 * 60 * 60,  # 초 (세션 종료를 놓친 항목의 최대 수명)
+}
+
+
+def get_session_registry_config():
+    """settings.SESSION_REGISTRY를 기본값과 병합"""
+    config = dict(DEFAULT_SESSION_REGISTRY_CONFIG)
+    config.update(getattr(settings, 'SESSION_REGISTRY', {}) or {})
+    return config
+
+
+class ActiveSession(NamedTuple):
+    """uid 사용자의 현재 활성 세션"""
+    user_id: int
+    login_id: str
+    session_id: int
+    connection_id: int
+
+
+def active_sessions_for_uid(uid):
+    """
+    uid 사용자의 활성 세션 (최근 시작 순)
+
+    사용자 조회 + 세션 조회를 JOIN 한 번으로 합치고, 로그에 쓰는 사용자 필드만 함께 읽습니다.
+    session.connection.user로 사용자(user_id, uid, login_id)에 접근합니다.
+    결과가 없을 때만 사용자가 없는 것인지 따로 확인합니다 (오류 응답 구분).
+    """
+    return Session.objects.select_related('connection__user').only(
+        'session_id', 'started_at',
+        'connection__connection_id',
+        'connection__user__user_id', 'connection__user__uid', 'connection__user__login_id',
+    ).filter(
+        connection__user__uid=uid,
+        connection__user__is_active=True,
+        connection__is_active=True,
+        connection__deleted_at__isnull=True,
+        ended_at__isnull=True
+    ).order_by('-started_at')
+
+
+def _normalize_uid(uid):
+    """캐시 키용 uid 문자열 (UUID 형식이 아니면 None)"""
+    try:
+        return str(uid if isinstance(uid, uuid.UUID) else uuid.UUID(str(uid)))
+    except ValueError:
+        return None
+
+
+class SessionRegistry:
+    """uid → ActiveSession 공유 캐시"""
+
+    def __init__(self, config=None):
+        self._config = config
+
+    @property
+    def config(self):
+        return self._config or get_session_registry_config()
+
+    @property
+    def enabled(self):
+        return self.config['TTL'] > 0
+
+    def _entry_key(self, uid):
+        return SESSION_REGISTRY.key(uid)
+
+    def _generation_key(self, uid):
+        return SESSION_REGISTRY.key(uid, 'generation')
+
+    def generation(self, uid):
+        return cache.get(self._generation_key(uid), 0)
+
+    def _bump(self, uid):
+        key = self._generation_key(uid)
+        cache.add(key, 0, timeout=None)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # 키가 그 사이 삭제된 경우
+            cache.set(key, 1, timeout=None)
+            return 1
+
+    def _store(self, uid, active, generation):
+        cache.set(
+            self._entry_key(uid),
+            {'session': tuple(active), 'generation': generation},
+            timeout=self.config['TTL']
+        )
+
+    def get(self, uid):
+        """
+        캐시된 활성 세션 (DB 조회 없음)
+
+        Returns:
+            tuple: (ActiveSession | None, 현재 세대) - 항목이 없거나 세대가 다르면 None
+        """
+        entry_key, generation_key = self._entry_key(uid), self._generation_key(uid)
+        values = cache.get_many([entry_key, generation_key])
+        generation = values.get(generation_key, 0)
+        entry = values.get(entry_key)
+        if entry is None or entry['generation'] != generation:
+            return None, generation
+        return ActiveSession(*entry['session']), generation
+
+    def resolve(self, uid):
+        """
+        uid 사용자의 활성 세션 (캐시 → DB)
+
+        Returns:
+            ActiveSession | None: 활성 세션이 없거나 uid 형식이 잘못되었으면 None
+        """
+        uid = _normalize_uid(uid)
+        if uid is None:
+            return None
+
+        if not self.enabled:
+            return self._load(uid)
+
+        active, generation = self.get(uid)
+        if active is not None:
+            return active
+
+        active = self._load(uid)
+        if active is not None:
+            self._store(uid, active, generation)
+        return active
+
+    async def aresolve(self, uid):
+        return await sync_to_async(self.resolve)(uid)
+
+    def _load(self, uid):
+        session = active_sessions_for_uid(uid).first()
+        if session is None:
+            return None
+        user = session.connection.user
+        return ActiveSession(user.user_id, user.login_id, session.session_id, session.connection_id)
+
+    def register(self, session, user):
+        """
+        새로 시작한 세션을 uid의 활성 세션으로 기록
+
+        트랜잭션 안에서 호출하면 커밋 이후에 기록합니다 (롤백된 세션이 남지 않도록).
+        """
+        uid = _normalize_uid(user.uid)
+        active = ActiveSession(user.user_id, user.login_id, session.session_id, session.connection_id)
+
+        def publish():
+            if self.enabled:
+                self._store(uid, active, self._bump(uid))
+
+        transaction.on_commit(publish)
+
+    def invalidate(self, uid):
+        """
+        uid의 활성 세션 항목 무효화 (세션 종료, 연결 해제, 로그아웃, 탈퇴)
+
+        트랜잭션 안에서 호출하면 커밋 이후에 무효화합니다.
+        """
+        uid = _normalize_uid(uid)
+
+        def expire():
+            self._bump(uid)
+            cache.delete(self._entry_key(uid))
+
+        transaction.on_commit(expire)
+
+
+# 프로세스 전역 레지스트리 (상태는 공유 캐시에 있음)
+session_registry = SessionRegistry()
@@ -0,0 +1,136 @@
+"""
+로컬 SMTP 스텁 서버 (테스트 / 벤치마크용)
+
+실제 메일 서버(Gmail SMTP) 없이 email_queue의 연결 재사용 / 재시도를 검증하기 위해
+Django SMTP 백엔드가 쓰는 명령(EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT)만 처리하는
+평문 SMTP 서버를 별도 스레드에서 띄웁니다.
+
+사용 예:
+    with SmtpStubServer(delay=0.05) as stub:
+        with override_settings(EMAIL_HOST=stub.host, EMAIL_PORT=stub.port, EMAIL_USE_TLS=False):
+            send_mail(...)
+        stub.messages     # [email.message.Message, ...]
+        stub.connections  # 연결 수
+        stub.fail_next(1, code=451)  # 다음 DATA 한 번을 일시 오류로 응답
+"""
+import email
+import socketserver
+import threading
+import time
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        stub = self.server.stub
+        stub._record_connection()
+        self._reply(220, 'stub ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip().split(' ', 1)[0].upper()
+            if stub.delay:
+                time.sleep(stub.delay)
+
+            if command in ('EHLO', 'HELO'):
+                self._reply(250, 'stub')
+            elif command == 'RCPT':
+                code = stub._take_failure('RCPT')
+                self._reply(code or 250, 'rejected' if code else 'OK')
+            elif command in ('MAIL', 'RSET', 'NOOP'):
+                self._reply(250, 'OK')
+            elif command == 'DATA':
+                self._reply(354, 'End data with <CR><LF>.<CR><LF>')
+                data = self._read_data()
+                code = stub._take_failure('DATA')
+                if code:
+                    self._reply(code, 'try again later' if code < 500 else 'rejected')
+                else:
+                    stub._record_message(data)
+                    self._reply(250, 'OK')
+            elif command == 'QUIT':
+                self._reply(221, 'Bye')
+                return
+            else:
+                self._reply(502, 'Command not implemented')
+
+    def _read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line == b'.\r\n':
+                break
+            # dot-stuffing 해제
+            lines.append(line[1:] if line.startswith(b'..') else line)
+        return b''.join(lines)
+
+    def _reply(self, code, text):
+        self.wfile.write(f'{code} {text}\r\n'.encode())
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SmtpStubServer:
+    """
+    SMTP 서버 스텁
+
+    Args:
+        delay: 명령마다 응답 전 대기 시간 (초) - 메일 서버 왕복 지연 흉내
+    """
+
+    def __init__(self, delay=0.0, host='127.0.0.1', port=0):
+        self.delay = delay
+        self.messages = []
+        self.connections = 0
+        self._failures = []
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _SmtpHandler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def fail_next(self, count=1, code=451, command='DATA'):
+        """다음 command(DATA 또는 RCPT) count번을 code로 응답 (4xx 일시 오류 / 5xx 영구 오류)"""
+        with self._lock:
+            self._failures.extend([(command, code)] * count)
+
+    def _take_failure(self, command):
+        with self._lock:
+            if self._failures and self._failures[0][0] == command:
+                return self._failures.pop(0)[1]
+        return None
+
+    def _record_message(self, data):
+        with self._lock:
+            self.messages.append(email.message_from_bytes(data))
+
+    def _record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -9,13 +9,15 @@ from accounts.models import Session
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 import logging
-import requests
-import os
 
-logger = logging.getLogger(__name__)
+from accounts.jetson_client import jetson, JetsonUnavailable
+from accounts.command_log_writer import command_log_writer
+from accounts.command_log_archive import command_log_archiver
+from accounts.presence import presence
+from accounts.email_queue import email_sender, get_email_queue_config, is_transient
+from celery.utils.time import get_exponential_backoff_interval
 
-# 젯슨 베이스 URL (settings.py의 JETSON_BASE_URL과 동일)
-JETSON_BASE_URL = os.getenv('JETSON_BASE_URL', 'https://unforetold-jannet-hydropically.ngrok-free.dev')
+logger = logging.getLogger(__name__)
 
 
 def notify_jetson_logout(user):
@@ -25,17 +27,13 @@ def notify_jetson_logout(user):
     Args:
         user: User 모델 인스턴스
     
+    DB 트랜잭션 안에서는 transaction.on_commit으로 호출해 커밋 후에 통지합니다.
+
     Returns:
         bool: 성공 여부
     """
     try:
-        headers = {
-            "ngrok-skip-browser-warning": "69420",
-            "Content-Type": "application/json"
-        }
-        
-        jetson_url = f"{JETSON_BASE_URL}/logout"
-        jetson_response = requests.post(jetson_url, json={}, headers=headers, timeout=10)
+        jetson_response = jetson.post('/logout', {})
         
         if jetson_response.status_code == 200:
             logger.info(f"젯슨 로그아웃 통지 성공: {user.login_id}")
@@ -44,7 +42,7 @@ def notify_jetson_logout(user):
             logger.warning(f"젯슨 로그아웃 통지 실패 (HTTP {jetson_response.status_code}): {user.login_id}")
             return False
             
-    except requests.exceptions.RequestException as e:
+    except JetsonUnavailable as e:
         logger.error(f"젯슨 로그아웃 통신 오류: {str(e)}")
         return False
 
@@ -62,3 +60,65 @@ def check_session_timeout():
     """
     logger.debug('세션 타임아웃 체크: 하트비트 로직 제거로 비활성화됨')
     return "Task disabled - no heartbeat mechanism"
+
+
+@shared_task(ignore_result=True)
+def flush_command_logs():
+    """
+    CommandLog 지연 저장 큐 flush Celery Task
+
+    Celery Beat로 주기적으로 실행됩니다 (settings.CELERY_BEAT_SCHEDULE).
+    실패하면 이벤트가 큐에 그대로 남아 다음 실행에서 다시 처리됩니다.
+
+    Returns:
+        int: 저장한 이벤트 수
+    """
+    return command_log_writer.flush()
+
+
+@shared_task(ignore_result=True)
+def sweep_presence():
+    """
+    앱 WebSocket 연결 레지스트리에서 만료된 연결 정리 Celery Task
+
+    Celery Beat에서 1분마다 실행 (만료된 연결은 정리 전에도 조회되지 않음)
+    """
+    return presence.sweep()
+
+
+@shared_task(ignore_result=True)
+def archive_command_logs():
+    """
+    보관 기간이 지난 CommandLog를 압축 파일로 옮기는 Celery Task
+
+    Celery Beat로 주기적으로 실행됩니다 (settings.CELERY_BEAT_SCHEDULE).
+    한 번에 처리하는 양은 settings.COMMAND_LOG_ARCHIVE의 BATCH_SIZE x MAX_BATCHES로 제한되며,
+    남은 행은 다음 실행에서 이어서 처리합니다.
+
+    Returns:
+        int: 옮긴 행 수
+    """
+    return command_log_archiver.archive()
+
+
+@shared_task(bind=True, ignore_result=True)
+def send_email(self, subject, message, recipient):
+    """
+    인증 메일 발송 Celery Task ('email' 큐, settings.CELERY_TASK_ROUTES)
+
+    워커 프로세스의 SMTP 연결을 메시지 사이에 재사용합니다 (email_queue.email_sender).
+    일시 오류는 지수 백오프로 최대 MAX_RETRIES번 재시도하고, 영구 오류는 기록만 합니다.
+    """
+    try:
+        email_sender.send(subject, message, recipient)
+    except Exception as e:
+        config = get_email_queue_config()
+        if not is_transient(e) or self.request.retries >= config['MAX_RETRIES']:
+            logger.error(f"메일 발송 실패: {recipient} ({e!r}, 재시도 {self.request.retries}회)")
+            return
+        countdown = get_exponential_backoff_interval(
+            config['RETRY_BACKOFF'], self.request.retries, config['RETRY_BACKOFF_MAX'], full_jitter=True
+        )
+        logger.warning(f"메일 발송 재시도 예정: {recipient} ({e!r}, {countdown}초 후)")
+        raise self.retry(exc=e, countdown=countdown, max_retries=config['MAX_RETRIES'])
+    logger.info(f"메일 발송 성공: {recipient}")
@@ -1,24 +1,75 @@
-from django.test import TestCase, Client, override_settings
+from django.test import TestCase, AsyncClient, Client, RequestFactory, override_settings
 from django.core.cache import cache
+from django.core import mail
+from django.core.exceptions import MiddlewareNotUsed
 from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
-from accounts.models import User, Phone, IoTDevice, UserDeviceConnection, BiometricLog, EmailVerification, PasswordResetToken, Session, UserManualPreset
+from accounts.models import User, Phone, UserDeviceConnection, BiometricLog, EmailVerification, PasswordResetToken, Session
+from accounts.models import Sarvis, CommandLog, Preset
+from accounts.face_gallery import FaceGallery, face_gallery
+from accounts.biometric_search import ExactIndex, IVFIndex, load_index, recall_at_k
+from accounts.vector_codec import pack_vectors, unpack_array
+from accounts.routing import websocket_urlpatterns as app_websocket_urlpatterns
+from accounts.cache_keys import REGISTRATION, ROBOT_ANGLE_CACHE_KEY, WEBSOCKET
+from accounts.registration_state import COMPARE_AND_SET_SCRIPT, RegistrationConflict, RegistrationStore, registration_store
+from accounts.jetson_client import CircuitBreaker, JetsonClient, JetsonUnavailable, get_client_config, jetson
+from accounts.jetson_stub import JetsonStubServer
+from accounts.button_stream import ButtonCommandStream, coalesce
+from accounts.command_log_writer import CommandLogWriter, command_log_writer
+from accounts.auth_utils import get_user_from_token
+from accounts.principal_cache import PrincipalCache, current_version, principal_cache
+from accounts.query_budget import QueryBudgetExceeded, QueryBudgetMiddleware, count_queries, response_query_count
+from accounts.session_registry import ActiveSession, active_sessions_for_uid, session_registry
+from accounts.command_log_archive import command_log_archiver, history as command_log_history
+from accounts.models import CommandLogArchive, CommandLogDailyStat
+from accounts import command_stats
+from accounts.dashboard_feed import dashboard_feed
+from accounts.presence import presence
+from accounts.email_queue import email_sender
+from accounts.smtp_stub import SmtpStubServer
+from accounts.tasks import send_email
+from kombu.exceptions import OperationalError as KombuOperationalError
+from accounts.websocket_logger import WebSocketLogger
+from server.routing import websocket_urlpatterns as server_websocket_urlpatterns
+from channels.layers import get_channel_layer
+from accounts.tasks import archive_command_logs
+from accounts import views as account_views
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import DatabaseError, OperationalError, connection as db_connection, transaction
+from datetime import timedelta
+from django.test.utils import CaptureQueriesContext
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from unittest.mock import patch
+import asyncio
+from django.core.management import call_command
+import numpy as np
+import gzip
+import io
 import json
+import random
 import tempfile
+import time
+import uuid
 from io import BytesIO
 import os
 
+def statement_kinds(queries, table=None):
+    """캡처한 쿼리의 SQL 종류 목록 (테스트 트랜잭션의 SAVEPOINT 제외, table을 주면 그 테이블 쿼리만)"""
+    return [
+        q['sql'].split()[0] for q in queries.captured_queries
+        if 'SAVEPOINT' not in q['sql'] and (table is None or f'"{table}"' in q['sql'])
+    ]
+
+
 class UserRegistrationTestCase(TestCase):
     """회원가입 관련 테스트"""
     
     def setUp(self):
         """테스트 초기 설정"""
         self.client = Client()
-        # 테스트용 IoT 기기 생성
-        self.iot_device = IoTDevice.objects.create(
-            iot_uuid='test_iot_uuid_001',
-            device_type='RPI'
-        )
+        # 테스트용 싸비스 기기 생성
+        self.sarvis = Sarvis.objects.create()
     
     def test_register_step1_success(self):
         """회원가입 1단계: 기본 정보 입력 테스트"""
@@ -651,15 +702,12 @@ class SessionManagementTestCase(TestCase):
         self.access_token = str(self.refresh.access_token)
         
         # 테스트용 기기 및 연결 생성
-        self.phone = Phone.objects.create(phone_uuid='phone_uuid_001')
-        self.iot_device = IoTDevice.objects.create(
-            iot_uuid='test_iot_uuid_001',
-            device_type='RPI'
-        )
+        self.phone = Phone.objects.create(device_name='phone_uuid_001')
+        self.sarvis = Sarvis.objects.create()
         self.connection = UserDeviceConnection.objects.create(
             user=self.user,
             phone=self.phone,
-            iot_device=self.iot_device,
+            sarvis=self.sarvis,
             is_active=True
         )
     
@@ -742,10 +790,7 @@ class USBConnectionTestCase(TestCase):
         self.refresh = RefreshToken.for_user(self.user)
         self.access_token = str(self.refresh.access_token)
         
-        self.iot_device = IoTDevice.objects.create(
-            iot_uuid='test_iot_uuid_001',
-            device_type='RPI'
-        )
+        self.sarvis = Sarvis.objects.create()
     
     def test_report_usb_connection_success(self):
         """USB 연결 상태 보고 성공 테스트"""
@@ -769,11 +814,11 @@ class USBConnectionTestCase(TestCase):
     def test_delete_connection_success(self):
         """연결 삭제 성공 테스트"""
         # 연결 생성
-        phone = Phone.objects.create(phone_uuid='phone_uuid_001')
+        phone = Phone.objects.create(device_name='phone_uuid_001')
         connection = UserDeviceConnection.objects.create(
             user=self.user,
             phone=phone,
-            iot_device=self.iot_device,
+            sarvis=self.sarvis,
             is_active=True
         )
         
@@ -1014,7 +1059,7 @@ class BiometricUploadTestCase(TestCase):
         from unittest.mock import patch
         mock_response = type('Response', (), {'status_code': 200})()
         
-        with patch('accounts.views.requests.post', return_value=mock_response):
+        with patch('accounts.views.jetson.post', return_value=mock_response):
             response = self.client.post(
                 '/api/biometric/upload/',
                 data={
@@ -1036,7 +1081,7 @@ class BiometricUploadTestCase(TestCase):
         from unittest.mock import patch
         mock_response = type('Response', (), {'status_code': 200})()
         
-        with patch('accounts.views.requests.post', return_value=mock_response):
+        with patch('accounts.views.jetson.post', return_value=mock_response):
             response = self.client.post(
                 '/api/biometric/upload/',
                 data={
@@ -1123,3 +1168,1928 @@ class UserProfileWithVoiceTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()['success'], True)
         self.assertEqual(response.json()['user']['has_voice'], False)
+
+
+
+class FaceGalleryTestCase(TestCase):
+    """얼굴 갤러리 기반 얼굴 로그인 테스트"""
+
+    def setUp(self):
+        """테스트 초기 설정"""
+        self.client = Client()
+        cache.clear()
+        face_gallery.invalidate()
+
+        # 포즈 5개 중 세 번째 포즈만 입력과 일치하는 사용자
+        self.user1 = User.objects.create_user(
+            login_id='galleryuser1',
+            email='gallery1@example.com',
+            nickname='갤러리1',
+            password='Test1234!'
+        )
+        poses = [[0.0] * 512 for _ in range(5)]
+        for i, pose in enumerate(poses):
+            pose[i] = 1.0
+        self.user1.face_vectors = poses
+        self.user1.save()
+
+        self.user2 = User.objects.create_user(
+            login_id='galleryuser2',
+            email='gallery2@example.com',
+            nickname='갤러리2',
+            password='Test1234!'
+        )
+        self.user2.face_vectors = [[0.0] * 511 + [1.0]] * 5
+        self.user2.save()
+
+    def _face_login(self, vector):
+        return self.client.post(
+            '/api/login/face/',
+            data=json.dumps({'face_vectors': vector}),
+            content_type='application/json'
+        )
+
+    def test_search_matches_any_pose(self):
+        """정면 외 포즈와도 매칭되는지 테스트"""
+        query = [0.0] * 512
+        query[2] = 1.0
+
+        user_id, similarity = face_gallery.search(query)
+
+        self.assertEqual(user_id, self.user1.user_id)
+        self.assertAlmostEqual(similarity, 1.0, places=5)
+
+    def test_face_login_uses_gallery(self):
+        """갤러리 매칭 후 로그인 성공 테스트"""
+        query = [0.0] * 512
+        query[4] = 1.0
+
+        response = self._face_login(query)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['uid'], str(self.user1.uid))
+        self.assertIn('session_id', response.json())
+
+    def test_upsert_replaces_only_target_user(self):
+        """증분 갱신 시 해당 사용자 벡터만 교체되는지 테스트"""
+        face_gallery.ensure_loaded()
+        new_pose = [0.0] * 512
+        new_pose[100] = 1.0
+
+        face_gallery.upsert(self.user2.user_id, [new_pose])
+
+        self.assertEqual(face_gallery.search(new_pose)[0], self.user2.user_id)
+        self.assertEqual(face_gallery.search([0.0] * 511 + [1.0])[1], 0.0)
+        self.assertEqual(len(face_gallery), 2)
+
+    def test_removed_user_not_matched(self):
+        """갤러리에서 제거된 사용자는 매칭되지 않는지 테스트"""
+        face_gallery.ensure_loaded()
+        face_gallery.remove(self.user2.user_id)
+
+        response = self._face_login([0.0] * 511 + [1.0])
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['reason'], 'FACE_NOT_MATCH')
+
+    def test_face_login_invalid_vector(self):
+        """숫자가 아닌 벡터로 로그인 시도 테스트"""
+        response = self._face_login(['a', 'b'])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['reason'], 'INVALID_REQUEST')
+
+
+class BiometricSearchTestCase(TestCase):
+    """얼굴 벡터 검색 백엔드 (exact / IVF, mmap 인덱스) 테스트"""
+
+    def setUp(self):
+        """클러스터 구조가 있는 합성 갤러리 생성"""
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((300, 64)).astype(np.float32)
+        self.vectors = np.repeat(centers, 5, axis=0)
+        self.vectors += 0.05 * rng.standard_normal(self.vectors.shape).astype(np.float32)
+        self.vectors /= np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        self.labels = np.repeat(np.arange(1, 301, dtype=np.int64), 5)
+        self.queries = self.vectors[::7]
+
+    def test_exact_finds_owner(self):
+        """exact 백엔드가 자기 벡터의 소유자를 찾는지 테스트"""
+        index = ExactIndex.build(self.vectors, self.labels)
+
+        labels, scores = index.search(self.vectors[12], k=3)
+
+        self.assertEqual(labels[0, 0], self.labels[12])
+        self.assertAlmostEqual(float(scores[0, 0]), 1.0, places=5)
+        self.assertTrue(np.all(np.diff(scores[0]) <= 0))
+
+    def test_ivf_recall_against_exact(self):
+        """IVF 백엔드 recall@1 측정 (전체 클러스터 탐색 시 exact와 동일)"""
+        exact = ExactIndex.build(self.vectors, self.labels)
+        ivf = IVFIndex.build(self.vectors, self.labels, nlist=16, nprobe=4)
+
+        self.assertGreaterEqual(recall_at_k(ivf, exact, self.queries, k=1), 0.9)
+        ivf.nprobe = ivf.nlist
+        self.assertEqual(recall_at_k(ivf, exact, self.queries, k=5), 1.0)
+
+    def test_exclude_labels(self):
+        """exclude로 지정한 사용자는 결과에서 빠지는지 테스트"""
+        index = IVFIndex.build(self.vectors, self.labels, nlist=8, nprobe=8)
+        owner = self.labels[40]
+
+        labels, _ = index.search(self.vectors[40], k=5, exclude=[owner])
+
+        self.assertNotIn(owner, labels[0])
+
+    def test_save_and_load_mmap(self):
+        """저장한 인덱스를 mmap으로 열어 같은 결과를 내는지 테스트"""
+        index = IVFIndex.build(self.vectors, self.labels, nlist=8, nprobe=3)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'face_index')
+            index.save(path, gallery_version=7)
+            loaded = load_index(path, mmap=True, nprobe=3)
+
+            self.assertIsInstance(loaded.vectors, np.memmap)
+            self.assertEqual(loaded.meta['gallery_version'], 7)
+            np.testing.assert_array_equal(
+                loaded.search(self.queries, k=3)[0], index.search(self.queries, k=3)[0]
+            )
+
+    def test_gallery_uses_index_file_and_delta(self):
+        """INDEX_PATH 인덱스 로드 후 이후 변경분이 반영되는지 테스트"""
+        cache.clear()
+        pose = [0.0] * 512
+        pose[0] = 1.0
+        user = User.objects.create_user(
+            login_id='indexuser', email='index@example.com', nickname='인덱스', password='Test1234!'
+        )
+        user.face_vectors = [pose]
+        user.save()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'face_index')
+            with self.settings(BIOMETRIC_SEARCH={'BACKEND': 'ivf', 'INDEX_PATH': path}):
+                call_command('build_face_index', stdout=io.StringIO())
+                face_gallery.invalidate()
+                self.assertEqual(face_gallery.search(pose)[0], user.user_id)
+
+                # 다른 워커에서 얼굴 재등록 → 이 워커는 변경된 사용자만 다시 읽음
+                new_pose = [0.0] * 512
+                new_pose[1] = 1.0
+                user.face_vectors = [new_pose]
+                user.save()
+                FaceGallery().upsert(user.user_id, user.face_vectors)
+
+                self.assertEqual(face_gallery.search(new_pose)[0], user.user_id)
+                self.assertEqual(face_gallery.search(pose)[1], 0.0)
+                self.assertIsInstance(face_gallery._index.vectors, np.memmap)
+        face_gallery.invalidate()
+
+
+class VectorCodecTestCase(TestCase):
+    """생체 벡터 바이너리 저장 형식 테스트"""
+
+    def test_pack_roundtrip(self):
+        """float16/float32 인코딩 후 형태와 값이 유지되는지 테스트"""
+        vectors = np.random.default_rng(0).standard_normal((5, 512)).astype(np.float32)
+
+        for dtype, places in (('float16', 2), ('float32', 6)):
+            restored = unpack_array(pack_vectors(vectors, dtype=dtype))
+            self.assertEqual(restored.shape, (5, 512))
+            np.testing.assert_allclose(restored, vectors, rtol=10 ** -places, atol=10 ** -places)
+
+    def test_packed_size(self):
+        """float16 5x512 벡터가 헤더 포함 약 5KB인지 테스트"""
+        data = pack_vectors([[0.1] * 512] * 5)
+
+        self.assertEqual(len(data), 8 + 4 * 2 + 5 * 512 * 2)
+
+    def test_invalid_data(self):
+        """헤더가 잘못된 데이터와 3차원 입력은 거부되는지 테스트"""
+        with self.assertRaises(ValueError):
+            unpack_array(b'not-a-vector')
+        with self.assertRaises(ValueError):
+            pack_vectors([[[1.0]]])
+
+    def test_model_accessors(self):
+        """모델 속성으로 list를 읽고 쓰는지 테스트"""
+        user = User.objects.create_user(
+            login_id='vectoruser', email='vector@example.com', nickname='벡터', password='Test1234!'
+        )
+        self.assertEqual(user.face_vectors, [])
+        self.assertIsNone(user.voice_vectors)
+
+        user.face_vectors = [[0.5] * 512] * 5
+        user.voice_vectors = [[0.25] * 256] * 4
+        user.save()
+        user.refresh_from_db()
+
+        self.assertEqual(len(user.face_vectors), 5)
+        self.assertEqual(user.face_vectors[0][0], 0.5)
+        self.assertEqual(len(user.voice_vectors[3]), 256)
+
+        log = BiometricLog.objects.create(user=user, change_type='face_update', new_vector=[[1.0] * 512])
+        log.refresh_from_db()
+        self.assertIsNone(log.previous_vector)
+        self.assertEqual(len(log.new_vector[0]), 512)
+
+    def test_malformed_vectors_rejected(self):
+        """길이가 틀리거나 숫자가 아닌 벡터는 저장하지 않고 400인지 테스트"""
+        user = User.objects.create_user(
+            login_id='vectoruser', email='vector@example.com', nickname='벡터', password='Test1234!'
+        )
+        user.face_vectors = [[0.5] * 512] * 5
+        user.save()
+
+        for url, payload in (
+            ('/api/biometric/update-face/', {'face_vectors': [[0.5] * 100] * 5}),
+            ('/api/biometric/update-face/', {'face_vectors': [[0.5] * 512, [0.5] * 511]}),
+            ('/api/biometric/update-voice/', {'voice_vectors': [['a', 'b']]}),
+            ('/api/biometric/update-voice/', {'voice_vectors': [[float('nan')] * 192]}),
+        ):
+            response = self.client.post(
+                url, data=json.dumps({'uid': str(user.uid), **payload}).replace('NaN', '1e999'),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertEqual(response.json()['reason'], 'INVALID_PAYLOAD')
+
+        user.refresh_from_db()
+        self.assertEqual(len(user.face_vectors[0]), 512)
+        self.assertIsNone(user.voice_vectors)
+        self.assertFalse(BiometricLog.objects.filter(user=user).exists())
+
+
+class CommandAckTestCase(TestCase):
+    """채널 레이어 기반 앱 명령 확인(ack) 테스트"""
+
+    def setUp(self):
+        """테스트 초기 설정 - 활성 세션까지 생성"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            login_id='ackuser', email='ack@example.com', nickname='확인', password='Test1234!'
+        )
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.session = Session.objects.create(connection=connection)
+
+    async def _connect_app(self):
+        communicator = WebsocketCommunicator(URLRouter(app_websocket_urlpatterns), f'/ws/app/{self.session.session_id}/')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual((await communicator.receive_json_from())['type'], 'connection_established')
+        return communicator
+
+    def _post(self, path, data):
+        return asyncio.ensure_future(
+            self.async_client.post(path, data=json.dumps(data), content_type='application/json')
+        )
+
+    async def test_youtube_command_resolved_by_app(self):
+        """앱의 실행 결과가 대기 중인 유튜브 명령 요청에 전달되는지 테스트"""
+        app = await self._connect_app()
+        request = self._post('/api/control/voice/', {'uid': str(self.user.uid), 'command': 'YOUTUBE_PAUSE'})
+
+        message = await app.receive_json_from(timeout=5)
+        self.assertEqual(message['type'], 'youtube_command')
+        await app.send_json_to({'type': 'youtube_command_ack', 'data': {'status': 'success', 'request_id': message['request_id']}})
+
+        response = await request
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        await sync_to_async(command_log_writer.flush)()
+        log = await CommandLog.objects.aget(command_content='YOUTUBE_PAUSE')
+        self.assertTrue(log.is_success)
+        await app.disconnect()
+
+    async def test_concurrent_requests_matched_by_request_id(self):
+        """동시에 대기 중인 요청이 request_id로 각각 응답받는지 테스트"""
+        app = await self._connect_app()
+        play = self._post('/api/control/voice/', {'uid': str(self.user.uid), 'command': 'YOUTUBE_PLAY'})
+        first = await app.receive_json_from(timeout=5)
+        pause = self._post('/api/control/voice/', {'uid': str(self.user.uid), 'command': 'YOUTUBE_PAUSE'})
+        second = await app.receive_json_from(timeout=5)
+
+        # 나중 요청부터 응답
+        await app.send_json_to({'type': 'youtube_command_ack', 'data': {'status': 'failed', 'request_id': second['request_id']}})
+        await app.send_json_to({'type': 'youtube_command_ack', 'data': {'status': 'success', 'request_id': first['request_id']}})
+
+        self.assertEqual((await play).status_code, 200)
+        self.assertEqual((await pause).status_code, 500)
+        await app.disconnect()
+
+    async def test_voice_call_timeout(self):
+        """앱 확인이 없으면 408을 반환하는지 테스트"""
+        app = await self._connect_app()
+
+        with patch('accounts.views.VOICE_CALL_ACK_TIMEOUT', 0.2):
+            response = await self._post('/api/voice-command/trigger/', {'uid': str(self.user.uid)})
+
+        self.assertEqual(response.status_code, 408)
+        self.assertEqual((await app.receive_json_from())['type'], 'voice_command')
+
+        # 타임아웃된 요청에 대한 뒤늦은 확인은 대기 요청 없음으로 응답
+        await app.send_json_to({'type': 'voice_call_confirmation'})
+        await asyncio.sleep(0.05)
+        ack = await app.receive_json_from()
+        self.assertFalse(ack['confirmed'])
+        await app.disconnect()
+
+    async def test_voice_call_confirmed(self):
+        """앱 확인 시 음성 호출 요청이 성공하는지 테스트"""
+        app = await self._connect_app()
+        request = self._post('/api/voice-command/trigger/', {'uid': str(self.user.uid)})
+
+        message = await app.receive_json_from(timeout=5)
+        self.assertEqual(message['type'], 'voice_command')
+        await app.send_json_to({'type': 'voice_call_confirmation', 'request_id': message['request_id']})
+
+        response = await request
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue((await app.receive_json_from())['confirmed'])
+        await app.disconnect()
+
+    async def test_ack_without_request_id_single_pending(self):
+        """request_id 없는 확인(이전 앱 버전)이 대기 요청이 하나뿐이면 그 요청에 전달되는지 테스트"""
+        app = await self._connect_app()
+        request = self._post('/api/control/voice/', {'uid': str(self.user.uid), 'command': 'YOUTUBE_PLAY'})
+
+        self.assertEqual((await app.receive_json_from(timeout=5))['type'], 'youtube_command')
+        await app.send_json_to({'type': 'youtube_command_ack', 'data': {'status': 'success'}})
+
+        response = await request
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        await app.disconnect()
+
+    async def test_ack_without_request_id_ambiguous_dropped(self):
+        """대기 요청이 여러 개면 request_id 없는 확인은 어느 요청에도 전달하지 않는지 테스트"""
+        app = await self._connect_app()
+
+        with patch('accounts.views.VOICE_CALL_ACK_TIMEOUT', 0.5):
+            first = self._post('/api/voice-command/trigger/', {'uid': str(self.user.uid)})
+            self.assertEqual((await app.receive_json_from(timeout=5))['type'], 'voice_command')
+            second = self._post('/api/voice-command/trigger/', {'uid': str(self.user.uid)})
+            self.assertEqual((await app.receive_json_from(timeout=5))['type'], 'voice_command')
+
+            await app.send_json_to({'type': 'voice_call_confirmation'})
+            self.assertFalse((await app.receive_json_from())['confirmed'])
+
+            self.assertEqual((await first).status_code, 408)
+            self.assertEqual((await second).status_code, 408)
+        await app.disconnect()
+
+    async def test_jetson_endpoints_post_only(self):
+        """젯슨 비동기 엔드포인트가 POST 외의 메서드에 405, CSRF 검사 없이 POST를 받는지 테스트"""
+        for path in ('/api/control/voice/', '/api/voice-command/trigger/'):
+            response = await self.async_client.get(path)
+            self.assertEqual(response.status_code, 405)
+            self.assertEqual(response['Allow'], 'POST')
+
+        client = AsyncClient(enforce_csrf_checks=True)
+        response = await client.post('/api/voice-command/trigger/', data=json.dumps({}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class SharedCacheTestCase(TestCase):
+    """공유 Redis 캐시(테스트에서는 fakeredis) 및 키 네임스페이스 테스트"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_is_shared_redis(self):
+        """테스트 캐시가 커넥션 풀을 쓰는 Redis 클라이언트인지 테스트"""
+        client = cache.client.get_client()
+
+        self.assertIsNotNone(client.connection_pool)
+        self.assertTrue(client.ping())
+
+    def test_namespaced_keys(self):
+        """기능별 키 형식 테스트 (기존 키와 동일)"""
+        self.assertEqual(REGISTRATION.key('user1', 'nickname'), 'registration:user1:nickname')
+        self.assertEqual(WEBSOCKET.key(42), 'websocket:42')
+        self.assertEqual(ROBOT_ANGLE_CACHE_KEY, 'robot:angle')
+
+    def test_registration_step_single_read_and_write(self):
+        """회원가입 단계가 레코드 하나를 GET 한 번 + 비교 후 저장 한 번으로 처리하는지 테스트"""
+        registration_store.start('cacheuser')
+        client = cache.client.get_client()
+        # 스크립트를 미리 올려 둠 - 서버에 없으면 NOSCRIPT → SCRIPT LOAD + EVALSHA로 왕복 수가 테스트 순서에 따라 달라짐
+        client.script_load(COMPARE_AND_SET_SCRIPT)
+
+        with patch.object(client, 'execute_command', wraps=client.execute_command) as execute:
+            with registration_store.edit('cacheuser') as state:
+                state.set(nickname='닉네임')
+
+        self.assertEqual([call.args[0] for call in execute.call_args_list], ['GET', 'EVALSHA'])
+        self.assertEqual(registration_store.load('cacheuser').fields, {'id': 'cacheuser', 'nickname': '닉네임'})
+
+
+class JetsonClientTestCase(TestCase):
+    """젯슨 HTTP 클라이언트 (커넥션 풀, 타임아웃, 회로 차단) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.stub = JetsonStubServer().start()
+        self.addCleanup(self.stub.stop)
+
+    def _client(self, **config):
+        config = {**get_client_config(), 'FAILURE_THRESHOLD': 2, 'RESET_TIMEOUT': 60, **config}
+        client = JetsonClient(base_url=self.stub.url, config=config)
+        self.addCleanup(client.close)
+        return client
+
+    def test_keep_alive_connection_reused(self):
+        """여러 요청이 하나의 커넥션을 재사용하는지 테스트"""
+        client = self._client()
+
+        for i in range(5):
+            response = client.post('/button_command', {'command': 'UP'})
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.stub.connections, 1)
+        self.assertEqual(self.stub.requests[0], ('/button_command', {'command': 'UP'}))
+
+    def test_async_post(self):
+        """비동기 facade 테스트"""
+        client = self._client()
+
+        async def run():
+            try:
+                responses = await asyncio.gather(*[client.apost('/logout', {}) for _ in range(3)])
+            finally:
+                await client.aclose()
+            return [r.status_code for r in responses]
+
+        self.assertEqual(asyncio.run(run()), [200, 200, 200])
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_endpoint_timeout(self):
+        """엔드포인트별 타임아웃 초과 시 JetsonUnavailable 테스트"""
+        self.stub.delay = 0.5
+        client = self._client(TIMEOUTS={'/button_command': 0.1})
+
+        with self.assertRaises(JetsonUnavailable):
+            client.post('/button_command', {'command': 'UP'})
+
+    def test_circuit_opens_after_failures(self):
+        """연속 실패 후 젯슨을 호출하지 않고 바로 실패하는지 테스트"""
+        self.stub.status = 503
+        client = self._client()
+
+        for i in range(2):
+            self.assertEqual(client.post('/logout', {}).status_code, 503)
+        with self.assertRaises(JetsonUnavailable):
+            client.post('/logout', {})
+
+        self.assertEqual(len(self.stub.requests), 2)
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+    def test_circuit_half_open_recovers(self):
+        """reset_timeout 경과 후 시험 호출 성공 시 회로가 닫히는지 테스트"""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        now[0] = 10.0
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # 시험 호출은 한 건만
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_half_open_probe_cancelled(self):
+        """시험 호출이 취소되어도 회로가 half_open에 묶이지 않고 다시 시험 호출하는지 테스트"""
+        client = self._client(FAILURE_THRESHOLD=1, RESET_TIMEOUT=0.2)
+        client.breaker.record_failure()
+        time.sleep(0.25)
+        self.stub.delay = 1.0
+
+        async def cancel_probe():
+            probe = asyncio.ensure_future(client.apost('/logout', {}))
+            await asyncio.sleep(0.1)
+            probe.cancel()
+            try:
+                with self.assertRaises(asyncio.CancelledError):
+                    await probe
+            finally:
+                await client.aclose()
+
+        asyncio.run(cancel_probe())
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        self.stub.delay = 0
+        time.sleep(0.25)
+        self.assertEqual(client.post('/logout', {}).status_code, 200)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_probe_lapses(self):
+        """결과를 남기지 않은 시험 호출은 reset_timeout 후 다음 시험 호출로 넘어가는지 테스트"""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        now[0] = 10.0
+        self.assertTrue(breaker.allow())
+        now[0] = 19.0
+        self.assertFalse(breaker.allow())
+
+        now[0] = 20.0
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+    def test_button_command_logs_outside_network_wait(self):
+        """버튼 명령: 젯슨 대기 중 트랜잭션을 열지 않고 응답 후 로그를 저장하는지 테스트"""
+        user = User.objects.create_user(
+            login_id='jetsonuser', email='jetson@example.com', nickname='젯슨', password='Test1234!'
+        )
+        session = Session.objects.create(connection=UserDeviceConnection.objects.create(
+            user=user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        ))
+        access_token = str(RefreshToken.for_user(user).access_token)
+        baseline = len(db_connection.savepoint_ids)
+        depths = []
+        original_post = jetson.post
+
+        def recording_post(endpoint, json=None):
+            depths.append(len(db_connection.savepoint_ids))
+            return original_post(endpoint, json)
+
+        with self.settings(JETSON_BASE_URL=self.stub.url), patch.object(jetson, 'post', side_effect=recording_post):
+            response = self.client.post(
+                '/api/control/button/',
+                data=json.dumps({'session_id': session.session_id, 'command': 'UP'}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {access_token}'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(depths, [baseline])
+        self.assertEqual(self.stub.requests, [('/button_command', {'command': 'UP'})])
+        command_log_writer.flush()
+        log = CommandLog.objects.get(event_id=response.json()['command_event_id'])
+        self.assertTrue(log.is_success)
+
+    def test_button_command_jetson_unavailable(self):
+        """젯슨 장애 시 실패 로그와 503 응답 테스트"""
+        user = User.objects.create_user(
+            login_id='jetsonuser2', email='jetson2@example.com', nickname='젯슨2', password='Test1234!'
+        )
+        session = Session.objects.create(connection=UserDeviceConnection.objects.create(
+            user=user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        ))
+        access_token = str(RefreshToken.for_user(user).access_token)
+        self.stub.stop()
+
+        with self.settings(JETSON_BASE_URL=self.stub.url):
+            response = self.client.post(
+                '/api/control/button/',
+                data=json.dumps({'session_id': session.session_id, 'command': 'UP'}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {access_token}'
+            )
+
+        self.assertEqual(response.status_code, 503)
+        command_log_writer.flush()
+        log = CommandLog.objects.get(event_id=response.json()['command_event_id'])
+        self.assertFalse(log.is_success)
+
+
+# WebSocket 테스트용 채널 레이어 (settings의 TESTING은 manage.py test일 때만 켜지므로 명시)
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class ButtonStreamTestCase(TestCase):
+    """앱 WebSocket 버튼 명령 스트림 (입력 합치기, 일괄 로그 저장) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.stub = JetsonStubServer().start()
+        self.addCleanup(self.stub.stop)
+        self.user = User.objects.create_user(
+            login_id='buttonuser', email='button@example.com', nickname='버튼', password='Test1234!'
+        )
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.session = Session.objects.create(connection=connection)
+
+    def test_coalesce_net_deltas(self):
+        """반대 방향 입력 상쇄 및 축별 순이동량 테스트"""
+        presses = ['RIGHT', 'RIGHT', 'UP', 'LEFT', 'RIGHT', 'DOWN', 'YAW_LEFT']
+
+        self.assertEqual(coalesce(presses), [('RIGHT', 2), ('YAW_LEFT', 1)])
+        self.assertEqual(coalesce(['LEFT'] * 10, max_steps=6), [('LEFT', 6)])
+        self.assertEqual(coalesce([]), [])
+
+    def test_dispatch_bulk_inserts_logs(self):
+        """전송한 단계 수만큼 로그를 기록하고 INSERT 한 번으로 저장하는지 테스트"""
+        stream = ButtonCommandStream(self.session)
+
+        with self.settings(JETSON_BASE_URL=self.stub.url), self.assertNumQueries(0):
+            async_to_sync(stream._dispatch)(['UP', 'UP', 'UP', 'NEAR'])
+        with CaptureQueriesContext(db_connection) as queries:
+            self.assertEqual(command_log_writer.flush(), 4)
+        self.assertEqual(statement_kinds(queries, 'command_log'), ['SELECT', 'INSERT'])
+
+        self.assertEqual([p for p, _ in self.stub.requests], ['/button_command'] * 4)
+        self.assertEqual(
+            list(CommandLog.objects.filter(session=self.session).values_list('command_content', 'is_success')),
+            [('UP', True), ('UP', True), ('UP', True), ('NEAR', True)]
+        )
+
+    async def test_websocket_button_burst(self):
+        """WebSocket으로 들어온 연속 입력이 한 번에 합쳐져 전송되는지 테스트"""
+        communicator = WebsocketCommunicator(URLRouter(app_websocket_urlpatterns), f'/ws/app/{self.session.session_id}/')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.receive_json_from()
+
+        with self.settings(JETSON_BASE_URL=self.stub.url):
+            for command in ['RIGHT', 'RIGHT', 'RIGHT', 'LEFT', 'PITCH_UP']:
+                await communicator.send_json_to({'type': 'button_command', 'command': command})
+            result = await communicator.receive_json_from(timeout=5)
+
+        await communicator.disconnect()
+
+        self.assertEqual(result['type'], 'button_command_result')
+        self.assertTrue(result['success'])
+        self.assertEqual(result['pressed'], 5)
+        self.assertEqual(result['commands'], [
+            {'command': 'RIGHT', 'steps': 2, 'sent': 2},
+            {'command': 'PITCH_UP', 'steps': 1, 'sent': 1},
+        ])
+        self.assertEqual([body['command'] for _, body in self.stub.requests], ['RIGHT', 'RIGHT', 'PITCH_UP'])
+        await sync_to_async(command_log_writer.flush)()
+        self.assertEqual(await CommandLog.objects.filter(session=self.session).acount(), 3)
+
+    async def test_websocket_invalid_button(self):
+        """지원하지 않는 버튼 명령 테스트"""
+        communicator = WebsocketCommunicator(URLRouter(app_websocket_urlpatterns), f'/ws/app/{self.session.session_id}/')
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        await communicator.send_json_to({'type': 'button_command', 'command': 'JUMP'})
+        result = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertEqual(result['type'], 'button_command_result')
+        self.assertFalse(result['success'])
+        self.assertEqual(self.stub.requests, [])
+
+
+class CommandLogWriterTestCase(TestCase):
+    """CommandLog 지연 저장 (Redis 큐 + 일괄 저장, 최소 1회 전달) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            login_id='loguser', email='log@example.com', nickname='로그', password='Test1234!'
+        )
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.session = Session.objects.create(connection=connection)
+
+    def test_record_defers_db_write(self):
+        """기록 시 DB 쓰기 없이 큐에만 쌓이고 flush 때 발생 시각 그대로 저장되는지 테스트"""
+        before = timezone.now()
+        with self.assertNumQueries(0):
+            event_id = command_log_writer.record(self.session.session_id, 'VOICE_COMMAND', 'TRACK_ON', is_success=True)
+
+        self.assertEqual(command_log_writer.pending(), 1)
+        self.assertFalse(CommandLog.objects.exists())
+
+        self.assertEqual(command_log_writer.flush(), 1)
+        log = CommandLog.objects.get(event_id=event_id)
+        self.assertEqual(log.command_content, 'TRACK_ON')
+        self.assertGreaterEqual(log.created_at, before)
+        self.assertEqual(command_log_writer.pending(), 0)
+
+    def test_create_and_update_merged(self):
+        """같은 배치의 생성 + 업데이트가 INSERT 한 번으로 합쳐지는지 테스트"""
+        event_id = command_log_writer.record(self.session.session_id, 'VOICE_COMMAND', 'YOUTUBE_PLAY', is_success=False)
+        command_log_writer.update(event_id, error_message='앱 응답 타임아웃')
+
+        with CaptureQueriesContext(db_connection) as queries:
+            command_log_writer.flush()
+        self.assertEqual(statement_kinds(queries, 'command_log'), ['SELECT', 'INSERT'])
+
+        log = CommandLog.objects.get(event_id=event_id)
+        self.assertFalse(log.is_success)
+        self.assertEqual(log.error_message, '앱 응답 타임아웃')
+
+    def test_update_after_flush(self):
+        """이미 저장된 로그의 업데이트가 bulk_update로 반영되는지 테스트"""
+        event_id = command_log_writer.record(self.session.session_id, 'VOICE_COMMAND', 'YOUTUBE_PLAY', is_success=False)
+        command_log_writer.flush()
+        command_log_writer.update(event_id, is_success=True)
+        command_log_writer.flush()
+
+        self.assertTrue(CommandLog.objects.get(event_id=event_id).is_success)
+
+    def test_replay_after_crash_is_idempotent(self):
+        """DB 커밋 후 큐 제거 전에 중단되어도 재처리 시 중복 저장되지 않는지 테스트 (at-least-once)"""
+        event_id = command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'UP', is_success=True)
+
+        with patch.object(CommandLogWriter, '_commit_batch', side_effect=ConnectionError('redis down')):
+            with self.assertRaises(ConnectionError):
+                command_log_writer.flush()
+
+        self.assertEqual(command_log_writer.pending(), 1)
+        command_log_writer.update(event_id, is_success=False, error_message='재전송')
+        self.assertEqual(command_log_writer.flush(), 2)
+
+        log = CommandLog.objects.get(event_id=event_id)
+        self.assertEqual(CommandLog.objects.count(), 1)
+        self.assertFalse(log.is_success)
+        self.assertEqual(log.error_message, '재전송')
+
+    def test_flush_single_worker(self):
+        """다른 워커가 flush 중이면 건너뛰는지 테스트"""
+        command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'UP', is_success=True)
+        cache.add(command_log_writer.lock_key, 1, timeout=60)
+
+        self.assertEqual(command_log_writer.flush(), 0)
+        self.assertEqual(command_log_writer.pending(), 1)
+
+    def test_expired_lock_not_trimmed_or_released(self):
+        """flush 중 락이 만료되어 다른 워커가 가져가면 큐를 제거하지 않고 그 워커의 락도 지우지 않는지 테스트"""
+        event_id = command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'UP', is_success=True)
+        redis = command_log_writer._redis()
+        lock = cache.make_key(command_log_writer.lock_key)
+        apply_batch = command_log_writer._apply_batch
+
+        def apply_then_lose_lock(raw):
+            failed = apply_batch(raw)
+            redis.set(lock, 'other-worker', px=60000)
+            return failed
+
+        with patch.object(command_log_writer, '_apply_batch', side_effect=apply_then_lose_lock):
+            self.assertEqual(command_log_writer.flush(), 0)
+
+        self.assertEqual(command_log_writer.pending(), 1)
+        self.assertEqual(redis.get(lock), b'other-worker')
+
+        # 이어받은 워커가 같은 배치를 다시 처리해도 중복 저장되지 않음
+        redis.delete(lock)
+        self.assertEqual(command_log_writer.flush(), 1)
+        self.assertEqual(CommandLog.objects.filter(event_id=event_id).count(), 1)
+        self.assertEqual(command_log_writer.pending(), 0)
+
+    def test_bad_event_moved_to_dead_letter(self):
+        """저장할 수 없는 이벤트만 dead letter로 옮기고 나머지는 저장해 큐가 막히지 않는지 테스트"""
+        first = command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'UP', is_success=True)
+        bad = {'op': 'create', 'event_id': uuid.uuid4().hex, 'fields': {'unknown_field': 1}}
+        command_log_writer._push([bad])
+        command_log_writer._redis().rpush(cache.make_key(command_log_writer.queue_key), 'not json')
+        second = command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'DOWN', is_success=True)
+
+        self.assertEqual(command_log_writer.flush(), 4)
+
+        self.assertEqual(command_log_writer.pending(), 0)
+        self.assertEqual(
+            set(CommandLog.objects.values_list('event_id', flat=True)), {uuid.UUID(first), uuid.UUID(second)}
+        )
+        self.assertEqual(command_log_writer.dead_letters(), [json.dumps(bad), 'not json'])
+
+    def test_transient_db_error_keeps_queue(self):
+        """DB 연결 오류는 dead letter로 옮기지 않고 큐에 남기는지 테스트"""
+        command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'UP', is_success=True)
+
+        with patch.object(CommandLogWriter, '_apply', side_effect=OperationalError('db down')):
+            with self.assertRaises(OperationalError):
+                command_log_writer.flush()
+
+        self.assertEqual(command_log_writer.pending(), 1)
+        self.assertEqual(command_log_writer.dead_letters(), [])
+        self.assertEqual(command_log_writer.flush(), 1)
+
+    def test_disabled_writes_directly(self):
+        """ENABLED=False면 바로 DB에 저장되는지 테스트"""
+        with self.settings(COMMAND_LOG_WRITER={'ENABLED': False}):
+            event_id = command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'UP', is_success=True)
+            command_log_writer.update(event_id, is_success=False)
+
+        self.assertFalse(CommandLog.objects.get(event_id=event_id).is_success)
+        self.assertEqual(command_log_writer.pending(), 0)
+
+    def test_voice_command_logged_write_behind(self):
+        """음성 명령 요청 경로에서 CommandLog INSERT 없이 큐에 기록되는지 테스트"""
+        response = self.client.post(
+            '/api/control/voice/',
+            data=json.dumps({'uid': str(self.user.uid), 'command': 'TRACK_ON'}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(CommandLog.objects.exists())
+        command_log_writer.flush()
+        log = CommandLog.objects.get(session=self.session)
+        self.assertEqual(log.command_content, 'TRACK_ON')
+        self.assertTrue(log.is_success)
+
+
+class PrincipalCacheTestCase(TestCase):
+    """JWT 인증 사용자 캐시 (토큰 → 사용자 스냅샷, 버전 무효화) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        principal_cache.clear()
+        self.user = User.objects.create_user(
+            login_id='authuser', email='auth@example.com', nickname='인증', password='Test1234!'
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access_token = str(self.refresh.access_token)
+        self.factory = RequestFactory()
+
+    def _authenticate(self, token=None):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token or self.access_token}')
+        return get_user_from_token(request)
+
+    def test_repeat_request_skips_db(self):
+        """같은 토큰의 두 번째 인증부터 DB 조회가 없는지 테스트"""
+        with self.assertNumQueries(1):
+            first = self._authenticate()
+        with self.assertNumQueries(0):
+            second = self._authenticate()
+
+        self.assertEqual(second, self.user)
+        self.assertEqual(second.login_id, 'authuser')
+        self.assertEqual(second.uid, self.user.uid)
+        self.assertIsNot(first, second)
+
+    def test_deferred_fields_loaded_once(self):
+        """스냅샷에 없는 필드는 처음 접근할 때 한 번에 읽는지 테스트"""
+        self._authenticate()
+        user = self._authenticate()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'auth@example.com')
+            self.assertIsNotNone(user.created_at)
+            self.assertTrue(user.check_password('Test1234!'))
+
+    def test_refresh_token_rejected(self):
+        """Refresh 토큰으로는 인증되지 않는지 테스트"""
+        self.assertIsNone(self._authenticate(str(self.refresh)))
+
+    def test_profile_update_invalidates(self):
+        """프로필 수정 후 새 닉네임으로 인증되는지 테스트"""
+        self.assertEqual(self._authenticate().nickname, '인증')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                '/api/user/profile/update/',
+                data=json.dumps({'nickname': '새닉네임'}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._authenticate().nickname, '새닉네임')
+
+    def test_delete_account_invalidates(self):
+        """탈퇴 후 같은 토큰으로 인증되지 않는지 테스트"""
+        self._authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/accounts/delete/',
+                data=json.dumps({'password': 'Test1234!', 'deletion_reason': 'OTHER'}),
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self._authenticate())
+        self.assertEqual(len(principal_cache), 0)
+
+    def test_invalidation_from_other_worker(self):
+        """다른 워커의 무효화(공유 캐시 버전 증가)를 다음 요청에서 감지하는지 테스트"""
+        self._authenticate()
+        self.assertEqual(len(principal_cache), 1)
+
+        # 다른 워커의 invalidate_principal - 공유 캐시의 버전만 바뀌고 이 워커의 항목은 남아 있음
+        cache.set(f'auth_principal:{self.user.user_id}:version', current_version(self.user.user_id) + 1, timeout=None)
+
+        with self.assertNumQueries(1):
+            self._authenticate()
+        with self.assertNumQueries(0):
+            self._authenticate()
+
+    def test_lru_and_token_expiry(self):
+        """최대 항목 수 초과 시 오래된 토큰부터 제거되고 만료된 토큰은 조회되지 않는지 테스트"""
+        local = PrincipalCache(config={'TTL': 60, 'MAX_ENTRIES': 2})
+        snapshot = (self.user.user_id, 'authuser', self.user.uid, '인증', True)
+        local.set('a', snapshot, 0)
+        local.set('b', snapshot, 0)
+        local.get('a')
+        local.set('c', snapshot, 0)
+
+        self.assertIsNotNone(local.get('a'))
+        self.assertIsNone(local.get('b'))
+        self.assertEqual(len(local), 2)
+
+        local.set('expired', snapshot, 0, token_exp=1)
+        self.assertIsNone(local.get('expired'))
+
+    def test_disabled_queries_every_request(self):
+        """TTL 0이면 매 요청 DB에서 조회하는지 테스트"""
+        with self.settings(AUTH_PRINCIPAL_CACHE={'TTL': 0}):
+            self._authenticate()
+            with self.assertNumQueries(1):
+                self._authenticate()
+
+
+@override_settings(QUERY_BUDGET={'ENABLED': True, 'ENFORCE': True, 'HEADER': True})
+class QueryBudgetTestCase(TestCase):
+    """요청당 쿼리 예산 (@query_budget, QueryBudgetMiddleware) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        principal_cache.clear()
+        self.stub = JetsonStubServer().start()
+        self.addCleanup(self.stub.stop)
+        self.user = User.objects.create_user(
+            login_id='budgetuser', email='budget@example.com', nickname='예산', password='Test1234!'
+        )
+        self.user.face_vectors = [[0.1] * 512]
+        self.user.save()
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.session = Session.objects.create(connection=connection)
+        for i in range(3):
+            Preset.objects.create(
+                user=self.user, preset_name=f'preset{i}',
+                servo1=0, servo2=0, servo3=0, servo4=0, servo5=0, servo6=0
+            )
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+
+    def _post(self, path, data, **extra):
+        return self.client.post(path, data=json.dumps(data), content_type='application/json', **extra)
+
+    def test_get_presets_within_budget(self):
+        """프리셋 목록이 프리셋 수와 관계없이 예산 안에서 처리되는지 테스트"""
+        response = self.client.get('/api/preset/list/', HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(response['X-Query-Budget'], '2')
+        self.assertLessEqual(response_query_count(response), 2)
+
+    def test_button_command_single_lookup(self):
+        """버튼 명령이 세션/연결을 한 번에 읽고 사용자 행은 읽지 않는지 테스트"""
+        principal_cache.set(self.access_token, (
+            self.user.user_id, self.user.login_id, self.user.uid, self.user.nickname, True
+        ), current_version(self.user.user_id))
+
+        with self.settings(JETSON_BASE_URL=self.stub.url), count_queries(record=True) as counted:
+            response = self._post(
+                '/api/control/button/', {'session_id': self.session.session_id, 'command': 'UP'},
+                HTTP_AUTHORIZATION=f'Bearer {self.access_token}'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(counted.count, 1)
+        self.assertNotIn('face_vectors_packed', counted.queries[0])
+
+    def test_voice_command_session_with_user(self):
+        """uid 음성 명령이 세션과 사용자를 쿼리 한 번으로 찾는지 테스트"""
+        response = self._post('/api/control/voice/', {'uid': str(self.user.uid), 'command': 'UP'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_query_count(response), 1)
+
+    def test_voice_command_missing_user_and_session(self):
+        """사용자 없음 / 활성 세션 없음 응답이 구분되는지 테스트"""
+        response = self._post('/api/control/voice/', {'uid': str(uuid.uuid4()), 'command': 'UP'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['message'], '사용자를 찾을 수 없습니다.')
+
+        self.session.ended_at = timezone.now()
+        self.session.save()
+        response = self._post('/api/control/voice/', {'uid': str(self.user.uid), 'command': 'UP'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['message'], '활성 세션이 없습니다.')
+
+    def test_over_budget_raises_when_enforced(self):
+        """예산을 넘으면 ENFORCE 모드에서 예외가 나는지 테스트"""
+        with patch.object(account_views.get_presets, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/preset/list/', HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+
+    def test_over_budget_warns_when_not_enforced(self):
+        """ENFORCE가 꺼져 있으면 경고 로그만 남기는지 테스트"""
+        with patch.object(account_views.get_presets, 'query_budget', 0), \
+                self.settings(QUERY_BUDGET={'ENABLED': True, 'ENFORCE': False, 'HEADER': True}), \
+                self.assertLogs('accounts.query_budget', level='WARNING'):
+            response = self.client.get('/api/preset/list/', HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_middleware_not_used_when_disabled(self):
+        """ENABLED가 꺼져 있으면(운영) 미들웨어를 쓰지 않아 쿼리를 세지 않는지 테스트"""
+        with self.settings(QUERY_BUDGET={'ENABLED': False, 'HEADER': True}):
+            with self.assertRaises(MiddlewareNotUsed):
+                QueryBudgetMiddleware(lambda request: None)
+
+            response = Client().get('/api/preset/list/', HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Query-Count', response)
+
+    def test_savepoints_not_counted(self):
+        """트랜잭션 제어문(SAVEPOINT)은 세지 않는지 테스트"""
+        with count_queries() as outer:
+            with transaction.atomic():
+                User.objects.filter(user_id=self.user.user_id).exists()
+            with count_queries() as inner:
+                User.objects.count()
+
+        self.assertEqual(inner.count, 1)
+        self.assertEqual(outer.count, 2)
+
+
+class SessionRegistryTestCase(TestCase):
+    """uid → 활성 세션 레지스트리 (세션 시작/종료 시 갱신, DB 대체 조회) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        principal_cache.clear()
+        self.stub = JetsonStubServer().start()
+        self.addCleanup(self.stub.stop)
+        self.user = User.objects.create_user(
+            login_id='registryuser', email='registry@example.com', nickname='레지스트리', password='Test1234!'
+        )
+        self.connections = [
+            UserDeviceConnection.objects.create(
+                user=self.user,
+                phone=Phone.objects.create(device_name=f'phone{i}'),
+                sarvis=Sarvis.objects.create(),
+                is_active=True
+            )
+            for i in range(2)
+        ]
+        self.refresh = RefreshToken.for_user(self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.refresh.access_token}'}
+
+    def _post(self, path, data, **extra):
+        return self.client.post(path, data=json.dumps(data), content_type='application/json', **extra)
+
+    def _start(self, connection):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post('/api/session/start/', {'connection_uuid': str(connection.connection_uuid)}, **self.auth)
+        self.assertEqual(response.status_code, 201)
+        return response.json()['session_id']
+
+    def _end(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self._post('/api/session/end/', {}, **self.auth)
+
+    def _db_active_session(self):
+        session = active_sessions_for_uid(self.user.uid).first()
+        return session and session.session_id
+
+    def test_started_session_resolved_without_db(self):
+        """세션 시작 후 uid 조회가 DB 없이 새 세션을 반환하는지 테스트"""
+        session_id = self._start(self.connections[0])
+
+        with self.assertNumQueries(0):
+            active = session_registry.resolve(self.user.uid)
+
+        self.assertEqual(active, ActiveSession(
+            self.user.user_id, 'registryuser', session_id, self.connections[0].connection_id
+        ))
+
+    def test_voice_command_without_db_reads(self):
+        """젯슨 음성 명령이 레지스트리 적중 시 DB를 읽지 않는지 테스트"""
+        self._start(self.connections[0])
+
+        with self.assertNumQueries(0):
+            response = self._post('/api/control/voice/', {'uid': str(self.user.uid), 'command': 'UP'})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_miss_falls_back_to_db_and_fills(self):
+        """캐시에 없으면 DB에서 찾아 채우는지 테스트"""
+        session = Session.objects.create(connection=self.connections[0])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(session_registry.resolve(self.user.uid).session_id, session.session_id)
+        with self.assertNumQueries(0):
+            self.assertEqual(session_registry.resolve(str(self.user.uid)).session_id, session.session_id)
+
+    def test_end_session_invalidates(self):
+        """세션 종료 후 이전 세션을 반환하지 않는지 테스트"""
+        self._start(self.connections[0])
+        self.assertEqual(self._end().status_code, 200)
+
+        self.assertIsNone(session_registry.resolve(self.user.uid))
+        response = self._post('/api/control/voice/', {'uid': str(self.user.uid), 'command': 'UP'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['message'], '활성 세션이 없습니다.')
+
+    def test_logout_invalidates(self):
+        """로그아웃 후 활성 세션이 없어지는지 테스트"""
+        self._start(self.connections[0])
+
+        with self.settings(JETSON_BASE_URL=self.stub.url), self.captureOnCommitCallbacks(execute=True):
+            response = self._post('/api/auth/logout/', {'refresh': str(self.refresh)}, **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(session_registry.resolve(self.user.uid))
+
+    def test_stale_fill_discarded(self):
+        """DB 조회 중 무효화되면 조회 결과가 사용되지 않는지 테스트"""
+        session = Session.objects.create(connection=self.connections[0])
+        _, generation = session_registry.get(self.user.uid)
+        stale = session_registry._load(str(self.user.uid))
+
+        # 조회와 저장 사이에 세션 종료
+        session.ended_at = timezone.now()
+        session.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            session_registry.invalidate(self.user.uid)
+        session_registry._store(str(self.user.uid), stale, generation)
+
+        self.assertEqual(session_registry.get(self.user.uid)[0], None)
+        self.assertIsNone(session_registry.resolve(self.user.uid))
+
+    def test_rolled_back_session_not_registered(self):
+        """롤백된 세션 시작은 레지스트리에 기록되지 않는지 테스트"""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            session = Session.objects.create(connection=self.connections[0])
+            session_registry.register(session, self.user)
+        session.delete()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(session_registry.get(self.user.uid)[0])
+
+    def test_consistency_with_db(self):
+        """세션 시작/종료를 무작위로 반복해도 레지스트리가 DB와 같은 세션을 가리키는지 테스트"""
+        rng = random.Random(0)
+        for _ in range(30):
+            if rng.random() < 0.6:
+                self._start(rng.choice(self.connections))
+            else:
+                self._end()
+
+            active = session_registry.resolve(self.user.uid)
+            self.assertEqual(active and active.session_id, self._db_active_session())
+
+    def test_disabled_reads_db(self):
+        """TTL 0이면 캐시 없이 항상 DB에서 찾는지 테스트"""
+        self._start(self.connections[0])
+
+        with self.settings(SESSION_REGISTRY={'TTL': 0}), self.assertNumQueries(1):
+            self.assertIsNotNone(session_registry.resolve(self.user.uid))
+
+
+class CommandLogArchiveTestCase(TestCase):
+    """CommandLog 보관 기간 관리 (압축 보관, 운영/보관 합친 조회) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive_dir = tmp.name
+        settings_override = override_settings(COMMAND_LOG_ARCHIVE={
+            'DIR': self.archive_dir, 'RETENTION_DAYS': 90, 'BATCH_SIZE': 100, 'MAX_BATCHES': 10
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            login_id='archiveuser', email='archive@example.com', nickname='보관', password='Test1234!'
+        )
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.now = timezone.now()
+        self.session = Session.objects.create(connection=connection)
+        Session.objects.filter(pk=self.session.pk).update(started_at=self.now - timedelta(days=120))
+        self.other_session = Session.objects.create(connection=connection)
+        Session.objects.filter(pk=self.other_session.pk).update(started_at=self.now - timedelta(days=120))
+
+        self.old = [self._log(self.session, days=100 + i, command=f'OLD{i}') for i in range(3)]
+        self.recent = [self._log(self.session, days=1 + i, command=f'NEW{i}') for i in range(2)]
+        self._log(self.other_session, days=100, command='OTHER')
+
+    def _log(self, session, days, command):
+        return CommandLog.objects.create(
+            session=session, command_type='BUTTON_COMMAND', command_content=command,
+            is_success=True, created_at=self.now - timedelta(days=days)
+        )
+
+    def test_archives_only_expired_rows(self):
+        """보관 기간이 지난 행만 압축 파일로 옮기고 운영 테이블에서 지우는지 테스트"""
+        self.assertEqual(archive_command_logs(), 4)
+
+        self.assertEqual(
+            set(CommandLog.objects.values_list('command_content', flat=True)), {'NEW0', 'NEW1'}
+        )
+        archive = CommandLogArchive.objects.get()
+        self.assertEqual(archive.row_count, 4)
+        with gzip.open(os.path.join(self.archive_dir, archive.path), 'rt', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(
+            sorted(r['command_content'] for r in records), ['OLD0', 'OLD1', 'OLD2', 'OTHER']
+        )
+        self.assertEqual(archive.first_log_id, min(r['command_log_id'] for r in records))
+
+    def test_history_unions_hot_and_archive(self):
+        """이력 조회가 운영 테이블과 보관 파일을 합쳐 시간순으로 반환하는지 테스트"""
+        before = command_log_history([self.session.session_id])
+        command_log_archiver.archive()
+        after = command_log_history([self.session.session_id])
+
+        self.assertEqual(
+            [r['command_content'] for r in after], ['OLD2', 'OLD1', 'OLD0', 'NEW1', 'NEW0']
+        )
+        self.assertEqual(after, before)
+
+        recent = command_log_history([self.session.session_id], since=self.now - timedelta(days=101))
+        self.assertEqual([r['command_content'] for r in recent], ['OLD1', 'OLD0', 'NEW1', 'NEW0'])
+
+    def test_bounded_batches(self):
+        """한 번 실행에서 BATCH_SIZE x MAX_BATCHES 행까지만 옮기는지 테스트"""
+        with self.settings(COMMAND_LOG_ARCHIVE={'DIR': self.archive_dir, 'BATCH_SIZE': 2, 'MAX_BATCHES': 1}):
+            self.assertEqual(command_log_archiver.archive(), 2)
+            self.assertEqual(command_log_archiver.archive(), 2)
+            self.assertEqual(command_log_archiver.archive(), 0)
+
+        self.assertEqual(CommandLogArchive.objects.count(), 2)
+        self.assertEqual(CommandLog.objects.count(), 2)
+
+    def test_rerun_after_interrupted_archive(self):
+        """파일을 쓴 뒤 DB 반영 전에 실패해도 다음 실행에서 중복 없이 이어지는지 테스트"""
+        with patch.object(CommandLogArchive.objects, 'update_or_create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                command_log_archiver.archive()
+        self.assertEqual(CommandLog.objects.count(), 6)
+        self.assertEqual(CommandLogArchive.objects.count(), 0)
+
+        self.assertEqual(command_log_archiver.archive(), 4)
+        self.assertEqual(CommandLogArchive.objects.count(), 1)
+        self.assertEqual(len(command_log_history([self.session.session_id])), 5)
+
+    def test_skips_while_locked(self):
+        """다른 워커가 실행 중이면 건너뛰는지 테스트"""
+        cache.add(command_log_archiver.lock_key, 1)
+
+        self.assertEqual(command_log_archiver.archive(), 0)
+        self.assertEqual(CommandLog.objects.count(), 6)
+
+    def test_stops_when_lock_taken_over(self):
+        """실행 중 락이 만료되어 다른 워커가 가져가면 다음 묶음을 옮기지 않고 그 락도 지우지 않는지 테스트"""
+        redis = command_log_writer._redis()
+        lock = cache.make_key(command_log_archiver.lock_key)
+        archive_batch = command_log_archiver._archive_batch
+
+        def archive_then_lose_lock(cutoff, config):
+            count = archive_batch(cutoff, config)
+            redis.set(lock, 'other-worker', px=60000)
+            return count
+
+        with self.settings(COMMAND_LOG_ARCHIVE={'DIR': self.archive_dir, 'BATCH_SIZE': 2, 'MAX_BATCHES': 5}), \
+                patch.object(command_log_archiver, '_archive_batch', side_effect=archive_then_lose_lock):
+            self.assertEqual(command_log_archiver.archive(), 2)
+
+        self.assertEqual(CommandLogArchive.objects.count(), 1)
+        self.assertEqual(redis.get(lock), b'other-worker')
+
+
+class CommandHistoryTestCase(TestCase):
+    """명령 이력 API (키셋 페이지네이션, 운영 테이블 + 보관 파일) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        principal_cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(COMMAND_LOG_ARCHIVE={
+            'DIR': tmp.name, 'RETENTION_DAYS': 90, 'BATCH_SIZE': 4, 'MAX_BATCHES': 10
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            login_id='historyuser', email='history@example.com', nickname='이력', password='Test1234!'
+        )
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.now = timezone.now()
+        self.session = Session.objects.create(connection=connection)
+        Session.objects.filter(pk=self.session.pk).update(started_at=self.now - timedelta(days=200))
+
+        # 오래된 로그(보관 대상) 12건 + 최근 로그 8건, 같은 시각이 섞이도록 두 건씩 같은 시각
+        for i in range(20):
+            days = 150 - (i // 2) * 10 if i < 12 else 10 - (i - 12) // 2
+            CommandLog.objects.create(
+                session=self.session, command_type='BUTTON_COMMAND', command_content=f'CMD{i}',
+                is_success=True, created_at=self.now - timedelta(days=days)
+            )
+        self.expected = list(
+            CommandLog.objects.order_by('-created_at', '-command_log_id').values_list('command_log_id', flat=True)
+        )
+
+        other = User.objects.create_user(
+            login_id='otheruser', email='other@example.com', nickname='다른', password='Test1234!'
+        )
+        other_session = Session.objects.create(connection=UserDeviceConnection.objects.create(
+            user=other, phone=Phone.objects.create(device_name='other-phone'), sarvis=Sarvis.objects.create()
+        ))
+        CommandLog.objects.create(session=other_session, command_type='BUTTON_COMMAND', command_content='OTHER')
+
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def _pages(self, limit, **params):
+        ids, cursor = [], None
+        while True:
+            query = {'limit': limit, **params}
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get('/api/command-log/history/', query, **self.auth)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertLessEqual(body['count'], limit)
+            ids += [log['command_log_id'] for log in body['logs']]
+            cursor = body['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_pages_cover_all_rows_in_order(self):
+        """페이지를 끝까지 넘기면 사용자의 로그 전체가 중복/누락 없이 최신순으로 나오는지 테스트"""
+        self.assertEqual(self._pages(limit=3), self.expected)
+        self.assertEqual(self._pages(limit=20), self.expected)
+
+    def test_pages_continue_into_archive(self):
+        """보관 후에도 같은 페이지 결과가 나오는지 테스트 (운영 테이블 → 보관 파일로 이어짐)"""
+        self.assertEqual(command_log_archiver.archive(now=self.now), 12)
+        self.assertGreater(CommandLogArchive.objects.count(), 1)
+
+        self.assertEqual(self._pages(limit=3), self.expected)
+        self.assertEqual(self._pages(limit=7), self.expected)
+
+    def test_new_logs_do_not_shift_pages(self):
+        """페이지 사이에 새 로그가 생겨도 다음 페이지가 밀리지 않는지 테스트 (OFFSET과 다른 점)"""
+        first = self.client.get('/api/command-log/history/', {'limit': 5}, **self.auth).json()
+        CommandLog.objects.create(session=self.session, command_type='BUTTON_COMMAND', command_content='NEW')
+        second = self.client.get(
+            '/api/command-log/history/', {'limit': 5, 'cursor': first['next_cursor']}, **self.auth
+        ).json()
+
+        self.assertEqual(
+            [log['command_log_id'] for log in first['logs'] + second['logs']], self.expected[:10]
+        )
+
+    def test_hot_page_query_count(self):
+        """운영 테이블로 채워지는 페이지는 보관 목록을 읽지 않는지 테스트 (사용자 조회 + 로그 조회)"""
+        response = self.client.get('/api/command-log/history/', {'limit': 5}, **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(response_query_count(response), 2)
+
+    def test_invalid_cursor(self):
+        """잘못된 커서 / 페이지 크기를 400으로 거절하는지 테스트"""
+        response = self.client.get('/api/command-log/history/', {'cursor': 'not-a-cursor'}, **self.auth)
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/command-log/history/', {'limit': 1000}, **self.auth)
+        self.assertEqual(response.status_code, 400)
+
+
+class CommandStatsTestCase(TestCase):
+    """명령 통계 (로그 저장 시 증분 집계, 통계 API, 재생성) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        principal_cache.clear()
+        self.user = User.objects.create_user(
+            login_id='statsuser', email='stats@example.com', nickname='통계', password='Test1234!'
+        )
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.session = Session.objects.create(connection=connection)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def _stats(self):
+        return {
+            (stat.command_type, stat.command_content): (stat.total_count, stat.success_count, stat.failure_count)
+            for stat in CommandLogDailyStat.objects.filter(user=self.user)
+        }
+
+    def test_flush_updates_rollup(self):
+        """flush한 로그가 명령별 성공/실패/결과 미정으로 집계되는지 테스트"""
+        for content, success in [('UP', True), ('UP', True), ('UP', False), ('HOME', None)]:
+            command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', content, is_success=success)
+        command_log_writer.flush()
+
+        self.assertEqual(self._stats(), {
+            ('BUTTON_COMMAND', 'UP'): (3, 2, 1),
+            ('BUTTON_COMMAND', 'HOME'): (1, 0, 0),
+        })
+
+    def test_outcome_update_moves_counts(self):
+        """결과가 나중에 바뀌면 성공/실패 집계만 옮겨지는지 테스트"""
+        event_id = command_log_writer.record(self.session.session_id, 'VOICE_COMMAND', 'YOUTUBE_PLAY', is_success=True)
+        command_log_writer.flush()
+        command_log_writer.update(event_id, is_success=False, error_message='앱 응답 타임아웃')
+        command_log_writer.flush()
+
+        self.assertEqual(self._stats(), {('VOICE_COMMAND', 'YOUTUBE_PLAY'): (1, 0, 1)})
+
+    def test_replay_does_not_double_count(self):
+        """커밋 후 큐 제거 전에 중단되어 재처리되어도 집계가 한 번만 반영되는지 테스트"""
+        command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'UP', is_success=True)
+        redis = command_log_writer._redis()
+        with patch.object(CommandLogWriter, '_commit_batch', side_effect=ConnectionError('redis down')):
+            with self.assertRaises(ConnectionError):
+                command_log_writer.flush()
+        command_log_writer.flush()
+
+        self.assertEqual(self._stats(), {('BUTTON_COMMAND', 'UP'): (1, 1, 0)})
+
+    def test_stats_endpoint_reads_rollup_only(self):
+        """통계 API가 command_log를 읽지 않고 집계 테이블로 응답하는지 테스트"""
+        for success in (True, True, False):
+            command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', 'UP', is_success=success)
+        command_log_writer.flush()
+        # 범위 밖(40일 전) 집계
+        CommandLogDailyStat.objects.create(
+            user=self.user, day=command_stats.today() - timedelta(days=40),
+            command_type='BUTTON_COMMAND', command_content='UP', total_count=5, success_count=5
+        )
+
+        with CaptureQueriesContext(db_connection) as queries:
+            response = self.client.get('/api/command-log/stats/', {'days': 7}, **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(statement_kinds(queries, 'command_log'), [])
+        body = response.json()
+        self.assertEqual(body['by_command'], [{
+            'command_type': 'BUTTON_COMMAND', 'command_content': 'UP',
+            'total': 3, 'success': 2, 'failure': 1, 'success_rate': 0.6667,
+        }])
+        self.assertEqual([day['date'] for day in body['by_day']], [command_stats.today().isoformat()])
+        self.assertEqual(body['total']['total'], 3)
+
+    def test_rebuild_matches_incremental(self):
+        """재생성 결과가 증분 집계와 같고, 보관된 로그도 포함하는지 테스트"""
+        for content, success in [('UP', True), ('DOWN', False), ('UP', None)]:
+            command_log_writer.record(self.session.session_id, 'BUTTON_COMMAND', content, is_success=success)
+        command_log_writer.flush()
+        incremental = self._stats()
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            with self.settings(COMMAND_LOG_ARCHIVE={'DIR': archive_dir, 'RETENTION_DAYS': 0}):
+                command_log_archiver.archive(now=timezone.now() + timedelta(seconds=1))
+                self.assertFalse(CommandLog.objects.exists())
+                CommandLogDailyStat.objects.all().delete()
+
+                call_command('rebuild_command_stats', stdout=io.StringIO())
+
+        self.assertEqual(self._stats(), incremental)
+
+    def test_rebuild_waits_for_flush(self):
+        """로그 저장 중에는 재생성하지 않는지 테스트"""
+        cache.add(command_log_writer.lock_key, 1)
+
+        with self.assertRaises(command_stats.RebuildLocked):
+            command_stats.rebuild()
+
+    def test_rebuild_keeps_lock_taken_over(self):
+        """재생성이 오래 걸려 락이 만료된 뒤 다른 워커가 잡은 락을 지우지 않는지 테스트"""
+        redis = command_log_writer._redis()
+        lock = cache.make_key(command_log_writer.lock_key)
+        get_config = command_stats.get_archive_config
+
+        def config_after_takeover():
+            redis.set(lock, 'other-worker', px=60000)
+            return get_config()
+
+        with patch('accounts.command_stats.get_archive_config', side_effect=config_after_takeover):
+            command_stats.rebuild()
+
+        self.assertEqual(redis.get(lock), b'other-worker')
+        self.assertIsNone(redis.get(cache.make_key(command_log_archiver.lock_key)))
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    DASHBOARD_FEED={'TICK': 0.1, 'SNAPSHOT_SIZE': 5, 'MAX_PENDING': 5000},
+)
+class DashboardFeedTestCase(TestCase):
+    """웹 대시보드 피드 (연결 시 스냅샷, 틱당 한 번 변경분 브로드캐스트) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            login_id='dashuser', email='dash@example.com', nickname='대시보드', password='Test1234!'
+        )
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.session = Session.objects.create(connection=connection)
+
+    async def _connect(self):
+        communicator = WebsocketCommunicator(URLRouter(server_websocket_urlpatterns), '/ws/dashboard/')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def _receive_logs(self, communicator, count):
+        """변경분 메시지를 count건이 모일 때까지 받음 - (메시지 수, 로그 목록)"""
+        messages, logs = 0, []
+        while len(logs) < count:
+            message = await communicator.receive_json_from(timeout=5)
+            self.assertEqual(message['type'], 'delta')
+            messages += 1
+            logs += message['logs']
+        return messages, logs
+
+    async def test_snapshot_on_connect_only(self):
+        """연결 시 최근 로그 스냅샷을 한 번 보내고, 변경이 없으면 더 보내지 않는지 테스트"""
+        for i in range(8):
+            await CommandLog.objects.acreate(
+                session=self.session, command_type='BUTTON_COMMAND', command_content=f'CMD{i}', is_success=True
+            )
+
+        communicator = await self._connect()
+        snapshot = await communicator.receive_json_from()
+        self.assertTrue(await communicator.receive_nothing(timeout=0.3))
+        await communicator.disconnect()
+
+        self.assertEqual(snapshot['type'], 'snapshot')
+        self.assertEqual([log['command_content'] for log in snapshot['logs']], ['CMD7', 'CMD6', 'CMD5', 'CMD4', 'CMD3'])
+
+    async def test_many_clients_one_broadcast_per_tick(self):
+        """여러 대시보드가 연결되어도 변경분을 틱당 한 번만 브로드캐스트하는지 테스트"""
+        clients = [await self._connect() for _ in range(50)]
+        for communicator in clients:
+            await communicator.receive_json_from()
+
+        layer = get_channel_layer()
+        sends = []
+        original_group_send = layer.group_send
+
+        async def counting_group_send(group, message):
+            sends.append(len(message['logs']))
+            await original_group_send(group, message)
+
+        def burst():
+            event_ids = []
+            for i in range(3):
+                event_ids += command_log_writer.record_many([
+                    {'session_id': self.session.session_id, 'command_type': 'BUTTON_COMMAND',
+                     'command_content': 'UP', 'is_success': None}
+                    for _ in range(10)
+                ])
+            command_log_writer.update(event_ids[0], is_success=True)
+            return event_ids
+
+        with patch.object(layer, 'group_send', counting_group_send):
+            event_ids = await sync_to_async(burst)()
+            results = [await self._receive_logs(communicator, 30) for communicator in clients]
+
+        for communicator in clients:
+            await communicator.disconnect()
+
+        # 기록 31건(생성 30 + 업데이트 1)이 틱 경계에 걸쳐도 최대 두 번에 나뉨
+        self.assertLessEqual(len(sends), 2)
+        self.assertEqual(sum(sends), 30)
+        for messages, logs in results:
+            self.assertEqual(messages, len(sends))
+            self.assertEqual([log['event_id'] for log in logs], event_ids)
+        first = results[0][1][0]
+        self.assertEqual(first['op'], 'create')
+        self.assertTrue(first['is_success'])
+
+    def test_drain_once_per_tick(self):
+        """여러 프로세스가 같은 틱에 비우려 해도 한 곳만 가져가는지 테스트"""
+        dashboard_feed.publish([{'op': 'create', 'event_id': 'a', 'fields': {'command_content': 'UP'}}])
+
+        self.assertEqual(len(dashboard_feed.drain()), 1)
+        dashboard_feed.publish([{'op': 'create', 'event_id': 'b', 'fields': {'command_content': 'UP'}}])
+        self.assertEqual(dashboard_feed.drain(), [])
+
+        cache.delete(dashboard_feed.tick_lock_key)
+        self.assertEqual([log['event_id'] for log in dashboard_feed.drain()], ['b'])
+
+    def test_pending_capped_without_dashboard(self):
+        """대시보드가 없을 때 최근 MAX_PENDING건만 남기는지 테스트"""
+        with self.settings(DASHBOARD_FEED={'MAX_PENDING': 5}):
+            dashboard_feed.publish([
+                {'op': 'create', 'event_id': str(i), 'fields': {}} for i in range(12)
+            ])
+            self.assertEqual([log['event_id'] for log in dashboard_feed.drain()], ['7', '8', '9', '10', '11'])
+
+
+class PresenceTestCase(TestCase):
+    """앱 WebSocket 연결 레지스트리 (heartbeat, 만료, 일괄 조회) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            login_id='presenceuser', email='presence@example.com', nickname='연결', password='Test1234!'
+        )
+        connection = UserDeviceConnection.objects.create(
+            user=self.user,
+            phone=Phone.objects.create(device_name='test-phone'),
+            sarvis=Sarvis.objects.create(),
+            is_active=True
+        )
+        self.session = Session.objects.create(connection=connection)
+
+    def _at(self, seconds):
+        """레지스트리 시계를 seconds 뒤로 옮김"""
+        now = time.time() + seconds
+        return patch('accounts.presence.time.time', return_value=now)
+
+    def test_connect_and_disconnect(self):
+        """연결 등록/조회/해제 테스트"""
+        presence.connect(7, user_id=1, user_login_id='user1', channel_name='chan-a')
+
+        self.assertTrue(presence.is_online(7))
+        self.assertEqual(presence.status(7)['user_login_id'], 'user1')
+        self.assertTrue(presence.disconnect(7, 'chan-a'))
+        self.assertFalse(presence.is_online(7))
+        self.assertIsNone(presence.status(7))
+
+    def test_stale_disconnect_keeps_reconnected_session(self):
+        """같은 세션으로 재연결한 뒤 이전 연결이 끊겨도 새 연결은 유지되는지 테스트"""
+        presence.connect(7, channel_name='old')
+        presence.connect(7, channel_name='new')
+
+        self.assertFalse(presence.disconnect(7, 'old'))
+        self.assertEqual(presence.status(7)['channel_name'], 'new')
+
+    def test_expiry_and_heartbeat(self):
+        """heartbeat가 없으면 TTL 후 연결 끊김으로 보고, heartbeat는 만료 시각을 늦추는지 테스트"""
+        with self.settings(PRESENCE={'TTL': 60}):
+            presence.connect(1, channel_name='a')
+            presence.connect(2, channel_name='b')
+            with self._at(50):
+                self.assertTrue(presence.heartbeat(1))
+            with self._at(70):
+                self.assertTrue(presence.is_online(1))
+                self.assertFalse(presence.is_online(2))
+                self.assertEqual([status['session_id'] for status in presence.active()], ['1'])
+                self.assertEqual(presence.count(), 1)
+
+                # 정리 후에는 heartbeat가 실패 (다시 등록해야 함)
+                self.assertEqual(presence.sweep(), 1)
+                self.assertFalse(presence.heartbeat(2))
+            self.assertEqual(presence.statuses([1, 2, 3]).keys(), {'1', '2', '3'})
+            self.assertIsNone(presence.statuses([2])['2'])
+
+    def test_bulk_reads_without_key_scan(self):
+        """활성 연결/일괄 상태 조회가 KEYS 스캔 없이 고정 왕복으로 처리되는지 테스트"""
+        for session_id in range(50):
+            presence.connect(session_id, channel_name=f'chan-{session_id}')
+        client = cache.client.get_client()
+
+        with patch.object(type(client), 'execute_command', autospec=True, side_effect=type(client).execute_command) as execute:
+            active = WebSocketLogger.get_all_active_connections()
+            statuses = WebSocketLogger.get_connection_statuses(range(0, 100, 10))
+
+        self.assertEqual(len(active), 50)
+        self.assertEqual(sum(status is not None for status in statuses.values()), 5)
+        self.assertNotIn('KEYS', [call.args[1] for call in execute.call_args_list])
+
+    async def test_app_consumer_registers_and_refreshes(self):
+        """앱 WebSocket 연결 시 등록, 메시지마다 만료 시각 갱신, 종료 시 삭제되는지 테스트"""
+        communicator = WebsocketCommunicator(URLRouter(app_websocket_urlpatterns), f'/ws/app/{self.session.session_id}/')
+        await communicator.connect()
+        await communicator.receive_json_from()
+        session_id = self.session.session_id
+        self.assertTrue(await presence.ais_online(session_id))
+        redis = presence._redis()
+        registered = redis.zscore(cache.make_key(presence.sessions_key), str(session_id))
+
+        with self.settings(PRESENCE={'TTL': 120, 'HEARTBEAT_INTERVAL': 0}):
+            await communicator.send_json_to({'type': 'ping'})
+            self.assertEqual((await communicator.receive_json_from())['type'], 'pong')
+        self.assertGreater(redis.zscore(cache.make_key(presence.sessions_key), str(session_id)), registered)
+
+        await communicator.disconnect()
+        self.assertFalse(await presence.ais_online(session_id))
+
+
+class EmailQueueTestCase(TestCase):
+    """인증 메일 비동기 발송 (큐, 주소당 횟수 제한, 연결 재사용, 재시도) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        email_sender.close()
+        self.client = Client()
+
+    def tearDown(self):
+        email_sender.close()
+
+    def _request_code(self, address):
+        return self.client.post(
+            '/api/register/email-request/',
+            data=json.dumps({'email': address}),
+            content_type='application/json'
+        )
+
+    def _smtp(self, stub):
+        return self.settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST=stub.host, EMAIL_PORT=stub.port, EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER=None, EMAIL_HOST_PASSWORD=None, EMAIL_TIMEOUT=5
+        )
+
+    def test_verification_code_is_mailed_through_queue(self):
+        """인증 코드 메일이 send_email 태스크로 발송되는지 테스트"""
+        with patch('accounts.tasks.send_email.delay', wraps=send_email.delay) as delay:
+            response = self._request_code('queue@example.com')
+
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once()
+        self.assertEqual(len(mail.outbox), 1)
+        verification = EmailVerification.objects.get(email='queue@example.com')
+        self.assertIn(verification.verification_code, mail.outbox[0].body)
+        self.assertEqual(mail.outbox[0].to, ['queue@example.com'])
+
+    def test_rate_limit_keeps_previous_code(self):
+        """주소당 발송 횟수를 넘으면 429로 응답하고 이전 인증 코드는 유지되는지 테스트"""
+        with self.settings(EMAIL_QUEUE={'RATE_LIMIT': 2, 'RATE_WINDOW': 600}):
+            self.assertEqual(self._request_code('Limit@example.com').status_code, 200)
+            self.assertEqual(self._request_code('limit@example.com').status_code, 200)
+            code = EmailVerification.objects.get(email='limit@example.com').verification_code
+
+            response = self._request_code('limit@example.com')
+            other = self._request_code('other@example.com')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(response.json()['retry_after'], 0)
+        self.assertEqual(other.status_code, 200)
+        self.assertEqual(EmailVerification.objects.get(email='limit@example.com').verification_code, code)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_broker_failure_sends_inline(self):
+        """브로커에 넣지 못하면 요청에서 바로 발송하는지 테스트"""
+        with patch('accounts.tasks.send_email.delay', side_effect=KombuOperationalError('broker down')):
+            response = self._request_code('inline@example.com')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_worker_reuses_smtp_connection(self):
+        """워커가 메시지 사이에 SMTP 연결을 재사용하고, 유휴 시간이 지나면 새로 여는지 테스트"""
+        with SmtpStubServer() as stub, self._smtp(stub):
+            for index in range(3):
+                send_email.delay('제목', '본문', f'user{index}@example.com')
+            self.assertEqual(stub.connections, 1)
+
+            with self.settings(EMAIL_QUEUE={'CONNECTION_IDLE': 0}):
+                send_email.delay('제목', '본문', 'idle@example.com')
+            email_sender.close()
+
+        self.assertEqual(stub.connections, 2)
+        self.assertEqual([message['To'] for message in stub.messages],
+                         ['user0@example.com', 'user1@example.com', 'user2@example.com', 'idle@example.com'])
+
+    def test_transient_error_is_retried(self):
+        """일시 오류(4xx)는 재시도하고 영구 오류(5xx)는 재시도하지 않는지 테스트"""
+        with SmtpStubServer() as stub, self._smtp(stub):
+            stub.fail_next(2, code=451)
+            with patch.object(send_email, 'retry', wraps=send_email.retry) as retry:
+                send_email.delay('제목', '본문', 'retry@example.com')
+            self.assertEqual(retry.call_count, 2)
+            self.assertEqual(len(stub.messages), 1)
+
+            stub.fail_next(1, code=550, command='RCPT')
+            with patch.object(send_email, 'retry') as retry:
+                send_email.delay('제목', '본문', 'rejected@example.com')
+            retry.assert_not_called()
+            email_sender.close()
+
+        self.assertEqual(len(stub.messages), 1)
+
+
+class RegistrationStateTestCase(TestCase):
+    """회원가입 진행 상태 레코드 (단계별 저장, 비교 후 저장, 얼굴 벡터 바이너리) 테스트"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.face_vectors = np.random.default_rng(0).standard_normal((5, 512)).round(3).tolist()
+
+    def _post(self, url, data):
+        return self.client.post(url, data=json.dumps(data), content_type='application/json')
+
+    def _register_until_face(self, login_id='stateuser'):
+        self.assertEqual(self._post('/api/register/check-id/', {'login_id': login_id}).status_code, 200)
+        self.assertEqual(self._post('/api/register/nickname/', {'login_id': login_id, 'nickname': '상태'}).status_code, 200)
+        self.assertEqual(self._post('/api/register/email/', {
+            'login_id': login_id, 'nickname': '상태', 'email': f'{login_id}@example.com', 'code': '999999'
+        }).status_code, 200)
+        self.assertEqual(self._post('/api/register/password/', {
+            'login_id': login_id, 'nickname': '상태', 'password': '123456'
+        }).status_code, 200)
+        self.assertEqual(self._post('/api/biometric/save-face/', {
+            'login_id': login_id, 'face_vectors': self.face_vectors
+        }).status_code, 200)
+
+    def test_full_registration(self):
+        """단계별 입력이 레코드 하나에 쌓이고, 완료 시 User 생성 후 삭제되는지 테스트"""
+        self._register_until_face()
+
+        state = registration_store.load('stateuser')
+        self.assertEqual(state.version, 5)
+        self.assertEqual(set(state.fields), {'id', 'nickname', 'email', 'password'})
+        self.assertEqual(state.face_array.shape, (5, 512))
+        # 얼굴 벡터는 float16 바이트 (5x512x2 + 헤더)
+        raw = registration_store._redis().get(registration_store._key('stateuser'))
+        self.assertLess(len(raw), 5 * 512 * 2 + 512)
+
+        response = self._post('/api/biometric/save-voice/', {'login_id': 'stateuser', 'voice_vectors': [[0.1] * 192] * 4})
+
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(login_id='stateuser')
+        self.assertTrue(user.check_password('123456'))
+        np.testing.assert_allclose(np.asarray(user.face_vectors), self.face_vectors, atol=1e-3)
+        self.assertIsNone(registration_store.load('stateuser'))
+
+    def test_expired_and_invalid_steps(self):
+        """이전 단계 없이 진행하거나 얼굴 벡터 형식이 잘못되면 400인지 테스트"""
+        response = self._post('/api/register/nickname/', {'login_id': 'nouser', 'nickname': '없음'})
+        self.assertEqual(response.status_code, 400)
+
+        self._register_until_face()
+        response = self._post('/api/biometric/save-face/', {'login_id': 'stateuser', 'face_vectors': [['x']]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['reason'], 'INVALID_PAYLOAD')
+        self.assertEqual(registration_store.load('stateuser').version, 5)
+
+    def test_concurrent_change_is_rejected(self):
+        """읽은 뒤 다른 요청이 바꿨으면(다시 시작 포함) 저장하지 않는지 테스트"""
+        registration_store.start('raceuser')
+
+        with self.assertRaises(RegistrationConflict):
+            with registration_store.edit('raceuser') as state:
+                with registration_store.edit('raceuser') as other:
+                    other.set(nickname='먼저')
+                state.set(nickname='나중')
+        self.assertEqual(registration_store.load('raceuser').get('nickname'), '먼저')
+
+        # 다시 시작한 회원가입은 version이 같아도 이전에 읽은 상태로는 저장되지 않음
+        registration_store.start('raceuser')
+        with self.assertRaises(RegistrationConflict):
+            with registration_store.edit('raceuser') as stale:
+                restarted = registration_store.start('raceuser')
+                self.assertEqual(restarted.version, stale.version)
+                stale.set(nickname='이전')
+        self.assertEqual(registration_store.load('raceuser').fields, {'id': 'raceuser'})
+
+    def test_voice_step_conflict_rolls_back_user(self):
+        """마지막 단계에서 충돌하면 409로 응답하고 생성한 User를 되돌리는지 테스트"""
+        self._register_until_face()
+
+        with patch.object(RegistrationStore, '_compare_and_set', return_value=False):
+            response = self._post('/api/biometric/save-voice/', {'login_id': 'stateuser', 'voice_vectors': None})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(User.objects.filter(login_id='stateuser').exists())
+        self.assertIsNotNone(registration_store.load('stateuser'))
@@ -25,6 +25,10 @@ urlpatterns = [
     path('api/session/command-log/', views.create_command_log, name='create_command_log'),
     path('api/session/end/', views.end_session, name='end_session'),
 
+    # ===== 명령 이력 / 통계 =====
+    path('api/command-log/history/', views.get_command_history, name='command_history'),
+    path('api/command-log/stats/', views.get_command_stats, name='command_stats'),
+
     # ===== 로그인 =====
     path('api/login/face/', views.face_login, name='face_login'),
     path('api/login/password/', views.password_login, name='password_login'),
@@ -0,0 +1,146 @@
+"""
+생체 벡터 바이너리 인코딩
+
+얼굴/음성 임베딩을 JSON 실수 목록 대신 헤더 + 패킹된 float16/float32 바이트로 저장합니다.
+
+형식 (little-endian):
+    magic(4s) = b'SVEC', version(B), dtype(B), ndim(B), 예약(x), shape(uint32 x ndim), 데이터
+
+- 5x512 얼굴 벡터: JSON 약 50KB → float16 5KB
+- 모델에서는 packed_vector_property로 기존과 같은 list 속성(user.face_vectors)을 제공
+"""
+import struct
+
+import numpy as np
+
+VECTOR_MAGIC = b'SVEC'
+VECTOR_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sBBBx')
+
+# 헤더의 dtype 코드
+DTYPE_CODES = {
+    'float16': 1,
+    'float32': 2,
+}
+_CODE_DTYPES = {code: np.dtype(name).newbyteorder('<') for name, code in DTYPE_CODES.items()}
+
+# 얼굴 임베딩 차원 (음성은 모델에 따라 192/256이라 차원을 고정하지 않음)
+FACE_VECTOR_DIM = 512
+
+
+def validate_vectors(vectors, dim=None):
+    """
+    API로 받은 벡터(1차원) / 벡터 목록(2차원) 형식 확인 (저장 전에 400으로 거르기 위해)
+
+    Args:
+        dim: 벡터 하나의 길이 (None이면 확인하지 않음)
+
+    Raises:
+        ValueError: 숫자가 아니거나, 행 길이가 다르거나, 비어 있거나, 길이가 dim이 아닌 입력
+    """
+    try:
+        array = np.asarray(vectors, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError('벡터는 길이가 같은 숫자 목록이어야 합니다.')
+
+    if array.ndim not in (1, 2) or array.size == 0:
+        raise ValueError(f'비어 있지 않은 1차원 또는 2차원 벡터여야 합니다: shape={array.shape}')
+    if not np.isfinite(array).all():
+        raise ValueError('벡터에 NaN/Inf가 있습니다.')
+    if dim is not None and array.shape[-1] != dim:
+        raise ValueError(f'벡터 길이는 {dim}이어야 합니다: {array.shape[-1]}')
+
+
+def pack_vectors(vectors, dtype='float16'):
+    """
+    벡터(1차원) 또는 벡터 목록(2차원)을 바이트로 인코딩
+
+    Args:
+        vectors: list / np.ndarray (None이면 None 반환)
+        dtype: 'float16' 또는 'float32'
+
+    Raises:
+        ValueError: 숫자 배열로 변환할 수 없거나 3차원 이상인 입력
+    """
+    if vectors is None:
+        return None
+
+    try:
+        array = np.asarray(vectors, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError('벡터는 숫자 목록이어야 합니다.')
+
+    if array.ndim not in (1, 2):
+        raise ValueError(f'1차원 또는 2차원 벡터만 저장할 수 있습니다: ndim={array.ndim}')
+    if dtype not in DTYPE_CODES:
+        raise ValueError(f'지원하지 않는 dtype입니다: {dtype}')
+
+    code = DTYPE_CODES[dtype]
+    header = _HEADER.pack(VECTOR_MAGIC, VECTOR_FORMAT_VERSION, code, array.ndim)
+    shape = struct.pack(f'<{array.ndim}I', *array.shape)
+    return header + shape + array.astype(_CODE_DTYPES[code], copy=False).tobytes()
+
+
+def unpack_array(data):
+    """
+    pack_vectors로 인코딩한 바이트를 float32 np.ndarray로 디코딩
+
+    Returns:
+        np.ndarray 또는 None (data가 None일 때)
+
+    Raises:
+        ValueError: 헤더가 올바르지 않은 데이터
+    """
+    if data is None:
+        return None
+
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise ValueError('벡터 데이터가 너무 짧습니다.')
+
+    magic, version, code, ndim = _HEADER.unpack_from(data)
+    if magic != VECTOR_MAGIC:
+        raise ValueError('벡터 데이터 형식이 아닙니다.')
+    if version != VECTOR_FORMAT_VERSION:
+        raise ValueError(f'지원하지 않는 벡터 형식 버전입니다: {version}')
+    if code not in _CODE_DTYPES:
+        raise ValueError(f'지원하지 않는 dtype 코드입니다: {code}')
+
+    shape = struct.unpack_from(f'<{ndim}I', data, _HEADER.size)
+    offset = _HEADER.size + 4 * ndim
+    array = np.frombuffer(data, dtype=_CODE_DTYPES[code], offset=offset)
+    if array.size != int(np.prod(shape)):
+        raise ValueError('벡터 데이터 길이가 헤더와 일치하지 않습니다.')
+
+    return array.reshape(shape).astype(np.float32)
+
+
+def unpack_vectors(data):
+    """바이트를 기존 JSON 형식과 같은 중첩 list로 디코딩"""
+    array = unpack_array(data)
+    return None if array is None else array.tolist()
+
+
+def packed_vector_property(field_name, dtype='float16', empty=None):
+    """
+    BinaryField(field_name)를 list 속성처럼 읽고 쓰는 모델 property 생성
+
+    Django는 모델 생성자 kwargs에 property 이름을 허용하므로
+    User.objects.create(face_vectors=[...])도 그대로 동작합니다.
+
+    Args:
+        field_name: 패킹된 바이트를 저장하는 BinaryField 이름
+        dtype: 저장 정밀도
+        empty: 값이 없을 때 반환할 기본값 생성 함수 (예: list)
+    """
+    def getter(instance):
+        data = getattr(instance, field_name)
+        if data is None:
+            return empty() if empty else None
+        return unpack_vectors(data)
+
+    def setter(instance, value):
+        setattr(instance, field_name, pack_vectors(value, dtype=dtype))
+
+    return property(getter, setter)
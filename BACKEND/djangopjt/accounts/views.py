@@ -2,7 +2,8 @@
 import numpy as np
 from rest_framework import status
 from rest_framework.decorators import api_view
-from django.views.decorators.csrf import csrf_exempt
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.core.exceptions import ValidationError
 from rest_framework.response import Response
 from django.db import transaction, models
 from django.core.cache import cache
@@ -10,18 +11,33 @@ from django.utils import timezone
 from datetime import timedelta
 from django.conf import settings
 import secrets
-import requests
 import logging
 import traceback
+import functools
+import json
 import os
 
 from .models import User, Phone, Sarvis, UserDeviceConnection, BiometricLog, EmailVerification, PasswordResetToken, Session, CommandLog, Preset
 from .tasks import notify_jetson_logout
+from .jetson_client import jetson, JetsonUnavailable
+from .command_log_writer import command_log_writer
+from .command_log_archive import decode_cursor, encode_cursor, history_page
+from . import command_stats
+from .dashboard_feed import dashboard_feed
+from .face_gallery import face_gallery
+from .vector_codec import FACE_VECTOR_DIM, validate_vectors
+from .command_ack import AckTimeout, request_ack
+from .cache_keys import ROBOT_ANGLE_CACHE_KEY
+from .registration_state import RegistrationConflict, registration_store
+from .presence import presence
+from .email_queue import EmailRateLimited, check_rate, queue_email
 from .serializers import (
     ConnectionDeleteSerializer,
     SessionCreateSerializer,
     CommandLogCreateSerializer,
     SessionEndSerializer,
+    CommandHistoryQuerySerializer,
+    CommandStatsQuerySerializer,
     PasswordLoginSerializer,
     AccountDeletionSerializer,
     FindLoginIdSerializer,
@@ -40,6 +56,9 @@ from .serializers import (
     ButtonCommandRequestSerializer,
 )
 from .auth_utils import generate_tokens_for_user, auto_login_for_user
+from .principal_cache import invalidate_principal
+from .query_budget import query_budget
+from .session_registry import session_registry
 from .decorators import jwt_required
 from django.contrib.auth.hashers import make_password
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -47,25 +66,65 @@ from rest_framework_simplejwt.exceptions import TokenError
 
 logger = logging.getLogger(__name__)
 
-JETSON_BASE_URL = "https://unforetold-jannet-hydropically.ngrok-free.dev"
 
+# 앱 확인 대기 시간 (초)
+YOUTUBE_ACK_TIMEOUT = 10
+VOICE_CALL_ACK_TIMEOUT = 10
 
-# 회원가입 정보 캐시 키 프리픽스
-REGISTRATION_CACHE_PREFIX = "registration:"
-# 캐시 만료 시간: 10분
-REGISTRATION_CACHE_TIMEOUT = 600
+# 앱 실행 결과를 기다리는 유튜브 명령
+YOUTUBE_COMMANDS = ['YOUTUBE_OPEN', 'YOUTUBE_SEEK_FORWARD', 'YOUTUBE_SEEK_BACKWARD', 'YOUTUBE_PAUSE', 'YOUTUBE_PLAY']
+
+
+def _load_request_json(request):
+    """
+    비동기 뷰용 요청 본문 파싱 (DRF request.data 대체)
+
+    form 요청이면 form 데이터, 그 외에는 JSON으로 파싱하며 실패 시 빈 dict를 반환합니다.
+    """
+    if request.content_type in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+        return request.POST.dict()
+    try:
+        data = json.loads(request.body) if request.body else {}
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.error(f"요청 JSON 파싱 실패: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _async_external_post(view):
+    """
+    비동기 뷰용 require_POST + csrf_exempt (젯슨에서 오는 외부 요청)
+
+    Django 4.2의 csrf_exempt / require_POST는 동기 뷰만 감싸므로(코루틴을 await하지 않음) 직접 처리합니다.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'POST':
+            return HttpResponseNotAllowed(['POST'])
+        return await view(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = True
+    return wrapper
 
 
 # ===== 회원가입 캐시 관리 헬퍼 =====
 def clear_registration_cache_by_login_id(login_id):
-    keys = [
-        f"{REGISTRATION_CACHE_PREFIX}{login_id}:nickname",
-        f"{REGISTRATION_CACHE_PREFIX}{login_id}:id",
-        f"{REGISTRATION_CACHE_PREFIX}{login_id}:email",
-        f"{REGISTRATION_CACHE_PREFIX}{login_id}:password",
-        f"{REGISTRATION_CACHE_PREFIX}{login_id}:face_vectors",
-    ]
-    cache.delete_many(keys)
+    registration_store.clear(login_id)
+
+
+def _registration_expired_response():
+    return Response({
+        'success': False,
+        'message': '이전 단계가 만료되었습니다. 처음부터 다시 진행해주세요.'
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _registration_conflict_response():
+    return Response({
+        'success': False,
+        'reason': 'REGISTRATION_CONFLICT',
+        'message': '다른 요청이 회원가입 정보를 변경했습니다. 다시 시도해주세요.'
+    }, status=status.HTTP_409_CONFLICT)
 
 
 # ===== 캐시 관리 =====
@@ -136,12 +195,8 @@ def register_step_id(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        # 회원가입 시작이므로, login_id 기준으로 캐시 초기화
-        clear_registration_cache_by_login_id(login_id)
-
-        # 아이디 캐시 저장
-        cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:id"
-        cache.set(cache_key, login_id, timeout=REGISTRATION_CACHE_TIMEOUT)
+        # 회원가입 시작이므로, login_id 기준으로 이전 진행 상태를 버리고 아이디 저장
+        registration_store.start(login_id)
 
         logger.info(f"[REGISTER START] login_id={login_id}")
 
@@ -176,17 +231,15 @@ def register_step_nickname(request):
             'message': '아이디와 닉네임이 필요합니다.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # 아이디가 캐시에 있는지 확인 (login_id를 키로 사용)
-    id_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:id"
-    if not cache.get(id_cache_key):
-        return Response({
-            'success': False,
-            'message': '아이디 입력이 만료되었습니다. 처음부터 다시 진행해주세요.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
     try:
-        # ✅ login_id를 키로 사용하여 닉네임 저장 (중복 검사 없음)
-        cache.set(f"{REGISTRATION_CACHE_PREFIX}{login_id}:nickname", nickname, timeout=REGISTRATION_CACHE_TIMEOUT)
+        # 아이디가 캐시에 있는지 확인 후 닉네임 저장 (중복 검사 없음)
+        with registration_store.edit(login_id) as state:
+            if state is None or not state.has('id'):
+                return Response({
+                    'success': False,
+                    'message': '아이디 입력이 만료되었습니다. 처음부터 다시 진행해주세요.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            state.set(nickname=nickname)
         
         logger.info(f"닉네임 저장 (캐시 저장): {nickname}, login_id={login_id}")
         
@@ -198,6 +251,8 @@ def register_step_nickname(request):
             'next_step': 'input_email'
         }, status=status.HTTP_200_OK)
         
+    except RegistrationConflict:
+        return _registration_conflict_response()
     except Exception as e:
         logger.error(f"닉네임 저장 오류: {str(e)}")
         logger.error(traceback.format_exc())
@@ -225,55 +280,41 @@ def register_step_email(request):
             'message': '아이디, 닉네임, 이메일, 인증 코드가 필요합니다.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # 닉네임과 아이디가 캐시에 있는지 확인 (login_id를 키로 사용)
-    nickname_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:nickname"
-    id_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:id"
-    
-    cached_nickname = cache.get(nickname_cache_key)
-    
-    if not cached_nickname or not cache.get(id_cache_key):
-        return Response({
-            'success': False,
-            'message': '이전 단계가 만료되었습니다. 처음부터 다시 진행해주세요.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # 닉네임 일치 확인
-    if cached_nickname != nickname:
-        return Response({
-            'success': False,
-            'message': '닉네임이 일치하지 않습니다.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # 이메일 중복 확인 (활성 회원만)
-    if User.objects.filter(email=email, is_active=True).exists():
-        return Response({
-            'success': False,
-            'message': '이미 사용 중인 이메일입니다.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # 이메일 인증 코드 검증
-    # 마스터키 인증 (개발 모드)
-    if code == "999999":
-        EmailVerification.objects.filter(email=email).delete()
-    else:
-        verification = EmailVerification.objects.filter(
-            email=email, 
-            verification_code=code,
-            expires_at__gt=timezone.now()
-        ).first()
-        
-        if not verification:
-            return Response({
-                'success': False,
-                'message': '인증 코드가 틀리거나 만료되었습니다.'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        verification.delete()
-    
     try:
-        # 캐시에 이메일 저장 (login_id를 키로 사용)
-        cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:email"
-        cache.set(cache_key, email, timeout=REGISTRATION_CACHE_TIMEOUT)
+        # 닉네임과 아이디가 캐시에 있는지 확인 후 이메일 저장 (login_id를 키로 사용)
+        with registration_store.edit(login_id) as state:
+            if state is None or not state.has('nickname', 'id'):
+                return _registration_expired_response()
+            
+            # 닉네임 일치 확인
+            if state.get('nickname') != nickname:
+                return Response({
+                    'success': False,
+                    'message': '닉네임이 일치하지 않습니다.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # 이메일 중복 확인 (활성 회원만)
+            if User.objects.filter(email=email, is_active=True).exists():
+                return Response({
+                    'success': False,
+                    'message': '이미 사용 중인 이메일입니다.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # 이메일 인증 코드 검증
+            # 마스터키 인증 (개발 모드)
+            verifications = EmailVerification.objects.filter(email=email)
+            if code != "999999":
+                verifications = verifications.filter(verification_code=code, expires_at__gt=timezone.now())
+                if not verifications.exists():
+                    return Response({
+                        'success': False,
+                        'message': '인증 코드가 틀리거나 만료되었습니다.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+            
+            state.set(email=email)
+        
+        # 저장된 뒤에 인증 코드 삭제 (충돌로 저장하지 못하면 같은 코드로 다시 시도 가능)
+        verifications.delete()
         
         logger.info(f"이메일 인증 완료 (캐시 저장): login_id={login_id}, email={email}")
         
@@ -284,6 +325,8 @@ def register_step_email(request):
             'next_step': 'input_password'
         }, status=status.HTTP_200_OK)
         
+    except RegistrationConflict:
+        return _registration_conflict_response()
     except Exception as e:
         logger.error(f"이메일 인증 오류: {str(e)}")
         logger.error(traceback.format_exc())
@@ -310,39 +353,27 @@ def register_step_password(request):
             'message': '아이디, 닉네임, 비밀번호가 필요합니다.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # 닉네임, 아이디, 이메일이 캐시에 있는지 확인 (login_id를 키로 사용)
-    nickname_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:nickname"
-    id_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:id"
-    email_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:email"
-    
-    cached_nickname = cache.get(nickname_cache_key)
-    
-    if not cached_nickname or not cache.get(id_cache_key) or not cache.get(email_cache_key):
-        return Response({
-            'success': False,
-            'message': '이전 단계가 만료되었습니다. 처음부터 다시 진행해주세요.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # 닉네임 일치 확인
-    if cached_nickname != nickname:
-        return Response({
-            'success': False,
-            'message': '닉네임이 일치하지 않습니다.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # 비밀번호 검증 (6자 숫자)
-    if len(password) != 6 or not password.isdigit():
-        return Response({
-            'success': False,
-            'message': '비밀번호는 6자 숫자입니다.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    
     try:
-        # 캐시에 비밀번호 저장 (login_id를 키로 사용)
-        hashed_password = make_password(password)
-        cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:password"
-        cache.set(cache_key, hashed_password, timeout=REGISTRATION_CACHE_TIMEOUT)
+        # 닉네임, 아이디, 이메일이 캐시에 있는지 확인 후 비밀번호 저장 (login_id를 키로 사용)
+        with registration_store.edit(login_id) as state:
+            if state is None or not state.has('nickname', 'id', 'email'):
+                return _registration_expired_response()
+            
+            # 닉네임 일치 확인
+            if state.get('nickname') != nickname:
+                return Response({
+                    'success': False,
+                    'message': '닉네임이 일치하지 않습니다.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # 비밀번호 검증 (6자 숫자)
+            if len(password) != 6 or not password.isdigit():
+                return Response({
+                    'success': False,
+                    'message': '비밀번호는 6자 숫자입니다.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            state.set(password=make_password(password))
         
         logger.info(f"비밀번호 검증 완료 (캐시 저장): login_id={login_id}")
         
@@ -352,6 +383,8 @@ def register_step_password(request):
             'next_step': 'upload_biometric_data'
         }, status=status.HTTP_200_OK)
         
+    except RegistrationConflict:
+        return _registration_conflict_response()
     except Exception as e:
         logger.error(f"비밀번호 검증 오류: {str(e)}")
         logger.error(traceback.format_exc())
@@ -373,11 +406,20 @@ def request_email_verification(request):
             'message': '이메일 주소가 필요합니다.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    # 주소당 발송 횟수 제한 (이전에 보낸 코드가 무효화되지 않도록 코드 생성 전에 확인)
+    try:
+        check_rate(email)
+    except EmailRateLimited as e:
+        return Response({
+            'success': False,
+            'message': '인증 코드 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.',
+            'retry_after': e.retry_after
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    
     try:
         EmailVerification.objects.filter(email=email).delete()
         
         import random
-        from django.core.mail import send_mail
         from django.template.loader import render_to_string
         
         verification_code = f"{random.randint(100000, 999999)}"
@@ -397,7 +439,7 @@ def request_email_verification(request):
             print(f"만료 시간: {expires_at}")
             print("====================")
         else:
-            # 프로덕션 모드: 실제 이메일 전송
+            # 프로덕션 모드: 메일 큐로 발송 (응답은 SMTP 전송을 기다리지 않음)
             subject = "[싸비스] 이메일 인증 코드"
             message = f"""
 안녕하세요,
@@ -412,18 +454,7 @@ def request_email_verification(request):
 싸비스 팀
             """
             
-            try:
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[email],
-                    fail_silently=False,
-                )
-                logger.info(f"이메일 발송 성공: {email}, 코드: {verification_code}")
-            except Exception as email_error:
-                logger.error(f"이메일 발송 실패: {str(email_error)}")
-                # 이메일 발송 실패시에도 인증 코드는 DB에 저장됨
+            queue_email(subject, message, email)
         
         return Response({
             'success': True,
@@ -506,6 +537,19 @@ def verify_email_code(request):
 
 
 # ===== 생체 정보 =====
+def invalid_vectors_response(field, vectors, dim=None):
+    """벡터 형식이 잘못되었으면 400 응답, 올바르면 None"""
+    try:
+        validate_vectors(vectors, dim=dim)
+    except ValueError as e:
+        return Response({
+            "success": False,
+            "reason": "INVALID_PAYLOAD",
+            "message": f"{field} 형식이 올바르지 않습니다: {e}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+
 @api_view(['POST'])
 def save_face_vector_from_jetson(request):
     """
@@ -524,28 +568,28 @@ def save_face_vector_from_jetson(request):
             "message": "login_id와 face_vectors가 필요합니다."
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # 회원가입 정보 캐시 확인
-    nickname_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:nickname"
-    id_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:id"
-    email_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:email"
-    password_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:password"
-    
-    cached_nickname = cache.get(nickname_cache_key)
-    cached_login_id = cache.get(id_cache_key)
-    email = cache.get(email_cache_key)
-    password = cache.get(password_cache_key)
-    
-    if not all([cached_nickname, cached_login_id, password, email]):
-        return Response({
-            "success": False,
-            "reason": "CACHE_EXPIRED",
-            "message": "회원가입 정보가 만료되었습니다. 처음부터 다시 진행해주세요."
-        }, status=status.HTTP_400_BAD_REQUEST)
+    invalid = invalid_vectors_response('face_vectors', face_vectors, dim=FACE_VECTOR_DIM)
+    if invalid:
+        return invalid
     
     try:
-        # 얼굴 벡터를 캐시에 임시 저장 (User 생성 안 함)
-        face_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:face_vectors"
-        cache.set(face_cache_key, face_vectors, timeout=REGISTRATION_CACHE_TIMEOUT)
+        # 회원가입 정보 캐시 확인 후 얼굴 벡터를 임시 저장 (User 생성 안 함)
+        with registration_store.edit(login_id) as state:
+            if state is None or not state.has('nickname', 'id', 'email', 'password'):
+                return Response({
+                    "success": False,
+                    "reason": "CACHE_EXPIRED",
+                    "message": "회원가입 정보가 만료되었습니다. 처음부터 다시 진행해주세요."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            try:
+                state.set_face_vectors(face_vectors)
+            except ValueError as e:
+                return Response({
+                    "success": False,
+                    "reason": "INVALID_PAYLOAD",
+                    "message": f"face_vectors 형식이 올바르지 않습니다: {e}"
+                }, status=status.HTTP_400_BAD_REQUEST)
         
         logger.info(f"얼굴 벡터 캐시 저장: login_id={login_id}")
         
@@ -556,6 +600,8 @@ def save_face_vector_from_jetson(request):
             "next_step": "upload_voice"
         }, status=status.HTTP_200_OK)
         
+    except RegistrationConflict:
+        return _registration_conflict_response()
     except Exception as e:
         logger.error(f"얼굴 벡터 캐시 저장 오류: {str(e)}")
         logger.error(traceback.format_exc())
@@ -590,122 +636,119 @@ def save_voice_vector_from_jetson(request):
             "message": "login_id가 필요합니다."
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    if voice_vectors:
+        invalid = invalid_vectors_response('voice_vectors', voice_vectors)
+        if invalid:
+            logger.error(f"[음성 등록 실패] 벡터 형식 오류: login_id={login_id}")
+            return invalid
+    
     try:
-        # 캐시에서 회원가입 정보 조회
-        nickname_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:nickname"
-        id_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:id"
-        email_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:email"
-        password_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:password"
-        face_cache_key = f"{REGISTRATION_CACHE_PREFIX}{login_id}:face_vectors"
-        
-        cached_nickname = cache.get(nickname_cache_key)
-        cached_login_id = cache.get(id_cache_key)
-        email = cache.get(email_cache_key)
-        hashed_password = cache.get(password_cache_key)
-        face_vectors = cache.get(face_cache_key)
-        
-        logger.info(f"[캐시 조회] nickname={cached_nickname}, login_id={cached_login_id}, email={email}, password={'*' * len(hashed_password) if hashed_password else None}, face_vectors_존재={face_vectors is not None}")
-        
-        if not all([cached_nickname, cached_login_id, hashed_password, email]):
-            logger.error("[음성 등록 실패] 캐시 만료 - 필요 정보 누락")
-            return Response({
-                "success": False,
-                "reason": "CACHE_EXPIRED",
-                "message": "회원가입 정보가 만료되었습니다. 처음부터 다시 진행해주세요."
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # User 생성 (탈퇴 회원도 포함하여 중복 체크)
-        logger.info(f"[User 생성 시작] login_id={cached_login_id}, email={email}, nickname={cached_nickname}")
-        
-        # # 이미 존재하는 이메일(활성+탈퇴)인지 확인
-        # if User.objects.filter(email=email).exists():
-        #     logger.error(f"[음성 등록 실패] 이미 존재하는 이메일: {email}")
-        #     return Response({
-        #         "success": False,
-        #         "reason": "EMAIL_ALREADY_EXISTS",
-        #         "message": "이미 사용 중인 이메일입니다. 새로운 이메일로 가입해주세요."
-        #     }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # 신규 회원 생성
-        user = User.objects.create(
-            login_id=cached_login_id,
-            email=email,
-            nickname=cached_nickname
-        )
+        # 캐시에서 회원가입 정보 조회 (완료 시 삭제 - 그 사이 다른 요청이 바꿨으면 RegistrationConflict)
+        with registration_store.edit(login_id) as state:
+            if state is None or not state.has('nickname', 'id', 'email', 'password'):
+                logger.error("[음성 등록 실패] 캐시 만료 - 필요 정보 누락")
+                return Response({
+                    "success": False,
+                    "reason": "CACHE_EXPIRED",
+                    "message": "회원가입 정보가 만료되었습니다. 처음부터 다시 진행해주세요."
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            cached_nickname = state.get('nickname')
+            cached_login_id = state.get('id')
+            email = state.get('email')
+            hashed_password = state.get('password')
+            face_vectors = state.face_vectors
+            
+            logger.info(f"[캐시 조회] nickname={cached_nickname}, login_id={cached_login_id}, email={email}, face_vectors_존재={face_vectors is not None}")
+        
+            # User 생성 (탈퇴 회원도 포함하여 중복 체크)
+            logger.info(f"[User 생성 시작] login_id={cached_login_id}, email={email}, nickname={cached_nickname}")
+        
+            # # 이미 존재하는 이메일(활성+탈퇴)인지 확인
+            # if User.objects.filter(email=email).exists():
+            #     logger.error(f"[음성 등록 실패] 이미 존재하는 이메일: {email}")
+            #     return Response({
+            #         "success": False,
+            #         "reason": "EMAIL_ALREADY_EXISTS",
+            #         "message": "이미 사용 중인 이메일입니다. 새로운 이메일로 가입해주세요."
+            #     }, status=status.HTTP_400_BAD_REQUEST)
+        
+            # 신규 회원 생성
+            user = User.objects.create(
+                login_id=cached_login_id,
+                email=email,
+                nickname=cached_nickname
+            )
         
-        # 이미 해시된 비밀번호 직접 설정 (이중 해시 방지)
-        user.password = hashed_password
-        user.save()
+            # 이미 해시된 비밀번호 직접 설정 (이중 해시 방지)
+            user.password = hashed_password
+            user.save()
 
-        logger.info(f"[User 생성 완료] user_id={user.user_id}, uid={user.uid}, login_id={user.login_id}")
-        
-        # 얼굴 벡터 저장 (캐시에서 가져옴)
-        if face_vectors:
-            logger.info(f"[얼굴 벡터 저장] login_id={user.login_id}, 벡터 길이={len(face_vectors)}")
-            BiometricLog.objects.create(
-                user=user,
-                change_type="face_update",
-                previous_vector=None,
-                new_vector=face_vectors,
-                change_reason="REGISTRATION"
-            )
-            user.face_vectors = face_vectors
-            logger.info(f"[얼굴 벡터 저장 완료] {user.login_id}")
-        else:
-            logger.info(f"[얼굴 벡터 없음] login_id={user.login_id}")
-        
-        # 음성 벡터 저장 (있는 경우에만)
-        if voice_vectors:
-            logger.info(f"[음성 벡터 저장 시작] login_id={user.login_id}, 벡터 길이={len(voice_vectors) if isinstance(voice_vectors, list) else 'N/A'}")
-            BiometricLog.objects.create(
-                user=user,
-                change_type="voice_update",
-                previous_vector=None,
-                new_vector=voice_vectors,
-                change_reason="REGISTRATION"
-            )
-            user.voice_vectors = voice_vectors
-            logger.info(f"[음성 벡터 저장 완료] {user.login_id}")
-        else:
-            logger.info(f"[음성 등록 건너뛰기] login_id={user.login_id}")
+            logger.info(f"[User 생성 완료] user_id={user.user_id}, uid={user.uid}, login_id={user.login_id}")
         
-        logger.info(f"[User 저장 시작] login_id={user.login_id}")
-        user.save()
-        logger.info(f"[User 저장 완료] login_id={user.login_id}")
+            # 얼굴 벡터 저장 (캐시에서 가져옴)
+            if face_vectors:
+                logger.info(f"[얼굴 벡터 저장] login_id={user.login_id}, 벡터 길이={len(face_vectors)}")
+                BiometricLog.objects.create(
+                    user=user,
+                    change_type="face_update",
+                    previous_vector=None,
+                    new_vector=face_vectors,
+                    change_reason="REGISTRATION"
+                )
+                user.face_vectors = face_vectors
+                logger.info(f"[얼굴 벡터 저장 완료] {user.login_id}")
+            else:
+                logger.info(f"[얼굴 벡터 없음] login_id={user.login_id}")
         
-        # 기본 프리셋 생성 (회원가입 시 자동 생성)
-        try:
-            # Preset은 connection에 종속되지 않음
-            # 기본 프리셋은 비활성 상태로 생성 (앱에서 선택 시 활성화)
-            default_preset = Preset.objects.create(
-                user=user,
-                preset_name='기본 프리셋',
-                servo1=90,
-                servo2=120,
-                servo3=0,
-                servo4=45,
-                servo5=90,
-                servo6=100,
-                is_active=False  # 비활성 상태로 생성
-            )
-            
-            logger.info(f"기본 프리셋 생성 완료: {default_preset.preset_id}, 사용자: {user.login_id}")
+            # 음성 벡터 저장 (있는 경우에만)
+            if voice_vectors:
+                logger.info(f"[음성 벡터 저장 시작] login_id={user.login_id}, 벡터 길이={len(voice_vectors) if isinstance(voice_vectors, list) else 'N/A'}")
+                BiometricLog.objects.create(
+                    user=user,
+                    change_type="voice_update",
+                    previous_vector=None,
+                    new_vector=voice_vectors,
+                    change_reason="REGISTRATION"
+                )
+                user.voice_vectors = voice_vectors
+                logger.info(f"[음성 벡터 저장 완료] {user.login_id}")
+            else:
+                logger.info(f"[음성 등록 건너뛰기] login_id={user.login_id}")
+        
+            logger.info(f"[User 저장 시작] login_id={user.login_id}")
+            user.save()
+            logger.info(f"[User 저장 완료] login_id={user.login_id}")
 
-        except Exception as e:
-            logger.error(f"기본 프리셋 생성 오류: {str(e)}")
-            # 프리셋 생성 실패가 회원가입 실패로 이어지지 않도록 예외 처리
-        
-        # 캐시 삭제
-        logger.info(f"[캐시 삭제 시작] login_id={login_id}")
-        keys_to_delete = [
-            nickname_cache_key,
-            id_cache_key,
-            email_cache_key,
-            password_cache_key,
-            face_cache_key
-        ]
-        cache.delete_many(keys_to_delete)
+            # 얼굴 갤러리에 신규 사용자 반영 (커밋 이후)
+            if face_vectors:
+                transaction.on_commit(lambda: face_gallery.upsert(user.user_id, face_vectors))
+        
+            # 기본 프리셋 생성 (회원가입 시 자동 생성)
+            try:
+                # Preset은 connection에 종속되지 않음
+                # 기본 프리셋은 비활성 상태로 생성 (앱에서 선택 시 활성화)
+                default_preset = Preset.objects.create(
+                    user=user,
+                    preset_name='기본 프리셋',
+                    servo1=90,
+                    servo2=120,
+                    servo3=0,
+                    servo4=45,
+                    servo5=90,
+                    servo6=100,
+                    is_active=False  # 비활성 상태로 생성
+                )
+            
+                logger.info(f"기본 프리셋 생성 완료: {default_preset.preset_id}, 사용자: {user.login_id}")
 
+            except Exception as e:
+                logger.error(f"기본 프리셋 생성 오류: {str(e)}")
+                # 프리셋 생성 실패가 회원가입 실패로 이어지지 않도록 예외 처리
+        
+            # 캐시 삭제 (with 블록을 벗어날 때)
+            state.delete()
+        
         logger.info(f"[캐시 삭제 완료] login_id={login_id}")
         
         logger.info(f"[회원가입 완료] {user.login_id}, uid={user.uid}")
@@ -718,6 +761,10 @@ def save_voice_vector_from_jetson(request):
         
         return Response(response_data, status=status.HTTP_200_OK)
         
+    except RegistrationConflict:
+        # 생성한 User / 프리셋 되돌림
+        transaction.set_rollback(True)
+        return _registration_conflict_response()
     except Exception as e:
         logger.error(f"[음성 등록 오류] {str(e)}")
         logger.error(traceback.format_exc())
@@ -747,8 +794,8 @@ def cosine_similarity(vec1, vec2):
 
 
 # ===== 로그인 =====
+@query_budget(9)  # 갤러리 최초 적재 + 기본 연결 생성 경로 포함
 @api_view(['POST'])
-@transaction.atomic
 def face_login(request):
     """
     젯슨 → Django: 얼굴 벡터로 로그인 요청
@@ -758,6 +805,9 @@ def face_login(request):
     - 젯슨에서 벡터 변환 후 서버로 로그인 요청
     - 서버에서 인증 후 토큰, 벡터, 로그인 성공여부
     - 젯슨에서 앱으로 결과 전달
+    
+    얼굴 매칭은 메모리 갤러리(face_gallery)에서 트랜잭션 밖에서 수행하고,
+    로그인 처리(세션 생성 등)만 트랜잭션으로 묶습니다.
     """
     input_vector = request.data.get('face_vectors')
     
@@ -773,23 +823,29 @@ def face_login(request):
         )
 
     THRESHOLD = 0.5
-    best_user = None
-    best_similarity = 0.0
 
-    users = User.objects.filter(is_active=True, face_vectors__isnull=False)
-
-    for user in users:
-        # 첫 번째 벡터(정면 사진)만 비교
-        face_vectors = user.face_vectors or []
-        if len(face_vectors) > 0:
-            stored_vector = face_vectors[0]
-            similarity = cosine_similarity(input_vector, stored_vector)
+    # 등록된 모든 포즈(최대 5개)와 한 번에 비교
+    try:
+        best_user_id, best_similarity = face_gallery.search(input_vector)
+    except ValueError:
+        return Response(
+            {
+                'success': False,
+                'reason': 'INVALID_REQUEST',
+                'fallback': 'PASSWORD_LOGIN',
+                'message': 'face_vectors 형식이 올바르지 않습니다.'
+            },
+            status=400
+        )
 
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_user = user
+    best_user = None
+    if best_user_id is not None and best_similarity >= THRESHOLD:
+        best_user = User.objects.filter(user_id=best_user_id, is_active=True).first()
+        if best_user is None:
+            # 다른 워커에서 탈퇴 처리된 사용자 - 갤러리에서 제거
+            face_gallery.remove(best_user_id)
 
-    if best_user is None or best_similarity < THRESHOLD:
+    if best_user is None:
         return Response(
             {
                 'success': False,
@@ -800,63 +856,66 @@ def face_login(request):
             status=401
         )
 
-    best_user.last_login_at = timezone.now()
-    best_user.save()
+    with transaction.atomic():
+        best_user.last_login_at = timezone.now()
+        best_user.save(update_fields=['last_login_at'])
 
-    # 토큰 생성 (Access + Refresh)
-    tokens = generate_tokens_for_user(best_user)
-    
-    # 활성 연결 찾기
-    active_connection = UserDeviceConnection.objects.filter(
-        user=best_user,
-        is_active=True,
-        deleted_at__isnull=True
-    ).order_by('-connected_at').first()
-    
-    # 세션 생성
-    try:
-        if active_connection:
-            session = Session.objects.create(connection=active_connection)
-            logger.info(f"얼굴 로그인 - 세션 생성 (연결 있음): {session.session_id}, 사용자: {best_user.login_id}")
-        else:
-            # 연결이 없는 경우: 기본 연결 생성
-            logger.info(f"얼굴 로그인 - 활성 연결 없음, 기본 연결 생성 시도: {best_user.login_id}")
-            
-            try:
-                # 기본 Phone 및 Sarvis 생성 (개발용)
-                from uuid import uuid4
-                
-                # 기본 Phone 생성 (user 필드 없음, device_name만 설정)
-                phone = Phone.objects.create(
-                    device_name=f'기본 폰 - {best_user.login_id} (자동 생성)'
-                )
-                
-                # 기본 Sarvis(IoT) 생성
-                sarvis = Sarvis.objects.create()
-                
-                # 연결 생성
-                new_connection = UserDeviceConnection.objects.create(
-                    user=best_user,
-                    phone=phone,
-                    sarvis=sarvis,
-                    is_active=True
-                )
-                
-                # 세션 생성
-                session = Session.objects.create(connection=new_connection)
-                logger.info(f"얼굴 로그인 - 기본 연결 및 세션 생성 완료: {session.session_id}, 사용자: {best_user.login_id}")
-                
-            except Exception as conn_error:
-                logger.error(f"얼굴 로그인 - 기본 연결 생성 실패: {str(conn_error)}")
-                # 연결 생성 실패 시 세션 없이 로그인 허용 (임시)
-                session = None
-                logger.warning(f"얼굴 로그인 - 세션 없이 로그인 허용 (연결 생성 실패): {best_user.login_id}")
+        # 토큰 생성 (Access + Refresh)
+        tokens = generate_tokens_for_user(best_user)
+        
+        # 활성 연결 찾기
+        active_connection = UserDeviceConnection.objects.filter(
+            user=best_user,
+            is_active=True,
+            deleted_at__isnull=True
+        ).order_by('-connected_at').first()
+        
+        # 세션 생성
+        try:
+            if active_connection:
+                session = Session.objects.create(connection=active_connection)
+                session_registry.register(session, best_user)
+                logger.info(f"얼굴 로그인 - 세션 생성 (연결 있음): {session.session_id}, 사용자: {best_user.login_id}")
+            else:
+                # 연결이 없는 경우: 기본 연결 생성
+                logger.info(f"얼굴 로그인 - 활성 연결 없음, 기본 연결 생성 시도: {best_user.login_id}")
                 
-    except Exception as e:
-        logger.error(f"얼굴 로그인 - 세션 생성 실패: {str(e)}")
-        session = None
+                try:
+                    # 기본 Phone 및 Sarvis 생성 (개발용)
+                    from uuid import uuid4
+                    
+                    # 기본 Phone 생성 (user 필드 없음, device_name만 설정)
+                    phone = Phone.objects.create(
+                        device_name=f'기본 폰 - {best_user.login_id} (자동 생성)'
+                    )
+                    
+                    # 기본 Sarvis(IoT) 생성
+                    sarvis = Sarvis.objects.create()
+                    
+                    # 연결 생성
+                    new_connection = UserDeviceConnection.objects.create(
+                        user=best_user,
+                        phone=phone,
+                        sarvis=sarvis,
+                        is_active=True
+                    )
+                    
+                    # 세션 생성
+                    session = Session.objects.create(connection=new_connection)
+                    session_registry.register(session, best_user)
+                    logger.info(f"얼굴 로그인 - 기본 연결 및 세션 생성 완료: {session.session_id}, 사용자: {best_user.login_id}")
+                    
+                except Exception as conn_error:
+                    logger.error(f"얼굴 로그인 - 기본 연결 생성 실패: {str(conn_error)}")
+                    # 연결 생성 실패 시 세션 없이 로그인 허용 (임시)
+                    session = None
+                    logger.warning(f"얼굴 로그인 - 세션 없이 로그인 허용 (연결 생성 실패): {best_user.login_id}")
+                    
+        except Exception as e:
+            logger.error(f"얼굴 로그인 - 세션 생성 실패: {str(e)}")
+            session = None
 
-    logger.info(f"얼굴 로그인 완료: {best_user.login_id}, 젯슨으로 전달 (토큰 + 벡터)")
+    logger.info(f"얼굴 로그인 완료: {best_user.login_id} (유사도 {best_similarity:.3f}), 젯슨으로 전달 (토큰 + 벡터)")
 
     # 젯슨으로 전달할 응답 (젯슨이 앱에 전달)
     response_data = {
@@ -875,8 +934,8 @@ def face_login(request):
 
     return Response(response_data, status=200)
 
+@query_budget(8)  # 기본 연결 생성 경로 포함
 @api_view(['POST'])
-@transaction.atomic
 def password_login(request):
     """
     앱 → Django: 아이디/비밀번호로 로그인 요청
@@ -885,6 +944,8 @@ def password_login(request):
     - 앱에서 서버로 직접 로그인 요청
     - 서버에서 인증 후 토큰, 프리셋 정보 반환
     - 젯슨은 비밀번호 로그인에 참여하지 않음
+    
+    DB 저장은 젯슨 전송 전에 커밋합니다 (젯슨 응답 대기 중 트랜잭션을 열어두지 않음).
     """
     serializer = PasswordLoginSerializer(data=request.data)
     
@@ -907,7 +968,7 @@ def password_login(request):
             }, status=status.HTTP_401_UNAUTHORIZED)
         
         user.last_login_at = timezone.now()
-        user.save()
+        user.save(update_fields=['last_login_at'])
         
         # 토큰 생성 (Access + Refresh)
         tokens = generate_tokens_for_user(user)
@@ -923,34 +984,37 @@ def password_login(request):
         try:
             if active_connection:
                 session = Session.objects.create(connection=active_connection)
+                session_registry.register(session, user)
                 logger.info(f"비밀번호 로그인 - 세션 생성 (연결 있음): {session.session_id}, 사용자: {user.login_id}")
             else:
                 # 연결이 없는 경우: 기본 연결 생성
                 logger.info(f"비밀번호 로그인 - 활성 연결 없음, 기본 연결 생성 시도: {user.login_id}")
                 
                 try:
-                    # 기본 Phone 및 Sarvis 생성 (개발용)
-                    from uuid import uuid4
+                    with transaction.atomic():
+                        # 기본 Phone 및 Sarvis 생성 (개발용)
+                        from uuid import uuid4
                     
-                    # 기본 Phone 생성 (user 필드 없음, device_name만 설정)
-                    phone = Phone.objects.create(
-                        device_name=f'기본 폰 - {user.login_id} (자동 생성)'
-                    )
+                        # 기본 Phone 생성 (user 필드 없음, device_name만 설정)
+                        phone = Phone.objects.create(
+                            device_name=f'기본 폰 - {user.login_id} (자동 생성)'
+                        )
                     
-                    # 기본 Sarvis(IoT) 생성
-                    sarvis = Sarvis.objects.create()
+                        # 기본 Sarvis(IoT) 생성
+                        sarvis = Sarvis.objects.create()
                     
-                    # 연결 생성
-                    new_connection = UserDeviceConnection.objects.create(
-                        user=user,
-                        phone=phone,
-                        sarvis=sarvis,
-                        is_active=True
-                    )
+                        # 연결 생성
+                        new_connection = UserDeviceConnection.objects.create(
+                            user=user,
+                            phone=phone,
+                            sarvis=sarvis,
+                            is_active=True
+                        )
                     
-                    # 세션 생성
-                    session = Session.objects.create(connection=new_connection)
-                    logger.info(f"비밀번호 로그인 - 기본 연결 및 세션 생성 완료: {session.session_id}, 사용자: {user.login_id}")
+                        # 세션 생성
+                        session = Session.objects.create(connection=new_connection)
+                        session_registry.register(session, user)
+                        logger.info(f"비밀번호 로그인 - 기본 연결 및 세션 생성 완료: {session.session_id}, 사용자: {user.login_id}")
                     
                 except Exception as conn_error:
                     logger.error(f"비밀번호 로그인 - 기본 연결 생성 실패: {str(conn_error)}")
@@ -966,19 +1030,13 @@ def password_login(request):
 
         # 젯슨으로 로그인 성공 신호 및 사용자 정보 전송
         try:
-            jetson_url = f"{JETSON_BASE_URL}/login_credentials"
             jetson_data = {
                 'uid': str(user.uid),
                 'face_vectors': user.face_vectors,
                 'voice_vectors': user.voice_vectors
             }
 
-            headers = {
-                "ngrok-skip-browser-warning": "69420",
-                "Content-Type": "application/json"  
-            }
-
-            jetson_response = requests.post(jetson_url, json=jetson_data, headers=headers, timeout=10)
+            jetson_response = jetson.post('/login_credentials', jetson_data)
             
             if jetson_response.status_code == 200:
                 logger.info(f"비밀번호 로그인 - Jetson 전송 성공: {user.login_id}")
@@ -990,7 +1048,7 @@ def password_login(request):
                 }, status=status.HTTP_502_BAD_GATEWAY)
                 
             
-        except requests.exceptions.RequestException as e:
+        except JetsonUnavailable as e:
             logger.error(f"비밀번호 로그인 - 로봇 통신 오류: {str(e)}")
             # Jetson 통신 실패 시 로그인 실패로 처리
             return Response({
@@ -1047,6 +1105,10 @@ def update_face_vector_from_jetson(request):
             "message": "uid와 face_vectors가 필요합니다."
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    invalid = invalid_vectors_response('face_vectors', face_vectors, dim=FACE_VECTOR_DIM)
+    if invalid:
+        return invalid
+    
     try:
         user = User.objects.get(uid=uid, is_active=True)
 
@@ -1061,6 +1123,9 @@ def update_face_vector_from_jetson(request):
         user.face_vectors = face_vectors
         user.save()
 
+        # 얼굴 갤러리에서 해당 사용자 행만 교체 (커밋 이후)
+        transaction.on_commit(lambda: face_gallery.upsert(user.user_id, face_vectors))
+
         logger.info(f"얼굴 벡터 업데이트 완료: uid={uid}, login_id={user.login_id}")
 
         return Response({
@@ -1107,6 +1172,10 @@ def update_voice_vector_from_jetson(request):
             "message": "uid와 voice_vectors가 필요합니다."
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    invalid = invalid_vectors_response('voice_vectors', voice_vectors)
+    if invalid:
+        return invalid
+    
     try:
         user = User.objects.get(uid=uid, is_active=True)
 
@@ -1188,6 +1257,7 @@ def delete_connection(request):
     connection.is_active = False
     connection.deleted_at = timezone.now()
     connection.save()
+    session_registry.invalidate(request.user.uid)
 
     return Response(
         {
@@ -1232,6 +1302,7 @@ def start_session(request):
         )
 
     session = Session.objects.create(connection=connection)
+    session_registry.register(session, request.user)
 
     return Response(
         {
@@ -1280,6 +1351,8 @@ def create_command_log(request):
         is_success=serializer.validated_data.get('is_success', False),
         error_message=serializer.validated_data.get('error_message'),
     )
+    command_stats.rollup(created=[log])
+    transaction.on_commit(lambda: dashboard_feed.publish_log(log))
 
     return Response(
         {
@@ -1291,6 +1364,80 @@ def create_command_log(request):
     )
 
 
+@query_budget(4)
+@api_view(['GET'])
+@jwt_required
+def get_command_history(request):
+    """
+    명령 이력 조회 (최신순, 커서 페이지네이션)
+
+    앱 → 서버: ?limit=20&cursor=<next_cursor>&session_id=<선택>
+    서버 → 앱: 로그 목록 + next_cursor (마지막 페이지면 null)
+    보관 기간이 지나 압축 보관된 로그도 이어서 조회됩니다.
+    """
+    serializer = CommandHistoryQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    before = None
+    if serializer.validated_data.get('cursor'):
+        try:
+            before = decode_cursor(serializer.validated_data['cursor'])
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': '잘못된 커서입니다.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    rows, has_more = history_page(
+        request.user.user_id,
+        before=before,
+        limit=serializer.validated_data['limit'],
+        session_id=serializer.validated_data.get('session_id'),
+    )
+    return Response({
+        'success': True,
+        'count': len(rows),
+        'logs': [
+            {
+                'command_log_id': row['command_log_id'],
+                'session_id': row['session_id'],
+                'command_type': row['command_type'],
+                'command_content': row['command_content'],
+                'is_success': row['is_success'],
+                'error_message': row['error_message'],
+                'occurred_at': row['created_at'],
+            }
+            for row in rows
+        ],
+        'next_cursor': encode_cursor(rows[-1]) if has_more else None,
+    }, status=status.HTTP_200_OK)
+
+
+@query_budget(3)
+@api_view(['GET'])
+@jwt_required
+def get_command_stats(request):
+    """
+    명령 통계 조회 (명령별 성공률, 일자별 건수)
+
+    앱 → 서버: ?days=30
+    집계 테이블(command_log_daily_stat)만 읽습니다 - 로그 저장 시 증분 갱신됨.
+    """
+    serializer = CommandStatsQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    until = command_stats.today()
+    since = until - timedelta(days=serializer.validated_data['days'] - 1)
+    return Response({
+        'success': True,
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        **command_stats.user_stats(request.user.user_id, since, until),
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @jwt_required
 @transaction.atomic
@@ -1318,6 +1465,7 @@ def end_session(request):
 
     session.ended_at = timezone.now()
     session.save()
+    session_registry.invalidate(request.user.uid)
 
     return Response(
         {
@@ -1404,8 +1552,7 @@ def logout(request):
             models.Q(ended_at__isnull=True)
         )
         
-        ended_count = sessions.count()
-        sessions.update(ended_at=timezone.now())
+        ended_count = sessions.update(ended_at=timezone.now())
         
         # 사용자의 모든 활성 connection 비활성화
         connections = UserDeviceConnection.objects.filter(
@@ -1420,8 +1567,11 @@ def logout(request):
         
         logger.info(f"로그아웃 성공: {request.user.login_id}, 종료된 세션 수: {ended_count}")
 
-        # [수정] tasks.py의 헬퍼 함수를 사용하여 젯슨에게 로그아웃 통지
-        notify_jetson_logout(request.user)
+        # [수정] tasks.py의 헬퍼 함수를 사용하여 젯슨에게 로그아웃 통지 (커밋 이후, 트랜잭션 밖에서 대기)
+        user = request.user
+        transaction.on_commit(lambda: notify_jetson_logout(user))
+        invalidate_principal(user.user_id)
+        session_registry.invalidate(user.uid)
         
         return Response({
             'success': True,
@@ -1436,6 +1586,7 @@ def logout(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(2)
 @api_view(['GET'])
 @jwt_required
 def get_presets(request):
@@ -1444,15 +1595,15 @@ def get_presets(request):
         # print(f"DEBUG: Request User -> {request.user} (ID: {request.user.id if hasattr(request.user, 'id') else 'No ID'})")
 
         # 2. 쿼리 실행
-        presets = Preset.objects.filter(user=request.user)
-        # print(f"DEBUG: Found {presets.count()} presets")
+        presets = list(Preset.objects.filter(user=request.user))
+        # print(f"DEBUG: Found {len(presets)} presets")
 
         # 3. 직렬화 (이 단계에서 에러가 많이 납니다)
         serializer = PresetSerializer(presets, many=True)
         
         return Response({
             'success': True,
-            'count': presets.count(),
+            'count': len(presets),
             'presets': serializer.data
         }, status=status.HTTP_200_OK)
 
@@ -1465,6 +1616,7 @@ def get_presets(request):
             'message': f'서버 내부 에러: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@query_budget(4)
 @api_view(['POST'])
 @jwt_required
 def select_preset(request):
@@ -1489,12 +1641,13 @@ def select_preset(request):
             user=request.user
         )
         
-        # 기존 활성 프리셋 비활성화
-        Preset.objects.filter(user=request.user, is_active=True).update(is_active=False)
-        
-        # 선택한 프리셋 활성화
-        preset.is_active = True
-        preset.save()
+        with transaction.atomic():
+            # 기존 활성 프리셋 비활성화
+            Preset.objects.filter(user=request.user, is_active=True).update(is_active=False)
+            
+            # 선택한 프리셋 활성화
+            preset.is_active = True
+            preset.save(update_fields=['is_active'])
         logger.info(f"프리셋 활성화: {preset.preset_id}, 이름: {preset.preset_name}, 사용자: {request.user.login_id}")
         
         # 프리셋 데이터 (offsets로 묶어서 전송)
@@ -1514,27 +1667,22 @@ def select_preset(request):
             'preset_name': preset.preset_name,
             'offsets': offsets,
         }
-        headers = {
-            "ngrok-skip-browser-warning": "69420",
-            "Content-Type": "application/json"  # 추가
-        }
 
-        # Jetson으로 로그인 성공 신호 + 프리셋 값 전송
+        # Jetson으로 로그인 성공 신호 + 프리셋 값 전송 (프리셋 저장 커밋 이후)
         try:
-            jetson_url = f"{JETSON_BASE_URL}/update_user_offsets"
             jetson_data = {
                 'uid': str(request.user.uid),
                 'offsets': offsets
             }
             
-            jetson_response = requests.post(jetson_url, json=jetson_data, headers=headers, timeout=10)
+            jetson_response = jetson.post('/update_user_offsets', jetson_data)
             
             if jetson_response.status_code == 200:
                 logger.info(f"프리셋 선택 - Jetson 전송 성공: {request.user.login_id}, 프리셋: {preset_id}")
             else:
                 logger.warning(f"프리셋 선택 - Jetson 전송 실패 (HTTP {jetson_response.status_code}): {request.user.login_id}")
                 
-        except requests.exceptions.RequestException as e:
+        except JetsonUnavailable as e:
             logger.error(f"프리셋 선택 - Jetson 통신 오류: {str(e)}")
             # Jetson 통신 실패 시에도 프리셋 선택은 성공으로 처리
         
@@ -1562,7 +1710,6 @@ def select_preset(request):
 
 @api_view(['POST'])
 @jwt_required
-@transaction.atomic
 def update_preset(request):
     """
     앱에서 수동 제어 후 프리셋 수정
@@ -1601,14 +1748,8 @@ def update_preset(request):
                 'message': '활성화된 프리셋이 없습니다.'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # 젯슨으로 현재 로봇팔 위치 요청
-        jetson_url = f"{JETSON_BASE_URL}/offsets_save"
-        headers = {
-            "ngrok-skip-browser-warning": "69420",
-            "Content-Type": "application/json"
-        }
-
-        jetson_response = requests.post(jetson_url, headers=headers, timeout=10)
+        # 젯슨으로 현재 로봇팔 위치 요청 (트랜잭션 밖에서 대기)
+        jetson_response = jetson.post('/offsets_save')
 
         if jetson_response.status_code != 200:
             logger.warning(f"젯슨에서 위치값 가져오기 실패 (HTTP {jetson_response.status_code})")
@@ -1684,7 +1825,7 @@ def update_preset(request):
             'message': '프리셋을 찾을 수 없습니다.'
         }, status=status.HTTP_404_NOT_FOUND)
         
-    except requests.exceptions.RequestException as e:
+    except JetsonUnavailable as e:
         logger.error(f"젯슨 통신 오류: {str(e)}")
         return Response({
             'success': False,
@@ -1839,6 +1980,7 @@ def update_robot_angle(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@query_budget(3)
 @api_view(['POST'])
 @jwt_required
 @transaction.atomic
@@ -1869,6 +2011,7 @@ def control_screen_enter(request):
 
     # 활성 세션 확인 - 항상 새 세션 생성 (로그인할 때마다 새 세션)
     session = Session.objects.create(connection=connection)
+    session_registry.register(session, request.user)
     logger.info(f"제어 화면 진입 - 새 세션 생성: {session.session_id}, 사용자: {request.user.login_id}")
 
     return Response({
@@ -1879,9 +2022,9 @@ def control_screen_enter(request):
     }, status=status.HTTP_200_OK)
 
 
-@api_view(['POST'])
-@transaction.atomic
-def voice_command_from_jetson(request):
+@query_budget(2)
+@_async_external_post
+async def voice_command_from_jetson(request):
     """
     젯슨 음성 명령 수신
     
@@ -1895,18 +2038,19 @@ def voice_command_from_jetson(request):
        - Django → Jetson으로 성공/실패 여부 반환
     4. 유튜브가 아닌 명령: DB에만 저장
     
+    앱 실행 결과는 채널 레이어 응답 채널로 받습니다 (command_ack).
+    비동기 뷰이므로 결과를 기다리는 동안 워커를 점유하지 않습니다.
+    
     지원하는 명령:
     - 유튜브: YOUTUBE_OPEN, YOUTUBE_SEEK, YOUTUBE_PAUSE, YOUTUBE_PLAY
     - 로봇 제어: TRACK_OFF, TRACK_ON, COME_HERE, LEFT, RIGHT, UP, DOWN, FORWARD, BACKWARD, HOME
     """
-    from channels.layers import get_channel_layer
-    from asgiref.sync import async_to_sync
-    import time
-    
-    serializer = VoiceCommandFromJetsonSerializer(data=request.data)
+    data = _load_request_json(request)
+
+    serializer = VoiceCommandFromJetsonSerializer(data=data)
     if not serializer.is_valid():
-        logger.warning(f"VoiceCommandFromJetsonSerializer validation 실패: {serializer.errors}, request.data={request.data}")
-        return Response({
+        logger.warning(f"VoiceCommandFromJetsonSerializer validation 실패: {serializer.errors}, request.data={data}")
+        return JsonResponse({
             'success': False,
             'errors': serializer.errors
         }, status=status.HTTP_400_BAD_REQUEST)
@@ -1914,166 +2058,111 @@ def voice_command_from_jetson(request):
     uid = serializer.validated_data['uid']
     command = serializer.validated_data['command']
 
-    try:
-        # uid로 사용자 찾기
-        user = User.objects.get(uid=uid, is_active=True)
-    except User.DoesNotExist:
-        return Response({
-            'success': False,
-            'message': '사용자를 찾을 수 없습니다.'
-        }, status=status.HTTP_404_NOT_FOUND)
+    # uid 사용자의 활성 세션 찾기 (세션 레지스트리, 없으면 DB)
+    session = await session_registry.aresolve(uid)
 
-    # 활성 세션 찾기
-    active_session = Session.objects.filter(
-        connection__user=user,
-        connection__is_active=True,
-        connection__deleted_at__isnull=True,
-        ended_at__isnull=True
-    ).order_by('-started_at').first()
+    if not session:
+        if not await User.objects.filter(uid=uid, is_active=True).aexists():
+            return JsonResponse({
+                'success': False,
+                'message': '사용자를 찾을 수 없습니다.'
+            }, status=status.HTTP_404_NOT_FOUND)
 
-    if not active_session:
-        logger.warning(f"음성 명령 수신 - 활성 세션 없음: uid={uid}, login_id={user.login_id}")
-        return Response({
+        logger.warning(f"음성 명령 수신 - 활성 세션 없음: uid={uid}")
+        return JsonResponse({
             'success': False,
             'message': '활성 세션이 없습니다.'
         }, status=status.HTTP_404_NOT_FOUND)
 
-    session = active_session
-    
-    # ✅ session_id 정의
     session_id = str(session.session_id)
     
-    # 명령 로그 생성 (항상)
+    if command not in YOUTUBE_COMMANDS:
+        # 유튜브가 아닌 명령: 로그만 저장 (command_log_writer가 DB에 일괄 저장)
+        event_id = await command_log_writer.arecord(
+            session.session_id, 'VOICE_COMMAND', command, is_success=True
+        )
+        
+        logger.info(f"음성 명령 로그 기록: {event_id}, 명령: {command}, uid={uid}, login_id={session.login_id}")
+        logger.info(f"음성 명령 DB 저장 완료 (유튜브 아님): {command}, session_id={session_id}")
+        
+        # 젯슨에 저장 성공 응답
+        return JsonResponse({
+            'success': True
+        }, status=status.HTTP_200_OK)
+
+    # 유튜브 명령: 로그 기록 (초기: 실패 상태, 앱 확인 후 업데이트)
     # command_type: VOICE_COMMAND (고정)
     # command_content: 실제 명령어
-    log = CommandLog.objects.create(
-        session=session,
-        command_type='VOICE_COMMAND',
-        command_content=command,
-        is_success=False  # 초기: 실패 상태, 앱 확인 후 업데이트
+    event_id = await command_log_writer.arecord(
+        session.session_id, 'VOICE_COMMAND', command, is_success=False
     )
 
-    logger.info(f"음성 명령 로그 저장: {log.command_log_id}, 명령: {command}, uid={uid}, login_id={user.login_id}")
+    logger.info(f"음성 명령 로그 기록: {event_id}, 명령: {command}, uid={uid}, login_id={session.login_id}")
 
-    # 유튜브 명령인지 확인
-    youtube_commands = ['YOUTUBE_OPEN', 'YOUTUBE_SEEK_FORWARD', 'YOUTUBE_SEEK_BACKWARD', 'YOUTUBE_PAUSE', 'YOUTUBE_PLAY']
-    
-    if command in youtube_commands:
-        # 유튜브 명령: 앱으로 전송 후 실행 결과 대기
-        try:
-            session_id = str(session.session_id)  # session_id 변수 정의
-            
-            # 캐시에서 웹소켓 연결 확인
-            websocket_info = cache.get(f'websocket:{session_id}')
-            
-            if not websocket_info or not websocket_info.get('connected'):
-                logger.warning(f"음성 명령 수신 - 웹소켓 연결 없음: session_id={session_id}")
-                # WebSocket 연결 없으면 실패 처리
-                log.error_message = 'WebSocket 연결 없음'
-                log.save()
-                
-                return Response({
-                    'success': False,
-                    'message': '앱 연결이 없습니다.'
-                }, status=status.HTTP_404_NOT_FOUND)
-            
-            # 캐시에 대기 상태 설정 (앱 확인 기다림)
-            youtube_command_key = f'youtube_command_wait:{session_id}'
-            cache.set(youtube_command_key, 'waiting', timeout=10)  # 10초 대기
-            
-            # 채널 레이어 가져오기
-            channel_layer = get_channel_layer()
+    # 앱으로 전송 후 실행 결과 대기
+    try:
+        # 연결 레지스트리에서 앱 웹소켓 연결 확인
+        if not await presence.ais_online(session_id):
+            logger.warning(f"음성 명령 수신 - 웹소켓 연결 없음: session_id={session_id}")
+            # WebSocket 연결 없으면 실패 처리
+            await command_log_writer.aupdate(event_id, error_message='WebSocket 연결 없음')
             
+            return JsonResponse({
+                'success': False,
+                'message': '앱 연결이 없습니다.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        message_data = {
+            'type': 'youtube_command',
+            'command': command,
+            'timestamp': timezone.now().isoformat()
+        }
+        
+        logger.info(f"유튜브 명령 WebSocket 전송, 앱 실행 결과 대기 시작: 명령={command}, session_id={session_id}")
+        
+        try:
             # 그룹 이름: app_{session_id}
-            group_name = f'app_{session_id}'
-            
-            message_data = {
-                'type': 'youtube_command',
-                'command': command,
-                'timestamp': timezone.now().isoformat()
-            }
-            
-            # 비동기 함수를 동기적으로 호출
-            async_to_sync(channel_layer.group_send)(
-                group_name,
-                {
-                    'type': 'youtube_command',
-                    'data': message_data
-                }
-            )
-            
-            logger.info(f"유튜브 명령 WebSocket 전송, 앱 실행 결과 대기 시작: 명령={command}, session_id={session_id}")
-            
-            # 앱 실행 결과 대기 (폴링, 최대 10초)
-            max_wait_time = 10
-            check_interval = 0.1  # 100ms마다 확인
-            elapsed_time = 0
-            
-            while elapsed_time < max_wait_time:
-                wait_status = cache.get(youtube_command_key)
-                if wait_status in ['success', 'failed']:
-                    # 앱에서 실행 결과 반환
-                    command_success = (wait_status == 'success')
-                    
-                    # DB 로그 업데이트
-                    log.is_success = command_success
-                    if not command_success:
-                        log.error_message = '앱 명령 실행 실패'
-                    log.save()
-                    
-                    logger.info(f"앱 명령 실행 완료: 명령={command}, 성공={command_success}, session_id={session_id}")
-                    
-                    # 캐시 정리
-                    cache.delete(youtube_command_key)
-                    
-                    return Response({
-                        'success': command_success
-                    }, status=status.HTTP_200_OK if command_success else status.HTTP_500_INTERNAL_SERVER_ERROR)
-                
-                time.sleep(check_interval)
-                elapsed_time += check_interval
-            
+            ack = await request_ack(f'app_{session_id}', 'youtube_command', message_data, timeout=YOUTUBE_ACK_TIMEOUT)
+        except AckTimeout:
             # 타임아웃: 앱에서 실행 결과 없음
             logger.warning(f"앱 명령 실행 타임아웃: 명령={command}, session_id={session_id}")
-            cache.delete(youtube_command_key)
             
-            # DB 로그 업데이트
-            log.error_message = '앱 응답 타임아웃'
-            log.save()
+            await command_log_writer.aupdate(event_id, error_message='앱 응답 타임아웃')
             
-            return Response({
+            return JsonResponse({
                 'success': False,
                 'message': '앱 응답 타임아웃'
             }, status=status.HTTP_408_REQUEST_TIMEOUT)
-            
-        except Exception as e:
-            logger.error(f"유튜브 명령 처리 오류: {str(e)}")
-            logger.error(traceback.format_exc())
-            
-            # DB 로그 업데이트
-            log.is_success = False
-            log.error_message = f'처리 오류: {str(e)}'
-            log.save()
-            
-            return Response({
-                'success': False,
-                'message': '명령 처리 중 오류 발생'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    else:
-        # 유튜브가 아닌 명령: DB에만 저장
-        log.is_success = True  # 저장 성공
-        log.save()
         
-        logger.info(f"음성 명령 DB 저장 완료 (유튜브 아님): {command}, session_id={session.session_id}")
+        # 앱에서 실행 결과 반환 → 로그 업데이트
+        command_success = bool(ack.get('success'))
+        await command_log_writer.aupdate(
+            event_id,
+            is_success=command_success,
+            error_message=None if command_success else '앱 명령 실행 실패'
+        )
         
-        # 젯슨에 저장 성공 응답
-        return Response({
-            'success': True
-        }, status=status.HTTP_200_OK)
+        logger.info(f"앱 명령 실행 완료: 명령={command}, 성공={command_success}, session_id={session_id}")
+        
+        return JsonResponse({
+            'success': command_success
+        }, status=status.HTTP_200_OK if command_success else status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+    except Exception as e:
+        logger.error(f"유튜브 명령 처리 오류: {str(e)}")
+        logger.error(traceback.format_exc())
+        
+        # 로그 업데이트
+        await command_log_writer.aupdate(event_id, is_success=False, error_message=f'처리 오류: {str(e)}')
+        
+        return JsonResponse({
+            'success': False,
+            'message': '명령 처리 중 오류 발생'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 # ===== 사용자 프로필 =====
+@query_budget(2)
 @api_view(['GET'])
 @jwt_required
 def get_user_profile(request):
@@ -2106,6 +2195,7 @@ def update_user_profile(request):
             
     user.nickname = nickname
     user.save()
+    invalidate_principal(user.user_id)
     
     return Response({
         'success': True,
@@ -2171,6 +2261,16 @@ def request_password_reset(request):
     if not user:
         return Response({"success": False, "message": "일치하는 유저가 없습니다."}, status=404)
     
+    # 주소당 발송 횟수 제한 (이전에 보낸 코드가 무효화되지 않도록 코드 생성 전에 확인)
+    try:
+        check_rate(email)
+    except EmailRateLimited as e:
+        return Response({
+            "success": False,
+            "message": "인증 코드 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+            "retry_after": e.retry_after
+        }, status=429)
+    
     # 비밀번호 재설정용 인증 코드 생성
     import random
     verification_code = f"{random.randint(100000, 999999)}"
@@ -2191,9 +2291,7 @@ def request_password_reset(request):
         print(f"만료 시간: {timezone.now() + timezone.timedelta(minutes=5)}")
         print("====================")
     else:
-        # 프로덕션 모드: 실제 이메일 전송
-        from django.core.mail import send_mail
-        
+        # 프로덕션 모드: 메일 큐로 발송 (응답은 SMTP 전송을 기다리지 않음)
         subject = "[싸비스] 비밀번호 재설정 인증 코드"
         message = f"""
 안녕하세요,
@@ -2208,17 +2306,7 @@ def request_password_reset(request):
 싸비스 팀
         """
         
-        try:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                fail_silently=False,
-            )
-            logger.info(f"비밀번호 재설정 이메일 발송 성공: {email}, 코드: {verification_code}")
-        except Exception as email_error:
-            logger.error(f"비밀번호 재설정 이메일 발송 실패: {str(email_error)}")
+        queue_email(subject, message, email)
     
     return Response({"success": True, "message": "인증 코드가 생성되었습니다."})
 
@@ -2323,7 +2411,7 @@ def dev_test_login(request):
             }, status=status.HTTP_401_UNAUTHORIZED)
         
         user.last_login_at = timezone.now()
-        user.save()
+        user.save(update_fields=['last_login_at'])
         
         # 토큰 생성 (Access + Refresh)
         tokens = generate_tokens_for_user(user)
@@ -2340,6 +2428,7 @@ def dev_test_login(request):
         try:
             if active_connection:
                 session = Session.objects.create(connection=active_connection)
+                session_registry.register(session, user)
                 logger.info(f"개발용 로그인 - 세션 생성 (연결 있음): {session.session_id}, 사용자: {user.login_id}")
             else:
                 # 연결이 없는 경우: 기본 연결 생성
@@ -2363,6 +2452,7 @@ def dev_test_login(request):
                 
                 # 세션 생성
                 session = Session.objects.create(connection=new_connection)
+                session_registry.register(session, user)
                 logger.info(f"개발용 로그인 - 기본 연결 및 세션 생성 완료: {session.session_id}, 사용자: {user.login_id}")
                 
         except Exception as e:
@@ -2404,10 +2494,9 @@ def dev_test_login(request):
 
 
 # ===== 웹소켓 음성 명령 전달 =====
-@api_view(['POST'])
-@csrf_exempt  # Jetson에서 오는 외부 요청이므로 CSRF 예외
-@transaction.atomic
-def trigger_voice_command(request):
+@query_budget(2)
+@_async_external_post
+async def trigger_voice_command(request):
     """
     Jetson → Django: 음성 호출 신호 트리거
     
@@ -2419,6 +2508,8 @@ def trigger_voice_command(request):
     5. 앱에서 알림/진동 실행 후 확인 신호 전송
     6. EC2 → 젯슨 응답 (앱 확인 완료 후)
     
+    앱 확인은 채널 레이어 응답 채널로 받습니다 (command_ack).
+    
     요청 예시:
     {
         "uid": "user_uuid"
@@ -2426,129 +2517,74 @@ def trigger_voice_command(request):
     
     응답 예시:
     {
-        "success": true,
-        "message": "앱에서 음성 호출을 확인했습니다.",
-        "uid": "user_uuid",
-        "session_id": "session_id"
+        "success": true
     }
     """
-    from channels.layers import get_channel_layer
-    from asgiref.sync import async_to_sync
-    import time
-    import json
-    
     # 요청 데이터 로깅
     logger.info(f"[음성 호출 트리거] 요청 수신: Content-Type={request.content_type}, IP={request.META.get('REMOTE_ADDR')}")
     logger.info(f"[음성 호출 트리거] 요청 본문: {request.body[:500] if request.body else 'None'}")
     
-    # JSON 데이터 파싱
-    try:
-        if request.body:
-            data = json.loads(request.body)
-        else:
-            data = {}
-    except json.JSONDecodeError as e:
-        logger.error(f"[음성 호출 트리거] JSON 파싱 실패: {e}")
-        data = {}
-    
+    data = _load_request_json(request)
     uid = data.get('uid')
     
     if not uid:
-        logger.warning(f"[음성 호출 트리거] 400 오류: uid가 누락됨, request.data={request.data}")
-        return Response({
+        logger.warning(f"[음성 호출 트리거] 400 오류: uid가 누락됨, request.data={data}")
+        return JsonResponse({
             'success': False,
             'message': 'uid가 필요합니다.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # uid로 사용자 찾기
-        user = User.objects.get(uid=uid, is_active=True)
-        
-        # 활성 세션 찾기
-        active_session = Session.objects.filter(
-            connection__user=user,
-            connection__is_active=True,
-            connection__deleted_at__isnull=True,
-            ended_at__isnull=True
-        ).order_by('-started_at').first()
+        # uid 사용자의 활성 세션 찾기 (세션 레지스트리, 없으면 DB)
+        active_session = await session_registry.aresolve(uid)
         
         if not active_session:
-            logger.warning(f"음성 명령 수신 - 활성 세션 없음: uid={uid}, login_id={user.login_id}")
-            return Response({
+            if not await User.objects.filter(uid=uid, is_active=True).aexists():
+                raise User.DoesNotExist
+
+            logger.warning(f"음성 명령 수신 - 활성 세션 없음: uid={uid}")
+            return JsonResponse({
                 'success': False,
                 'message': '활성 세션이 없습니다.'
             }, status=status.HTTP_404_NOT_FOUND)
         
         session_id = str(active_session.session_id)
         
-        # 캐시에서 웹소켓 연결 확인
-        websocket_info = cache.get(f'websocket:{session_id}')
-        
-        if not websocket_info or not websocket_info.get('connected'):
+        # 연결 레지스트리에서 앱 웹소켓 연결 확인
+        if not await presence.ais_online(session_id):
             logger.warning(f"음성 명령 수신 - 웹소켓 연결 없음: uid={uid}, session_id={session_id}")
-            return Response({
+            return JsonResponse({
                 'success': False,
                 'message': 'WebSocket 연결이 없습니다.'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # 캐시에 대기 상태 설정 (앱 확인 기다림)
-        voice_call_key = f'voice_call_wait:{session_id}'
-        cache.set(voice_call_key, 'waiting', timeout=20)  # 10초 → 20초
-        
-        # 채널 레이어 가져오기
-        channel_layer = get_channel_layer()
-        
-        # 그룹 이름: app_{session_id}
-        group_name = f'app_{session_id}'
-        
         message_data = {
             'type': 'voice_command',
             'command': '싸비스',
             'timestamp': timezone.now().isoformat()
         }
         
-        # 비동기 함수를 동기적으로 호출
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                'type': 'voice_command',
-                'data': message_data
-            }
-        )
-        
-        logger.info(f"음성 호출 신호 WebSocket 전송, 앱 확인 대기 시작: uid={uid}, login_id={user.login_id}")
-        
-        # 앱 확인 대기 (폴링, 최대 10초)
-        max_wait_time = 10
-        check_interval = 0.1  # 100ms마다 확인
-        elapsed_time = 0
+        logger.info(f"음성 호출 신호 WebSocket 전송, 앱 확인 대기 시작: uid={uid}, login_id={active_session.login_id}")
         
-        while elapsed_time < max_wait_time:
-            confirmation_status = cache.get(voice_call_key)
-            if confirmation_status == 'confirmed':
-                logger.info(f"앱 확인 완료: uid={uid}, login_id={user.login_id}")
-                
-                # 캐시 정리
-                cache.delete(voice_call_key)
-                
-                return Response({
-                    'success': True
-                }, status=status.HTTP_200_OK)
-            
-            time.sleep(check_interval)
-            elapsed_time += check_interval
+        try:
+            # 그룹 이름: app_{session_id}
+            await request_ack(f'app_{session_id}', 'voice_command', message_data, timeout=VOICE_CALL_ACK_TIMEOUT)
+        except AckTimeout:
+            # 타임아웃: 앱 확인이 없음
+            logger.warning(f"앱 확인 타임아웃: uid={uid}, login_id={active_session.login_id}")
+            return JsonResponse({
+                'success': False
+            }, status=status.HTTP_408_REQUEST_TIMEOUT)
         
-        # 타임아웃: 앱 확인이 없음
-        logger.warning(f"앱 확인 타임아웃: uid={uid}, login_id={user.login_id}")
-        cache.delete(voice_call_key)
+        logger.info(f"앱 확인 완료: uid={uid}, login_id={active_session.login_id}")
         
-        return Response({
-            'success': False
-        }, status=status.HTTP_408_REQUEST_TIMEOUT)
+        return JsonResponse({
+            'success': True
+        }, status=status.HTTP_200_OK)
         
-    except User.DoesNotExist:
+    except (User.DoesNotExist, ValidationError):
         logger.warning(f"음성 명령 수신 - 사용자 없음: uid={uid}")
-        return Response({
+        return JsonResponse({
             'success': False,
             'message': '사용자를 찾을 수 없습니다.'
         }, status=status.HTTP_404_NOT_FOUND)
@@ -2556,20 +2592,21 @@ def trigger_voice_command(request):
     except Exception as e:
         logger.error(f"음성 명령 전송 오류: {str(e)}")
         logger.error(traceback.format_exc())
-        return Response({
+        return JsonResponse({
             'success': False,
             'message': '음성 명령 전송 중 오류 발생',
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # ===== 버튼 명령 =====
+@query_budget(2)
 @api_view(['POST'])
-@transaction.atomic
 def button_command_request(request):
     """
     앱 버튼 명령 요청
     앱 → 서버: uid, command 전송
     서버: CommandLog 저장 + 젯슨으로 전송
+    (로그는 바로 커밋하고, 젯슨 응답 대기는 트랜잭션 밖에서 수행)
     
     지원하는 명령:
     - COME_HERE: 이리와
@@ -2588,60 +2625,44 @@ def button_command_request(request):
     command = serializer.validated_data['command']
 
     try:
-        # uid로 사용자 찾기
-        user = User.objects.get(uid=uid, is_active=True)
-
-        # 활성 세션 찾기
-        active_session = Session.objects.filter(
-            connection__user=user,
-            connection__is_active=True,
-            connection__deleted_at__isnull=True,
-            ended_at__isnull=True
-        ).order_by('-started_at').first()
+        # uid 사용자의 활성 세션 찾기 (세션 레지스트리, 없으면 DB)
+        active_session = session_registry.resolve(uid)
 
         if not active_session:
-            logger.warning(f"버튼 명령 수신 - 활성 세션 없음: uid={uid}, login_id={user.login_id}")
+            if not User.objects.filter(uid=uid, is_active=True).exists():
+                raise User.DoesNotExist
+
+            logger.warning(f"버튼 명령 수신 - 활성 세션 없음: uid={uid}")
             return Response({
                 'success': False,
                 'message': '활성 세션이 없습니다.'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # CommandLog 저장
+        # CommandLog 기록 (command_log_writer가 DB에 일괄 저장)
         # command_type: BUTTON_COMMAND (고정)
         # command_content: COME_HERE, TRACK_ON, TRACK_OFF, HOME
-        log = CommandLog.objects.create(
-            session=active_session,
-            command_type='BUTTON_COMMAND',
-            command_content=command,
-            is_success=True
-        )
+        event_id = command_log_writer.record(active_session.session_id, 'BUTTON_COMMAND', command, is_success=True)
 
-        logger.info(f"버튼 명령 로그 저장: {log.command_log_id}, 명령: {command}, uid={uid}, login_id={user.login_id}")
+        logger.info(f"버튼 명령 로그 기록: {event_id}, 명령: {command}, uid={uid}, login_id={active_session.login_id}")
 
         # 젯슨으로 명령 전송
         try:
-            jetson_url = f"{JETSON_BASE_URL}/voice_command"
             jetson_data = {
                 'uid': str(uid),
                 'command': command
             }
 
-            headers = {
-                "ngrok-skip-browser-warning": "69420",
-                "Content-Type": "application/json"
-            }
-
-            jetson_response = requests.post(jetson_url, json=jetson_data, headers=headers, timeout=10)
+            jetson_response = jetson.post('/voice_command', jetson_data)
 
             if jetson_response.status_code == 200:
-                logger.info(f"버튼 명령 - 젯슨 전송 성공: uid={uid}, login_id={user.login_id}, 명령={command}")
+                logger.info(f"버튼 명령 - 젯슨 전송 성공: uid={uid}, login_id={active_session.login_id}, 명령={command}")
             else:
                 # 젯슨 통신 실패 시 로그 업데이트
-                log.is_success = False
-                log.error_message = f"젯슨 통신 실패 (HTTP {jetson_response.status_code})"
-                log.save()
+                command_log_writer.update(
+                    event_id, is_success=False, error_message=f"젯슨 통신 실패 (HTTP {jetson_response.status_code})"
+                )
 
-                logger.warning(f"버튼 명령 - 젯슨 전송 실패 (HTTP {jetson_response.status_code}): uid={uid}, login_id={user.login_id}")
+                logger.warning(f"버튼 명령 - 젯슨 전송 실패 (HTTP {jetson_response.status_code}): uid={uid}, login_id={active_session.login_id}")
                 return Response({
                     'success': False,
                     'message': '로봇과 통신 실패'
@@ -2651,14 +2672,12 @@ def button_command_request(request):
                 'success': True,
                 'message': '버튼 명령 전송 성공',
                 'command': command,
-                'command_log_id': log.command_log_id
+                'command_event_id': event_id
             }, status=status.HTTP_200_OK)
 
-        except requests.exceptions.RequestException as e:
+        except JetsonUnavailable as e:
             # 젯슨 연결 실패 시 로그 업데이트
-            log.is_success = False
-            log.error_message = f"젯슨 연결 실패: {str(e)}"
-            log.save()
+            command_log_writer.update(event_id, is_success=False, error_message=str(e))
 
             logger.error(f"버튼 명령 - 젯슨 통신 오류: {str(e)}")
             return Response({
@@ -2714,6 +2733,11 @@ def delete_account(request):
         user.deletion_reason = deletion_reason
     user.save()
 
+    # 얼굴 갤러리에서 제거, 캐시된 인증 정보 무효화 (커밋 이후)
+    transaction.on_commit(lambda: face_gallery.remove(user.user_id))
+    invalidate_principal(user.user_id)
+    session_registry.invalidate(user.uid)
+
     UserDeviceConnection.objects.filter(
         user=user,
         is_active=True,
@@ -2725,13 +2749,12 @@ def delete_account(request):
         (models.Q(connection__user=user) | models.Q(connection__isnull=True)) &
         models.Q(ended_at__isnull=True)
     )
-    ended_count = sessions.count()
-    sessions.update(ended_at=now)
+    ended_count = sessions.update(ended_at=now)
     
     logger.info(f"회원탈퇴 - 세션 종료: {user.login_id}, 종료된 세션 수: {ended_count}")
 
-    # 젯슨에게 로그아웃 통지
-    notify_jetson_logout(user)
+    # 젯슨에게 로그아웃 통지 (커밋 이후, 트랜잭션 밖에서 대기)
+    transaction.on_commit(lambda: notify_jetson_logout(user))
 
     return Response({
         'success': True,
@@ -4,10 +4,10 @@ WebSocket 연결 상태 로깅 유틸리티
 WebSocket 연결, 메시지 송수신, 연결 종료 등의 상태를 상세하게 로깅합니다.
 """
 import logging
-from datetime import datetime
-from django.core.cache import cache
 from django.utils import timezone
 
+from .presence import presence
+
 logger = logging.getLogger('accounts.websocket_logger')
 
 
@@ -27,18 +27,13 @@ class WebSocketLogger:
     @staticmethod
     def log_connection_success(session_id, user_id, user_login_id, client_ip, channel_name):
         """연결 성공 로그"""
-        # 캐시에 연결 정보 저장
-        cache.set(
-            f'ws_status:{session_id}',
-            {
-                'status': 'connected',
-                'user_id': user_id,
-                'user_login_id': user_login_id,
-                'client_ip': client_ip,
-                'channel_name': channel_name,
-                'connected_at': timezone.now().isoformat(),
-            },
-            timeout=3600  # 1시간
+        # 연결 레지스트리에 등록
+        presence.connect(
+            session_id,
+            user_id=user_id,
+            user_login_id=user_login_id,
+            client_ip=client_ip,
+            channel_name=channel_name,
         )
         
         logger.info(
@@ -75,8 +70,8 @@ class WebSocketLogger:
         }
         close_reason = close_reasons.get(close_code, f"알 수 없는 코드: {close_code}")
         
-        # 캐시에서 연결 정보 삭제
-        cache.delete(f'ws_status:{session_id}')
+        # 연결 레지스트리에서 삭제 (channel_name이 있으면 그 연결일 때만)
+        presence.disconnect(session_id, channel_name)
         
         duration_str = f"{connection_duration:.2f}초" if connection_duration else "알 수 없음"
         
@@ -145,28 +140,19 @@ class WebSocketLogger:
     
     @staticmethod
     def get_connection_status(session_id):
-        """연결 상태 조회"""
-        return cache.get(f'ws_status:{session_id}')
+        """연결 상태 조회 (연결 없음/만료면 None)"""
+        return presence.status(session_id)
+    
+    @staticmethod
+    def get_connection_statuses(session_ids):
+        """여러 세션의 연결 상태 한 번에 조회 - session_id(str) → 상태 또는 None"""
+        return presence.statuses(session_ids)
     
     @staticmethod
     def get_all_active_connections():
-        """모든 활성 연결 조회 (캐시 키 패턴으로 검색)"""
-        # 주의: Redis를 사용하는 경우 keys 명령은 프로덕션에서 피해야 함
-        # 대신 SCAN 명령이나 별도의 연결 추적 시스템 사용 권장
+        """모든 활성 연결 조회 (연결 레지스트리 - 키 스캔 없음)"""
         try:
-            # 캐시가 Redis 기반이라고 가정
-            from django.core.cache import cache
-            if hasattr(cache, 'keys'):
-                keys = cache.keys('ws_status:*')
-                connections = []
-                for key in keys:
-                    status = cache.get(key)
-                    if status:
-                        connections.append(status)
-                return connections
-            else:
-                # LocMemCache 등 다른 백엔드인 경우
-                return []
+            return presence.active()
         except Exception as e:
             logger.error(f"활성 연결 조회 실패: {str(e)}")
             return []
@@ -4,12 +4,20 @@
 - GMS Proxy (STT, LLM)
 - Wake Word Validation
 """
-import os, time, json, tempfile, re
+import os, time, json
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, UploadFile, File, Header, HTTPException
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import httpx
 
+from batch import NDJSON_MEDIA_TYPE, stream_as_completed
+from command_parser import command_parser
+from metrics import CONTENT_TYPE, MetricsMiddleware, MetricsRegistry, UpstreamCall, connection_pool_stats
+from parse_cache import ParseCache
+from stt_stream import StreamUpload, iter_upload, parse_audio_content_type, peek, post_stream, prepend, wav_header
+from wake_matcher import get_matcher, matcher_stats, normalize_korean, similarity
+
 # ⭐ .env 파일 자동 로드
 from dotenv import load_dotenv
 load_dotenv()  # 같은 폴더의 .env 파일을 읽어서 환경변수로 설정
@@ -18,9 +26,43 @@ load_dotenv()  # 같은 폴더의 .env 파일을 읽어서 환경변수로 설
 JETSON_TOKEN = os.environ.get("JETSON_TOKEN", "")
 GMS_KEY = os.environ.get("GMS_KEY", "")
 
-# GMS API 엔드포인트
-GMS_CHAT_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1/chat/completions"
-GMS_STT_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1/audio/transcriptions"
+# GMS API 엔드포인트 (GMS_BASE_URL로 로컬 스텁 서버 등으로 바꿀 수 있음)
+GMS_BASE_URL = os.environ.get("GMS_BASE_URL", "https://gms.ssafy.io/gmsapi/api.openai.com/v1").rstrip("/")
+GMS_CHAT_URL = f"{GMS_BASE_URL}/chat/completions"
+GMS_STT_URL = f"{GMS_BASE_URL}/audio/transcriptions"
+
+# ⭐ /llm_parse 응답 캐시 (항목 수, 유효 시간(초) - 0이면 캐시 끔)
+LLM_CACHE_SIZE = int(os.environ.get("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", "600"))
+llm_cache = ParseCache(maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL)
+
+# ⭐ /llm_parse 규칙 파서 먼저 (0이면 항상 GMS), 단계별 응답 수
+LLM_RULE_FIRST = os.environ.get("LLM_RULE_FIRST", "1") != "0"
+parse_tiers = {"rule": 0, "cache": 0, "llm": 0}
+
+# ⭐ /stt_batch, /llm_parse_batch: 요청당 동시 GMS 호출 수, 최대 항목 수
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "256"))
+
+# ⭐ 지표 (/metrics, metrics.py)
+metrics_registry = MetricsRegistry()
+http_requests = metrics_registry.counter(
+    "gms_proxy_http_requests_total", "Requests by route template, method and status", ("route", "method", "status")
+)
+http_duration = metrics_registry.histogram(
+    "gms_proxy_http_request_duration_seconds", "Request latency until the last body byte", ("route", "method")
+)
+http_in_progress = metrics_registry.gauge("gms_proxy_http_requests_in_progress", "Requests being handled")
+upstream_requests = metrics_registry.counter(
+    "gms_proxy_upstream_requests_total", "GMS calls by upstream and outcome (ok or error class)", ("upstream", "outcome")
+)
+upstream_duration = metrics_registry.histogram(
+    "gms_proxy_upstream_duration_seconds", "GMS call latency (STT includes streaming the upload)", ("upstream",)
+)
+
+
+def upstream_call(upstream: str) -> UpstreamCall:
+    return UpstreamCall(upstream, upstream_requests, upstream_duration)
 
 # ⭐ 글로벌 httpx 클라이언트 (커넥션 풀링)
 http_client: httpx.AsyncClient = None
@@ -53,6 +95,9 @@ async def lifespan(app: FastAPI):
     print("✅ HTTP client closed")
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    MetricsMiddleware, requests=http_requests, duration=http_duration, in_progress=http_in_progress
+)
 
 def check_auth(x_token: str | None):
     if JETSON_TOKEN and x_token != JETSON_TOKEN:
@@ -60,7 +105,55 @@ def check_auth(x_token: str | None):
 
 @app.get("/health")
 def health():
-    return {"ok": True, "services": ["gms_proxy", "wake_validation"]}
+    return {
+        "ok": True,
+        "services": ["gms_proxy", "wake_validation"],
+        "llm_cache": llm_cache.stats(),
+        "llm_parse_tiers": dict(parse_tiers),
+    }
+
+
+@metrics_registry.collector
+def collect_proxy_state():
+    """스크랩 때 읽는 값 (캐시, 단계별 응답 수, 커넥션 풀)"""
+    cache = llm_cache.stats()
+    yield "gms_proxy_llm_cache_events_total", "counter", "/llm_parse cache lookups and removals", [
+        ({"event": event}, cache[event]) for event in ("hits", "misses", "coalesced", "evictions", "expired")
+    ]
+    yield "gms_proxy_llm_cache_entries", "gauge", "/llm_parse cache entries", [({}, cache["size"])]
+    yield "gms_proxy_llm_cache_hit_ratio", "gauge", "(hits + coalesced) / lookups", [({}, cache["hit_rate"])]
+    yield "gms_proxy_llm_parse_total", "counter", "/llm_parse answers by tier", [
+        ({"tier": tier}, count) for tier, count in parse_tiers.items()
+    ]
+    
+    wake = matcher_stats()
+    yield "gms_proxy_wake_match_cache_total", "counter", "/verify_wake result cache lookups", [
+        ({"result": "hit"}, wake["hits"]), ({"result": "miss"}, wake["misses"])
+    ]
+    
+    pool = connection_pool_stats(http_client)
+    if pool is not None:
+        yield "gms_proxy_http_pool_connections", "gauge", "Shared http_client connections by state", [
+            ({"state": "active"}, pool["active"]), ({"state": "idle"}, pool["idle"])
+        ]
+        yield "gms_proxy_http_pool_queued_requests", "gauge", "Requests waiting for a pool connection", [
+            ({}, pool["queued"])
+        ]
+        yield "gms_proxy_http_pool_max_connections", "gauge", "Pool connection limit", [({}, pool["max_connections"])]
+        yield "gms_proxy_http_pool_utilization", "gauge", "Active connections / limit", [
+            ({}, pool["active"] / pool["max_connections"])
+        ]
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus 스크랩용 지표 (metrics.py)
+    
+    라우트별 요청 수/지연, GMS 호출(gms_chat, gms_stt) 결과/지연, 커넥션 풀, 캐시 적중
+    ⭐ async - 지표를 갱신하는 이벤트 루프 스레드에서 읽음 (스레드 풀에서 읽으면 dict 순회 중 변경)
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE)
 
 
 # =====================
@@ -82,129 +175,18 @@ class VerifyWakeResponse(BaseModel):
     matched_word: str | None = None
 
 
-def normalize_korean(text: str) -> str:
-    """한글/영문 텍스트 정규화"""
-    text = text.lower().strip()
-    
-    # ⭐ 영문도 허용 (한글 + 영문 + 숫자만 남김)
-    text = re.sub(r'[^가-힣a-z0-9]', '', text)
-    
-    # 연속 공백 제거
-    text = re.sub(r'\s+', '', text)
-    
-    return text
-
-
 def fuzzy_match(text: str, target: str, threshold: float = 0.7) -> float:
     """간단한 fuzzy matching (Levenshtein distance)"""
-    text = normalize_korean(text)
-    target = normalize_korean(target)
-    
-    if target in text:
-        return 1.0
-    
-    # Levenshtein distance
-    m, n = len(text), len(target)
-    
-    if m == 0:
-        return 0.0
-    if n == 0:
-        return 0.0
-    
-    # DP table
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    
-    for i in range(m + 1):
-        dp[i][0] = i
-    for j in range(n + 1):
-        dp[0][j] = j
-    
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            cost = 0 if text[i-1] == target[j-1] else 1
-            dp[i][j] = min(
-                dp[i-1][j] + 1,      # deletion
-                dp[i][j-1] + 1,      # insertion
-                dp[i-1][j-1] + cost  # substitution
-            )
-    
-    distance = dp[m][n]
-    max_len = max(m, n)
-    
-    similarity = 1.0 - (distance / max_len)
-    return similarity
+    return similarity(normalize_korean(text), normalize_korean(target))
 
 
 def verify_with_rules(text: str, target_words: list[str]) -> dict:
     """
     규칙 기반 Wake word 검증
-    """
-    text_norm = normalize_korean(text)
-    
-    # 1) Exact match
-    for target in target_words:
-        target_norm = normalize_korean(target)
-        if target_norm == text_norm:
-            return {
-                "is_valid": True,
-                "confidence": 1.0,
-                "reason": f"exact_match: {target}",
-                "matched_word": target,
-            }
-    
-    # 2) Contains match
-    for target in target_words:
-        target_norm = normalize_korean(target)
-        if target_norm in text_norm:
-            return {
-                "is_valid": True,
-                "confidence": 0.95,
-                "reason": f"contains: {target}",
-                "matched_word": target,
-            }
-    
-    # 3) Fuzzy match
-    best_score = 0.0
-    best_target = None
-    
-    for target in target_words:
-        score = fuzzy_match(text, target)
-        if score > best_score:
-            best_score = score
-            best_target = target
-    
-    # Threshold: 0.7
-    if best_score >= 0.7:
-        return {
-            "is_valid": True,
-            "confidence": best_score,
-            "reason": f"fuzzy_match: {best_target}",
-            "matched_word": best_target,
-        }
-    
-    # 4) Negative cases
-    # 확실히 다른 단어들
-    negative_words = [
-        "안녕", "헬로", "하이", "좋아", "싫어", "예", "아니오",
-        "고마워", "미안", "잘가", "안녕하세요", "감사합니다",
-    ]
-    
-    for neg in negative_words:
-        if normalize_korean(neg) == text_norm:
-            return {
-                "is_valid": False,
-                "confidence": 0.95,
-                "reason": f"negative_word: {neg}",
-                "matched_word": None,
-            }
     
-    # 5) Unknown
-    return {
-        "is_valid": False,
-        "confidence": best_score if best_score > 0.3 else 0.1,
-        "reason": f"no_match (best: {best_target}, score: {best_score:.2f})",
-        "matched_word": None,
-    }
+    ⭐ 대상 단어 묶음별로 한 번 만든 매처 사용 (wake_matcher.py)
+    """
+    return get_matcher(target_words).match(text)
 
 
 @app.post("/verify_wake", response_model=VerifyWakeResponse)
@@ -239,52 +221,34 @@ async def verify_wake(req: VerifyWakeRequest):
 # GMS Proxy - STT
 # =====================
 
-@app.post("/stt")
-async def stt(
-    file: UploadFile = File(...), 
-    language: str = "ko",
-    x_token: str | None = Header(default=None)
-):
+async def transcribe_stream(filename: str, content_type: str, chunks, started: float) -> dict:
     """
-    Jetson의 음성 파일을 GMS Whisper API로 전송
+    오디오 청크를 받는 대로 GMS Whisper API로 흘려보냄 (전체를 메모리에 읽지 않음)
     """
-    check_auth(x_token)
-    
     if not GMS_KEY:
         raise HTTPException(status_code=500, detail="GMS_KEY not configured")
     
-    t0 = time.time()
-    
     try:
-        # 파일 데이터 읽기
-        audio_data = await file.read()
+        upload = StreamUpload({"model": "whisper-1"}, filename, content_type, chunks, started=started)
         
         # ⭐ 글로벌 http_client 사용 (커넥션 재사용)
-        files = {
-            "file": (file.filename or "audio.wav", audio_data, file.content_type or "audio/wav")
-        }
-        data = {
-            "model": "whisper-1"
-        }
-        headers = {
-            "Authorization": f"Bearer {GMS_KEY}"
-        }
-        
-        response = await http_client.post(
-            GMS_STT_URL,
-            files=files,
-            data=data,
-            headers=headers
-        )
-        response.raise_for_status()
-        result = response.json()
+        with upstream_call("gms_stt"):
+            response, timings = await post_stream(
+                http_client,
+                GMS_STT_URL,
+                {"Authorization": f"Bearer {GMS_KEY}"},
+                upload
+            )
+            response.raise_for_status()
+            result = response.json()
         
         # GMS 응답 형식: {"text": "..."}
         text = result.get("text", "").strip()
         
         return {
             "text": text,
-            "timings": {"stt_ms": (time.time() - t0) * 1000.0}
+            "bytes": upload.bytes,
+            "timings": {"stt_ms": timings["total_ms"], **timings}
         }
     
     except httpx.HTTPStatusError as e:
@@ -293,6 +257,115 @@ async def stt(
         raise HTTPException(status_code=500, detail=f"STT error: {str(e)}")
 
 
+@app.post("/stt")
+async def stt(
+    file: UploadFile = File(...), 
+    language: str = "ko",
+    x_token: str | None = Header(default=None)
+):
+    """
+    Jetson의 음성 파일을 GMS Whisper API로 전송
+    """
+    check_auth(x_token)
+    
+    return await transcribe_stream(
+        file.filename or "audio.wav",
+        file.content_type or "audio/wav",
+        iter_upload(file),
+        time.perf_counter()
+    )
+
+
+@app.post("/stt_stream")
+async def stt_stream(
+    request: Request,
+    language: str = "ko",
+    x_token: str | None = Header(default=None)
+):
+    """
+    요청 본문(오디오)을 받는 대로 GMS Whisper API로 흘려보냄
+    
+    Content-Type:
+        audio/L16; rate=16000; channels=1  원시 PCM (16bit little-endian) - WAV 헤더를 붙여 전송
+        audio/flac, audio/wav              그대로 전송
+    
+    Response:
+        {
+            "text": "왼쪽으로 이동",
+            "bytes": 96044,
+            "timings": {"stt_ms": ..., "upload_ms": ..., "first_byte_ms": ..., "total_ms": ...}
+        }
+    """
+    check_auth(x_token)
+    started = time.perf_counter()
+    
+    media_type, options = parse_audio_content_type(request.headers.get("content-type"))
+    _, chunks = await peek(request.stream())
+    if chunks is None:
+        raise HTTPException(status_code=400, detail="audio is required")
+    
+    if media_type in ("audio/l16", "audio/pcm"):
+        try:
+            sample_rate = int(options.get("rate", 16000))
+            channels = int(options.get("channels", 1))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid rate/channels")
+        # Content-Length를 알면 정확한 WAV 크기, chunked면 길이 미정
+        length = request.headers.get("content-length")
+        header = wav_header(sample_rate, channels, data_size=int(length) if length and length.isdigit() else None)
+        return await transcribe_stream("audio.wav", "audio/wav", prepend(header, chunks), started)
+    
+    if media_type in ("audio/flac", "audio/x-flac"):
+        return await transcribe_stream("audio.flac", "audio/flac", chunks, started)
+    
+    return await transcribe_stream("audio.wav", media_type or "audio/wav", chunks, started)
+
+
+def check_batch_size(count: int):
+    if not count:
+        raise HTTPException(status_code=400, detail="items are required")
+    if count > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"too many items (max {BATCH_MAX_ITEMS})")
+
+
+@app.post("/stt_batch")
+async def stt_batch(
+    files: list[UploadFile] = File(...),
+    language: str = "ko",
+    x_token: str | None = Header(default=None)
+):
+    """
+    여러 음성 파일을 GMS Whisper API로 동시에 전송 (BATCH_CONCURRENCY개씩)
+    
+    끝나는 순서대로 NDJSON 한 줄씩 응답 (batch.py):
+        {"index": 1, "filename": "WAKE_b.wav", "text": "싸비스", "bytes": ..., "timings": {...}}
+        {"index": 0, "filename": "WAKE_a.wav", "error": "GMS STT failed: ...", "status": 502}
+        {"done": true, "count": 2, "errors": 1, "elapsed_ms": ...}
+    """
+    check_auth(x_token)
+    check_batch_size(len(files))
+    
+    if not GMS_KEY:
+        raise HTTPException(status_code=500, detail="GMS_KEY not configured")
+    
+    async def transcribe_item(index: int, file: UploadFile) -> dict:
+        try:
+            result = await transcribe_stream(
+                file.filename or f"audio_{index}.wav",
+                file.content_type or "audio/wav",
+                iter_upload(file),
+                time.perf_counter()
+            )
+        except HTTPException as e:
+            return {"filename": file.filename, "error": e.detail, "status": e.status_code}
+        return {"filename": file.filename, **result}
+    
+    return StreamingResponse(
+        stream_as_completed(files, transcribe_item, BATCH_CONCURRENCY),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
 # =====================
 # GMS Proxy - LLM Parse
 # =====================
@@ -349,19 +422,45 @@ COMMAND_SYSTEM_PROMPT = """너는 음성 명령을 JSON 형식으로 변환하
 """
 
 
-@app.post("/llm_parse")
-async def llm_parse(req: ParseReq, x_token: str | None = Header(default=None)):
-    """
-    자연어 명령을 GMS GPT API로 파싱
-    """
-    check_auth(x_token)
+def parse_cache_key(text: str, mode: str) -> tuple[str, str]:
+    """캐시 키: 공백/문장부호/대소문자만 다른 발화는 같은 명령으로 봄"""
+    return normalize_korean(text), mode
+
+
+def action_result(action: dict, mode: str) -> dict:
+    """파싱 결과 검증 (규칙 파서 / GPT 공통)"""
+    # 유튜브 명령 검증
+    cmd = action.get("cmd", "")
+    if cmd.startswith("YOUTUBE_") and mode != "youtube":
+        return {
+            "ok": False,
+            "reason": "not_in_youtube"
+        }
     
-    if not GMS_KEY:
-        raise HTTPException(status_code=500, detail="GMS_KEY not configured")
+    # UNKNOWN이면 실패
+    if cmd == "UNKNOWN":
+        return {
+            "ok": False,
+            "reason": "unknown_command"
+        }
     
+    return {
+        "ok": True,
+        "action": action
+    }
+
+
+def is_cacheable_parse(result: dict) -> bool:
+    """GPT 응답을 JSON으로 읽지 못한 경우는 저장하지 않음 (다음 요청에서 다시 시도)"""
+    return result.get("reason") != "llm_parse_error"
+
+
+async def llm_parse_upstream(text: str, mode: str) -> dict:
+    """
+    GMS GPT API로 명령 파싱 (캐시 없이 한 번 호출)
+    """
     try:
         # 상태 정보 포함
-        mode = req.state.get("mode", "idle")
         context = f"현재 모드: {mode}"
         if mode != "youtube":
             context += "\n(유튜브 명령은 유튜브 모드에서만 사용 가능)"
@@ -376,7 +475,7 @@ async def llm_parse(req: ParseReq, x_token: str | None = Header(default=None)):
                 },
                 {
                     "role": "user",
-                    "content": f"{context}\n\n명령: {req.text}"
+                    "content": f"{context}\n\n명령: {text}"
                 }
             ],
             "temperature": 0.1,
@@ -388,37 +487,20 @@ async def llm_parse(req: ParseReq, x_token: str | None = Header(default=None)):
             "Authorization": f"Bearer {GMS_KEY}"
         }
         
-        response = await http_client.post(
-            GMS_CHAT_URL,
-            json=payload,
-            headers=headers
-        )
-        response.raise_for_status()
-        result = response.json()
-        
-        # GPT 응답 파싱
-        content = result["choices"][0]["message"]["content"]
-        action = json.loads(content)
-        
-        # 유튜브 명령 검증
-        cmd = action.get("cmd", "")
-        if cmd.startswith("YOUTUBE_") and mode != "youtube":
-            return {
-                "ok": False,
-                "reason": "not_in_youtube"
-            }
-        
-        # UNKNOWN이면 실패
-        if cmd == "UNKNOWN":
-            return {
-                "ok": False,
-                "reason": "unknown_command"
-            }
+        with upstream_call("gms_chat"):
+            response = await http_client.post(
+                GMS_CHAT_URL,
+                json=payload,
+                headers=headers
+            )
+            response.raise_for_status()
+            result = response.json()
+            
+            # GPT 응답 파싱
+            content = result["choices"][0]["message"]["content"]
+            action = json.loads(content)
         
-        return {
-            "ok": True,
-            "action": action
-        }
+        return action_result(action, mode)
     
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=e.response.status_code, detail=f"GMS Chat failed: {e.response.text}")
@@ -431,6 +513,81 @@ async def llm_parse(req: ParseReq, x_token: str | None = Header(default=None)):
         raise HTTPException(status_code=500, detail=f"LLM parse error: {str(e)}")
 
 
+async def parse_request(req: ParseReq) -> dict:
+    """
+    자연어 명령 파싱 (규칙 파서 → 캐시 → GMS)
+    """
+    mode = req.state.get("mode", "idle")
+    
+    if LLM_RULE_FIRST:
+        action = command_parser.parse(req.text)
+        if action is not None:
+            parse_tiers["rule"] += 1
+            return {**action_result(action, mode), "tier": "rule"}
+    
+    if not GMS_KEY:
+        raise HTTPException(status_code=500, detail="GMS_KEY not configured")
+    
+    result, source = await llm_cache.get_or_load(
+        parse_cache_key(req.text, mode),
+        lambda: llm_parse_upstream(req.text, mode),
+        cacheable=is_cacheable_parse,
+    )
+    tier = "cache" if source == "cache" else "llm"
+    parse_tiers[tier] += 1
+    return {**result, "tier": tier}
+
+
+@app.post("/llm_parse")
+async def llm_parse(req: ParseReq, x_token: str | None = Header(default=None)):
+    """
+    자연어 명령 파싱
+    
+    ⭐ 단계 (응답의 "tier")
+       rule:  규칙 파서(command_parser.py)가 확실하게 답함 - GMS 호출 없음
+       cache: 같은 (정규화한 텍스트, 모드)의 이전 GPT 결과
+       llm:   GMS GPT API (동시에 들어온 같은 명령은 호출 하나로 합침)
+       지표: /health의 llm_parse_tiers, llm_cache
+    """
+    check_auth(x_token)
+    
+    return await parse_request(req)
+
+
+class ParseBatchReq(BaseModel):
+    items: list[ParseReq]
+
+
+@app.post("/llm_parse_batch")
+async def llm_parse_batch(req: ParseBatchReq, x_token: str | None = Header(default=None)):
+    """
+    여러 명령을 동시에 파싱 (항목마다 /llm_parse와 같은 단계, GMS 호출은 BATCH_CONCURRENCY개씩)
+    
+    Example:
+        POST /llm_parse_batch
+        {"items": [{"text": "멈춰"}, {"text": "10초 앞으로", "state": {"mode": "youtube"}, "request_id": "r2"}]}
+        
+        Response (NDJSON, 끝나는 순서대로):
+        {"index": 0, "request_id": null, "ok": true, "action": {"cmd": "STOP"}, "tier": "rule"}
+        {"index": 1, "request_id": "r2", "ok": true, "action": {"cmd": "YOUTUBE_SEEK", "sec": 10}, "tier": "rule"}
+        {"done": true, "count": 2, "errors": 0, "elapsed_ms": ...}
+    """
+    check_auth(x_token)
+    check_batch_size(len(req.items))
+    
+    async def parse_item(index: int, item: ParseReq) -> dict:
+        try:
+            result = await parse_request(item)
+        except HTTPException as e:
+            return {"request_id": item.request_id, "error": e.detail, "status": e.status_code}
+        return {"request_id": item.request_id, **result}
+    
+    return StreamingResponse(
+        stream_as_completed(req.items, parse_item, BATCH_CONCURRENCY),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
 # =====================
 # Speaker Verification (선택사항)
 # =====================
@@ -474,9 +631,11 @@ if __name__ == "__main__":
     
     print(f"🚀 Starting unified server...")
     print(f"   Services:")
-    print(f"   - STT: {GMS_STT_URL}")
+    print(f"   - STT: {GMS_STT_URL} (/stt, /stt_stream)")
     print(f"   - LLM: {GMS_CHAT_URL}")
+    print(f"   - LLM cache: {LLM_CACHE_SIZE} entries, TTL {LLM_CACHE_TTL:.0f}s")
+    print(f"   - Batch: /stt_batch, /llm_parse_batch (concurrency {BATCH_CONCURRENCY})")
     print(f"   - Wake Validation: /verify_wake")
-    print(f"   - Health: /health")
+    print(f"   - Health: /health, Metrics: /metrics")
     
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+여러 항목 일괄 처리 (/stt_batch, /llm_parse_batch)
+
+검증 도구처럼 파일 수천 개를 하나씩 순서대로 보내던 것을 요청 하나로 받아,
+동시에 concurrency개까지 GMS로 보내고(글로벌 http_client 공유) 끝나는 순서대로 NDJSON 한 줄씩 돌려줍니다.
+
+    {"index": 3, ...항목 결과}
+    {"index": 0, ...}
+    {"index": 1, "error": "...", "status": 502}     ← 항목 하나의 실패는 그 줄에만
+    {"done": true, "count": 4, "errors": 1, "elapsed_ms": 812.4}
+
+- 항목 처리 함수(worker)는 예외 대신 "error"가 들어간 dict를 반환
+- 클라이언트가 중간에 끊으면 남은 항목은 취소
+"""
+import asyncio
+import json
+import time
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_line(obj: dict) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode()
+
+
+async def stream_as_completed(items, worker, concurrency: int):
+    """
+    items를 동시에 concurrency개까지 worker(index, item)로 처리하고, 끝나는 순서대로 NDJSON 줄을 냄
+
+    worker의 결과에는 index가 붙고, 마지막 줄은 요약(done)입니다.
+    """
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index, item):
+        async with semaphore:
+            try:
+                result = await worker(index, item)
+            except Exception as e:
+                result = {"error": str(e), "status": 500}
+        return {"index": index, **result}
+
+    tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)]
+    errors = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            errors += "error" in result
+            yield ndjson_line(result)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    yield ndjson_line({
+        "done": True,
+        "count": len(tasks),
+        "errors": errors,
+        "elapsed_ms": (time.perf_counter() - started) * 1000.0,
+    })
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+/llm_parse 단계별(규칙 파서 / GPT) 정확도와 지연시간 벤치마크
+
+정답이 붙은 발화 묶음(LABELED)을
+- rule: 규칙 파서만 - 답한 비율, 답한 것 중 정답 비율, 파싱 시간
+- llm:  GMS만 (LLM_RULE_FIRST=0, 캐시 끔) - 정답 비율, 요청 지연
+- rule-first: /llm_parse 기본 동작 (규칙 → 캐시 끔 → GMS) - 정답 비율, 요청 지연, GMS 호출 수
+로 비교합니다.
+
+GMS는 기본적으로 로컬 스텁(fake_gms.py, 키워드 파서 + --delay 지연)이라 llm 정확도는 스텁의 값입니다.
+--live를 주면 환경 변수(GMS_KEY, GMS_BASE_URL)의 실제 GMS를 씁니다 (요청마다 과금).
+
+사용 예:
+    cd gms_proxy
+    python bench_command_parser.py --delay 0.4
+    GMS_KEY=... python bench_command_parser.py --live --json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import httpx
+
+import app as proxy
+from command_parser import command_parser
+from fake_gms import FakeGmsServer
+from parse_cache import ParseCache
+
+MOVE = {d: {"ok": True, "action": {"cmd": "MOVE", "dir": d}} for d in ("left", "right", "forward", "backward", "up", "down")}
+STOP = {"ok": True, "action": {"cmd": "STOP"}}
+FOLLOW = {"ok": True, "action": {"cmd": "FOLLOW_ME"}}
+COME = {"ok": True, "action": {"cmd": "COME_HERE"}}
+UNKNOWN = {"ok": False, "reason": "unknown_command"}
+NOT_YT = {"ok": False, "reason": "not_in_youtube"}
+
+
+def yt(cmd, **args):
+    return {"ok": True, "action": {"cmd": cmd, **args}}
+
+
+# (발화, 모드, 정답)
+LABELED = (
+    ("왼쪽으로 이동", "idle", MOVE["left"]),
+    ("왼쪽으로 이동해줘", "idle", MOVE["left"]),
+    ("좌회전", "idle", MOVE["left"]),
+    ("싸비스 왼쪽으로 가", "idle", MOVE["left"]),
+    ("오른쪽으로 이동", "idle", MOVE["right"]),
+    ("우회전 해줘", "idle", MOVE["right"]),
+    ("오른쪽으로 조금만 가줘", "idle", MOVE["right"]),
+    ("앞으로 가", "idle", MOVE["forward"]),
+    ("전진", "idle", MOVE["forward"]),
+    ("뒤로 가", "idle", MOVE["backward"]),
+    ("후진해", "idle", MOVE["backward"]),
+    ("위로 올라가", "idle", MOVE["up"]),
+    ("아래로 내려가", "idle", MOVE["down"]),
+    ("멈춰", "idle", STOP),
+    ("정지", "idle", STOP),
+    ("스톱", "idle", STOP),
+    ("그만", "idle", STOP),
+    ("멈춰!", "youtube", STOP),
+    ("따라와", "idle", FOLLOW),
+    ("따라오세요", "idle", FOLLOW),
+    ("이리 와", "idle", COME),
+    ("이쪽으로 와", "idle", COME),
+    ("유튜브 켜줘", "youtube", yt("YOUTUBE_OPEN")),
+    ("유튜브 실행", "youtube", yt("YOUTUBE_OPEN")),
+    ("일시정지", "youtube", yt("YOUTUBE_PAUSE")),
+    ("재생", "youtube", yt("YOUTUBE_PLAY")),
+    ("다시 재생해줘", "youtube", yt("YOUTUBE_PLAY")),
+    ("10초 앞으로", "youtube", yt("YOUTUBE_SEEK", sec=10)),
+    ("10초 뒤로", "youtube", yt("YOUTUBE_SEEK", sec=-10)),
+    ("삼십 초 앞으로", "youtube", yt("YOUTUBE_SEEK", sec=30)),
+    ("일시정지", "idle", NOT_YT),
+    ("10초 뒤로", "idle", NOT_YT),
+    # 규칙 파서가 GMS에 넘겨야 하는 발화
+    ("왼쪽 말고 오른쪽으로", "idle", MOVE["right"]),
+    ("가지 말고 멈춰", "idle", STOP),
+    ("나를 따라서 와 줄래", "idle", FOLLOW),
+    ("여기로 와 볼래", "idle", COME),
+    ("영상 잠깐 멈춰줄래", "youtube", yt("YOUTUBE_PAUSE")),
+    ("오늘 날씨 어때", "idle", UNKNOWN),
+    ("고마워", "idle", UNKNOWN),
+    ("노래 틀어줘", "idle", UNKNOWN),
+)
+
+
+def summarize_ms(samples):
+    ms = sorted(s * 1000 for s in samples)
+    q = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else [ms[0]] * 99
+    return {"count": len(ms), "p50": round(q[49], 4), "p95": round(q[94], 4), "max": round(ms[-1], 4)}
+
+
+def strip_tier(body):
+    return {k: v for k, v in body.items() if k != "tier"}
+
+
+def bench_rule(rounds):
+    answered = correct = 0
+    wrong = []
+    latencies = []
+    for text, mode, expected in LABELED:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            action = command_parser.parse(text)
+        latencies.append((time.perf_counter() - started) / rounds)
+        if action is None:
+            continue
+        answered += 1
+        if proxy.action_result(action, mode) == expected:
+            correct += 1
+        else:
+            wrong.append(text)
+    return {
+        "coverage": round(answered / len(LABELED), 3),
+        "accuracy": round(correct / answered, 3) if answered else 0.0,
+        "wrong": wrong,
+        "latency": summarize_ms(latencies),
+    }
+
+
+async def bench_proxy(rule_first):
+    tiers = {"rule": 0, "cache": 0, "llm": 0}
+    latencies = []
+    correct = 0
+    with patch.object(proxy, "LLM_RULE_FIRST", rule_first), \
+            patch.object(proxy, "llm_cache", ParseCache(maxsize=0)), patch.object(proxy, "parse_tiers", tiers):
+        async with proxy.lifespan(proxy.app), httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=proxy.app), base_url="http://proxy"
+        ) as client:
+            for text, mode, expected in LABELED:
+                started = time.perf_counter()
+                response = await client.post("/llm_parse", json={"text": text, "state": {"mode": mode}})
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                correct += strip_tier(response.json()) == expected
+    return {
+        "accuracy": round(correct / len(LABELED), 3),
+        "latency": summarize_ms(latencies),
+        "gms_calls": tiers["llm"],
+        "tiers": tiers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/llm_parse 규칙 파서 / GPT 단계별 정확도와 지연시간")
+    parser.add_argument("--delay", type=float, default=0.4, help="스텁 GMS 응답 지연 (초)")
+    parser.add_argument("--rounds", type=int, default=2000, help="규칙 파서 발화당 반복 횟수 (시간 측정용)")
+    parser.add_argument("--live", action="store_true", help="스텁 대신 실제 GMS 사용 (GMS_KEY 필요)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    results = {"utterances": len(LABELED), "gms": "live" if args.live else f"stub ({args.delay * 1000:.0f}ms)"}
+    results["rule"] = bench_rule(args.rounds)
+
+    with ExitStack() as stack:
+        if not args.live:
+            gms = stack.enter_context(FakeGmsServer(delay=args.delay))
+            stack.enter_context(patch.object(proxy, "GMS_KEY", "bench"))
+            stack.enter_context(patch.object(proxy, "GMS_CHAT_URL", gms.chat_url))
+        elif not proxy.GMS_KEY:
+            raise SystemExit("--live에는 GMS_KEY가 필요합니다.")
+        stack.enter_context(patch.object(proxy, "JETSON_TOKEN", ""))
+        results["llm"] = asyncio.run(bench_proxy(rule_first=False))
+        results["rule-first"] = asyncio.run(bench_proxy(rule_first=True))
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    rule = results["rule"]
+    print(f"발화 {len(LABELED)}개, GMS {results['gms']}")
+    print(
+        f"rule      : 답함 {rule['coverage'] * 100:.0f}%, 정확도 {rule['accuracy'] * 100:.1f}%, "
+        f"p50 {rule['latency']['p50'] * 1000:.1f}us, p95 {rule['latency']['p95'] * 1000:.1f}us"
+    )
+    if rule["wrong"]:
+        print(f"            틀린 발화: {rule['wrong']}")
+    for mode in ("llm", "rule-first"):
+        r = results[mode]
+        print(
+            f"{mode:<10}: 정확도 {r['accuracy'] * 100:.1f}%, p50 {r['latency']['p50']:.1f}ms, "
+            f"p95 {r['latency']['p95']:.1f}ms, GMS 호출 {r['gms_calls']}회"
+        )
+
+
+if __name__ == "__main__":
+    main()
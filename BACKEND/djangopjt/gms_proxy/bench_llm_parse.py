@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+/llm_parse 응답 캐시 벤치마크
+
+로컬 GMS 스텁 서버(--delay로 GPT 응답 지연 흉내)에 프록시를 연결하고,
+반복이 많은 실제 명령 분포(소수의 명령이 대부분, 공백/문장부호 변형 포함)로
+--requests번을 --concurrency개씩 동시에 보내 캐시 끔 / 켬을 비교합니다.
+
+사용 예:
+    cd gms_proxy
+    python bench_llm_parse.py --requests 300 --concurrency 8 --delay 0.3
+    python bench_llm_parse.py --json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from unittest.mock import patch
+
+import httpx
+
+import app as proxy
+from fake_gms import FakeGmsServer
+from parse_cache import ParseCache
+
+# (발화, 모드) - 앞쪽일수록 자주 나옴 (Zipf 가중치)
+UTTERANCES = (
+    ("멈춰", "idle"),
+    ("왼쪽으로 이동", "idle"),
+    ("오른쪽으로 이동", "idle"),
+    ("따라와", "idle"),
+    ("앞으로 가", "idle"),
+    ("일시정지", "youtube"),
+    ("재생", "youtube"),
+    ("이리 와", "idle"),
+    ("10초 앞으로", "youtube"),
+    ("뒤로 가", "idle"),
+    ("위로 올라가", "idle"),
+    ("10초 뒤로", "youtube"),
+    ("아래로 내려가", "idle"),
+    ("유튜브 켜줘", "youtube"),
+    ("오늘 날씨 어때", "idle"),
+)
+VARIANTS = ("{}", "{} ", " {}", "{}!", "{}.")
+
+
+def workload(count, seed=0):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(UTTERANCES) + 1)]
+    picks = rng.choices(UTTERANCES, weights=weights, k=count)
+    return [(rng.choice(VARIANTS).format(text), mode) for text, mode in picks]
+
+
+def summarize_ms(samples):
+    ms = sorted(s * 1000 for s in samples)
+    q = statistics.quantiles(ms, n=100, method="inclusive")
+    return {
+        "count": len(ms),
+        "mean": round(statistics.fmean(ms), 3),
+        "p50": round(q[49], 3),
+        "p95": round(q[94], 3),
+        "p99": round(q[98], 3),
+        "max": round(ms[-1], 3),
+    }
+
+
+async def run(requests, concurrency, cache):
+    latencies = []
+    queue = list(reversed(requests))
+    with patch.object(proxy, "llm_cache", cache):
+        async with proxy.lifespan(proxy.app), httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=proxy.app), base_url="http://proxy"
+        ) as client:
+
+            async def worker():
+                while queue:
+                    text, mode = queue.pop()
+                    started = time.perf_counter()
+                    response = await client.post("/llm_parse", json={"text": text, "state": {"mode": mode}})
+                    latencies.append(time.perf_counter() - started)
+                    response.raise_for_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/llm_parse 캐시 끔 / 켬 지연시간과 GMS 호출 수 비교")
+    parser.add_argument("--requests", type=int, default=300, help="방식별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--delay", type=float, default=0.3, help="스텁 GMS 응답 지연 (초)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    requests = workload(args.requests)
+    results = {"requests": args.requests, "concurrency": args.concurrency, "delay_s": args.delay}
+
+    with FakeGmsServer(delay=args.delay) as gms, \
+            patch.object(proxy, "GMS_KEY", "bench"), patch.object(proxy, "JETSON_TOKEN", ""), \
+            patch.object(proxy, "GMS_CHAT_URL", gms.chat_url):
+        for mode, cache in (("off", ParseCache(maxsize=0)), ("on", ParseCache())):
+            calls = gms.chat_requests
+            latencies, elapsed = asyncio.run(run(requests, args.concurrency, cache))
+            results[mode] = {
+                "latency": summarize_ms(latencies),
+                "elapsed_s": round(elapsed, 3),
+                "upstream_calls": gms.chat_requests - calls,
+                "cache": cache.stats(),
+            }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"GMS 스텁 지연 {args.delay * 1000:.0f}ms, 요청 {args.requests}개, 동시 {args.concurrency}")
+    for mode in ("off", "on"):
+        r = results[mode]
+        latency = r["latency"]
+        print(
+            f"캐시 {mode:<3}: p50 {latency['p50']:.1f}ms, p95 {latency['p95']:.1f}ms, "
+            f"전체 {r['elapsed_s']:.2f}s, GMS 호출 {r['upstream_calls']}회 "
+            f"(적중 {r['cache']['hits']}, 병합 {r['cache']['coalesced']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
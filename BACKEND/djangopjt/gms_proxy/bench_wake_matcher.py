@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+/verify_wake 규칙 매처 마이크로 벤치마크
+
+STT 결과 문장 묶음을 --rounds번 반복 검증해 초당 처리 수를 비교합니다.
+- legacy: 이전 verify_with_rules (요청마다 대상 단어 정규화, 대상마다 전체 편집 거리 표)
+- matcher: WakeMatcher, 최근 결과 LRU 끔 (정규화 1회 + 거리 상한 띠 계산만)
+- matcher+lru: WakeMatcher 기본 설정
+
+세 방식의 판정 결과가 모두 같은지도 확인합니다.
+문장 묶음은 --corpus로 validate_wake_word.py 리포트(JSON, results[].stt_text) 또는
+한 줄에 한 문장인 텍스트 파일을 줄 수 있고, 없으면 아래 SAMPLE_STT_OUTPUTS를 씁니다.
+
+사용 예:
+    cd gms_proxy
+    python bench_wake_matcher.py --rounds 200
+    python bench_wake_matcher.py --corpus validation_report.json --json
+"""
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from app import VerifyWakeRequest
+from wake_matcher import NEGATIVE_WORDS, WakeMatcher
+
+# Whisper가 wake word 녹음에 대해 돌려준 형태의 문장들 (정답 / 오인식 / 무음 환각 / 다른 말)
+SAMPLE_STT_OUTPUTS = (
+    "싸비스", "싸비스.", "사비스", "사비스!", "싸비스?", "서비스", "서비스.", "써비스",
+    "싸비스 켜줘", "사비스야", "싸비스야 이리 와", "Service.", "service", "Sarvis",
+    "싸비쓰", "사비수", "쌉이스", "시비스", "삽이스", "서버스", "사피스", "싸비스 싸비스",
+    "감사합니다.", "안녕하세요.", "네.", "예", "아니오", "좋아", "MBC 뉴스 이덕영입니다.",
+    "시청해주셔서 감사합니다.", "구독과 좋아요 부탁드립니다.", "음", "아",
+    "오늘 날씨 어때?", "멈춰", "왼쪽으로 이동", "Thank you.", "Bye.",
+)
+
+
+# =====================
+# 이전 구현 (비교용)
+# =====================
+
+def legacy_normalize_korean(text):
+    text = text.lower().strip()
+    text = re.sub(r'[^가-힣a-z0-9]', '', text)
+    text = re.sub(r'\s+', '', text)
+    return text
+
+
+def legacy_fuzzy_match(text, target):
+    text = legacy_normalize_korean(text)
+    target = legacy_normalize_korean(target)
+    if target in text:
+        return 1.0
+    m, n = len(text), len(target)
+    if m == 0 or n == 0:
+        return 0.0
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        dp[i][0] = i
+    for j in range(n + 1):
+        dp[0][j] = j
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            cost = 0 if text[i-1] == target[j-1] else 1
+            dp[i][j] = min(dp[i-1][j] + 1, dp[i][j-1] + 1, dp[i-1][j-1] + cost)
+    return 1.0 - (dp[m][n] / max(m, n))
+
+
+def legacy_verify_with_rules(text, target_words):
+    text_norm = legacy_normalize_korean(text)
+    for target in target_words:
+        if legacy_normalize_korean(target) == text_norm:
+            return {"is_valid": True, "confidence": 1.0, "reason": f"exact_match: {target}", "matched_word": target}
+    for target in target_words:
+        if legacy_normalize_korean(target) in text_norm:
+            return {"is_valid": True, "confidence": 0.95, "reason": f"contains: {target}", "matched_word": target}
+    best_score = 0.0
+    best_target = None
+    for target in target_words:
+        score = legacy_fuzzy_match(text, target)
+        if score > best_score:
+            best_score = score
+            best_target = target
+    if best_score >= 0.7:
+        return {"is_valid": True, "confidence": best_score, "reason": f"fuzzy_match: {best_target}", "matched_word": best_target}
+    for neg in NEGATIVE_WORDS:
+        if legacy_normalize_korean(neg) == text_norm:
+            return {"is_valid": False, "confidence": 0.95, "reason": f"negative_word: {neg}", "matched_word": None}
+    return {
+        "is_valid": False,
+        "confidence": best_score if best_score > 0.3 else 0.1,
+        "reason": f"no_match (best: {best_target}, score: {best_score:.2f})",
+        "matched_word": None,
+    }
+
+
+def load_corpus(path):
+    if path is None:
+        return list(SAMPLE_STT_OUTPUTS)
+    path = Path(path)
+    if path.suffix == ".json":
+        report = json.loads(path.read_text(encoding="utf-8"))
+        return [r["stt_text"] for r in report["results"] if r.get("stt_text")]
+    return [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def measure(verify, corpus, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            verify(text)
+    elapsed = time.perf_counter() - started
+    count = rounds * len(corpus)
+    return {"requests": count, "elapsed_s": round(elapsed, 4), "per_sec": round(count / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/verify_wake 규칙 매처 이전 구현 / WakeMatcher 처리량 비교")
+    parser.add_argument("--corpus", default=None, help="validate_wake_word 리포트(JSON) 또는 한 줄에 한 문장인 텍스트 파일")
+    parser.add_argument("--rounds", type=int, default=200, help="문장 묶음 반복 횟수")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    targets = VerifyWakeRequest(text="-").target_words
+    plain = WakeMatcher(targets, cache_size=0)
+    cached = WakeMatcher(targets)
+
+    modes = {
+        "legacy": lambda text: legacy_verify_with_rules(text, targets),
+        "matcher": plain.match,
+        "matcher+lru": cached.match,
+    }
+    mismatches = [text for text in corpus if len({json.dumps(verify(text), sort_keys=True) for verify in modes.values()}) != 1]
+    if mismatches:
+        raise SystemExit(f"판정 결과가 다른 문장: {mismatches[:5]}")
+
+    results = {"corpus": len(corpus), "rounds": args.rounds}
+    for mode, verify in modes.items():
+        results[mode] = measure(verify, corpus, args.rounds)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"문장 {len(corpus)}개 x {args.rounds}회 (판정 결과 모두 같음)")
+    base = results["legacy"]["per_sec"]
+    for mode in modes:
+        r = results[mode]
+        print(f"{mode:<12}: {r['per_sec']:>10,.0f} req/s  ({r['per_sec'] / base:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
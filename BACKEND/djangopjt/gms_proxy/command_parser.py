@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+규칙 기반 명령 파서 (/llm_parse 1단계)
+
+COMMAND_SYSTEM_PROMPT의 명령은 닫힌 문법(이동 6방향, 정지, 따라오기, 이리 와, 유튜브 조작)이므로
+확실한 발화는 GPT 없이 여기서 바로 답하고, 애매한 발화만 GMS로 넘깁니다.
+
+    "싸비스 왼쪽으로 이동해줘" → 정규화 "싸비스왼쪽으로이동해줘"
+        └ 키워드 트라이: [싸비스(filler)] [왼쪽으로 → MOVE left] [이동(filler)] [해줘(filler)] → 남은 글자 0
+    "10초 앞으로"              → 시간 추출기: YOUTUBE_SEEK sec=10 (이 구간의 "앞으로"는 이동으로 보지 않음)
+
+- 키워드는 가장 왼쪽, 가장 긴 것부터 겹치지 않게 찾음 ("일시정지"의 "정지"는 STOP이 아님)
+- 다음이면 애매함(None) → GMS
+    명령 키워드가 없음 / 서로 다른 명령이 둘 이상 / 부정 표현("가지 마", "말고")
+    키워드와 filler로 설명되지 않는 글자가 max_residue개보다 많음 ("왼쪽에 뭐가 있어")
+    방향 없는 시간("10초")
+- 모드 검증(유튜브 모드가 아닐 때 YOUTUBE_*)은 호출한 쪽에서 GPT 결과와 똑같이 처리
+"""
+import re
+
+from wake_matcher import normalize_korean
+
+# 명령 키워드 (정규화된 형태 - 공백/문장부호 없음)
+COMMAND_KEYWORDS = {
+    ("MOVE", "left"): ("왼쪽", "왼쪽으로", "좌회전", "좌측", "좌측으로", "left"),
+    ("MOVE", "right"): ("오른쪽", "오른쪽으로", "우회전", "우측", "우측으로", "right"),
+    ("MOVE", "forward"): ("앞으로", "전진", "forward"),
+    ("MOVE", "backward"): ("뒤로", "후진", "backward"),
+    ("MOVE", "up"): ("위로", "올라가", "올라와", "up"),
+    ("MOVE", "down"): ("아래로", "내려가", "내려와", "down"),
+    ("STOP", None): ("멈춰", "멈춰줘", "멈춰라", "정지", "스톱", "스탑", "그만", "stop"),
+    ("FOLLOW_ME", None): ("따라와", "따라와줘", "따라오세요", "따라오라", "따라오기", "followme"),
+    ("COME_HERE", None): ("이리와", "이리로와", "이쪽으로와", "일로와", "comehere"),
+    ("YOUTUBE_OPEN", None): ("유튜브켜", "유튜브실행", "유튜브틀어", "유튜브열어", "youtube켜"),
+    ("YOUTUBE_PAUSE", None): ("일시정지", "일시중지", "pause"),
+    ("YOUTUBE_PLAY", None): ("재생", "다시재생", "play"),
+}
+
+# 명령 앞뒤에 붙는 말 (매칭된 글자로 치지만 명령은 아님)
+FILLER_WORDS = (
+    "싸비스", "사비스", "써비스", "서비스", "야", "아",
+    "이동", "이동해", "움직여", "가", "가줘", "가자", "가라", "와", "와줘",
+    "해", "해줘", "해주세요", "하자", "해라", "줘", "주세요", "좀", "요", "지금", "빨리", "한번", "조금",
+    "줘요", "봐", "봐줘", "으로", "로", "쪽", "쪽으로",
+)
+
+# 부정 / 대조 표현 - 있으면 GMS에 맡김
+NEGATIONS = ("지마", "지말", "말고", "않", "안돼", "안되", "못", "하지")
+
+_FILLER = "filler"
+_NUMERAL_DIGITS = {"일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6, "칠": 7, "팔": 8, "구": 9}
+_NUMBER = r"(\d+|[일이삼사오육칠팔구]?십[일이삼사오육칠팔구]?|[일이삼사오육칠팔구])"
+_UNIT = r"(초|분)"
+_DIR = r"(앞|뒤|전|후)(?:으로|로)?"
+# "10초 앞으로" / "앞으로 10초" (정규화된 텍스트 기준)
+SEEK_PATTERNS = (
+    re.compile(_NUMBER + _UNIT + _DIR),
+    re.compile(_DIR + _NUMBER + _UNIT),
+)
+_SEEK_FORWARD = {"앞": 1, "후": 1, "뒤": -1, "전": -1}
+
+
+def parse_korean_number(token: str) -> int | None:
+    """'10' / '십' / '삼십오' / '오' → 정수 (100 미만)"""
+    if token.isdigit():
+        return int(token)
+    if "십" in token:
+        tens, _, ones = token.partition("십")
+        return _NUMERAL_DIGITS.get(tens, 1) * 10 + _NUMERAL_DIGITS.get(ones, 0)
+    return _NUMERAL_DIGITS.get(token)
+
+
+class KeywordTrie:
+    """글자 단위 트라이 - 가장 왼쪽, 가장 긴 키워드부터 겹치지 않게 찾음"""
+
+    _END = object()
+
+    def __init__(self, entries):
+        self.root = {}
+        for keyword, value in entries:
+            node = self.root
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node.setdefault(self._END, value)
+
+    def scan(self, text: str, start: int = 0, end: int | None = None):
+        """[(시작, 끝, 값), ...] (text[start:end] 안에서)"""
+        end = len(text) if end is None else end
+        found = []
+        i = start
+        while i < end:
+            node = self.root
+            match = None
+            j = i
+            while j < end:
+                node = node.get(text[j])
+                if node is None:
+                    break
+                j += 1
+                if self._END in node:
+                    match = (i, j, node[self._END])
+            if match:
+                found.append(match)
+                i = match[1]
+            else:
+                i += 1
+        return found
+
+
+class CommandParser:
+    """
+    Args:
+        max_residue: 키워드/filler로 설명되지 않아도 되는 최대 글자 수
+    """
+
+    def __init__(self, max_residue: int = 2):
+        self.max_residue = max_residue
+        entries = [(word, (cmd, direction)) for (cmd, direction), words in COMMAND_KEYWORDS.items() for word in words]
+        entries += [(word, _FILLER) for word in FILLER_WORDS]
+        self.trie = KeywordTrie(entries)
+
+    def parse(self, text: str) -> dict | None:
+        """
+        확실하면 action dict ({"cmd": "MOVE", "dir": "left"} 등), 애매하면 None
+        """
+        norm = normalize_korean(text)
+        if not norm or any(neg in norm for neg in NEGATIONS):
+            return None
+
+        actions = []
+        spans = []
+        for pattern in SEEK_PATTERNS:
+            for m in pattern.finditer(norm):
+                if any(s < m.end() and m.start() < e for s, e in spans):
+                    continue
+                groups = m.groups()
+                number, unit, direction = groups if pattern is SEEK_PATTERNS[0] else groups[1:] + groups[:1]
+                sec = parse_korean_number(number)
+                if sec is None:
+                    return None
+                sec *= 60 if unit == "분" else 1
+                actions.append(("YOUTUBE_SEEK", sec * _SEEK_FORWARD[direction]))
+                spans.append(m.span())
+        # 방향 없는 시간 ("10초만")
+        if re.search(_NUMBER + _UNIT, self._mask(norm, spans)):
+            return None
+
+        covered = sum(e - s for s, e in spans)
+        for start, end in self._unmasked(norm, spans):
+            for s, e, value in self.trie.scan(norm, start, end):
+                covered += e - s
+                if value is not _FILLER:
+                    actions.append(value)
+
+        distinct = set(actions)
+        if len(distinct) != 1 or len(norm) - covered > self.max_residue:
+            return None
+
+        cmd, arg = distinct.pop()
+        if cmd == "MOVE":
+            return {"cmd": cmd, "dir": arg}
+        if cmd == "YOUTUBE_SEEK":
+            return {"cmd": cmd, "sec": arg}
+        return {"cmd": cmd}
+
+    @staticmethod
+    def _mask(text, spans):
+        for s, e in spans:
+            text = text[:s] + " " * (e - s) + text[e:]
+        return text
+
+    @staticmethod
+    def _unmasked(text, spans):
+        """spans 밖의 구간들"""
+        position = 0
+        for s, e in sorted(spans):
+            if position < s:
+                yield position, s
+            position = max(position, e)
+        if position < len(text):
+            yield position, len(text)
+
+
+# 프로세스 전역 파서 (트라이는 한 번만 만듦)
+command_parser = CommandParser()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 GMS 스텁 서버 (테스트 / 벤치마크용)
+
+실제 GMS(OpenAI 호환 API) 없이 프록시의 캐시 / 요청 병합 / 오류 처리를 검증하기 위해
+/chat/completions, /audio/transcriptions 만 흉내내는 서버를 별도 스레드의 uvicorn으로 띄웁니다.
+명령 텍스트의 키워드로 정해진 JSON을 돌려주고(chat), 받은 오디오를 기록한 뒤 stt_text를 돌려줍니다(STT).
+
+사용 예:
+    with FakeGmsServer(delay=0.3) as gms:
+        app.GMS_CHAT_URL = gms.chat_url
+        ...
+        gms.chat_requests      # /chat/completions 호출 수
+        gms.uploads            # /audio/transcriptions로 받은 파일 [{"filename", "content_type", "data", "model"}, ...]
+        gms.fail_next(1, 500)  # 다음 호출 한 번을 HTTP 500으로 응답
+        gms.garble_next(1)     # 다음 호출 한 번을 JSON이 아닌 content로 응답
+"""
+import asyncio
+import json
+import re
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.responses import JSONResponse
+
+# 키워드 → 파싱 결과 (앞에서부터 확인, "일시정지"가 "정지"보다 먼저)
+RULES = (
+    ("유튜브", {"cmd": "YOUTUBE_OPEN"}),
+    ("일시정지", {"cmd": "YOUTUBE_PAUSE"}),
+    ("재생", {"cmd": "YOUTUBE_PLAY"}),
+    ("멈춰", {"cmd": "STOP"}),
+    ("정지", {"cmd": "STOP"}),
+    ("스톱", {"cmd": "STOP"}),
+    ("따라", {"cmd": "FOLLOW_ME"}),
+    ("이리", {"cmd": "COME_HERE"}),
+    ("왼쪽", {"cmd": "MOVE", "dir": "left"}),
+    ("좌회전", {"cmd": "MOVE", "dir": "left"}),
+    ("오른쪽", {"cmd": "MOVE", "dir": "right"}),
+    ("우회전", {"cmd": "MOVE", "dir": "right"}),
+    ("앞으로", {"cmd": "MOVE", "dir": "forward"}),
+    ("전진", {"cmd": "MOVE", "dir": "forward"}),
+    ("뒤로", {"cmd": "MOVE", "dir": "backward"}),
+    ("후진", {"cmd": "MOVE", "dir": "backward"}),
+    ("위로", {"cmd": "MOVE", "dir": "up"}),
+    ("아래로", {"cmd": "MOVE", "dir": "down"}),
+)
+SEEK = re.compile(r"(\d+)\s*초\s*(앞|뒤)")
+
+
+def parse_command(text):
+    """스텁 파서 (GPT 대신 키워드로)"""
+    seek = SEEK.search(text)
+    if seek:
+        sec = int(seek.group(1))
+        return {"cmd": "YOUTUBE_SEEK", "sec": sec if seek.group(2) == "앞" else -sec}
+    for keyword, action in RULES:
+        if keyword in text:
+            return dict(action)
+    return {"cmd": "UNKNOWN"}
+
+
+class FakeGmsServer:
+    """
+    GMS 서버 스텁
+
+    Args:
+        delay: 요청마다 응답 전 대기 시간 (초) - GPT 응답 지연 흉내 (비동기라 동시 요청은 함께 대기)
+    """
+
+    def __init__(self, delay=0.0, host="127.0.0.1", port=0, stt_text="싸비스"):
+        self.delay = delay
+        self.stt_text = stt_text
+        self.chat_requests = 0
+        self.texts = []
+        self.uploads = []
+        self._failures = []
+        self._lock = threading.Lock()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self._server = uvicorn.Server(
+            uvicorn.Config(self._build_app(), log_level="warning", lifespan="off")
+        )
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._socket.getsockname()[0]
+
+    @property
+    def port(self):
+        return self._socket.getsockname()[1]
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def chat_url(self):
+        return f"{self.base_url}/chat/completions"
+
+    @property
+    def stt_url(self):
+        return f"{self.base_url}/audio/transcriptions"
+
+    def fail_next(self, count=1, status=500):
+        """다음 호출 count번을 HTTP status로 응답"""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def garble_next(self, count=1):
+        """다음 호출 count번을 JSON이 아닌 content로 응답 (llm_parse_error)"""
+        with self._lock:
+            self._failures.extend([None] * count)
+
+    def _take_failure(self):
+        with self._lock:
+            if self._failures:
+                return True, self._failures.pop(0)
+        return False, None
+
+    def _build_app(self):
+        app = FastAPI()
+
+        @app.post("/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            # 프록시가 보내는 user 메시지: "현재 모드: ...\n\n명령: {text}"
+            text = body["messages"][-1]["content"].rsplit("명령: ", 1)[-1]
+            with self._lock:
+                self.chat_requests += 1
+                self.texts.append(text)
+            if self.delay:
+                await asyncio.sleep(self.delay)
+
+            failed, status = self._take_failure()
+            if failed and status is not None:
+                return JSONResponse({"error": {"message": "stub failure"}}, status_code=status)
+            content = "not json" if failed else json.dumps(parse_command(text), ensure_ascii=False)
+            return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+        @app.post("/audio/transcriptions")
+        async def transcriptions(file: UploadFile = File(...), model: str = Form(...)):
+            upload = {
+                "filename": file.filename,
+                "content_type": file.content_type,
+                "data": await file.read(),
+                "model": model,
+            }
+            with self._lock:
+                self.uploads.append(upload)
+            if self.delay:
+                await asyncio.sleep(self.delay)
+
+            failed, status = self._take_failure()
+            if failed and status is not None:
+                return JSONResponse({"error": {"message": "stub failure"}}, status_code=status)
+            return {"text": self.stt_text}
+
+        return app
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True
+        )
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("fake GMS server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join()
+        self._socket.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
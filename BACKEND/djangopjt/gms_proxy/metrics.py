@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+프록시 지표 (/metrics - Prometheus 텍스트 형식)
+
+요청 처리 중에는 정수 더하기만 하고, 누적 합과 문자열은 스크랩(/metrics) 때 만듭니다.
+    요청 1건: perf_counter 2번 + 버킷 찾기(bisect) + dict 갱신 몇 번
+
+- 잠금 없음: 갱신은 모두 이벤트 루프 스레드에서, 중간에 await 없이 일어남
+  (sync 엔드포인트는 스레드 풀에서 돌기 때문에 거기서는 갱신하지 않음)
+- 라벨 값은 정해진 것만: route는 경로 템플릿, 매칭되지 않은 경로는 "unmatched",
+  업스트림 오류는 error_class()의 분류 → 시계열 수가 요청 내용에 따라 늘지 않음
+- 다른 곳에 이미 있는 집계(llm_cache.stats(), 커넥션 풀 상태)는 스크랩 때 collector가 읽음
+
+사용 예:
+    registry = MetricsRegistry()
+    requests = registry.counter("x_requests_total", "요청 수", ("route",))
+    requests.inc("/stt")
+
+    @registry.collector
+    def collect_cache():
+        yield "x_cache_entries", "gauge", "캐시 항목 수", [({}, len(cache))]
+
+    registry.render()  # Prometheus 텍스트
+"""
+import asyncio
+import json
+import math
+import time
+from bisect import bisect_left
+
+import httpx
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 초 단위 (GMS STT/GPT 응답은 수백 ms ~ 수 초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """증가만 하는 값 (라벨 값 묶음별)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Gauge(Counter):
+    """오르내리는 값"""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+
+class Histogram:
+    """
+    고정 버킷 히스토그램
+
+    관측값은 해당 버킷 하나만 +1, 누적(le 이하 개수)은 스크랩 때 계산
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+
+    def observe(self, value: float, *labels):
+        # [버킷별 개수..., +Inf 개수, 합]
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, *labels):
+        state = self._values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    def samples(self):
+        for labels, state in self._values.items():
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state):
+                cumulative += count
+                yield f"{self.name}_bucket", {**base, "le": _format_value(float(bound))}, cumulative
+            yield f"{self.name}_sum", base, state[-1]
+            yield f"{self.name}_count", base, cumulative
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def collector(self, func):
+        """
+        스크랩 때 호출할 함수 등록 (데코레이터로도 사용)
+
+        func()는 (이름, 종류, 설명, [(라벨 dict, 값), ...])를 yield
+        """
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    라우트별 요청 수 / 지연 (순수 ASGI 미들웨어)
+
+    StreamingResponse(/stt_batch 등)는 본문을 다 보낼 때까지를 지연으로 잼
+    """
+
+    def __init__(self, app, requests: Counter, duration: Histogram, in_progress: Gauge):
+        self.app = app
+        self.requests = requests
+        self.duration = duration
+        self.in_progress = in_progress
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        # 응답 시작 전에 예외가 나면 ServerErrorMiddleware가 500으로 응답
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_progress.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            self.requests.inc(route, method, str(status))
+            self.duration.observe(time.perf_counter() - started, route, method)
+
+
+def error_class(exc) -> str:
+    """업스트림 호출 결과 분류 (예외 없으면 "ok")"""
+    if exc is None:
+        return "ok"
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"http_{exc.response.status_code // 100}xx"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, httpx.ConnectError):
+        return "connect_error"
+    if isinstance(exc, httpx.TransportError):
+        return "transport_error"
+    if isinstance(exc, (json.JSONDecodeError, KeyError, IndexError, TypeError)):
+        return "invalid_response"
+    if isinstance(exc, asyncio.CancelledError):
+        return "cancelled"
+    return "error"
+
+
+class UpstreamCall:
+    """
+    업스트림(GMS) 호출 하나의 결과 / 지연 기록 (with 블록 안의 예외로 분류, 예외는 그대로 전달)
+
+        with UpstreamCall("gms_chat", upstream_requests, upstream_duration):
+            response = await http_client.post(...)
+            response.raise_for_status()
+    """
+
+    __slots__ = ("upstream", "requests", "duration", "started")
+
+    def __init__(self, upstream: str, requests: Counter, duration: Histogram):
+        self.upstream = upstream
+        self.requests = requests
+        self.duration = duration
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration.observe(time.perf_counter() - self.started, self.upstream)
+        self.requests.inc(self.upstream, error_class(exc))
+        return False
+
+
+def connection_pool_stats(client: httpx.AsyncClient | None) -> dict | None:
+    """
+    httpx 클라이언트의 커넥션 풀 상태 (httpcore 내부 속성을 읽음 - 없으면 None)
+    """
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None:
+        return None
+    connections = pool.connections
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "connections": len(connections),
+        "active": len(connections) - idle,
+        "idle": idle,
+        "queued": sum(1 for request in getattr(pool, "_requests", ()) if request.is_queued()),
+        "max_connections": getattr(pool, "_max_connections", None),
+    }
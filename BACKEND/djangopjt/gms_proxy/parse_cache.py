@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 명령 파싱 응답 캐시 (/llm_parse)
+
+음성 명령은 어휘가 작고 같은 발화("멈춰", "왼쪽으로 이동")가 계속 반복되므로
+(정규화한 텍스트, 모드)별로 파싱 결과를 저장해 GMS(gpt-4o-mini) 호출을 줄입니다.
+
+- TTL: 저장 후 ttl초가 지나면 다시 GMS로 (프롬프트/모델을 바꿔도 오래 남지 않도록)
+- LRU: maxsize개를 넘으면 가장 오래 쓰지 않은 항목부터 제거
+- single-flight: 같은 키의 요청이 동시에 들어오면 GMS 호출 하나의 결과를 함께 받음
+  (먼저 온 요청의 연결이 끊겨도 호출은 끝까지 진행)
+- 예외(GMS 오류)는 저장하지 않음 - 기다리던 요청 모두 같은 예외를 받고, 다음 요청은 다시 호출
+- maxsize 또는 ttl이 0이면 캐시/병합 없이 매번 호출
+
+이벤트 루프 하나(uvicorn 워커 하나) 안에서만 공유합니다.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class ParseCache:
+    """
+    TTL + LRU 응답 캐시와 single-flight
+
+    Args:
+        maxsize: 최대 항목 수
+        ttl: 항목 유효 시간 (초)
+        clock: 현재 시각 함수 (테스트용)
+    """
+
+    def __init__(self, maxsize=1024, ttl=600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (만료 시각, 결과)
+        self._inflight = {}  # key -> asyncio.Task (진행 중인 GMS 호출)
+
+        # 지표 (/health)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expired = 0
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key):
+        """저장된 결과 (없거나 만료됐으면 None)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_load(self, key, loader, cacheable=None):
+        """
+        캐시에 있으면 바로, 같은 키의 호출이 진행 중이면 그 결과를, 아니면 loader()를 호출해 반환
+
+        Args:
+            loader: 인자 없는 코루틴 함수 (GMS 호출)
+            cacheable: 결과를 저장할지 판단하는 함수 (None이면 모두 저장)
+
+        Returns:
+            (결과, 출처) - 출처는 "cache" / "coalesced" / "upstream"
+        """
+        if not self.enabled:
+            self.misses += 1
+            return await self._call(loader), "upstream"
+
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, "cache"
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), "coalesced"
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._load(key, loader, cacheable))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        # shield: 기다리던 요청이 취소돼도 호출은 계속 (다른 요청이 같은 결과를 기다릴 수 있음)
+        return await asyncio.shield(task), "upstream"
+
+    async def _load(self, key, loader, cacheable):
+        value = await self._call(loader)
+        if cacheable is None or cacheable(value):
+            self.put(key, value)
+        return value
+
+    async def _call(self, loader):
+        self.upstream_calls += 1
+        try:
+            return await loader()
+        except Exception:
+            self.upstream_errors += 1
+            raise
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 기다리던 요청이 모두 취소된 경우에도 "exception was never retrieved" 경고가 남지 않도록
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "inflight": len(self._inflight),
+            "upstream_calls": self.upstream_calls,
+            "upstream_errors": self.upstream_errors,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+STT 업로드 스트리밍 (/stt, /stt_stream → GMS Whisper)
+
+받은 오디오를 메모리에 모두 읽은 뒤 multipart로 다시 만들어 보내던 것을,
+받는 대로 multipart 본문에 끼워 GMS로 바로 흘려보냅니다 (chunked 전송).
+
+    Jetson ── 오디오 청크 ──▶ 프록시 ── multipart(앞부분 + 청크... + 끝부분) ──▶ GMS
+
+- 원시 PCM(audio/L16)은 앞에 WAV 헤더를 붙여 보냄 (Whisper가 읽을 수 있는 형식)
+- 시간 측정 (요청 처리 시작 기준, ms)
+    upload_ms:     마지막 청크를 GMS로 보낸 시점
+    first_byte_ms: GMS 응답 헤더를 받은 시점
+    total_ms:      GMS 응답 본문까지 받은 시점
+"""
+import struct
+import time
+import uuid
+
+# 길이를 모르는 스트림의 WAV 크기 필드 (ffmpeg 등은 파일 끝까지 읽음)
+WAV_UNKNOWN_SIZE = 0xFFFFFFFF
+
+CHUNK_SIZE = 64 * 1024
+
+
+def wav_header(sample_rate: int, channels: int = 1, sample_width: int = 2, data_size: int | None = None) -> bytes:
+    """PCM WAV 헤더 (data_size를 모르면 최대값)"""
+    if data_size is None:
+        riff_size = data_size = WAV_UNKNOWN_SIZE
+    else:
+        riff_size = min(36 + data_size, WAV_UNKNOWN_SIZE)
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b"data", data_size,
+    )
+
+
+def parse_audio_content_type(value: str | None) -> tuple[str, dict]:
+    """'audio/L16; rate=16000; channels=1' → ('audio/l16', {'rate': '16000', 'channels': '1'})"""
+    media_type, *params = (value or "").split(";")
+    options = {}
+    for param in params:
+        key, _, val = param.partition("=")
+        if key.strip():
+            options[key.strip().lower()] = val.strip().strip('"')
+    return media_type.strip().lower(), options
+
+
+async def prepend(head: bytes, chunks):
+    yield head
+    async for chunk in chunks:
+        yield chunk
+
+
+async def peek(chunks):
+    """
+    첫 청크를 미리 읽음 (빈 업로드를 GMS로 보내기 전에 거르기 위해)
+
+    Returns:
+        (첫 청크, 첫 청크부터 다시 시작하는 반복자) - 비어 있으면 (b"", None)
+    """
+    async for chunk in chunks:
+        if chunk:
+            return chunk, prepend(chunk, chunks)
+    return b"", None
+
+
+async def iter_upload(file, chunk_size: int = CHUNK_SIZE):
+    """UploadFile을 청크 단위로 읽음"""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class StreamUpload:
+    """
+    multipart/form-data 본문을 청크 단위로 만드는 비동기 반복자
+
+    Args:
+        fields: 일반 폼 필드 (model 등)
+        filename, content_type: 파일 필드
+        chunks: 파일 내용 비동기 반복자
+    """
+
+    def __init__(self, fields: dict, filename: str, content_type: str, chunks, started: float | None = None):
+        self.boundary = uuid.uuid4().hex
+        self.fields = fields
+        self.filename = filename
+        self.file_content_type = content_type
+        self.chunks = chunks
+        self.started = time.perf_counter() if started is None else started
+        self.bytes = 0
+        self.upload_ms = None
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _preamble(self) -> bytes:
+        # 클라이언트가 보낸 파일 이름이 헤더를 깨지 않도록
+        filename = "".join(c for c in self.filename if c not in '"\r\n')
+        parts = [
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in self.fields.items()
+        ]
+        parts.append(
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: {self.file_content_type}\r\n\r\n'
+        )
+        return "".join(parts).encode()
+
+    async def __aiter__(self):
+        yield self._preamble()
+        async for chunk in self.chunks:
+            if chunk:
+                self.bytes += len(chunk)
+                yield chunk
+        yield f"\r\n--{self.boundary}--\r\n".encode()
+        self.upload_ms = (time.perf_counter() - self.started) * 1000.0
+
+
+async def post_stream(client, url: str, headers: dict, upload: StreamUpload):
+    """
+    업로드를 흘려보내고 응답 본문까지 받음
+
+    Returns:
+        (httpx.Response, timings) - 상태 코드 확인은 호출한 쪽에서
+    """
+    request = client.build_request(
+        "POST", url, content=upload, headers={**headers, "Content-Type": upload.content_type}
+    )
+    response = await client.send(request, stream=True)
+    first_byte_ms = (time.perf_counter() - upload.started) * 1000.0
+    try:
+        await response.aread()
+    finally:
+        await response.aclose()
+    total_ms = (time.perf_counter() - upload.started) * 1000.0
+    return response, {
+        "upload_ms": upload.upload_ms if upload.upload_ms is not None else first_byte_ms,
+        "first_byte_ms": first_byte_ms,
+        "total_ms": total_ms,
+    }
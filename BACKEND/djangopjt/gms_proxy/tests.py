@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""
+GMS 프록시 테스트 (로컬 GMS 스텁 서버 사용)
+
+실행:
+    cd gms_proxy
+    python -m unittest tests
+"""
+import asyncio
+import json
+import struct
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+import app as proxy
+from fake_gms import FakeGmsServer
+from metrics import Histogram, MetricsRegistry
+from command_parser import CommandParser, parse_korean_number
+from parse_cache import ParseCache
+from stt_stream import WAV_UNKNOWN_SIZE
+from wake_matcher import WakeMatcher, bounded_levenshtein
+
+
+class ProxyTestCase(unittest.IsolatedAsyncioTestCase):
+    """프록시 앱(lifespan 포함)을 로컬 GMS 스텁 서버에 연결"""
+
+    delay = 0.0
+    rule_first = True
+
+    def setUp(self):
+        self.gms = FakeGmsServer(delay=self.delay).start()
+        self.addCleanup(self.gms.stop)
+        for name, value in (
+            ("GMS_KEY", "test-key"),
+            ("JETSON_TOKEN", ""),
+            ("GMS_CHAT_URL", self.gms.chat_url),
+            ("GMS_STT_URL", self.gms.stt_url),
+            ("llm_cache", ParseCache(maxsize=16, ttl=60)),
+            ("LLM_RULE_FIRST", self.rule_first),
+            ("parse_tiers", {"rule": 0, "cache": 0, "llm": 0}),
+        ):
+            patcher = patch.object(proxy, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncSetUp(self):
+        self._lifespan = proxy.lifespan(proxy.app)
+        await self._lifespan.__aenter__()
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=proxy.app), base_url="http://proxy")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await self._lifespan.__aexit__(None, None, None)
+
+    async def parse(self, text, mode="idle"):
+        return await self.client.post("/llm_parse", json={"text": text, "state": {"mode": mode}})
+
+
+class LlmParseCacheTestCase(ProxyTestCase):
+    """/llm_parse 응답 캐시 / 요청 병합 테스트 (규칙 파서 끔)"""
+
+    delay = 0.05
+    rule_first = False
+
+    async def test_repeated_command_served_from_cache(self):
+        """같은 명령은 한 번만 GMS로 보내고 /health에 적중/실패가 집계되는지 테스트"""
+        first = await self.parse("왼쪽으로 이동")
+        second = await self.parse("왼쪽으로 이동")
+
+        self.assertEqual(first.json(), {"ok": True, "action": {"cmd": "MOVE", "dir": "left"}, "tier": "llm"})
+        self.assertEqual(second.json(), {**first.json(), "tier": "cache"})
+        self.assertEqual(self.gms.chat_requests, 1)
+
+        stats = (await self.client.get("/health")).json()["llm_cache"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["upstream_calls"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    async def test_key_normalized_text_and_mode(self):
+        """공백/문장부호만 다른 발화는 같은 항목, 모드가 다르면 다른 항목인지 테스트"""
+        await self.parse("10초 앞으로", mode="youtube")
+        variant = await self.parse("  10초 앞으로!! ", mode="youtube")
+        idle = await self.parse("10초 앞으로", mode="idle")
+
+        self.assertEqual(variant.json()["action"], {"cmd": "YOUTUBE_SEEK", "sec": 10})
+        self.assertEqual(idle.json(), {"ok": False, "reason": "not_in_youtube", "tier": "llm"})
+        self.assertEqual(self.gms.chat_requests, 2)
+
+    async def test_concurrent_identical_requests_coalesced(self):
+        """동시에 들어온 같은 명령은 GMS 호출 하나로 합치는지 테스트"""
+        responses = await asyncio.gather(*(self.parse("멈춰") for _ in range(8)))
+
+        self.assertEqual({r.json()["action"]["cmd"] for r in responses}, {"STOP"})
+        self.assertEqual(self.gms.chat_requests, 1)
+        self.assertEqual(proxy.llm_cache.stats()["coalesced"], 7)
+
+    async def test_unknown_command_cached(self):
+        """UNKNOWN 결과도 저장하는지 테스트 (같은 잡음 발화가 반복돼도 GMS 호출 없음)"""
+        for _ in range(3):
+            response = await self.parse("오늘 날씨 어때")
+            self.assertEqual(response.json()["reason"], "unknown_command")
+
+        self.assertEqual(self.gms.chat_requests, 1)
+
+    async def test_failures_not_cached(self):
+        """GMS 오류 / JSON이 아닌 응답은 저장하지 않고 다음 요청에서 다시 호출하는지 테스트"""
+        self.gms.fail_next(1, status=503)
+        failed = await asyncio.gather(*(self.parse("따라와") for _ in range(3)))
+        self.assertEqual({r.status_code for r in failed}, {503})
+        self.assertEqual(self.gms.chat_requests, 1)
+
+        self.gms.garble_next(1)
+        garbled = await self.parse("따라와")
+        self.assertEqual(garbled.json(), {"ok": False, "reason": "llm_parse_error", "tier": "llm"})
+
+        recovered = await self.parse("따라와")
+        self.assertEqual(recovered.json()["action"], {"cmd": "FOLLOW_ME"})
+        self.assertEqual(self.gms.chat_requests, 3)
+        self.assertEqual(proxy.llm_cache.stats()["upstream_errors"], 1)
+
+    async def test_cache_disabled(self):
+        """LLM_CACHE_SIZE=0이면 매번 GMS로 보내는지 테스트"""
+        with patch.object(proxy, "llm_cache", ParseCache(maxsize=0)):
+            await asyncio.gather(*(self.parse("정지") for _ in range(3)))
+
+        self.assertEqual(self.gms.chat_requests, 3)
+
+
+class RuleFirstParseTestCase(ProxyTestCase):
+    """/llm_parse 규칙 파서 우선 테스트"""
+
+    async def test_rule_tier_answers_without_gms(self):
+        """확실한 명령은 GMS 호출 없이 규칙 파서가 답하는지 테스트"""
+        with patch.object(proxy, "GMS_KEY", ""):
+            response = await self.parse("싸비스 왼쪽으로 이동해줘")
+
+        self.assertEqual(response.json(), {"ok": True, "action": {"cmd": "MOVE", "dir": "left"}, "tier": "rule"})
+        self.assertEqual(self.gms.chat_requests, 0)
+
+    async def test_rule_tier_checks_mode(self):
+        """규칙 파서 결과도 GPT 결과와 같이 모드를 검증하는지 테스트"""
+        idle = await self.parse("10초 뒤로")
+        youtube = await self.parse("10초 뒤로", mode="youtube")
+
+        self.assertEqual(idle.json(), {"ok": False, "reason": "not_in_youtube", "tier": "rule"})
+        self.assertEqual(youtube.json()["action"], {"cmd": "YOUTUBE_SEEK", "sec": -10})
+
+    async def test_ambiguous_goes_to_llm(self):
+        """애매한 발화는 GMS로 보내고 단계별 응답 수를 /health에 보고하는지 테스트"""
+        await self.parse("정지")
+        response = await self.parse("왼쪽 말고 오른쪽")
+        await self.parse("왼쪽 말고 오른쪽")
+
+        self.assertEqual(response.json()["tier"], "llm")
+        self.assertEqual(self.gms.texts, ["왼쪽 말고 오른쪽"])
+        tiers = (await self.client.get("/health")).json()["llm_parse_tiers"]
+        self.assertEqual(tiers, {"rule": 1, "cache": 1, "llm": 1})
+
+
+class CommandParserTestCase(unittest.TestCase):
+    """규칙 기반 명령 파서 테스트"""
+
+    def setUp(self):
+        self.parser = CommandParser()
+
+    def test_closed_grammar(self):
+        """프롬프트의 명령 문법을 확실하게 파싱하는지 테스트"""
+        cases = (
+            ("왼쪽으로 이동해줘", {"cmd": "MOVE", "dir": "left"}),
+            ("우회전", {"cmd": "MOVE", "dir": "right"}),
+            ("싸비스, 앞으로 가!", {"cmd": "MOVE", "dir": "forward"}),
+            ("위로 올라가", {"cmd": "MOVE", "dir": "up"}),
+            ("멈춰", {"cmd": "STOP"}),
+            ("따라오세요", {"cmd": "FOLLOW_ME"}),
+            ("이쪽으로 와", {"cmd": "COME_HERE"}),
+            ("유튜브 켜줘", {"cmd": "YOUTUBE_OPEN"}),
+            ("일시정지", {"cmd": "YOUTUBE_PAUSE"}),
+            ("다시 재생해줘", {"cmd": "YOUTUBE_PLAY"}),
+            ("10초 앞으로", {"cmd": "YOUTUBE_SEEK", "sec": 10}),
+            ("앞으로 삼십 초", {"cmd": "YOUTUBE_SEEK", "sec": 30}),
+            ("1분 뒤로", {"cmd": "YOUTUBE_SEEK", "sec": -60}),
+        )
+        for text, action in cases:
+            self.assertEqual(self.parser.parse(text), action, text)
+
+    def test_ambiguous_deferred(self):
+        """명령 없음 / 여러 명령 / 부정 / 설명되지 않는 말 / 방향 없는 시간은 None인지 테스트"""
+        for text in ("오늘 날씨 어때", "왼쪽으로 가다가 멈춰", "가지 마", "왼쪽에 뭐가 있어", "10초만", "유튜브 꺼줘", ""):
+            self.assertIsNone(self.parser.parse(text), text)
+
+    def test_korean_numbers(self):
+        """한글 숫자 변환 테스트"""
+        for token, value in (("10", 10), ("십", 10), ("이십오", 25), ("삼십", 30), ("오", 5), ("십이", 12)):
+            self.assertEqual(parse_korean_number(token), value)
+
+
+class ParseCacheTestCase(unittest.IsolatedAsyncioTestCase):
+    """ParseCache TTL / LRU 테스트"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.cache = ParseCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    async def load(self, key, value):
+        async def loader():
+            return value
+        return await self.cache.get_or_load(key, loader)
+
+    async def test_ttl_expiry(self):
+        """TTL이 지나면 다시 호출하는지 테스트"""
+        self.assertEqual(await self.load("a", 1), (1, "upstream"))
+        self.now = 9.9
+        self.assertEqual(await self.load("a", 2), (1, "cache"))
+        self.now = 10.0
+        self.assertEqual(await self.load("a", 3), (3, "upstream"))
+        self.assertEqual(self.cache.expired, 1)
+
+    async def test_lru_eviction(self):
+        """가장 오래 쓰지 않은 항목부터 제거하는지 테스트"""
+        await self.load("a", 1)
+        await self.load("b", 2)
+        await self.load("a", 1)  # a 사용 → b가 가장 오래됨
+        await self.load("c", 3)
+
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.evictions, 1)
+
+    async def test_cancelled_caller_does_not_cancel_load(self):
+        """먼저 온 요청이 취소돼도 기다리던 요청은 결과를 받는지 테스트"""
+        release = asyncio.Event()
+
+        async def loader():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(self.cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(self.cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        self.assertEqual(await second, ("done", "coalesced"))
+        self.assertEqual(self.cache.get("k"), "done")
+        self.assertEqual(self.cache.upstream_calls, 1)
+
+
+class SttStreamTestCase(ProxyTestCase):
+    """/stt, /stt_stream 업로드 스트리밍 테스트"""
+
+    pcm = struct.pack("<4000h", *range(-2000, 2000))
+
+    async def chunks(self, data, size=1024):
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+            await asyncio.sleep(0)
+
+    async def stream(self, content, content_type):
+        return await self.client.post("/stt_stream", content=content, headers={"Content-Type": content_type})
+
+    async def test_pcm_stream_wrapped_in_wav(self):
+        """청크로 보낸 원시 PCM에 WAV 헤더를 붙여 GMS로 보내고 시간을 보고하는지 테스트"""
+        response = await self.stream(self.chunks(self.pcm), "audio/L16; rate=16000; channels=1")
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["text"], "싸비스")
+        self.assertEqual(body["bytes"], 44 + len(self.pcm))
+        timings = body["timings"]
+        self.assertLessEqual(timings["upload_ms"], timings["first_byte_ms"])
+        self.assertLessEqual(timings["first_byte_ms"], timings["total_ms"])
+
+        upload = self.gms.uploads[0]
+        self.assertEqual((upload["filename"], upload["model"]), ("audio.wav", "whisper-1"))
+        riff, _, wave, rate, bits, data_size = struct.unpack_from("<4sI4s12xI6xH4xI", upload["data"])
+        self.assertEqual((riff, wave, rate, bits), (b"RIFF", b"WAVE", 16000, 16))
+        # chunked 전송이라 길이 미정
+        self.assertEqual(data_size, WAV_UNKNOWN_SIZE)
+        self.assertEqual(upload["data"][44:], self.pcm)
+
+    async def test_pcm_with_content_length(self):
+        """Content-Length가 있으면 WAV 헤더에 정확한 크기를 쓰는지 테스트"""
+        await self.stream(self.pcm, "audio/L16; rate=48000")
+
+        data = self.gms.uploads[0]["data"]
+        self.assertEqual(struct.unpack_from("<I", data, 24)[0], 48000)
+        self.assertEqual(struct.unpack_from("<I", data, 40)[0], len(self.pcm))
+
+    async def test_flac_passthrough(self):
+        """FLAC은 그대로 전달하는지 테스트"""
+        flac = b"fLaC" + bytes(range(256)) * 20
+        await self.stream(self.chunks(flac, 700), "audio/flac")
+
+        upload = self.gms.uploads[0]
+        self.assertEqual((upload["filename"], upload["content_type"]), ("audio.flac", "audio/flac"))
+        self.assertEqual(upload["data"], flac)
+
+    async def test_upload_file_streamed(self):
+        """/stt 파일 업로드도 같은 내용으로 GMS에 전달하는지 테스트"""
+        wav = b"RIFF" + self.pcm
+        response = await self.client.post("/stt", files={"file": ("cmd_1.wav", wav, "audio/wav")})
+
+        self.assertEqual(response.json()["text"], "싸비스")
+        self.assertEqual(self.gms.uploads[0]["filename"], "cmd_1.wav")
+        self.assertEqual(self.gms.uploads[0]["data"], wav)
+
+    async def test_empty_audio_and_upstream_error(self):
+        """빈 오디오는 GMS로 보내지 않고, GMS 오류 상태 코드를 그대로 전달하는지 테스트"""
+        empty = await self.stream(b"", "audio/flac")
+        self.assertEqual(empty.status_code, 400)
+        self.assertEqual(self.gms.uploads, [])
+
+        self.gms.fail_next(1, status=502)
+        failed = await self.stream(self.pcm, "audio/L16; rate=16000")
+        self.assertEqual(failed.status_code, 502)
+
+
+class BatchTestCase(ProxyTestCase):
+    """/stt_batch, /llm_parse_batch NDJSON 일괄 처리 테스트"""
+
+    delay = 0.1
+    rule_first = False
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(proxy, "BATCH_CONCURRENCY", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def lines(self, response):
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        *items, summary = [json.loads(line) for line in response.text.splitlines()]
+        return items, summary
+
+    async def test_llm_parse_batch(self):
+        """항목마다 index/request_id가 붙고 마지막 줄에 요약이 오는지, 동시 호출 수가 제한되는지 테스트"""
+        texts = ["왼쪽으로 이동", "멈춰", "따라와", "뒤로 가"]
+        response = await self.client.post("/llm_parse_batch", json={
+            "items": [{"text": text, "request_id": f"r{i}"} for i, text in enumerate(texts)]
+        })
+
+        self.assertEqual(response.status_code, 200)
+        items, summary = self.lines(response)
+        by_index = {item["index"]: item for item in items}
+        self.assertEqual(sorted(by_index), [0, 1, 2, 3])
+        self.assertEqual(by_index[1], {"index": 1, "request_id": "r1", "ok": True, "action": {"cmd": "STOP"}, "tier": "llm"})
+        self.assertEqual((summary["done"], summary["count"], summary["errors"]), (True, 4, 0))
+        self.assertEqual(self.gms.chat_requests, 4)
+        # 2개씩 2번 (한 번에 보냈다면 ~100ms, 하나씩 보냈다면 ~400ms)
+        self.assertGreaterEqual(summary["elapsed_ms"], 190)
+        self.assertLess(summary["elapsed_ms"], 390)
+
+    async def test_stt_batch_item_error(self):
+        """GMS 오류는 그 항목의 줄에만 나타나고 나머지는 계속 처리되는지 테스트"""
+        self.gms.fail_next(1, status=502)
+        files = [("files", (f"WAKE_{i}.wav", b"RIFF" + bytes([i]) * 100, "audio/wav")) for i in range(3)]
+        response = await self.client.post("/stt_batch", files=files)
+
+        items, summary = self.lines(response)
+        self.assertEqual(sorted(item["index"] for item in items), [0, 1, 2])
+        failed = [item for item in items if "error" in item]
+        self.assertEqual([item["status"] for item in failed], [502])
+        for item in items:
+            self.assertEqual(item["filename"], f"WAKE_{item['index']}.wav")
+            if item not in failed:
+                self.assertEqual(item["text"], "싸비스")
+        self.assertEqual((summary["count"], summary["errors"]), (3, 1))
+        self.assertEqual(sorted(upload["data"][4] for upload in self.gms.uploads), [0, 1, 2])
+
+    async def test_batch_size_limit(self):
+        """항목이 없거나 BATCH_MAX_ITEMS를 넘으면 400인지 테스트"""
+        empty = await self.client.post("/llm_parse_batch", json={"items": []})
+        self.assertEqual(empty.status_code, 400)
+
+        with patch.object(proxy, "BATCH_MAX_ITEMS", 2):
+            response = await self.client.post("/llm_parse_batch", json={"items": [{"text": "멈춰"}] * 3})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.gms.chat_requests, 0)
+
+
+def metric_samples(text):
+    """Prometheus 텍스트 → {'이름{라벨}': 값}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+class MetricsTestCase(ProxyTestCase):
+    """/metrics 지표 테스트 (지표는 프로세스 전역이라 전후 차이로 확인)"""
+
+    async def scrape(self):
+        response = await self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        return metric_samples(response.text)
+
+    def assertDelta(self, before, after, name, expected):
+        self.assertEqual(after.get(name, 0) - before.get(name, 0), expected, name)
+
+    async def test_route_and_upstream_metrics(self):
+        """라우트별 요청 수/지연, GMS 호출 결과 분류가 집계되는지 테스트"""
+        before = await self.scrape()
+        await self.parse("오늘 날씨 어때")
+        await self.parse("멈춰")
+        self.gms.fail_next(1, status=503)
+        await self.parse("노래 틀어줘")
+        await self.client.post("/stt", files={"file": ("cmd.wav", b"RIFF0000", "audio/wav")})
+        await self.client.get("/no_such_route")
+        after = await self.scrape()
+
+        route = 'route="/llm_parse",method="POST"'
+        self.assertDelta(before, after, f'gms_proxy_http_requests_total{{{route},status="200"}}', 2)
+        self.assertDelta(before, after, f'gms_proxy_http_requests_total{{{route},status="503"}}', 1)
+        self.assertDelta(before, after, f'gms_proxy_http_request_duration_seconds_count{{{route}}}', 3)
+        self.assertDelta(before, after, f'gms_proxy_http_request_duration_seconds_bucket{{{route},le="+Inf"}}', 3)
+        self.assertDelta(
+            before, after, 'gms_proxy_http_requests_total{route="unmatched",method="GET",status="404"}', 1
+        )
+        # "멈춰"는 규칙 파서가 답함 → GMS 호출은 2번
+        self.assertDelta(before, after, 'gms_proxy_upstream_requests_total{upstream="gms_chat",outcome="ok"}', 1)
+        self.assertDelta(before, after, 'gms_proxy_upstream_requests_total{upstream="gms_chat",outcome="http_5xx"}', 1)
+        self.assertDelta(before, after, 'gms_proxy_upstream_duration_seconds_count{upstream="gms_chat"}', 2)
+        self.assertDelta(before, after, 'gms_proxy_upstream_requests_total{upstream="gms_stt",outcome="ok"}', 1)
+
+        self.assertEqual(after['gms_proxy_llm_parse_total{tier="rule"}'], 1)
+        self.assertEqual(after['gms_proxy_llm_cache_events_total{event="misses"}'], 2)
+        self.assertEqual(after["gms_proxy_http_pool_max_connections"], 200)
+        self.assertEqual(after['gms_proxy_http_pool_connections{state="active"}'], 0)
+        self.assertGreaterEqual(after['gms_proxy_http_pool_connections{state="idle"}'], 1)
+
+
+class MetricsRegistryTestCase(unittest.TestCase):
+    """지표 텍스트 형식 테스트"""
+
+    def test_histogram_buckets_cumulative(self):
+        """관측값은 le 이상인 버킷 모두에 누적되고 +Inf/sum/count가 나오는지 테스트"""
+        histogram = Histogram("latency_seconds", "latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/stt")
+
+        samples = {name + str(labels): value for name, labels, value in histogram.samples()}
+        self.assertEqual(samples["latency_seconds_bucket{'route': '/stt', 'le': '0.1'}"], 2)
+        self.assertEqual(samples["latency_seconds_bucket{'route': '/stt', 'le': '1.0'}"], 3)
+        self.assertEqual(samples["latency_seconds_bucket{'route': '/stt', 'le': '+Inf'}"], 4)
+        self.assertEqual(samples["latency_seconds_count{'route': '/stt'}"], 4)
+        self.assertAlmostEqual(samples["latency_seconds_sum{'route': '/stt'}"], 3.65)
+
+    def test_render(self):
+        """HELP/TYPE 줄, 라벨 이스케이프, collector 값이 들어가는지 테스트"""
+        registry = MetricsRegistry()
+        counter = registry.counter("errors_total", "errors", ("reason",))
+        counter.inc('bad "quote"')
+        registry.collector(lambda: [("entries", "gauge", "entries", [({}, 3)])])
+
+        self.assertEqual(registry.render(), (
+            "# HELP errors_total errors\n"
+            "# TYPE errors_total counter\n"
+            'errors_total{reason="bad \\"quote\\""} 1\n'
+            "# HELP entries entries\n"
+            "# TYPE entries gauge\n"
+            "entries 3\n"
+        ))
+
+
+class WakeMatcherTestCase(unittest.TestCase):
+    """/verify_wake 규칙 매처 테스트"""
+
+    def setUp(self):
+        self.matcher = WakeMatcher(["싸비스", "사비스", "service"])
+
+    def test_rule_order(self):
+        """정확 일치 → 포함 → fuzzy → 부정 단어 → 불일치 순서로 판정하는지 테스트"""
+        cases = (
+            ("싸비스!", True, "exact_match: 싸비스"),
+            ("사비스 켜줘", True, "contains: 사비스"),
+            ("Service.", True, "exact_match: service"),
+            ("servis", True, "fuzzy_match: service"),
+            ("감사합니다.", False, "negative_word: 감사합니다"),
+            ("싸비수", False, "no_match (best: 싸비스, score: 0.67)"),
+            ("MBC 뉴스입니다", False, "no_match (best: 싸비스, score: 0.12)"),
+        )
+        for text, is_valid, reason in cases:
+            result = self.matcher.match(text)
+            self.assertEqual((result["is_valid"], result["reason"]), (is_valid, reason), text)
+
+        self.assertAlmostEqual(self.matcher.match("servis")["confidence"], 5 / 7)
+        self.assertAlmostEqual(self.matcher.match("싸비수")["confidence"], 2 / 3)
+
+    def test_bounded_levenshtein_cutoff(self):
+        """거리 상한 안에서는 정확한 거리, 넘으면 상한 + 1을 반환하는지 테스트"""
+        self.assertEqual(bounded_levenshtein("싸비스", "사비스", 3), 1)
+        self.assertEqual(bounded_levenshtein("kitten", "sitting", 3), 3)
+        self.assertEqual(bounded_levenshtein("kitten", "sitting", 2), 3)
+        self.assertEqual(bounded_levenshtein("싸비스", "안녕하세요반가워요", 2), 3)
+        self.assertEqual(bounded_levenshtein("", "abc", 5), 3)
+
+    def test_recent_results_cached(self):
+        """정규화한 텍스트가 같으면 최근 결과를 재사용하고, 결과를 바꿔도 캐시는 그대로인지 테스트"""
+        first = self.matcher.match("싸비스 켜줘")
+        first["is_valid"] = None
+        second = self.matcher.match(" 싸비스, 켜줘?")
+
+        self.assertTrue(second["is_valid"])
+        self.assertEqual(self.matcher.stats(), {"size": 1, "hits": 1, "misses": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
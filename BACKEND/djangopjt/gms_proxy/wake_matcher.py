@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+규칙 기반 Wake word 매처 (/verify_wake)
+
+요청마다 대상 단어를 다시 정규화하고, 대상마다 전체 편집 거리 표(m x n)를 만들던 것을
+대상 단어 묶음마다 한 번 만든 매처로 바꿉니다. 판정 결과는 이전 verify_with_rules와 같습니다.
+
+- 대상 단어 / 부정 단어는 만들 때 한 번만 정규화 (정확 일치는 dict 조회)
+- 편집 거리는 거리 상한(max_dist)이 있는 띠(band) 계산 - 상한을 넘는 게 확실해지면 바로 중단
+- 유사도 비교는 지금까지의 최고 점수를 넘을 수 있는 거리까지만 계산 (길이 차이가 크면 계산 없이 건너뜀)
+- 최근 결과 LRU (정규화한 텍스트 기준 - STT 결과는 같은 문장이 자주 반복됨)
+- 매처는 get_matcher()가 대상 단어 묶음별로 재사용
+"""
+import re
+from collections import OrderedDict
+
+_NON_WORD = re.compile(r'[^가-힣a-z0-9]')
+
+FUZZY_THRESHOLD = 0.7
+
+# 확실히 다른 단어들
+NEGATIVE_WORDS = (
+    "안녕", "헬로", "하이", "좋아", "싫어", "예", "아니오",
+    "고마워", "미안", "잘가", "안녕하세요", "감사합니다",
+)
+
+
+def normalize_korean(text: str) -> str:
+    """한글/영문 텍스트 정규화 (소문자, 한글 + 영문 + 숫자만 남김)"""
+    return _NON_WORD.sub('', text.lower())
+
+
+def bounded_levenshtein(a: str, b: str, max_dist: int) -> int:
+    """
+    편집 거리 (max_dist를 넘으면 max_dist + 1)
+
+    |i - j| <= max_dist 인 칸만 계산하고, 한 행의 최솟값이 max_dist를 넘으면 바로 중단합니다.
+    """
+    if a == b:
+        return 0
+    m, n = len(a), len(b)
+    over = max_dist + 1
+    if abs(m - n) > max_dist:
+        return over
+    if n == 0:
+        return m
+    if m == 0:
+        return n
+
+    prev = list(range(n + 1))
+    for i in range(1, m + 1):
+        lo = max(1, i - max_dist)
+        hi = min(n, i + max_dist)
+        cur = [over] * (n + 1)
+        if i <= max_dist:
+            cur[0] = i
+        row_min = cur[0]
+        ca = a[i - 1]
+        for j in range(lo, hi + 1):
+            d = prev[j - 1] + (ca != b[j - 1])
+            if prev[j] + 1 < d:
+                d = prev[j] + 1
+            if cur[j - 1] + 1 < d:
+                d = cur[j - 1] + 1
+            cur[j] = d
+            if d < row_min:
+                row_min = d
+        if row_min > max_dist:
+            return over
+        prev = cur
+    return prev[n] if prev[n] <= max_dist else over
+
+
+def similarity(text_norm: str, target_norm: str) -> float:
+    """정규화된 두 문자열의 유사도 (포함이면 1.0, 아니면 1 - 편집 거리 / 긴 쪽 길이)"""
+    if target_norm in text_norm:
+        return 1.0
+    longest = max(len(text_norm), len(target_norm))
+    if not text_norm or not target_norm:
+        return 0.0
+    return 1.0 - bounded_levenshtein(text_norm, target_norm, longest) / longest
+
+
+class WakeMatcher:
+    """
+    대상 단어 묶음 하나의 매처
+
+    Args:
+        target_words: 대상 단어 (앞에 있는 단어가 먼저 일치)
+        negative_words: 일치하면 확실히 wake word가 아닌 단어
+        threshold: fuzzy 일치 최소 유사도
+        cache_size: 최근 결과 LRU 크기 (0이면 저장 안 함)
+    """
+
+    def __init__(self, target_words, negative_words=NEGATIVE_WORDS, threshold=FUZZY_THRESHOLD, cache_size=1024):
+        self.targets = [(word, normalize_korean(word)) for word in target_words]
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self._exact = {}
+        for word, norm in self.targets:
+            self._exact.setdefault(norm, word)
+        self._negative = {}
+        for word in negative_words:
+            self._negative.setdefault(normalize_korean(word), word)
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def match(self, text: str) -> dict:
+        """규칙 기반 검증 결과 (is_valid, confidence, reason, matched_word)"""
+        text_norm = normalize_korean(text)
+        result = self._results.get(text_norm)
+        if result is not None:
+            self._results.move_to_end(text_norm)
+            self.hits += 1
+            return dict(result)
+
+        self.misses += 1
+        result = self._match(text_norm)
+        if self.cache_size > 0:
+            self._results[text_norm] = result
+            if len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return dict(result)
+
+    def _match(self, text_norm: str) -> dict:
+        # 1) Exact match
+        word = self._exact.get(text_norm)
+        if word is not None:
+            return {
+                "is_valid": True,
+                "confidence": 1.0,
+                "reason": f"exact_match: {word}",
+                "matched_word": word,
+            }
+
+        # 2) Contains match
+        for word, norm in self.targets:
+            if norm in text_norm:
+                return {
+                    "is_valid": True,
+                    "confidence": 0.95,
+                    "reason": f"contains: {word}",
+                    "matched_word": word,
+                }
+
+        # 3) Fuzzy match - 최고 점수를 넘을 수 있는 거리까지만 계산
+        best_score = 0.0
+        best_target = None
+        m = len(text_norm)
+        if m:
+            for word, norm in self.targets:
+                if not norm:
+                    continue
+                longest = max(m, len(norm))
+                # 1 - d / longest > best_score 가 되려면 d < longest * (1 - best_score)
+                # (+1: 부동소수점 경계에서 놓치지 않도록, 최종 비교는 아래 score로)
+                max_dist = int(longest * (1.0 - best_score)) + 1
+                distance = bounded_levenshtein(text_norm, norm, max_dist)
+                if distance > max_dist:
+                    continue
+                score = 1.0 - distance / longest
+                if score > best_score:
+                    best_score = score
+                    best_target = word
+
+        if best_score >= self.threshold:
+            return {
+                "is_valid": True,
+                "confidence": best_score,
+                "reason": f"fuzzy_match: {best_target}",
+                "matched_word": best_target,
+            }
+
+        # 4) Negative cases
+        word = self._negative.get(text_norm)
+        if word is not None:
+            return {
+                "is_valid": False,
+                "confidence": 0.95,
+                "reason": f"negative_word: {word}",
+                "matched_word": None,
+            }
+
+        # 5) Unknown
+        return {
+            "is_valid": False,
+            "confidence": best_score if best_score > 0.3 else 0.1,
+            "reason": f"no_match (best: {best_target}, score: {best_score:.2f})",
+            "matched_word": None,
+        }
+
+    def stats(self):
+        return {"size": len(self._results), "hits": self.hits, "misses": self.misses}
+
+
+# 대상 단어 묶음별 매처 (요청이 기본 목록을 쓰면 항상 같은 매처)
+_matchers = OrderedDict()
+MAX_MATCHERS = 32
+
+
+def get_matcher(target_words) -> WakeMatcher:
+    key = tuple(target_words)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = WakeMatcher(key)
+        if len(_matchers) > MAX_MATCHERS:
+            _matchers.popitem(last=False)
+    else:
+        _matchers.move_to_end(key)
+    return matcher
+
+
+def matcher_stats() -> dict:
+    """살아 있는 매처들의 결과 캐시 합계 (/metrics)"""
+    stats = {"matchers": len(_matchers), "size": 0, "hits": 0, "misses": 0}
+    for matcher in list(_matchers.values()):
+        for key, value in matcher.stats().items():
+            stats[key] += value
+    return stats
@@ -1,2 +1,7 @@
 import pymysql
 pymysql.install_as_MySQLdb()
+
+# Django 프로세스에서도 Celery 앱 설정(CELERY_*)을 사용하도록 로드 (shared_task의 delay 등)
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -8,11 +8,12 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
 django_asgi_app = get_asgi_application()
 
 import accounts.routing
+import server.routing
 
 application = ProtocolTypeRouter({
     "websocket": AuthMiddlewareStack(
         URLRouter(
-            accounts.routing.websocket_urlpatterns
+            accounts.routing.websocket_urlpatterns + server.routing.websocket_urlpatterns
         )
     ),
     "http": django_asgi_app,
@@ -1,50 +1,36 @@
-import json
 import logging
-from channels.generic.websocket import AsyncWebsocketConsumer
-from asgiref.sync import sync_to_async
-from accounts.models import CommandLog, Session
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from accounts.dashboard_feed import DASHBOARD_GROUP, dashboard_feed
 
 logger = logging.getLogger(__name__)
 
-class DashboardConsumer(AsyncWebsocketConsumer):
-    """웹 대시보드용 Consumer - 단순 데이터 브로드캐스팅"""
+class DashboardConsumer(AsyncJsonWebsocketConsumer):
+    """
+    웹 대시보드용 Consumer - 명령 로그 실시간 피드
+
+    URL: ws/dashboard/
+    - 연결 시: 최근 명령 로그 스냅샷 한 번 ({'type': 'snapshot', 'logs': [...]})
+    - 이후: 틱(기본 200ms)마다 모은 변경분 ({'type': 'delta', 'logs': [...]})
+      (변경분은 dashboard_feed가 기록 시점에 모아 그룹으로 한 번만 보냄)
+    """
     
     async def connect(self):
+        # 스냅샷 전에 그룹에 참여 (스냅샷과 첫 변경분 사이에 빠지는 로그가 없도록, 중복은 event_id로 구분)
+        await self.channel_layer.group_add(DASHBOARD_GROUP, self.channel_name)
         await self.accept()
-        self.room_name = 'dashboard'
-        await self.channel_layer.group_add(self.room_name, self.channel_name)
+        await self.send_json({'type': 'snapshot', 'logs': await dashboard_feed.asnapshot()})
+        dashboard_feed.attach()
         logger.info(f"웹 대시보드 연결됨")
     
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.room_name, self.channel_name)
+        dashboard_feed.detach()
+        await self.channel_layer.group_discard(DASHBOARD_GROUP, self.channel_name)
         logger.info(f"웹 대시보드 연결 종료")
     
-    async def receive(self, text_data):
-        # 데이터 브로드캐스팅을 위한 허용/인증 필요
-        await self.broadcast_state()
+    async def receive_json(self, content):
+        # 대시보드는 받기만 함 (상태는 변경분으로 전달)
+        logger.debug(f"웹 대시보드 메시지 무시: {content}")
     
-    async def broadcast_state(self):
-        """최근 로그와 현재 상태를 브로드캐스팅"""
-        # 최근 명령 로그 조회
-        recent_logs = await sync_to_async(CommandLog.objects.select_related)(
-            command_type__in=['BUTTON', 'VOICE'],
-            is_success=True
-        )[:10].order_by('-occurred_at')
-        
-        logs_data = [
-            {
-                'type': log.command_type,
-                'content': log.command_content,
-                'timestamp': log.occurred_at.isoformat()
-            }
-            for log in recent_logs
-        ]
-        
-        # 웹 클라이언트에 브로드캐스팅
-        await self.channel_layer.group_send(
-            self.room_name,
-            json.dumps({
-                'type': 'state_update',
-                'logs': logs_data
-            })
-        )
+    async def dashboard_delta(self, event):
+        """dashboard_feed 틱 브로드캐스트 → 클라이언트"""
+        await self.send_json({'type': 'delta', 'logs': event['logs']})
@@ -2,10 +2,6 @@ from django.urls import re_path
 from . import consumers
 
 websocket_urlpatterns = [
+    # 웹 대시보드 - 명령 로그 실시간 피드
     re_path(r'ws/dashboard/$', consumers.DashboardConsumer.as_asgi()),
 ]
-
-application = ProtocolTypeRouter({
-    "websocket": websocket_urlpatterns,
-    "http": django_asgi_app,
-})
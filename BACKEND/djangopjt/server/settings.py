@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 from datetime import timedelta
 
@@ -27,6 +28,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('SECRET_KEY')
 
+# manage.py test 실행 여부
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DEBUG', 'False') == 'True'
 # ALLOWED_HOSTS = ["i14a104.p.ssafy.io", "localhost", "127.0.0.1", "localhost:8080", "127.0.0.1:8080"]
@@ -56,6 +60,8 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
+    # 요청당 쿼리 수 집계 / 뷰별 예산 확인 (가장 바깥에서 전체 요청을 셈)
+    'accounts.query_budget.QueryBudgetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -205,24 +211,39 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 # 캐시 설정 (Redis)
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django_redis.cache.RedisCache',
-#         'LOCATION': 'redis://127.0.0.1:6379/1',
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#         }
-#     }
-# }
-
-
+# 회원가입 단계, WebSocket 연결 여부, 얼굴 갤러리 버전 등은 모든 워커가 공유해야 하므로
+# 프로세스별 LocMemCache 대신 Redis 사용. 키 형식은 accounts/cache_keys.py 참고
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv(
+            'REDIS_CACHE_URL',
+            f"redis://{os.getenv('REDIS_HOST', '127.0.0.1')}:{os.getenv('REDIS_PORT', 6379)}/1"
+        ),
+        'KEY_PREFIX': 'sarvis',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # 워커(프로세스)당 커넥션 풀 - 요청마다 새 연결을 맺지 않음
+            'CONNECTION_POOL_KWARGS': {
+                'max_connections': int(os.getenv('REDIS_CACHE_MAX_CONNECTIONS', 50)),
+                'health_check_interval': 30,
+                'retry_on_timeout': True,
+            },
+            'SOCKET_CONNECT_TIMEOUT': 2,  # 초
+            'SOCKET_TIMEOUT': 2,  # 초
+        },
     }
 }
 
+# 테스트(manage.py test) 또는 CACHE_FAKE_REDIS=True: Redis 서버 없이 fakeredis 사용
+if TESTING or os.getenv('CACHE_FAKE_REDIS') == 'True':
+    import fakeredis
+
+    CACHES['default']['OPTIONS']['CONNECTION_POOL_KWARGS'] = {
+        'connection_class': fakeredis.FakeConnection,
+        'server': fakeredis.FakeServer(),
+    }
+
 
 # 세션 설정
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
@@ -241,7 +262,8 @@ REST_FRAMEWORK = {
     
     # 3. (추후 추가될) 인증 설정 - JWT 등을 쓸 때 필요합니다
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # accounts의 JWT 인증 (인증 사용자 캐시 사용, @jwt_required와 결과 공유)
+        'accounts.auth_utils.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
 }
@@ -304,6 +326,22 @@ EMAIL_TIMEOUT = 30
 if DEBUG:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# 테스트에서는 메모리에만 저장 (django.core.mail.outbox)
+if TESTING:
+    EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# 인증 메일 비동기 발송 (accounts/email_queue.py)
+EMAIL_QUEUE = {
+    # False: 요청에서 바로 발송 (Celery 워커 없이 실행하는 개발 환경)
+    'ENABLED': os.getenv('EMAIL_QUEUE_ENABLED', 'True') == 'True',
+    'MAX_RETRIES': 5,
+    'RETRY_BACKOFF': 10,  # 초 - 재시도 간격 기준 (10, 20, 40 ... 최대 RETRY_BACKOFF_MAX)
+    'RETRY_BACKOFF_MAX': 600,
+    'RATE_LIMIT': int(os.getenv('EMAIL_RATE_LIMIT', '5')),  # 주소당 RATE_WINDOW 안 최대 발송 수 (0이면 제한 없음)
+    'RATE_WINDOW': 600,  # 초
+    'CONNECTION_IDLE': 30,  # 초 - 워커가 SMTP 연결을 열어 두는 최대 유휴 시간
+}
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'SARVIS API Project',
     'DESCRIPTION': '라즈베리 파이 & 스마트폰 연동 보안 시스템 API',
@@ -324,6 +362,35 @@ CHANNEL_LAYERS = {
     },
 }
 
+# 테스트에서는 Redis 없이 프로세스 내 채널 레이어 사용 (CACHES의 fakeredis와 같은 이유)
+if TESTING:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        },
+    }
+
+# 얼굴 벡터 검색 엔진 (accounts/biometric_search.py)
+BIOMETRIC_SEARCH = {
+    'BACKEND': os.getenv('BIOMETRIC_SEARCH_BACKEND', 'exact'),  # 'exact' | 'ivf'
+    # build_face_index 명령으로 생성한 인덱스 디렉터리 - 설정 시 워커들이 mmap으로 공유
+    'INDEX_PATH': os.getenv('BIOMETRIC_INDEX_PATH') or None,
+    'NLIST': None,  # IVF 클러스터 수 (None이면 sqrt(벡터 수))
+    'NPROBE': int(os.getenv('BIOMETRIC_NPROBE', 8)),  # IVF 검색 시 스캔할 클러스터 수
+    'MAX_DELTA': 5000,  # 메모리 인덱스 재구축 전까지 누적할 변경 사용자 수
+}
+
+# 젯슨 HTTP 클라이언트 (accounts/jetson_client.py)
+JETSON_BASE_URL = os.getenv('JETSON_BASE_URL', 'https://unforetold-jannet-hydropically.ngrok-free.dev')
+JETSON_CLIENT = {
+    'TIMEOUTS': {},  # 엔드포인트별 응답 타임아웃(초) 덮어쓰기, 예: {'/button_command': 2}
+    'CONNECT_TIMEOUT': 3.0,
+    'MAX_CONNECTIONS': 20,  # 워커(프로세스)당 커넥션 풀 크기
+    'MAX_KEEPALIVE': 10,
+    'FAILURE_THRESHOLD': 5,  # 연속 실패 시 회로 차단
+    'RESET_TIMEOUT': 15.0,  # 회로 차단 후 재시도까지 (초)
+}
+
 # Celery 설정 (세션 타임아웃 체크 등 비동기 작업)
 CELERY_BROKER_URL = 'redis://127.0.0.1:6379/0'
 CELERY_RESULT_BACKEND = 'redis://127.0.0.1:6379/0'
@@ -332,12 +399,79 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Seoul'
 
+# 메일 발송은 별도 큐 (워커 실행: celery -A server worker -Q celery,email)
+CELERY_TASK_ROUTES = {
+    'accounts.tasks.send_email': {'queue': 'email'},
+}
+
+# 테스트에서는 태스크를 호출한 자리에서 바로 실행
+CELERY_TASK_ALWAYS_EAGER = TESTING
+
 # Celery Beat 스케줄 설정
 CELERY_BEAT_SCHEDULE = {
     'check-session-timeout': {
         'task': 'accounts.tasks.check_session_timeout',
         'schedule': 60.0,  # 60초마다 실행
     },
+    'flush-command-logs': {
+        'task': 'accounts.tasks.flush_command_logs',
+        'schedule': 1.0,  # 1초마다 CommandLog 큐 저장
+    },
+    'archive-command-logs': {
+        'task': 'accounts.tasks.archive_command_logs',
+        'schedule': 60 * 60,  # 1시간마다 보관 기간 지난 CommandLog 압축 보관
+    },
+    'sweep-presence': {
+        'task': 'accounts.tasks.sweep_presence',
+        'schedule': 60.0,  # 1분마다 만료된 앱 WebSocket 연결 정리
+    },
+}
+
+# 뷰별 쿼리 예산 (accounts/query_budget.py)
+QUERY_BUDGET = {
+    'ENABLED': DEBUG or TESTING,  # 운영에서는 미들웨어를 쓰지 않음 (쿼리마다 감싸지 않음)
+    'ENFORCE': TESTING,  # 테스트에서는 예산 초과 시 실패
+    'HEADER': DEBUG or TESTING,  # X-Query-Count / X-Query-Budget 응답 헤더
+}
+
+# JWT 인증 사용자 캐시 (accounts/principal_cache.py)
+AUTH_PRINCIPAL_CACHE = {
+    'TTL': int(os.getenv('AUTH_PRINCIPAL_CACHE_TTL', '60')),  # 초, 0이면 매 요청 DB 조회
+    'MAX_ENTRIES': 10000,  # 워커당 토큰 수
+}
+
+# uid → 활성 세션 레지스트리 (accounts/session_registry.py)
+SESSION_REGISTRY = {
+    'TTL': int(os.getenv('SESSION_REGISTRY_TTL', str(6 * 60 * 60))),  # 초, 0이면 매 요청 DB 조회
+}
+
+# CommandLog 보관 기간 관리 (accounts/command_log_archive.py)
+COMMAND_LOG_ARCHIVE = {
+    'DIR': os.getenv('COMMAND_LOG_ARCHIVE_DIR', str(BASE_DIR / 'archive' / 'command_log')),
+    'RETENTION_DAYS': int(os.getenv('COMMAND_LOG_RETENTION_DAYS', '90')),
+    'BATCH_SIZE': 10000,  # 보관 파일 하나의 행 수
+    'MAX_BATCHES': 20,  # 실행당 최대 파일 수
+}
+
+# CommandLog 지연 저장 (accounts/command_log_writer.py)
+COMMAND_LOG_WRITER = {
+    # False: 요청에서 바로 DB 저장 (Celery Beat 없이 실행하는 개발 환경)
+    'ENABLED': os.getenv('COMMAND_LOG_WRITE_BEHIND', 'True') == 'True',
+    'BATCH_SIZE': 500,
+    'LOCK_TIMEOUT': 60,
+}
+
+# 앱 WebSocket 연결 레지스트리 (accounts/presence.py)
+PRESENCE = {
+    'TTL': int(os.getenv('PRESENCE_TTL', '120')),  # 초 - 앱 메시지(ping 등) 없이 이 시간이 지나면 연결 끊김으로 봄
+    'HEARTBEAT_INTERVAL': 30,  # 초 - 연결당 만료 시각 갱신 최소 간격
+}
+
+# 웹 대시보드 명령 로그 피드 (accounts/dashboard_feed.py)
+DASHBOARD_FEED = {
+    'TICK': float(os.getenv('DASHBOARD_FEED_TICK', '0.2')),  # 초 - 변경분을 모아 보내는 간격
+    'SNAPSHOT_SIZE': 20,  # 연결 시 보내는 최근 로그 수
+    'MAX_PENDING': 5000,  # 대시보드가 없을 때 쌓아 두는 최대 변경분 수
 }
 
 # 로깅 설정
@@ -80,6 +80,9 @@ WAKE_VALIDATION_MODE = "OR"                                       # "OR": 둘 
 PROXY_SERVER = "http://13.124.184.2:8000"  # EC2 IP
 STT_PROXY_URL = "http://13.124.184.2:8000/stt"
 STT_PROXY_TIMEOUT = 6.0
+STT_STREAM_URL = "http://13.124.184.2:8000/stt_stream"   # 메모리에서 바로 스트리밍 (비우면 STT_PROXY_URL로 WAV 파일 업로드)
+STT_STREAM_FORMAT = "flac"         # "flac" (무손실, 약 절반 크기) | "pcm" (원시 16bit)
+STT_STREAM_CHUNK_BYTES = 16384
 LLM_PARSE_URL = "http://13.124.184.2:8000/llm_parse"
 LLM_PARSE_TIMEOUT = 3.0
 LLM_FALLBACK = True
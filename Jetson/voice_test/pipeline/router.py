@@ -24,10 +24,9 @@ from pipeline.kws_wake import WakeKWS, WakeKWSConfig
 from pipeline.speaker_verify import SpeakerVerifier, SpeakerConfig
 from pipeline.stt_llm import (
     RuntimeState,
-    transcribe_via_server,
+    transcribe_audio_via_server,
     parse_command_rule,
     llm_fallback_parse,
-    save_wav,
 )
 
 STATE_DIR = Path("/run/sarvis")
@@ -235,49 +234,40 @@ class ImprovedVoiceCommandPipeline:
             return True, 1.0, "validation_disabled"
         
         try:
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                tmp_path = Path(tmp.name)
-                save_wav(tmp_path, audio_f32, sr)
-                
-                stt_text, _ = transcribe_via_server(self.http, tmp_path)
-                
-                try:
-                    tmp_path.unlink()
-                except Exception:
-                    pass
-                
-                if not stt_text:
-                    return False, 0.0, "empty_stt"
-                
-                payload = {
-                    "text": stt_text,
-                    "target_words": self._wake_target_words,
-                }
-                
-                response = self.http.post(
-                    self._wake_validation_url,
-                    json=payload,
-                    timeout=3.0
-                )
-                
-                if response.status_code != 200:
-                    self._log(f"⚠️  Validation API error: status={response.status_code}")
-                    return True, 1.0, "api_error_bypass"
-                
-                result = response.json()
-                is_valid = result.get("is_valid", False)
-                confidence = result.get("confidence", 0.0)
-                reason = result.get("reason", "unknown")
-                matched = result.get("matched_word", "")
-                
-                self._log(
-                    f"[VALIDATION] STT='{stt_text}' -> "
-                    f"valid={is_valid}, conf={confidence:.3f}, "
-                    f"reason={reason}, matched={matched}"
-                )
-                
-                return is_valid, confidence, reason
+            # ⭐ 메모리에서 바로 STT (임시 WAV 파일 없음)
+            stt_text, _ = transcribe_audio_via_server(self.http, audio_f32, sr)
+            
+            if not stt_text:
+                return False, 0.0, "empty_stt"
+            
+            payload = {
+                "text": stt_text,
+                "target_words": self._wake_target_words,
+            }
+            
+            response = self.http.post(
+                self._wake_validation_url,
+                json=payload,
+                timeout=3.0
+            )
+            
+            if response.status_code != 200:
+                self._log(f"⚠️  Validation API error: status={response.status_code}")
+                return True, 1.0, "api_error_bypass"
+            
+            result = response.json()
+            is_valid = result.get("is_valid", False)
+            confidence = result.get("confidence", 0.0)
+            reason = result.get("reason", "unknown")
+            matched = result.get("matched_word", "")
+            
+            self._log(
+                f"[VALIDATION] STT='{stt_text}' -> "
+                f"valid={is_valid}, conf={confidence:.3f}, "
+                f"reason={reason}, matched={matched}"
+            )
+            
+            return is_valid, confidence, reason
         
         except Exception as e:
             self._log(f"❌ Wake validation error: {e}")
@@ -622,9 +612,6 @@ class ImprovedVoiceCommandPipeline:
         request_id = uuid.uuid4().hex[:12]
         speaker_id = self.sm.get_cached_speaker() or "unknown"
         
-        tmp_dir = Path(getattr(C, "CMD_WAV_DIR", "/tmp"))
-        tmp = tmp_dir / f"cmd_{request_id}.wav"
-        
         stt_text = ""
         cmd: Dict[str, Any] = {"cmd": "REJECT", "reason": "internal_error"}
         timings: Dict[str, float] = {}
@@ -632,11 +619,9 @@ class ImprovedVoiceCommandPipeline:
         self._stats["cmd_finalized"] += 1
         
         try:
-            save_wav(tmp, audio, sr)
-            
             self._log(f"📝 Finalizing command: duration={len(audio)/sr:.2f}s, segments={len(self._cmd_buf)}")
             
-            stt_text, t = transcribe_via_server(self.http, tmp)
+            stt_text, t = transcribe_audio_via_server(self.http, audio, sr)
             timings.update(t)
             
             if not stt_text:
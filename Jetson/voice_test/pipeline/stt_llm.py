@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import io
 import json
+import tempfile
 import time
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterator, Tuple
 
 import httpx
 import numpy as np
@@ -82,6 +84,77 @@ def transcribe_via_server(client: httpx.Client, wav_path: Path) -> Tuple[str, Di
     return text, {"stt_ms": t1 - t0, "stt_req_ms": t1 - t_req}
 
 
+def encode_audio_stream(audio_f32: np.ndarray, sr: int, fmt: str = "flac") -> Tuple[str, memoryview]:
+    """
+    Encode mono float32 audio in memory for /stt_stream.
+
+    Returns:
+        (content_type, encoded bytes)
+          - "pcm":  audio/L16 (16bit little-endian, no header - proxy adds WAV header)
+          - "flac": audio/flac (lossless, about half the upload size)
+    """
+    audio = np.clip(np.asarray(audio_f32, dtype=np.float32).reshape(-1), -1.0, 1.0)
+    if fmt == "pcm":
+        pcm = (audio * 32767.0).astype("<i2")
+        return f"audio/L16; rate={int(sr)}; channels=1", memoryview(pcm.tobytes())
+    if fmt == "flac":
+        buf = io.BytesIO()
+        sf.write(buf, audio, int(sr), format="FLAC", subtype="PCM_16")
+        return "audio/flac", buf.getbuffer()
+    raise ValueError(f"unsupported STT stream format: {fmt}")
+
+
+def iter_chunks(data: memoryview, chunk_bytes: int) -> Iterator[bytes]:
+    for start in range(0, len(data), chunk_bytes):
+        yield bytes(data[start:start + chunk_bytes])
+
+
+def transcribe_stream_via_server(client: httpx.Client, audio_f32: np.ndarray, sr: int) -> Tuple[str, Dict[str, float]]:
+    """
+    Server-side STT from memory (no temp WAV file).
+
+    Audio is sent as a chunked request body to STT_STREAM_URL; the proxy forwards
+    chunks to GMS as they arrive and reports its upload/first-byte/total timings.
+    """
+    url = str(getattr(C, "STT_STREAM_URL", "")).strip()
+    if not url:
+        raise RuntimeError("STT_STREAM_URL is empty. Provide server streaming STT endpoint.")
+    t0 = now_ms()
+    content_type, data = encode_audio_stream(audio_f32, sr, str(getattr(C, "STT_STREAM_FORMAT", "flac")))
+    t_req = now_ms()
+
+    r = client.post(
+        url,
+        content=iter_chunks(data, int(getattr(C, "STT_STREAM_CHUNK_BYTES", 16384))),
+        headers={**proxy_headers(), "Content-Type": content_type},
+        timeout=float(getattr(C, "STT_PROXY_TIMEOUT", 6.0)),
+    )
+    t1 = now_ms()
+
+    r.raise_for_status()
+    body = r.json()
+    text = (body.get("text") or "").strip()
+    timings = {"stt_ms": t1 - t0, "stt_encode_ms": t_req - t0, "stt_req_ms": t1 - t_req}
+    server = body.get("timings") or {}
+    for key in ("upload_ms", "first_byte_ms", "total_ms"):
+        if key in server:
+            timings[f"stt_server_{key}"] = float(server[key])
+    return text, timings
+
+
+def transcribe_audio_via_server(client: httpx.Client, audio_f32: np.ndarray, sr: int) -> Tuple[str, Dict[str, float]]:
+    """STT for in-memory audio: stream if STT_STREAM_URL is set, else upload a temp WAV to STT_PROXY_URL."""
+    if str(getattr(C, "STT_STREAM_URL", "")).strip():
+        return transcribe_stream_via_server(client, audio_f32, sr)
+
+    tmp_dir = Path(getattr(C, "CMD_WAV_DIR", tempfile.gettempdir()))
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(suffix=".wav", dir=tmp_dir) as tmp:
+        tmp_path = Path(tmp.name)
+        save_wav(tmp_path, audio_f32, sr)
+        return transcribe_via_server(client, tmp_path)
+
+
 # -------------------------
 # Rule parse
 # -------------------------
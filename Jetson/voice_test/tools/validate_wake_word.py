@@ -11,8 +11,9 @@ import os
 import json
 import shutil
 import argparse
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, Iterator
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -28,6 +29,7 @@ import httpx
 class ValidatorConfig:
     # Server endpoints (기존 시스템 활용)
     stt_url: str = "http://13.124.184.2:8000/stt"
+    stt_batch_url: str = "http://13.124.184.2:8000/stt_batch"
     llm_verify_url: str = "http://13.124.184.2:8000/verify_wake"
     
     # Jetson token (기존 config.py와 동일)
@@ -41,6 +43,7 @@ class ValidatorConfig:
     
     # Concurrency
     max_workers: int = 4
+    batch_size: int = 0  # > 0이면 /stt_batch로 batch_size개씩 전송 (동시 처리는 서버가)
     
     # Timeouts
     stt_timeout: float = 10.0
@@ -103,6 +106,73 @@ class STTClient:
         self.client.close()
 
 
+class BatchSTTClient:
+    """
+    /stt_batch 일괄 STT
+    
+    파일 batch_size개를 요청 하나로 보내고, 서버가 끝내는 순서대로 NDJSON 결과를 받음
+    (파일마다 요청을 보내고 응답을 기다리던 것보다 왕복/연결 비용이 적음)
+    """
+    
+    def __init__(self, cfg: ValidatorConfig):
+        self.cfg = cfg
+        # read timeout은 줄 사이 간격 기준이라 파일 하나의 STT 시간이면 충분
+        self.client = httpx.Client(timeout=httpx.Timeout(cfg.stt_timeout))
+    
+    def transcribe_many(self, audio_paths: List[Path]) -> Iterator[Tuple[Path, str, float]]:
+        """
+        (path, text, confidence)를 끝나는 순서대로 반환 (실패한 파일은 ("", 0.0))
+        """
+        for start in range(0, len(audio_paths), self.cfg.batch_size):
+            group = audio_paths[start:start + self.cfg.batch_size]
+            pending = dict(enumerate(group))
+            
+            try:
+                yield from self._transcribe_group(group, pending)
+            except Exception as e:
+                print(f"⚠️  Batch STT failed ({len(pending)} files): {e}")
+            
+            # 결과를 받지 못한 파일
+            for audio_path in pending.values():
+                yield audio_path, "", 0.0
+    
+    def _transcribe_group(self, group: List[Path], pending: Dict[int, Path]):
+        with ExitStack() as stack:
+            files = [
+                ("files", (path.name, stack.enter_context(open(path, "rb")), "audio/wav"))
+                for path in group
+            ]
+            headers = {"x-token": self.cfg.jetson_token}
+            
+            with self.client.stream(
+                "POST",
+                self.cfg.stt_batch_url,
+                params={"language": "ko"},
+                files=files,
+                headers=headers,
+            ) as r:
+                r.raise_for_status()
+                
+                for line in r.iter_lines():
+                    if not line.strip():
+                        continue
+                    result = json.loads(line)
+                    if result.get("done"):
+                        break
+                    
+                    audio_path = pending.pop(result["index"])
+                    if "error" in result:
+                        print(f"⚠️  STT failed for {audio_path.name}: {result['error']}")
+                        yield audio_path, "", 0.0
+                        continue
+                    
+                    text = result.get("text", "").strip()
+                    yield audio_path, text, float(result.get("confidence", 1.0))
+    
+    def close(self):
+        self.client.close()
+
+
 # =====================
 # LLM Verifier
 # =====================
@@ -200,6 +270,7 @@ class WakeWordValidator:
     def __init__(self, cfg: ValidatorConfig):
         self.cfg = cfg
         self.stt = STTClient(cfg)
+        self.batch_stt = BatchSTTClient(cfg) if cfg.batch_size > 0 else None
         self.llm = LLMVerifier(cfg)
     
     def validate_file(self, audio_path: Path) -> ValidationResult:
@@ -207,6 +278,10 @@ class WakeWordValidator:
         # 1) STT 변환
         stt_text, stt_conf = self.stt.transcribe(audio_path)
         
+        return self.judge(audio_path, stt_text, stt_conf)
+    
+    def judge(self, audio_path: Path, stt_text: str, stt_conf: float) -> ValidationResult:
+        """STT 결과 판정"""
         if not stt_text:
             return ValidationResult(
                 path=audio_path,
@@ -256,10 +331,17 @@ class WakeWordValidator:
         results = []
         
         with ThreadPoolExecutor(max_workers=self.cfg.max_workers) as executor:
-            futures = {
-                executor.submit(self.validate_file, wav): wav
-                for wav in wav_files
-            }
+            if self.batch_stt is not None:
+                # STT는 /stt_batch 스트림에서 도착하는 대로, LLM 검증은 스레드 풀에서
+                futures = {
+                    executor.submit(self.judge, wav, text, conf): wav
+                    for wav, text, conf in self.batch_stt.transcribe_many(wav_files)
+                }
+            else:
+                futures = {
+                    executor.submit(self.validate_file, wav): wav
+                    for wav in wav_files
+                }
             
             for i, future in enumerate(as_completed(futures), 1):
                 wav = futures[future]
@@ -332,6 +414,8 @@ class WakeWordValidator:
     
     def close(self):
         self.stt.close()
+        if self.batch_stt is not None:
+            self.batch_stt.close()
         self.llm.close()
 
 
@@ -465,6 +549,7 @@ def main():
     validate_parser.add_argument("--target-words", nargs="*", default=None)
     validate_parser.add_argument("--confidence", type=float, default=0.7)
     validate_parser.add_argument("--workers", type=int, default=4)
+    validate_parser.add_argument("--batch-size", type=int, default=0, help="/stt_batch로 N개씩 전송 (0: 파일마다 /stt)")
     
     # --- organize ---
     organize_parser = subparsers.add_parser("organize", help="Organize files by validation")
@@ -473,6 +558,7 @@ def main():
     organize_parser.add_argument("--backup-dir", default=None)
     organize_parser.add_argument("--dry-run", action="store_true")
     organize_parser.add_argument("--confidence", type=float, default=0.7)
+    organize_parser.add_argument("--batch-size", type=int, default=0)
     
     # --- full ---
     full_parser = subparsers.add_parser("full", help="Validate + Organize")
@@ -483,6 +569,7 @@ def main():
     full_parser.add_argument("--dry-run", action="store_true")
     full_parser.add_argument("--interactive", action="store_true")
     full_parser.add_argument("--confidence", type=float, default=0.7)
+    full_parser.add_argument("--batch-size", type=int, default=0)
     
     args = parser.parse_args()
     
@@ -494,6 +581,7 @@ def main():
     cfg = ValidatorConfig(
         confidence_threshold=args.confidence,
         max_workers=getattr(args, "workers", 4),
+        batch_size=args.batch_size,
     )
     
     if hasattr(args, "target_words") and args.target_words:
@@ -234,7 +234,7 @@ export interface ButtonCommandResponse {
   success: boolean;
   message: string;
   command: string;
-  command_log_id: number;
+  command_event_id: string;
   jetson_error?: string;
 }
 
@@ -358,6 +358,7 @@ export interface ConnectionEstablishedMessage {
 export interface VoiceCommandMessage {
   type: 'voice_command';
   command: string;  // 예: "SARVIS"
+  request_id?: string;  // 확인(voice_call_confirmation)에 그대로 돌려보냄
   timestamp: string;
 }
 
@@ -367,6 +368,7 @@ export interface VoiceCommandMessage {
 export interface YouTubeCommandMessage {
   type: 'youtube_command';
   command: 'YOUTUBE_OPEN' | 'YOUTUBE_SEEK_FORWARD' | 'YOUTUBE_SEEK_BACKWARD' | 'YOUTUBE_PAUSE' | 'YOUTUBE_PLAY';
+  request_id?: string;  // 확인(youtube_command_ack)에 그대로 돌려보냄
   timestamp: string;
 }
 
@@ -377,6 +379,7 @@ export interface YouTubeCommandAckMessage {
   type: 'youtube_command_ack';
   data: {
     status: 'success' | 'failed';
+    request_id?: string;
     timestamp: string;
   };
 }
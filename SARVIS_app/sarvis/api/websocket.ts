@@ -178,7 +178,7 @@ export class WebSocketManager {
    * 음성 호출 확인 메시지 전송
    * - 서버가 음성 호출 트리거 후 앱의 확인을 대기할 때 사용
    */
-  sendVoiceCommandAck(): void {
+  sendVoiceCommandAck(requestId?: string): void {
     if (!this.ws || this.ws.readyState !== WebSocket.OPEN) {
       console.warn('⚠️ WebSocket이 연결되지 않아 확인 메시지를 보낼 수 없습니다.');
       return;
@@ -186,6 +186,7 @@ export class WebSocketManager {
 
     const ackMessage = {
       type: 'voice_call_confirmation',
+      request_id: requestId,
       timestamp: new Date().toISOString()
     };
 
@@ -201,7 +202,7 @@ export class WebSocketManager {
    * 유튜브 명령 실행 결과 전송
    * - 서버가 유튜브 제어 명령 후 앱의 실행 결과를 대기할 때 사용
    */
-  sendYouTubeCommandAck(status: 'success' | 'failed'): void {
+  sendYouTubeCommandAck(status: 'success' | 'failed', requestId?: string): void {
     if (!this.ws || this.ws.readyState !== WebSocket.OPEN) {
       console.warn('⚠️ WebSocket이 연결되지 않아 유튜브 확인 메시지를 보낼 수 없습니다.');
       return;
@@ -211,6 +212,7 @@ export class WebSocketManager {
       type: 'youtube_command_ack',
       data: {
         status,
+        request_id: requestId,
         timestamp: new Date().toISOString()
       }
     };
@@ -172,7 +172,7 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
         await handleVoiceCommand(command, message.timestamp);
 
         // 2. 알람 실행 성공 후 서버에 확인 신호(ACK) 전송 (백엔드 대기 해제용)
-        wsManager.sendVoiceCommandAck();
+        wsManager.sendVoiceCommandAck(message.request_id);
 
         // 3. UI 오버레이 표시
         setLastVoiceCommand(command);
@@ -219,7 +219,7 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
         }
 
         // 서버로 실행 결과 전송 (백엔드 대기 해제용)
-        wsManager.sendYouTubeCommandAck(success ? 'success' : 'failed');
+        wsManager.sendYouTubeCommandAck(success ? 'success' : 'failed', message.request_id);
       },
       onDisconnected: () => {
         console.log('🔌 WebSocket 연결 해제');